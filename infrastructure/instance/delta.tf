@@ -62,6 +62,7 @@ resource "aws_lambda_function" "delta_sync_lambda" {
       SOURCE               = "IEDS"
       SPLUNK_FIREHOSE_NAME = module.splunk.firehose_stream_name
       LOG_LEVEL            = "INFO"
+      DELTA_MAX_WORKERS    = "10"
     }
   }
 
@@ -202,6 +202,10 @@ resource "aws_dynamodb_table" "events-dynamodb-table" {
     name = "PatientSK"
     type = "S"
   }
+  attribute {
+    name = "PatientOccurrenceSK"
+    type = "S"
+  }
   attribute {
     name = "IdentifierPK"
     type = "S"
@@ -226,6 +230,21 @@ resource "aws_dynamodb_table" "events-dynamodb-table" {
     }
   }
 
+  global_secondary_index {
+    name            = "PatientOccurrenceGSI"
+    projection_type = "ALL"
+
+    key_schema {
+      attribute_name = "PatientPK"
+      key_type       = "HASH"
+    }
+
+    key_schema {
+      attribute_name = "PatientOccurrenceSK"
+      key_type       = "RANGE"
+    }
+  }
+
   global_secondary_index {
     name            = "IdentifierGSI"
     projection_type = "ALL"
@@ -71,6 +71,7 @@ resource "aws_iam_policy" "ecs_task_exec_policy" {
       {
         Effect = "Allow"
         Action = [
+          "dynamodb:GetItem",
           "dynamodb:Query",
           "dynamodb:UpdateItem"
         ]
@@ -179,6 +180,14 @@ resource "aws_ecs_task_definition" "ecs_task" {
       {
         name  = "REDIS_PORT"
         value = tostring(data.aws_elasticache_cluster.existing_redis.cache_nodes[0].port)
+      },
+      {
+        name  = "ROW_PROCESSING_WORKERS"
+        value = "4"
+      },
+      {
+        name  = "REDIS_LOCAL_CACHE_TTL_SECONDS"
+        value = "60"
       }
     ]
     logConfiguration = {
@@ -28,11 +28,14 @@ locals {
     "IMMUNIZATION_ENV"       = local.resource_scope,
     "IMMUNIZATION_BASE_PATH" = strcontains(var.sub_environment, "pr-") ? "immunisation-fhir-api/FHIR/R4-${var.sub_environment}" : "immunisation-fhir-api/FHIR/R4"
     # except for prod and ref, any other env uses PDS int environment
-    "PDS_ENV"              = var.pds_environment
-    "SPLUNK_FIREHOSE_NAME" = module.splunk.firehose_stream_name
-    "SQS_QUEUE_URL"        = "https://sqs.${var.aws_region}.amazonaws.com/${var.immunisation_account_id}/${local.short_prefix}-ack-metadata-queue.fifo"
-    "REDIS_HOST"           = data.aws_elasticache_cluster.existing_redis.cache_nodes[0].address
-    "REDIS_PORT"           = data.aws_elasticache_cluster.existing_redis.cache_nodes[0].port
+    "PDS_ENV"                       = var.pds_environment
+    "SPLUNK_FIREHOSE_NAME"          = module.splunk.firehose_stream_name
+    "SQS_QUEUE_URL"                 = "https://sqs.${var.aws_region}.amazonaws.com/${var.immunisation_account_id}/${local.short_prefix}-ack-metadata-queue.fifo"
+    "REDIS_HOST"                    = data.aws_elasticache_cluster.existing_redis.cache_nodes[0].address
+    "REDIS_PORT"                    = data.aws_elasticache_cluster.existing_redis.cache_nodes[0].port
+    "REDIS_LOCAL_CACHE_TTL_SECONDS" = "60"
+    # Enable once all existing records have been backfilled with PatientOccurrenceSK
+    "OCCURRENCE_DATE_INDEX_ENABLED" = "false"
   }
 }
 data "aws_iam_policy_document" "imms_policy_document" {
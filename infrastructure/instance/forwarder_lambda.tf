@@ -92,6 +92,8 @@ resource "aws_iam_policy" "forwarding_lambda_exec_policy" {
         Effect = "Allow"
         Action = [
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:PutItem",
           "dynamodb:UpdateItem",
           "dynamodb:Query"
@@ -147,12 +149,14 @@ resource "aws_lambda_function" "forwarding_lambda" {
 
   environment {
     variables = {
-      SOURCE_BUCKET_NAME  = aws_s3_bucket.batch_data_source_bucket.bucket
-      ACK_BUCKET_NAME     = aws_s3_bucket.batch_data_destination_bucket.bucket
-      DYNAMODB_TABLE_NAME = aws_dynamodb_table.events-dynamodb-table.name
-      SQS_QUEUE_URL       = aws_sqs_queue.fifo_queue.url
-      REDIS_HOST          = data.aws_elasticache_cluster.existing_redis.cache_nodes[0].address
-      REDIS_PORT          = data.aws_elasticache_cluster.existing_redis.cache_nodes[0].port
+      SOURCE_BUCKET_NAME            = aws_s3_bucket.batch_data_source_bucket.bucket
+      ACK_BUCKET_NAME               = aws_s3_bucket.batch_data_destination_bucket.bucket
+      DYNAMODB_TABLE_NAME           = aws_dynamodb_table.events-dynamodb-table.name
+      SQS_QUEUE_URL                 = aws_sqs_queue.fifo_queue.url
+      REDIS_HOST                    = data.aws_elasticache_cluster.existing_redis.cache_nodes[0].address
+      REDIS_PORT                    = data.aws_elasticache_cluster.existing_redis.cache_nodes[0].port
+      REDIS_LOCAL_CACHE_TTL_SECONDS = "60"
+      FORWARDING_MAX_WORKERS        = "8"
     }
   }
   kms_key_arn = data.aws_kms_key.existing_lambda_encryption_key.arn
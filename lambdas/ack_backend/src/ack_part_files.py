@@ -0,0 +1,117 @@
+"""
+Functions for writing the ack rows from each batch of messages to a separate part file, and for combining the part
+files into a single ack file once the batch file has been fully processed.
+"""
+
+import io
+from collections.abc import Iterable, Iterator
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+from common.clients import get_s3_client, logger
+from common.models.batch_constants import ACK_BUCKET_NAME
+from constants import (
+    ACK_FILE_READ_CHUNK_SIZE,
+    ACK_FILE_UPLOAD_MAX_CONCURRENCY,
+    ACK_PART_ROW_NUMBER_WIDTH,
+    S3_DELETE_OBJECTS_MAX_KEYS,
+    TEMP_ACK_PARTS_DIR,
+)
+
+
+def get_ack_parts_prefix(ack_filename: str) -> str:
+    """Returns the S3 prefix under which the part files for the given ack file are stored"""
+    return f"{TEMP_ACK_PARTS_DIR}/{ack_filename}/"
+
+
+def write_ack_part(ack_filename: str, first_row_id: str, content: str) -> None:
+    """
+    Uploads the content as a new part file for the given ack file. Part files are named after the number of the first
+    row they contain, so that listing them returns them in row order, and so that a batch which is processed again
+    overwrites its own part file rather than adding a duplicate one.
+    """
+    first_row_number = int(first_row_id.split("^")[-1])
+    part_key = f"{get_ack_parts_prefix(ack_filename)}{first_row_number:0{ACK_PART_ROW_NUMBER_WIDTH}d}"
+    get_s3_client().put_object(Bucket=ACK_BUCKET_NAME, Key=part_key, Body=content.encode("utf-8"))
+    logger.info("Ack part file written to %s: %s", ACK_BUCKET_NAME, part_key)
+
+
+def list_ack_part_keys(ack_filename: str) -> list[str]:
+    """Returns the keys of all part files for the given ack file, in row order"""
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    return [
+        s3_object["Key"]
+        for page in paginator.paginate(Bucket=ACK_BUCKET_NAME, Prefix=get_ack_parts_prefix(ack_filename))
+        for s3_object in page.get("Contents", [])
+    ]
+
+
+def iter_object_chunks(file_key: str, missing_ok: bool = False) -> Iterator[bytes]:
+    """
+    Yields the content of the given object from the ack bucket in chunks.
+    If missing_ok is True then nothing is yielded if the object does not exist.
+    """
+    try:
+        response = get_s3_client().get_object(Bucket=ACK_BUCKET_NAME, Key=file_key)
+    except ClientError as error:
+        if missing_ok and error.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return
+        raise
+
+    yield from response["Body"].iter_chunks(ACK_FILE_READ_CHUNK_SIZE)
+
+
+def iter_object_lines(file_key: str) -> Iterator[bytes]:
+    """Yields each non-empty line of the given object from the ack bucket"""
+    response = get_s3_client().get_object(Bucket=ACK_BUCKET_NAME, Key=file_key)
+    for line in response["Body"].iter_lines(ACK_FILE_READ_CHUNK_SIZE):
+        if line:
+            yield line
+
+
+class ChunkStream(io.RawIOBase):
+    """Read-only file-like object over an iterable of byte strings, so that they can be streamed to S3"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._current_chunk = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._current_chunk:
+            try:
+                self._current_chunk = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+
+        size = min(len(buffer), len(self._current_chunk))
+        buffer[:size] = self._current_chunk[:size]
+        self._current_chunk = self._current_chunk[size:]
+        return size
+
+
+def upload_chunks(chunks: Iterable[bytes], file_key: str) -> None:
+    """
+    Streams the chunks to the given object in the ack bucket. Large content is sent as a multipart upload, so only a
+    bounded number of upload parts are held in memory at once.
+    """
+    get_s3_client().upload_fileobj(
+        io.BufferedReader(ChunkStream(chunks), buffer_size=ACK_FILE_READ_CHUNK_SIZE),
+        ACK_BUCKET_NAME,
+        file_key,
+        Config=TransferConfig(max_concurrency=ACK_FILE_UPLOAD_MAX_CONCURRENCY),
+    )
+
+
+def delete_objects(file_keys: list[str]) -> None:
+    """Deletes the given objects from the ack bucket"""
+    s3_client = get_s3_client()
+    for start in range(0, len(file_keys), S3_DELETE_OBJECTS_MAX_KEYS):
+        keys_to_delete = file_keys[start : start + S3_DELETE_OBJECTS_MAX_KEYS]
+        s3_client.delete_objects(
+            Bucket=ACK_BUCKET_NAME,
+            Delete={"Objects": [{"Key": key} for key in keys_to_delete], "Quiet": True},
+        )
@@ -1,9 +1,11 @@
 """Ack lambda handler"""
 
 import json
+from collections import Counter
 
 from common.batch.audit_table import increment_records_failed_count
 from common.batch.eof_utils import is_eof_message
+from common.clients import logger
 from convert_message_to_ack_row import convert_message_to_ack_row
 from logging_decorators import ack_lambda_handler_logging_decorator
 from update_ack_file import (
@@ -18,7 +20,9 @@ def lambda_handler(event, _):
     """
     Ack lambda handler.
     For each record: each message in the array of messages is converted to an ack row,
-    then all of the ack rows for that array of messages are uploaded to the ack file in one go.
+    then all of the ack rows for the event are uploaded to new ack part files in one go.
+    The records_failed count on the audit table is then updated once for each file in the event, rather than once for
+    each message.
     """
 
     if not event.get("Records"):
@@ -31,6 +35,7 @@ def lambda_handler(event, _):
     vaccine_type = None
 
     ack_data_rows = []
+    failure_counts = Counter()
     file_processing_complete = False
 
     for i, record in enumerate(event["Records"]):
@@ -54,11 +59,13 @@ def lambda_handler(event, _):
                 break
 
             ack_data_rows.append(convert_message_to_ack_row(message, created_at_formatted_string))
-            increment_records_failed_count(message_id)
+            failure_counts[message.get("row_id", "").split("^")[0] or message_id] += 1
 
     update_csv_ack_file(file_key, created_at_formatted_string, ack_data_rows)
 
-    update_json_ack_file(message_id, supplier, file_key, created_at_formatted_string, ack_data_rows)
+    update_json_ack_file(file_key, created_at_formatted_string, ack_data_rows)
+
+    update_records_failed_counts(failure_counts)
 
     if file_processing_complete:
         complete_batch_file_process(message_id, supplier, vaccine_type, created_at_formatted_string, file_key)
@@ -67,3 +74,17 @@ def lambda_handler(event, _):
         "statusCode": 200,
         "body": json.dumps("Lambda function executed successfully!"),
     }
+
+
+def update_records_failed_counts(failure_counts: Counter) -> None:
+    """Adds the number of failures counted for each file to its records_failed count on the audit table"""
+    for failures_message_id, failure_count in failure_counts.items():
+        increment_records_failed_count(failures_message_id, failure_count)
+
+    total_failures = failure_counts.total()
+    logger.info(
+        "Added %s failures to the audit table in %s update(s), saving %s DynamoDB calls",
+        total_failures,
+        len(failure_counts),
+        total_failures - len(failure_counts),
+    )
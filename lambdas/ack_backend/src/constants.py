@@ -2,6 +2,7 @@
 
 COMPLETED_ACK_DIR = "forwardedFile"
 TEMP_ACK_DIR = "TempAck"
+TEMP_ACK_PARTS_DIR = "TempAck/parts"
 BATCH_FILE_PROCESSING_DIR = "processing"
 BATCH_FILE_ARCHIVE_DIR = "archive"
 BATCH_REPORT_TITLE = "Immunisation FHIR API Batch Report"
@@ -9,6 +10,12 @@ BATCH_REPORT_VERSION = 1
 LAMBDA_FUNCTION_NAME_PREFIX = "ack_processor"
 DEFAULT_STREAM_NAME = "immunisation-fhir-api-internal-dev-splunk-firehose"
 
+# Ack part files are named after the zero-padded number of their first row, so that they list in row order
+ACK_PART_ROW_NUMBER_WIDTH = 10
+ACK_FILE_READ_CHUNK_SIZE = 1024 * 1024
+ACK_FILE_UPLOAD_MAX_CONCURRENCY = 4
+S3_DELETE_OBJECTS_MAX_KEYS = 1000
+
 
 ACK_HEADERS = [
     "MESSAGE_HEADER_ID",
@@ -2,13 +2,23 @@
 
 import json
 import os
+import textwrap
 import time
-from copy import deepcopy
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
-from io import BytesIO, StringIO
+from io import StringIO
+from itertools import chain
 
 from botocore.exceptions import ClientError
 
+from ack_part_files import (
+    delete_objects,
+    iter_object_chunks,
+    iter_object_lines,
+    list_ack_part_keys,
+    upload_chunks,
+    write_ack_part,
+)
 from common.aws_s3_utils import move_file
 from common.batch.audit_table import (
     get_ingestion_start_time_by_message_id,
@@ -69,8 +79,7 @@ def _add_ack_data_dict_summary(
     total_failures: int,
     ingestion_end_time_seconds: int,
 ) -> dict:
-    ack_data_dict = deepcopy(existing_ack_data_dict)
-    ack_data_dict["generatedDate"] = _generated_date()
+    ack_data_dict = {**existing_ack_data_dict, "generatedDate": _generated_date()}
     ack_data_dict_summary_ingestion_time = {
         "start": ack_data_dict["summary"]["ingestionTime"]["start"],
         "end": ingestion_end_time_seconds,
@@ -138,15 +147,16 @@ def complete_batch_file_process(
     created_at_formatted_string: str,
     file_key: str,
 ) -> dict:
-    """Mark the batch file as processed. This involves moving the ack and original file to destinations and updating
-    the audit table status"""
+    """Mark the batch file as processed. This involves combining the ack part files into the completed ack files,
+    moving the original file to the archive and updating the audit table status"""
     start_time = time.time()
 
     # finish CSV file
     file_key_without_ext = get_file_key_without_ext(file_key)
     ack_filename = f"{file_key_without_ext}_BusAck_{created_at_formatted_string}.csv"
+    csv_part_keys = list_ack_part_keys(ack_filename)
+    complete_csv_ack_file(ack_filename, csv_part_keys)
 
-    move_file(ACK_BUCKET_NAME, f"{TEMP_ACK_DIR}/{ack_filename}", f"{COMPLETED_ACK_DIR}/{ack_filename}")
     move_file(SOURCE_BUCKET_NAME, f"{BATCH_FILE_PROCESSING_DIR}/{file_key}", f"{BATCH_FILE_ARCHIVE_DIR}/{file_key}")
 
     total_ack_rows_processed, total_failures = get_record_count_and_failures_by_message_id(message_id)
@@ -169,6 +179,7 @@ def complete_batch_file_process(
     json_ack_filename = f"{file_key_without_ext}_BusAck_{created_at_formatted_string}.json"
     temp_ack_file_key = f"{TEMP_ACK_DIR}/{json_ack_filename}"
     ack_data_dict = obtain_current_json_ack_content(message_id, supplier, file_key, temp_ack_file_key)
+    existing_failures = ack_data_dict.pop("failures")
 
     ack_data_dict = _add_ack_data_dict_summary(
         ack_data_dict,
@@ -178,10 +189,14 @@ def complete_batch_file_process(
         int(time.strftime("%s", time_now)),
     )
 
-    # Upload ack_data_dict to S3
-    json_bytes = BytesIO(json.dumps(ack_data_dict, indent=2).encode("utf-8"))
-    get_s3_client().upload_fileobj(json_bytes, ACK_BUCKET_NAME, temp_ack_file_key)
-    move_file(ACK_BUCKET_NAME, f"{TEMP_ACK_DIR}/{json_ack_filename}", f"{COMPLETED_ACK_DIR}/{json_ack_filename}")
+    json_part_keys = list_ack_part_keys(json_ack_filename)
+    part_failures = (json.loads(line) for part_key in json_part_keys for line in iter_object_lines(part_key))
+    upload_chunks(
+        iter_json_ack_file_chunks(ack_data_dict, chain(existing_failures, part_failures)),
+        f"{COMPLETED_ACK_DIR}/{json_ack_filename}",
+    )
+
+    delete_objects([*csv_part_keys, f"{TEMP_ACK_DIR}/{ack_filename}", *json_part_keys, temp_ack_file_key])
 
     result = {
         "message_id": message_id,
@@ -202,6 +217,44 @@ def complete_batch_file_process(
     return result
 
 
+def complete_csv_ack_file(ack_filename: str, part_keys: list[str]) -> None:
+    """
+    Streams the ack headers, followed by the content of each part file, into the completed CSV ack file.
+    If a temporary ack file was created before ack part files were introduced then its content (which includes the
+    headers) is used in place of the headers.
+    """
+    temp_ack_file_key = f"{TEMP_ACK_DIR}/{ack_filename}"
+    existing_chunks = iter_object_chunks(temp_ack_file_key, missing_ok=True)
+    first_existing_chunk = next(existing_chunks, None)
+    if first_existing_chunk is None:
+        initial_chunks = [("|".join(ACK_HEADERS) + "\n").encode("utf-8")]
+    else:
+        logger.info("Existing temporary ack file found in S3 - including its content: %s", temp_ack_file_key)
+        initial_chunks = chain([first_existing_chunk], existing_chunks)
+
+    part_chunks = chain.from_iterable(iter_object_chunks(part_key) for part_key in part_keys)
+    completed_ack_file_key = f"{COMPLETED_ACK_DIR}/{ack_filename}"
+    upload_chunks(chain(initial_chunks, part_chunks), completed_ack_file_key)
+    logger.info("Completed ack file written from %s part files to %s", len(part_keys), completed_ack_file_key)
+
+
+def iter_json_ack_file_chunks(ack_data_dict: dict, failures: Iterable[dict]) -> Iterator[bytes]:
+    """
+    Yields the JSON ack file content for the given ack data (without its failures) followed by the given failures.
+    The content is the same as json.dumps of the complete ack data with indent=2, but only one failure is held in
+    memory at a time.
+    """
+    header_json = json.dumps({**ack_data_dict, "failures": []}, indent=2)
+    yield header_json.removesuffix("[]\n}").encode("utf-8") + b"["
+
+    separator = "\n"
+    for failure in failures:
+        yield (separator + textwrap.indent(json.dumps(failure, indent=2), "    ")).encode("utf-8")
+        separator = ",\n"
+
+    yield b"]\n}" if separator == "\n" else b"\n  ]\n}"
+
+
 def log_batch_file_process(start_time: float, result: dict, function_name: str) -> None:
     """Logs the batch file processing completion to Splunk"""
     base_log_data = {
@@ -217,26 +270,6 @@ def log_batch_file_process(start_time: float, result: dict, function_name: str)
     generate_and_send_logs(STREAM_NAME, start_time, base_log_data, additional_log_data)
 
 
-def obtain_current_csv_ack_content(temp_ack_file_key: str) -> StringIO:
-    """Returns the current ack file content if the file exists, or else initialises the content with the ack headers."""
-    try:
-        # If ack file exists in S3 download the contents
-        existing_ack_file = get_s3_client().get_object(Bucket=ACK_BUCKET_NAME, Key=temp_ack_file_key)
-        existing_content = existing_ack_file["Body"].read().decode("utf-8")
-    except ClientError as error:
-        # If ack file does not exist in S3 create a new file containing the identifier information
-        if error.response["Error"]["Code"] in ("404", "NoSuchKey"):
-            logger.info("No existing ack file found in S3 - creating new file")
-            existing_content = "|".join(ACK_HEADERS) + "\n"
-        else:
-            logger.error("error whilst obtaining current ack content: %s", error)
-            raise
-
-    accumulated_csv_content = StringIO()
-    accumulated_csv_content.write(existing_content)
-    return accumulated_csv_content
-
-
 def obtain_current_json_ack_content(message_id: str, supplier: str, file_key: str, temp_ack_file_key: str) -> dict:
     """Returns the current ack file content if the file exists, or else initialises the content with the ack headers."""
     try:
@@ -269,40 +302,33 @@ def update_csv_ack_file(
     created_at_formatted_string: str,
     ack_data_rows: list,
 ) -> None:
-    """Updates the ack file with the new data row based on the given arguments"""
+    """Writes the given ack data rows to a new part file for the CSV ack file"""
+    if not ack_data_rows:
+        return
+
     file_key_without_ext = get_file_key_without_ext(file_key)
     ack_filename = f"{file_key_without_ext}_BusAck_{created_at_formatted_string}.csv"
-    temp_ack_file_key = f"{TEMP_ACK_DIR}/{ack_filename}"
-    accumulated_csv_content = obtain_current_csv_ack_content(temp_ack_file_key)
 
+    csv_content = StringIO()
     for row in ack_data_rows:
         data_row_str = [str(item) for item in row.values()]
         cleaned_row = "|".join(data_row_str).replace(" |", "|").replace("| ", "|").strip()
-        accumulated_csv_content.write(cleaned_row + "\n")
+        csv_content.write(cleaned_row + "\n")
 
-    csv_file_like_object = BytesIO(accumulated_csv_content.getvalue().encode("utf-8"))
-
-    get_s3_client().upload_fileobj(csv_file_like_object, ACK_BUCKET_NAME, temp_ack_file_key)
-    logger.info("Ack file updated to %s: %s", ACK_BUCKET_NAME, temp_ack_file_key)
+    write_ack_part(ack_filename, ack_data_rows[0]["MESSAGE_HEADER_ID"], csv_content.getvalue())
 
 
 def update_json_ack_file(
-    message_id: str,
-    supplier: str,
     file_key: str,
     created_at_formatted_string: str,
     ack_data_rows: list,
 ) -> None:
-    """Updates the ack file with the new data row based on the given arguments"""
+    """Writes the given ack data rows to a new part file for the JSON ack file, as one JSON failure entry per line"""
+    if not ack_data_rows:
+        return
+
     file_key_without_ext = get_file_key_without_ext(file_key)
     ack_filename = f"{file_key_without_ext}_BusAck_{created_at_formatted_string}.json"
-    temp_ack_file_key = f"{TEMP_ACK_DIR}/{ack_filename}"
-    ack_data_dict = obtain_current_json_ack_content(message_id, supplier, file_key, temp_ack_file_key)
-
-    for row in ack_data_rows:
-        ack_data_dict["failures"].append(_make_json_ack_data_row(row))
 
-    # Upload ack_data_dict to S3
-    json_bytes = BytesIO(json.dumps(ack_data_dict, indent=2).encode("utf-8"))
-    get_s3_client().upload_fileobj(json_bytes, ACK_BUCKET_NAME, temp_ack_file_key)
-    logger.info("JSON ack file updated to %s: %s", ACK_BUCKET_NAME, temp_ack_file_key)
+    json_lines = "".join(json.dumps(_make_json_ack_data_row(row)) + "\n" for row in ack_data_rows)
+    write_ack_part(ack_filename, ack_data_rows[0]["MESSAGE_HEADER_ID"], json_lines)
@@ -22,6 +22,7 @@ from utils.mock_environment_variables import (
 )
 from utils.utils_for_ack_backend_tests import (
     add_audit_entry_to_table,
+    delete_ack_part_files,
     generate_sample_existing_ack_content,
     generate_sample_existing_json_ack_content,
     validate_ack_file_content,
@@ -36,6 +37,7 @@ from utils.values_for_ack_backend_tests import (
 
 with patch.dict("os.environ", MOCK_ENVIRONMENT_DICT):
     from ack_processor import lambda_handler
+    from common.batch.audit_table import increment_records_failed_count
 
 BASE_SUCCESS_MESSAGE = MOCK_MESSAGE_DETAILS.success_message
 BASE_FAILURE_MESSAGE = {
@@ -67,6 +69,8 @@ class TestAckProcessor(unittest.TestCase):
 
         self.ack_bucket_patcher = patch("update_ack_file.ACK_BUCKET_NAME", BucketNames.DESTINATION)
         self.ack_bucket_patcher.start()
+        self.ack_part_files_bucket_patcher = patch("ack_part_files.ACK_BUCKET_NAME", BucketNames.DESTINATION)
+        self.ack_part_files_bucket_patcher.start()
 
         self.source_bucket_patcher = patch("update_ack_file.SOURCE_BUCKET_NAME", BucketNames.SOURCE)
         self.source_bucket_patcher.start()
@@ -94,22 +98,23 @@ class TestAckProcessor(unittest.TestCase):
     def assert_ack_and_source_file_locations_correct(
         self,
         source_file_key: str,
-        tmp_ack_file_key: str,
+        tmp_ack_parts_prefix: str,
         complete_ack_file_key: str,
-        tmp_json_ack_file_key: str,
+        tmp_json_ack_parts_prefix: str,
         complete_json_ack_file_key: str,
         is_complete: bool,
     ) -> None:
-        """Helper function to check the ack and source files have not been moved as the processing is not yet
-        complete"""
+        """Helper function to check that the ack part files have been combined into the completed ack files and the
+        source file archived only once processing is complete"""
         if is_complete:
             ack_file = self.s3_client.get_object(Bucket=BucketNames.DESTINATION, Key=complete_ack_file_key)
             json_ack_file = self.s3_client.get_object(Bucket=BucketNames.DESTINATION, Key=complete_json_ack_file_key)
-        else:
-            ack_file = self.s3_client.get_object(Bucket=BucketNames.DESTINATION, Key=tmp_ack_file_key)
-            json_ack_file = self.s3_client.get_object(Bucket=BucketNames.DESTINATION, Key=tmp_json_ack_file_key)
-        self.assertIsNotNone(ack_file["Body"].read())
-        self.assertIsNotNone(json_ack_file["Body"].read())
+            self.assertIsNotNone(ack_file["Body"].read())
+            self.assertIsNotNone(json_ack_file["Body"].read())
+
+        for parts_prefix in (tmp_ack_parts_prefix, tmp_json_ack_parts_prefix):
+            part_files = self.s3_client.list_objects_v2(Bucket=BucketNames.DESTINATION, Prefix=parts_prefix)
+            self.assertEqual(part_files.get("KeyCount"), 0 if is_complete else 1)
 
         full_src_file_key = f"archive/{source_file_key}" if is_complete else f"processing/{source_file_key}"
         src_file = self.s3_client.get_object(Bucket=BucketNames.SOURCE, Key=full_src_file_key)
@@ -219,6 +224,27 @@ class TestAckProcessor(unittest.TestCase):
         )
         self.assert_audit_entry_counts_equal("row", expected_entry_counts)
 
+    def test_lambda_handler_updates_records_failed_count_once_per_file(self):
+        """Test that the failures in all records of the event are added to the audit table in a single update"""
+        add_audit_entry_to_table(self.dynamodb_client, "row")
+        event = {
+            "Records": [
+                {"body": json.dumps([{**BASE_FAILURE_MESSAGE, "row_id": f"row^{i}"} for i in range(1, 4)])},
+                {"body": json.dumps([{**BASE_FAILURE_MESSAGE, "row_id": f"row^{i}"} for i in range(4, 8)])},
+            ]
+        }
+
+        with patch(
+            "ack_processor.increment_records_failed_count", wraps=increment_records_failed_count
+        ) as mock_increment_records_failed_count:
+            response = lambda_handler(event=event, context={})
+
+        self.assertEqual(response, EXPECTED_ACK_LAMBDA_RESPONSE_FOR_SUCCESS)
+        mock_increment_records_failed_count.assert_called_once_with("row", 7)
+        self.assert_audit_entry_counts_equal(
+            "row", {"record_count": None, "records_succeeded": None, "records_failed": "7"}
+        )
+
     def test_lambda_handler_main(self):
         """Test lambda handler with consistent ack_file_name and message_template."""
         # Set up an audit entry which does not yet have record_count recorded
@@ -268,22 +294,16 @@ class TestAckProcessor(unittest.TestCase):
                 validate_ack_file_content(self.s3_client, test_case["messages"])
                 validate_json_ack_file_content(self.s3_client, test_case["messages"], existing_json_file_content)
 
-                self.s3_client.delete_object(
-                    Bucket=BucketNames.DESTINATION,
-                    Key=MOCK_MESSAGE_DETAILS.temp_ack_file_key,
-                )
-                self.s3_client.delete_object(
-                    Bucket=BucketNames.DESTINATION,
-                    Key=MOCK_MESSAGE_DETAILS.temp_json_ack_file_key,
-                )
+                delete_ack_part_files(self.s3_client, MOCK_MESSAGE_DETAILS.temp_ack_parts_prefix)
+                delete_ack_part_files(self.s3_client, MOCK_MESSAGE_DETAILS.temp_json_ack_parts_prefix)
 
     def test_lambda_handler_updates_ack_file_but_does_not_mark_complete_when_records_still_remaining(self):
         """
         Test that the batch file process is not marked as complete when not all records have been processed.
         This means:
-        - the ack file remains in the TempAck directory
+        - the ack rows are written to ack part files in the TempAck directory
         - the source file remains in the processing directory
-        - all ack records in the event are written to the temporary ack
+        - all ack records in the event are written to the ack part files
         """
         mock_batch_message_id = "b500efe4-6e75-4768-a38b-6127b3c7b8e0"
 
@@ -322,9 +342,9 @@ class TestAckProcessor(unittest.TestCase):
         )
         self.assert_ack_and_source_file_locations_correct(
             MOCK_MESSAGE_DETAILS.file_key,
-            MOCK_MESSAGE_DETAILS.temp_ack_file_key,
+            MOCK_MESSAGE_DETAILS.temp_ack_parts_prefix,
             MOCK_MESSAGE_DETAILS.archive_ack_file_key,
-            MOCK_MESSAGE_DETAILS.temp_json_ack_file_key,
+            MOCK_MESSAGE_DETAILS.temp_json_ack_parts_prefix,
             MOCK_MESSAGE_DETAILS.archive_json_ack_file_key,
             is_complete=False,
         )
@@ -335,9 +355,9 @@ class TestAckProcessor(unittest.TestCase):
         """
         Test that the batch file process is marked as complete when all records have been processed.
         This means:
-        - the ack file moves from the TempAck directory to the forwardedFile directory
+        - the ack part files are combined into the completed ack file in the forwardedFile directory
         - the source file moves from the processing to the archive directory
-        - all ack records in the event are appended to the existing temporary ack file
+        - all ack records in the event are appended to the existing temporary ack file content
         - the DDB Audit Table status is set as 'Processed'
         """
         mock_batch_message_id = "75db20e6-c0b5-4012-a8bc-f861a1dd4b22"
@@ -397,9 +417,9 @@ class TestAckProcessor(unittest.TestCase):
         )
         self.assert_ack_and_source_file_locations_correct(
             MOCK_MESSAGE_DETAILS.file_key,
-            MOCK_MESSAGE_DETAILS.temp_ack_file_key,
+            MOCK_MESSAGE_DETAILS.temp_ack_parts_prefix,
             MOCK_MESSAGE_DETAILS.archive_ack_file_key,
-            MOCK_MESSAGE_DETAILS.temp_json_ack_file_key,
+            MOCK_MESSAGE_DETAILS.temp_json_ack_parts_prefix,
             MOCK_MESSAGE_DETAILS.archive_json_ack_file_key,
             is_complete=True,
         )
@@ -47,6 +47,8 @@ class TestLoggingDecorators(unittest.TestCase):
 
         self.ack_bucket_patcher = patch("update_ack_file.ACK_BUCKET_NAME", BucketNames.DESTINATION)
         self.ack_bucket_patcher.start()
+        self.ack_part_files_bucket_patcher = patch("ack_part_files.ACK_BUCKET_NAME", BucketNames.DESTINATION)
+        self.ack_part_files_bucket_patcher.start()
 
         self.get_ingestion_start_time_by_message_id_patcher = patch(
             "update_ack_file.get_ingestion_start_time_by_message_id"
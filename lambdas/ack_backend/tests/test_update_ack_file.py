@@ -1,6 +1,5 @@
 """Tests for the functions in the update_ack_file module."""
 
-import copy
 import json
 import os
 import unittest
@@ -21,12 +20,14 @@ from utils.mock_environment_variables import (
 )
 from utils.utils_for_ack_backend_tests import (
     MOCK_MESSAGE_DETAILS,
+    delete_ack_part_files,
     generate_expected_ack_file_row,
     generate_expected_json_ack_file_element,
     generate_sample_existing_ack_content,
     generate_sample_existing_json_ack_content,
+    obtain_completed_ack_file_content,
     obtain_current_ack_file_content,
-    obtain_current_json_ack_file_content,
+    obtain_current_json_ack_failures,
     setup_existing_ack_file,
 )
 from utils.values_for_ack_backend_tests import DefaultValues, ValidValues
@@ -35,7 +36,7 @@ with patch.dict("os.environ", MOCK_ENVIRONMENT_DICT):
     from update_ack_file import (
         complete_batch_file_process,
         create_ack_data,
-        obtain_current_csv_ack_content,
+        iter_json_ack_file_chunks,
         obtain_current_json_ack_content,
         update_csv_ack_file,
         update_json_ack_file,
@@ -66,6 +67,8 @@ class TestUpdateAckFile(unittest.TestCase):
 
         self.ack_bucket_patcher = patch("update_ack_file.ACK_BUCKET_NAME", BucketNames.DESTINATION)
         self.ack_bucket_patcher.start()
+        self.ack_part_files_bucket_patcher = patch("ack_part_files.ACK_BUCKET_NAME", BucketNames.DESTINATION)
+        self.ack_part_files_bucket_patcher.start()
         self.source_bucket_patcher = patch("update_ack_file.SOURCE_BUCKET_NAME", BucketNames.SOURCE)
         self.source_bucket_patcher.start()
 
@@ -161,34 +164,114 @@ class TestUpdateAckFile(unittest.TestCase):
                 expected_ack_file_content = ValidValues.ack_headers + "\n".join(test_case["expected_rows"]) + "\n"
                 self.assertEqual(expected_ack_file_content, actual_ack_file_content)
 
-                self.s3_client.delete_object(
-                    Bucket=BucketNames.DESTINATION,
-                    Key=MOCK_MESSAGE_DETAILS.temp_ack_file_key,
-                )
-
-    def test_update_ack_file_existing(self):
-        """Test that update_ack_file correctly updates the ack file when there was an existing ack file"""
-        # Mock existing content in the ack file
-        existing_content = generate_sample_existing_ack_content()
-        setup_existing_ack_file(MOCK_MESSAGE_DETAILS.temp_ack_file_key, existing_content, self.s3_client)
+                delete_ack_part_files(self.s3_client, MOCK_MESSAGE_DETAILS.temp_ack_parts_prefix)
 
-        ack_data_rows = [
-            ValidValues.ack_data_success_dict,
-            ValidValues.ack_data_failure_dict,
-        ]
+    def test_update_csv_ack_file_writes_a_part_file_per_batch(self):
+        """Test that each call to update_csv_ack_file writes a separate part file, named after its first row"""
         update_csv_ack_file(
             file_key=MOCK_MESSAGE_DETAILS.file_key,
             created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
-            ack_data_rows=ack_data_rows,
+            ack_data_rows=[{**ValidValues.ack_data_failure_dict, "MESSAGE_HEADER_ID": "test_file_id^11"}],
+        )
+        update_csv_ack_file(
+            file_key=MOCK_MESSAGE_DETAILS.file_key,
+            created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
+            ack_data_rows=[ValidValues.ack_data_success_dict, ValidValues.ack_data_failure_dict],
         )
 
-        actual_ack_file_content = obtain_current_ack_file_content(self.s3_client)
+        part_files = self.s3_client.list_objects_v2(
+            Bucket=BucketNames.DESTINATION, Prefix=MOCK_MESSAGE_DETAILS.temp_ack_parts_prefix
+        )
+        self.assertEqual(
+            [obj["Key"] for obj in part_files["Contents"]],
+            [
+                f"{MOCK_MESSAGE_DETAILS.temp_ack_parts_prefix}0000000001",
+                f"{MOCK_MESSAGE_DETAILS.temp_ack_parts_prefix}0000000011",
+            ],
+        )
         expected_rows = [
             generate_expected_ack_file_row(success=True, imms_id=DefaultValues.imms_id),
             generate_expected_ack_file_row(success=False, imms_id="", diagnostics="DIAGNOSTICS"),
+            generate_expected_ack_file_row(
+                success=False, imms_id="", diagnostics="DIAGNOSTICS", row_id="test_file_id^11"
+            ),
+        ]
+        self.assertEqual(
+            obtain_current_ack_file_content(self.s3_client), ValidValues.ack_headers + "\n".join(expected_rows) + "\n"
+        )
+
+    def test_update_csv_ack_file_with_empty_ack_data_rows(self):
+        """Test that update_csv_ack_file does not write a part file when given an empty list"""
+        update_csv_ack_file(
+            file_key=MOCK_MESSAGE_DETAILS.file_key,
+            created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
+            ack_data_rows=[],
+        )
+
+        part_files = self.s3_client.list_objects_v2(Bucket=BucketNames.DESTINATION, Prefix="TempAck/")
+        self.assertEqual(part_files["KeyCount"], 0)
+
+    def test_complete_batch_file_process_combines_csv_ack_part_files(self):
+        """Test that complete_batch_file_process writes the headers and the part files, in row order, to the completed
+        ack file and deletes the part files"""
+        for first_row_number in (11, 1):
+            update_csv_ack_file(
+                file_key=MOCK_MESSAGE_DETAILS.file_key,
+                created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
+                ack_data_rows=[
+                    {**ValidValues.ack_data_failure_dict, "MESSAGE_HEADER_ID": f"test_file_id^{row_number}"}
+                    for row_number in range(first_row_number, first_row_number + 10)
+                ],
+            )
+        self.mock_get_record_and_failure_count.return_value = 20, 20
+
+        complete_batch_file_process(
+            message_id=MOCK_MESSAGE_DETAILS.message_id,
+            supplier=MOCK_MESSAGE_DETAILS.supplier,
+            vaccine_type=MOCK_MESSAGE_DETAILS.vaccine_type,
+            created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
+            file_key=MOCK_MESSAGE_DETAILS.file_key,
+        )
+
+        expected_rows = [
+            generate_expected_ack_file_row(
+                success=False, imms_id="", diagnostics="DIAGNOSTICS", row_id=f"test_file_id^{row_number}"
+            )
+            for row_number in range(1, 21)
         ]
-        expected_ack_file_content = existing_content + "\n".join(expected_rows) + "\n"
-        self.assertEqual(expected_ack_file_content, actual_ack_file_content)
+        self.assertEqual(
+            obtain_completed_ack_file_content(self.s3_client),
+            ValidValues.ack_headers + "\n".join(expected_rows) + "\n",
+        )
+        remaining_files = self.s3_client.list_objects_v2(Bucket=BucketNames.DESTINATION, Prefix="TempAck/")
+        self.assertEqual(remaining_files["KeyCount"], 0)
+
+    def test_complete_batch_file_process_includes_existing_temp_ack_file(self):
+        """Test that the content of a temporary ack file written before ack part files were introduced is included at
+        the start of the completed ack file"""
+        existing_content = generate_sample_existing_ack_content() + "\n"
+        setup_existing_ack_file(MOCK_MESSAGE_DETAILS.temp_ack_file_key, existing_content, self.s3_client)
+        update_csv_ack_file(
+            file_key=MOCK_MESSAGE_DETAILS.file_key,
+            created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
+            ack_data_rows=[{**ValidValues.ack_data_failure_dict, "MESSAGE_HEADER_ID": "test_file_id^2"}],
+        )
+        self.mock_get_record_and_failure_count.return_value = 2, 1
+
+        complete_batch_file_process(
+            message_id=MOCK_MESSAGE_DETAILS.message_id,
+            supplier=MOCK_MESSAGE_DETAILS.supplier,
+            vaccine_type=MOCK_MESSAGE_DETAILS.vaccine_type,
+            created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
+            file_key=MOCK_MESSAGE_DETAILS.file_key,
+        )
+
+        expected_row = generate_expected_ack_file_row(
+            success=False, imms_id="", diagnostics="DIAGNOSTICS", row_id="test_file_id^2"
+        )
+        self.assertEqual(obtain_completed_ack_file_content(self.s3_client), existing_content + expected_row + "\n")
+        remaining_files = self.s3_client.list_objects_v2(Bucket=BucketNames.DESTINATION, Prefix="TempAck/")
+        self.assertEqual(remaining_files["KeyCount"], 0)
 
     def test_create_ack_data(self):
         """Test create_ack_data with success and failure cases."""
@@ -252,18 +335,6 @@ class TestUpdateAckFile(unittest.TestCase):
                 )
                 self.assertEqual(result, test_case["expected_result"])
 
-    def test_obtain_current_csv_ack_content_file_no_existing(self):
-        """Test that when the ack file does not yet exist, obtain_current_csv_ack_content returns the ack headers only."""
-        result = obtain_current_csv_ack_content(MOCK_MESSAGE_DETAILS.temp_ack_file_key)
-        self.assertEqual(result.getvalue(), ValidValues.ack_headers)
-
-    def test_obtain_current_csv_ack_content_file_exists(self):
-        """Test that the existing ack file content is retrieved and new rows are added."""
-        existing_content = generate_sample_existing_ack_content()
-        setup_existing_ack_file(MOCK_MESSAGE_DETAILS.temp_ack_file_key, existing_content, self.s3_client)
-        result = obtain_current_csv_ack_content(MOCK_MESSAGE_DETAILS.temp_ack_file_key)
-        self.assertEqual(result.getvalue(), existing_content)
-
     def test_update_json_ack_file(self):
         """Test that update_json_ack_file correctly creates the ack file when there was no existing ack file"""
 
@@ -321,55 +392,51 @@ class TestUpdateAckFile(unittest.TestCase):
         for test_case in test_cases:
             with self.subTest(test_case["description"]):
                 update_json_ack_file(
-                    message_id=MOCK_MESSAGE_DETAILS.message_id,
-                    supplier=MOCK_MESSAGE_DETAILS.supplier,
                     file_key=MOCK_MESSAGE_DETAILS.file_key,
                     created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
                     ack_data_rows=test_case["input_rows"],
                 )
 
-                actual_ack_file_content = obtain_current_json_ack_file_content(
-                    self.s3_client, MOCK_MESSAGE_DETAILS.temp_json_ack_file_key
-                )
-                expected_ack_file_content = copy.deepcopy(ValidValues.json_ack_initial_content)
-                for element in test_case["expected_elements"]:
-                    expected_ack_file_content["failures"].append(element)
-                self.assertEqual(expected_ack_file_content, actual_ack_file_content)
-                self.s3_client.delete_object(
-                    Bucket=BucketNames.DESTINATION,
-                    Key=MOCK_MESSAGE_DETAILS.temp_json_ack_file_key,
-                )
+                self.assertEqual(obtain_current_json_ack_failures(self.s3_client), test_case["expected_elements"])
+                delete_ack_part_files(self.s3_client, MOCK_MESSAGE_DETAILS.temp_json_ack_parts_prefix)
 
-    def test_update_json_ack_file_existing(self):
-        """Test that update_json_ack_file correctly updates the ack file when there was an existing ack file"""
-        # Mock existing content in the ack file
+    def test_complete_batch_file_process_includes_existing_temp_json_ack_file(self):
+        """Test that the failures in a temporary JSON ack file written before ack part files were introduced are
+        included at the start of the completed JSON ack file"""
         existing_content = generate_sample_existing_json_ack_content()
         setup_existing_ack_file(
             MOCK_MESSAGE_DETAILS.temp_json_ack_file_key, json.dumps(existing_content), self.s3_client
         )
-
-        ack_data_rows = [
-            ValidValues.ack_data_failure_dict,
-        ]
         update_json_ack_file(
-            message_id=MOCK_MESSAGE_DETAILS.message_id,
-            supplier=MOCK_MESSAGE_DETAILS.supplier,
             file_key=MOCK_MESSAGE_DETAILS.file_key,
             created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
-            ack_data_rows=ack_data_rows,
+            ack_data_rows=[{**ValidValues.ack_data_failure_dict, "MESSAGE_HEADER_ID": "test_file_id^2"}],
         )
+        self.mock_get_record_and_failure_count.return_value = 2, 2
 
-        actual_ack_file_content = obtain_current_json_ack_file_content(
-            self.s3_client, MOCK_MESSAGE_DETAILS.temp_json_ack_file_key
+        complete_batch_file_process(
+            message_id=MOCK_MESSAGE_DETAILS.message_id,
+            supplier=MOCK_MESSAGE_DETAILS.supplier,
+            vaccine_type=MOCK_MESSAGE_DETAILS.vaccine_type,
+            created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
+            file_key=MOCK_MESSAGE_DETAILS.file_key,
         )
 
-        expected_rows = [
-            generate_expected_json_ack_file_element(success=False, imms_id="", diagnostics="DIAGNOSTICS"),
-        ]
-        expected_ack_file_content = existing_content
-        expected_ack_file_content["failures"].append(expected_rows[0])
-
-        self.assertEqual(expected_ack_file_content, actual_ack_file_content)
+        completed_ack_file = self.s3_client.get_object(
+            Bucket=BucketNames.DESTINATION, Key=MOCK_MESSAGE_DETAILS.archive_json_ack_file_key
+        )
+        completed_content = json.loads(completed_ack_file["Body"].read())
+        self.assertEqual(
+            completed_content["failures"],
+            [
+                *existing_content["failures"],
+                generate_expected_json_ack_file_element(
+                    success=False, imms_id="", diagnostics="DIAGNOSTICS", row_id="test_file_id^2"
+                ),
+            ],
+        )
+        remaining_files = self.s3_client.list_objects_v2(Bucket=BucketNames.DESTINATION, Prefix="TempAck/")
+        self.assertEqual(remaining_files["KeyCount"], 0)
 
     def test_obtain_current_json_ack_content_file_no_existing(self):
         """Test that when the json ack file does not yet exist, obtain_current_json_ack_content returns the ack headers only."""
@@ -409,8 +476,6 @@ class TestUpdateAckFile(unittest.TestCase):
             ack_data_rows=[ValidValues.ack_data_failure_dict],
         )
         update_json_ack_file(
-            message_id=MOCK_MESSAGE_DETAILS.message_id,
-            supplier=MOCK_MESSAGE_DETAILS.supplier,
             file_key=MOCK_MESSAGE_DETAILS.file_key,
             created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
             ack_data_rows=[ValidValues.ack_data_failure_dict],
@@ -457,8 +522,6 @@ class TestUpdateAckFile(unittest.TestCase):
             ack_data_rows=[ValidValues.ack_data_failure_dict],
         )
         update_json_ack_file(
-            message_id=MOCK_MESSAGE_DETAILS.message_id,
-            supplier=MOCK_MESSAGE_DETAILS.supplier,
             file_key=file_key_with_dat,
             created_at_formatted_string=created_at_formatted_string,
             ack_data_rows=[ValidValues.ack_data_failure_dict],
@@ -490,23 +553,31 @@ class TestUpdateAckFile(unittest.TestCase):
             json_ack_exists = False
         self.assertTrue(json_ack_exists, f"Expected JSON ACK file at {expected_json_ack_file_key}")
 
-    def test_update_json_ack_file_with_empty_ack_data_rows(self):
-        """Test that update_json_ack_file correctly updates the ack file when given an empty list"""
-        # Mock existing content in the ack file
-        existing_content = generate_sample_existing_json_ack_content()
-        setup_existing_ack_file(
-            MOCK_MESSAGE_DETAILS.temp_json_ack_file_key, json.dumps(existing_content), self.s3_client
-        )
+    def test_iter_json_ack_file_chunks_matches_json_dumps(self):
+        """Test that the streamed JSON ack file content is identical to dumping the complete ack data in one go"""
+        ack_data_dict = {k: v for k, v in ValidValues.json_ack_complete_content.items() if k != "failures"}
+        failure = ValidValues.json_ack_complete_content["failures"][0]
+
+        for number_of_failures in (0, 1, 3):
+            with self.subTest(number_of_failures=number_of_failures):
+                failures = [{**failure, "rowId": row_id} for row_id in range(1, number_of_failures + 1)]
+
+                streamed_content = b"".join(iter_json_ack_file_chunks(ack_data_dict, iter(failures)))
 
-        # Should not raise an exception
+                expected_content = json.dumps({**ack_data_dict, "failures": failures}, indent=2)
+                self.assertEqual(streamed_content.decode("utf-8"), expected_content)
+
+    def test_update_json_ack_file_with_empty_ack_data_rows(self):
+        """Test that update_json_ack_file does not write a part file when given an empty list"""
         update_json_ack_file(
-            message_id=MOCK_MESSAGE_DETAILS.message_id,
-            supplier=MOCK_MESSAGE_DETAILS.supplier,
             file_key=MOCK_MESSAGE_DETAILS.file_key,
             created_at_formatted_string=MOCK_MESSAGE_DETAILS.created_at_formatted_string,
             ack_data_rows=[],
         )
 
+        part_files = self.s3_client.list_objects_v2(Bucket=BucketNames.DESTINATION, Prefix="TempAck/")
+        self.assertEqual(part_files["KeyCount"], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -17,6 +17,8 @@ class TestUpdateAckFileFlow(unittest.TestCase):
         self.source_bucket_name = BucketNames.SOURCE
         self.ack_bucket_patcher = patch("update_ack_file.ACK_BUCKET_NAME", self.ack_bucket_name)
         self.ack_bucket_patcher.start()
+        self.ack_part_files_bucket_patcher = patch("ack_part_files.ACK_BUCKET_NAME", self.ack_bucket_name)
+        self.ack_part_files_bucket_patcher.start()
 
         self.source_bucket_patcher = patch("update_ack_file.SOURCE_BUCKET_NAME", self.source_bucket_name)
         self.source_bucket_patcher.start()
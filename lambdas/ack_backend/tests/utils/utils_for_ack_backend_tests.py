@@ -46,10 +46,28 @@ def setup_existing_ack_file(file_key, file_content, s3_client):
     s3_client.put_object(Bucket=BucketNames.DESTINATION, Key=file_key, Body=file_content)
 
 
-def obtain_current_ack_file_content(s3_client, temp_ack_file_key: str = MOCK_MESSAGE_DETAILS.temp_ack_file_key) -> str:
-    """Obtains the ack file content from the destination bucket."""
-    retrieved_object = s3_client.get_object(Bucket=BucketNames.DESTINATION, Key=temp_ack_file_key)
-    return retrieved_object["Body"].read().decode("utf-8")
+def obtain_ack_part_files_content(s3_client, parts_prefix: str) -> str:
+    """Obtains the combined content of the ack part files with the given prefix, in row order."""
+    part_keys = [
+        obj["Key"]
+        for obj in s3_client.list_objects_v2(Bucket=BucketNames.DESTINATION, Prefix=parts_prefix).get("Contents", [])
+    ]
+    return "".join(
+        s3_client.get_object(Bucket=BucketNames.DESTINATION, Key=key)["Body"].read().decode("utf-8") for key in part_keys
+    )
+
+
+def delete_ack_part_files(s3_client, parts_prefix: str) -> None:
+    """Deletes the ack part files with the given prefix."""
+    for obj in s3_client.list_objects_v2(Bucket=BucketNames.DESTINATION, Prefix=parts_prefix).get("Contents", []):
+        s3_client.delete_object(Bucket=BucketNames.DESTINATION, Key=obj["Key"])
+
+
+def obtain_current_ack_file_content(
+    s3_client, temp_ack_parts_prefix: str = MOCK_MESSAGE_DETAILS.temp_ack_parts_prefix
+) -> str:
+    """Obtains the ack rows written to the ack part files so far, preceded by the ack headers."""
+    return ValidValues.ack_headers + obtain_ack_part_files_content(s3_client, temp_ack_parts_prefix)
 
 
 def obtain_completed_ack_file_content(
@@ -132,12 +150,12 @@ def validate_ack_file_content(
     assert expected_ack_file_content == actual_ack_file_content
 
 
-def obtain_current_json_ack_file_content(
-    s3_client, temp_ack_file_key: str = MOCK_MESSAGE_DETAILS.temp_ack_file_key
-) -> dict:
-    """Obtains the ack file content from the destination bucket."""
-    retrieved_object = s3_client.get_object(Bucket=BucketNames.DESTINATION, Key=temp_ack_file_key)
-    return json.loads(retrieved_object["Body"].read().decode("utf-8"))
+def obtain_current_json_ack_failures(
+    s3_client, temp_json_ack_parts_prefix: str = MOCK_MESSAGE_DETAILS.temp_json_ack_parts_prefix
+) -> list[dict]:
+    """Obtains the JSON ack failure entries written to the ack part files so far."""
+    part_files_content = obtain_ack_part_files_content(s3_client, temp_json_ack_parts_prefix)
+    return [json.loads(line) for line in part_files_content.splitlines()]
 
 
 def obtain_completed_json_ack_file_content(
@@ -219,14 +237,18 @@ def validate_json_ack_file_content(
     Obtains the ack file content and ensures that it matches the expected content (expected content is based
     on the incoming messages).
     """
-    actual_ack_file_content = (
-        obtain_current_json_ack_file_content(s3_client, MOCK_MESSAGE_DETAILS.temp_json_ack_file_key)
-        if not is_complete
-        else obtain_completed_json_ack_file_content(s3_client, MOCK_MESSAGE_DETAILS.archive_json_ack_file_key)
-    )
     existing_file_content_copy = deepcopy(existing_file_content)
     expected_ack_file_content = generate_expected_json_ack_content(incoming_messages, existing_file_content_copy)
 
+    if not is_complete:
+        # The header and summary are only added when the ack part files are combined on completion
+        assert expected_ack_file_content["failures"] == obtain_current_json_ack_failures(s3_client)
+        return
+
+    actual_ack_file_content = obtain_completed_json_ack_file_content(
+        s3_client, MOCK_MESSAGE_DETAILS.archive_json_ack_file_key
+    )
+
     # NB: disregard real-time generated fields
     actual_ack_file_content["generatedDate"] = expected_ack_file_content["generatedDate"]
     actual_ack_file_content["summary"]["ingestionTime"] = expected_ack_file_content["summary"]["ingestionTime"]
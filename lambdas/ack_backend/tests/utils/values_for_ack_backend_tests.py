@@ -112,6 +112,12 @@ class MessageDetails:
         self.archive_json_ack_file_key = (
             f"forwardedFile/{vaccine_type}_Vaccinations_v5_{ods_code}_20210730T12000000_BusAck_20211120T12000000.json"
         )
+        self.temp_ack_parts_prefix = (
+            f"TempAck/parts/{vaccine_type}_Vaccinations_v5_{ods_code}_20210730T12000000_BusAck_20211120T12000000.csv/"
+        )
+        self.temp_json_ack_parts_prefix = (
+            f"TempAck/parts/{vaccine_type}_Vaccinations_v5_{ods_code}_20210730T12000000_BusAck_20211120T12000000.json/"
+        )
         self.vaccine_type = vaccine_type
         self.ods_code = ods_code
         self.supplier = supplier
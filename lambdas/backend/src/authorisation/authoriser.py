@@ -5,6 +5,7 @@ import json
 from authorisation.api_operation_code import ApiOperationCode
 from common.clients import logger
 from common.models.constants import RedisHashKeys
+from common.redis_cache import cached_hget
 from common.redis_client import get_redis_client
 
 
@@ -33,7 +34,9 @@ class Authoriser:
         return expanded_permissions
 
     def _get_supplier_permissions(self, supplier_system: str) -> dict[str, list[ApiOperationCode]]:
-        raw_permissions_data = get_redis_client().hget(RedisHashKeys.SUPPLIER_PERMISSIONS_HASH_KEY, supplier_system)
+        raw_permissions_data = cached_hget(
+            get_redis_client(), RedisHashKeys.SUPPLIER_PERMISSIONS_HASH_KEY, supplier_system
+        )
         permissions_data = json.loads(raw_permissions_data) if raw_permissions_data else []
 
         return self._expand_permissions(permissions_data)
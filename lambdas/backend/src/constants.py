@@ -3,3 +3,6 @@
 GENERIC_SERVER_ERROR_DIAGNOSTICS_MESSAGE = "Unable to process request. Issue may be transient."
 # Maximum response size for an AWS Lambda function
 MAX_SEARCH_RESPONSE_SIZE_BYTES = 1 * 1024 * 1024
+# Maximum number of PatientGSI queries (one per vaccine type) run in parallel for a search. This is kept below the
+# default botocore connection pool size of 10
+MAX_PARALLEL_SEARCH_QUERIES = 8
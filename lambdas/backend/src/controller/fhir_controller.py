@@ -7,7 +7,6 @@ from json import JSONDecodeError
 from urllib.parse import parse_qs
 
 from aws_lambda_typing.events import APIGatewayProxyEventV1
-from fhir.resources.R4B.bundle import Bundle
 from fhir.resources.R4B.identifier import Identifier
 
 from common.get_service_url import get_service_url
@@ -37,10 +36,10 @@ from models.errors import (
     InvalidImmunizationIdError,
     InvalidJsonError,
     InvalidResourceVersionError,
-    TooManyResultsError,
 )
 from repository.fhir_repository import ImmunizationRepository, create_table
 from service.fhir_service import FhirService
+from service.search_bundle import serialise_search_bundle
 
 IMMUNIZATION_ENV = os.getenv("IMMUNIZATION_ENV")
 IMMUNIZATION_BASE_PATH = os.getenv("IMMUNIZATION_BASE_PATH")
@@ -210,14 +209,13 @@ class FhirController:
 
         return self._create_search_response(search_bundle)
 
-    def _create_search_response(self, search_bundle: Bundle) -> dict:
-        search_response_json = search_bundle.json(use_decimal=True)
-
-        if len(search_response_json) > MAX_SEARCH_RESPONSE_SIZE_BYTES:
-            raise TooManyResultsError("Search returned too many results. Please narrow down the search")
-
-        prepared_search_bundle = self._prepare_search_bundle(search_response_json)
-        return create_response(200, prepared_search_bundle)
+    @staticmethod
+    def _create_search_response(search_bundle: dict) -> dict:
+        """
+        Serialises the search bundle, which is already in its response form, into the response body. Serialisation
+        stops with TooManyResultsError as soon as the body is over the maximum response size
+        """
+        return create_response(200, serialise_search_bundle(search_bundle, MAX_SEARCH_RESPONSE_SIZE_BYTES))
 
     @staticmethod
     def _is_target_disease_search(search_params: dict[str, list[str]]) -> bool:
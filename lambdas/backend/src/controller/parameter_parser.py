@@ -1,10 +1,13 @@
 import datetime
 import json
 import logging
+from collections.abc import Mapping
 from dataclasses import dataclass, field
+from types import MappingProxyType
 
 from common.models.constants import RedisHashKeys, Urls
 from common.models.utils.generic_utils import nhs_number_mod11_check
+from common.redis_cache import cached_hkeys, redis_local_cache
 from common.redis_client import get_redis_client
 from controller.constants import IdentifierSearchElement, IdentifierSearchParameterName, ImmunizationSearchParameterName
 from models.errors import ParameterExceptionError
@@ -56,6 +59,14 @@ class SearchParams:
         return str(self.__dict__)
 
 
+@dataclass(frozen=True)
+class TargetDiseaseLookup:
+    """Read-only index of the supported target disease codes, and the vaccine types mapped to each code"""
+
+    vaccine_types_by_code: Mapping[str, tuple[str, ...]]
+    valid_codes: frozenset[str]
+
+
 @dataclass
 class SearchParamsResult:
     params: SearchParams
@@ -111,7 +122,7 @@ def process_immunization_target(imms_params: dict[str, list[str]]) -> tuple[list
             f"Search parameter {ImmunizationSearchParameterName.IMMUNIZATION_TARGET} must have one or more values."
         )
 
-    valid_vaccine_types_set = set(get_redis_client().hkeys(RedisHashKeys.VACCINE_TYPE_TO_DISEASES_HASH_KEY))
+    valid_vaccine_types_set = set(cached_hkeys(get_redis_client(), RedisHashKeys.VACCINE_TYPE_TO_DISEASES_HASH_KEY))
     valid = [v for v in vaccine_types if v in valid_vaccine_types_set]
     invalid = [v for v in vaccine_types if v not in valid_vaccine_types_set]
 
@@ -225,7 +236,26 @@ def _build_valid_codes_set(redis, disease_to_vaccs_map: dict[str, list[str]]) ->
     return valid_codes_set
 
 
-def _classify_target_disease_value(raw: str, valid_codes_set: set[str]) -> tuple[str, str | None]:
+def _compile_target_disease_lookup(redis) -> TargetDiseaseLookup:
+    """Builds the target disease lookup from the Redis mappings"""
+    disease_to_vaccs_map = _build_disease_to_vaccs_map(redis)
+    valid_codes_set = _build_valid_codes_set(redis, disease_to_vaccs_map)
+    return TargetDiseaseLookup(
+        vaccine_types_by_code=MappingProxyType(
+            {code: tuple(vacc_types) for code, vacc_types in disease_to_vaccs_map.items()}
+        ),
+        valid_codes=frozenset(valid_codes_set),
+    )
+
+
+def get_target_disease_lookup() -> TargetDiseaseLookup:
+    """Returns the target disease lookup. It is compiled once and then held in the local Redis cache, so it is only
+    rebuilt when the cache entry expires or redis_sync uploads new config."""
+    redis = get_redis_client()
+    return redis_local_cache.get(redis, ("target_disease_lookup",), lambda: _compile_target_disease_lookup(redis))
+
+
+def _classify_target_disease_value(raw: str, valid_codes_set: frozenset[str]) -> tuple[str, str | None]:
     """Classify one target-disease value.
 
     Returns (status, code_or_none) where status is one of:
@@ -278,9 +308,7 @@ def process_target_disease(params: dict[str, list[str]]) -> tuple[list[str], set
     Raises ParameterExceptionError when no values or all format invalid.
     """
     values = _extract_target_disease_values(params)
-    redis = get_redis_client()
-    disease_to_vaccs_map = _build_disease_to_vaccs_map(redis)
-    valid_codes_set = _build_valid_codes_set(redis, disease_to_vaccs_map)
+    target_disease_lookup = get_target_disease_lookup()
 
     valid_raw: list[str] = []
     vaccine_types: set[str] = set()
@@ -289,7 +317,7 @@ def process_target_disease(params: dict[str, list[str]]) -> tuple[list[str], set
     format_invalid_count = 0
 
     for raw in values:
-        status, code = _classify_target_disease_value(raw, valid_codes_set)
+        status, code = _classify_target_disease_value(raw, target_disease_lookup.valid_codes)
         if status == TARGET_DISEASE_STATUS_FORMAT_INVALID:
             invalid_diagnostics.append(f"Invalid format for '{raw}': {TARGET_DISEASE_FORMAT_ERROR}")
             format_invalid_count += 1
@@ -301,7 +329,7 @@ def process_target_disease(params: dict[str, list[str]]) -> tuple[list[str], set
             unmapped_format_valid.append(raw)
             continue
         valid_raw.append(raw)
-        vaccs_list = disease_to_vaccs_map.get(code, [])
+        vaccs_list = target_disease_lookup.vaccine_types_by_code.get(code, ())
         if vaccs_list:
             vaccine_types.update(vaccs_list)
         else:
@@ -3,6 +3,7 @@
 import copy
 
 from common.models.constants import Constants, Urls
+from common.models.contained_resources import ContainedResources
 from common.models.utils.generic_utils import (
     get_contained_patient,
     get_contained_practitioner,
@@ -10,11 +11,11 @@ from common.models.utils.generic_utils import (
 )
 
 
-def remove_reference_to_contained_practitioner(imms: dict) -> dict:
+def remove_reference_to_contained_practitioner(imms: dict, contained: ContainedResources | None = None) -> dict:
     """Remove the reference to a contained patient resource from the performer field (if such a reference exists)"""
     # Obtain contained_practitioner (if it exists)
     try:
-        contained_practitioner = get_contained_practitioner(imms)
+        contained_practitioner = get_contained_practitioner(imms, contained)
     except (KeyError, IndexError, AttributeError):
         return imms
 
@@ -114,8 +115,9 @@ class Filter:
     @staticmethod
     def search(imms: dict, patient_full_url: str) -> dict:
         """Apply filtering for an individual FHIR Immunization Resource as part of SEARCH request"""
-        imms = remove_reference_to_contained_practitioner(imms)
-        imms["patient"] = create_reference_to_patient_resource(patient_full_url, get_contained_patient(imms))
+        contained = ContainedResources(imms)
+        imms = remove_reference_to_contained_practitioner(imms, contained)
+        imms["patient"] = create_reference_to_patient_resource(patient_full_url, get_contained_patient(imms, contained))
         imms = add_use_to_identifier(imms)
         imms.pop("contained")
 
@@ -6,6 +6,7 @@ from functools import wraps
 from common.clients import STREAM_NAME, logger
 from common.log_firehose import send_log_to_firehose
 from common.models.utils.validation_utils import get_vaccine_type
+from common.redis_cache import get_redis_cache_stats
 
 
 def _log_data_from_body(event) -> dict:
@@ -84,6 +85,7 @@ def function_info(func):
             result = func(*args, **kwargs)
             end = time.time()
             log_data["time_taken"] = f"{round(end - start, 5)}s"
+            log_data["redis_cache"] = get_redis_cache_stats()
             log_data.update(_log_data_from_body(event))
             operation_outcome = _get_operation_outcome(result)
 
@@ -96,6 +98,7 @@ def function_info(func):
             log_data["error"] = str(e)
             end = time.time()
             log_data["time_taken"] = f"{round(end - start, 5)}s"
+            log_data["redis_cache"] = get_redis_cache_stats()
             log_data.update(_log_data_from_body(event))
             logger.exception(json.dumps(log_data))
             send_log_to_firehose(STREAM_NAME, log_data)
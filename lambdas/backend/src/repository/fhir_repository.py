@@ -1,5 +1,7 @@
+import datetime
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 import boto3
@@ -13,15 +15,18 @@ from fhir.resources.R4B.immunization import Immunization
 from mypy_boto3_dynamodb.service_resource import DynamoDBServiceResource, Table
 
 from common.models.constants import Constants
+from common.models.contained_resources import ContainedResources
 from common.models.errors import ResourceNotFoundError
 from common.models.immunization_record_metadata import ImmunizationRecordMetadata
 from common.models.utils.generic_utils import (
     get_contained_patient,
     get_nhs_number,
+    make_patient_occurrence_sk,
 )
 from common.models.utils.validation_utils import (
     get_vaccine_type,
 )
+from constants import MAX_PARALLEL_SEARCH_QUERIES
 from models.errors import InvalidStoredDataError, UnhandledResponseError
 
 
@@ -43,6 +48,11 @@ def _make_patient_pk(_id: str):
     return f"Patient#{_id}"
 
 
+# Set to true once all existing records have a PatientOccurrenceSK, so that searches by date use the
+# PatientOccurrenceGSI. Until then, records written before the attribute was added would be missing from the results.
+OCCURRENCE_DATE_INDEX_ENABLED = os.getenv("OCCURRENCE_DATE_INDEX_ENABLED", "false").lower() == "true"
+
+
 def _query_identifier(table, index, pk, identifier):
     queryresponse = table.query(IndexName=index, KeyConditionExpression=Key(pk).eq(identifier), Limit=1)
     if queryresponse.get("Count", 0) > 0:
@@ -66,6 +76,7 @@ class RecordAttributes:
     pk: str
     patient_pk: str
     patient_sk: str
+    patient_occurrence_sk: str
     patient: dict
     vaccine_type: str
     timestamp: int
@@ -76,14 +87,18 @@ class RecordAttributes:
     def from_immunization(cls, immunization: Immunization, patient: dict | None = None) -> "RecordAttributes":
         """Build DynamoDB attributes from a FHIR Immunization resource."""
         imms_dict = immunization.dict()
-        patient_resolved = patient if patient is not None else get_contained_patient(imms_dict)
-        nhs_number = get_nhs_number(imms_dict)
+        contained = ContainedResources(imms_dict) if imms_dict.get("contained") is not None else None
+        patient_resolved = patient if patient is not None else get_contained_patient(imms_dict, contained)
+        nhs_number = get_nhs_number(imms_dict, contained)
         vaccine_type = get_vaccine_type(imms_dict)
         first_identifier = immunization.identifier[0]
         return cls(
             pk=_make_immunization_pk(immunization.id),
             patient_pk=_make_patient_pk(nhs_number),
             patient_sk=f"{vaccine_type}#{immunization.id}",
+            patient_occurrence_sk=make_patient_occurrence_sk(
+                vaccine_type, immunization.occurrenceDateTime, immunization.id
+            ),
             patient=patient_resolved,
             vaccine_type=vaccine_type,
             timestamp=int(time.time()),
@@ -172,6 +187,7 @@ class ImmunizationRepository:
                 "PK": attr.pk,
                 "PatientPK": attr.patient_pk,
                 "PatientSK": attr.patient_sk,
+                "PatientOccurrenceSK": attr.patient_occurrence_sk,
                 "Resource": immunization.json(use_decimal=True),
                 "IdentifierPK": attr.identifier,
                 "Operation": "CREATE",
@@ -212,13 +228,15 @@ class ImmunizationRepository:
         if is_reinstate:
             return (
                 "SET UpdatedAt = :timestamp, PatientPK = :patient_pk, "
-                "PatientSK = :patient_sk, #imms_resource = :imms_resource_val, "
+                "PatientSK = :patient_sk, PatientOccurrenceSK = :patient_occurrence_sk, "
+                "#imms_resource = :imms_resource_val, "
                 "Operation = :operation, Version = :version, DeletedAt = :respawn, SupplierSystem = :supplier_system "
             )
         else:
             return (
                 "SET UpdatedAt = :timestamp, PatientPK = :patient_pk, "
-                "PatientSK = :patient_sk, #imms_resource = :imms_resource_val, "
+                "PatientSK = :patient_sk, PatientOccurrenceSK = :patient_occurrence_sk, "
+                "#imms_resource = :imms_resource_val, "
                 "Operation = :operation, Version = :version, SupplierSystem = :supplier_system "
             )
 
@@ -243,6 +261,7 @@ class ImmunizationRepository:
             ":timestamp": attr.timestamp,
             ":patient_pk": attr.patient_pk,
             ":patient_sk": attr.patient_sk,
+            ":patient_occurrence_sk": attr.patient_occurrence_sk,
             ":imms_resource_val": attr.immunization.json(use_decimal=True),
             ":operation": "UPDATE",
             ":version": updated_version,
@@ -299,39 +318,79 @@ class ImmunizationRepository:
             else:
                 raise error
 
-    def find_immunizations(self, patient_identifier: str, vaccine_types: set) -> list[dict]:
-        condition = Key("PatientPK").eq(_make_patient_pk(patient_identifier))
-        is_not_deleted = Attr("DeletedAt").not_exists() | Attr("DeletedAt").eq("reinstated")
-
-        ieds_resources = self.get_all_items(condition, is_not_deleted)
-
-        if not ieds_resources:
+    def find_immunizations(
+        self,
+        patient_identifier: str,
+        vaccine_types: set,
+        date_from: datetime.date | None = None,
+        date_to: datetime.date | None = None,
+    ) -> list[dict]:
+        """
+        Returns the FHIR Immunization resources for the patient which have any of the given vaccine types.
+        PatientSK begins with the vaccine type, so each vaccine type is queried separately with a begins_with key
+        condition, and only records of the requested types are read. The queries are run in parallel.
+        If a date range is given and the PatientOccurrenceGSI is enabled then the range is applied in the key condition
+        too, so that only records which occurred within it, or have no occurrence date, are read. Otherwise the caller
+        must filter by date.
+        """
+        if not vaccine_types:
             return []
 
-        # Filter the response to contain only the requested vaccine types
-        filtered_ieds_resources = [x for x in ieds_resources if self._vaccine_type(x["PatientSK"]) in vaccine_types]
+        patient_pk = _make_patient_pk(patient_identifier)
+        is_not_deleted = Attr("DeletedAt").not_exists() | Attr("DeletedAt").eq("reinstated")
+
+        # Querying the vaccine types in sorted order returns the resources in sort key order, as a single query would
+        if OCCURRENCE_DATE_INDEX_ENABLED and (date_from or date_to):
+            index_name = "PatientOccurrenceGSI"
+            conditions = []
+            for vaccine_type in sorted(vaccine_types):
+                # Records with no occurrence date sort before the range, but are not filtered out by date, so they are
+                # queried separately when the range has a lower bound
+                if date_from:
+                    conditions.append(
+                        Key("PatientPK").eq(patient_pk) & Key("PatientOccurrenceSK").begins_with(f"{vaccine_type}##")
+                    )
+                conditions.append(
+                    Key("PatientPK").eq(patient_pk)
+                    & Key("PatientOccurrenceSK").between(*self._occurrence_sk_range(vaccine_type, date_from, date_to))
+                )
+        else:
+            index_name = "PatientGSI"
+            conditions = [
+                Key("PatientPK").eq(patient_pk) & Key("PatientSK").begins_with(f"{vaccine_type}#")
+                for vaccine_type in sorted(vaccine_types)
+            ]
+
+        if len(conditions) == 1:
+            items_per_condition = [self.get_all_items(conditions[0], is_not_deleted, index_name)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(conditions), MAX_PARALLEL_SEARCH_QUERIES)) as executor:
+                items_per_condition = list(
+                    executor.map(lambda condition: self.get_all_items(condition, is_not_deleted, index_name), conditions)
+                )
 
         # Return a list of the FHIR immunization resource JSON items
-        final_resources = [
+        return [
             {
                 **json.loads(item["Resource"]),
                 "meta": {"versionId": int(item.get("Version", 1))},
             }
-            for item in filtered_ieds_resources
+            for items in items_per_condition
+            for item in items
         ]
 
-        return final_resources
-
-    def get_all_items(self, condition, is_not_deleted):
-        """Query DynamoDB and paginate through all results."""
+    def get_all_items(self, condition, is_not_deleted, index_name: str = "PatientGSI"):
+        """Query DynamoDB and paginate through all results, returning only the Resource and Version of each item."""
         all_items = []
         last_evaluated_key = None
 
         while True:
             query_args = {
-                "IndexName": "PatientGSI",
+                "IndexName": index_name,
                 "KeyConditionExpression": condition,
                 "FilterExpression": is_not_deleted,
+                "ProjectionExpression": "#imms_resource, #version",
+                "ExpressionAttributeNames": {"#imms_resource": "Resource", "#version": "Version"},
             }
             if last_evaluated_key:
                 query_args["ExclusiveStartKey"] = last_evaluated_key
@@ -350,9 +409,16 @@ class ImmunizationRepository:
         return all_items
 
     @staticmethod
-    def _vaccine_type(patient_sk: str) -> str:
-        parsed = [str.strip(s) for s in patient_sk.split("#")]
-        return parsed[0]
+    def _occurrence_sk_range(
+        vaccine_type: str, date_from: datetime.date | None, date_to: datetime.date | None
+    ) -> tuple[str, str]:
+        """
+        Returns the inclusive PatientOccurrenceSK bounds for the vaccine type and date range. The upper bound ends with
+        "$", which sorts after the "#" separating the date from the immunization id.
+        """
+        lower_bound = f"{vaccine_type}#{date_from.isoformat()}" if date_from else f"{vaccine_type}#"
+        upper_bound = f"{vaccine_type}#{date_to.isoformat()}$" if date_to else f"{vaccine_type}$"
+        return lower_bound, upper_bound
 
     @staticmethod
     def _make_identifier_pk(identifier: Identifier) -> str:
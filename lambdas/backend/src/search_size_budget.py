@@ -0,0 +1,50 @@
+"""Running byte budget for a patient search, so that an oversized search is abandoned as soon as it is known to be"""
+
+import json
+
+from common.clients import logger
+from models.errors import TooManyResultsError
+
+SEARCH_TOO_MANY_RESULTS_MESSAGE = "Search returned too many results. Please narrow down the search"
+
+
+class SearchSizeBudget:
+    """
+    Counts the bytes written at one stage of a search, and raises TooManyResultsError as soon as they exceed the
+    limit, rather than after the whole response has been serialised. When the budget is first exceeded a
+    structured log line records the stage and how far through the search it got, so that the number and timing of
+    rejected searches can be monitored.
+    """
+
+    def __init__(self, stage: str, limit_bytes: int, total_items: int | None = None):
+        self.stage = stage
+        self.limit_bytes = limit_bytes
+        self.total_items = total_items
+        self.used_bytes = 0
+        self.items = 0
+        self.exceeded = False
+
+    def charge(self, size_bytes: int, items: int = 0) -> None:
+        """Adds size_bytes and items to the running totals, raising TooManyResultsError if the limit is exceeded"""
+        self.used_bytes += size_bytes
+        self.items += items
+        if self.used_bytes <= self.limit_bytes:
+            return
+
+        if not self.exceeded:
+            self.exceeded = True
+            logger.info(
+                json.dumps(
+                    {
+                        "search_size_budget_exceeded": {
+                            "stage": self.stage,
+                            "limit_bytes": self.limit_bytes,
+                            "used_bytes": self.used_bytes,
+                            "items": self.items,
+                            "total_items": self.total_items,
+                        }
+                    }
+                )
+            )
+
+        raise TooManyResultsError(SEARCH_TOO_MANY_RESULTS_MESSAGE)
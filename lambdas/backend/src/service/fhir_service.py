@@ -6,6 +6,7 @@ import uuid
 from typing import Any
 from uuid import uuid4
 
+import simplejson as json
 from fhir.resources.R4B.bundle import (
     Bundle as FhirBundle,
 )
@@ -17,7 +18,6 @@ from fhir.resources.R4B.bundle import (
 from fhir.resources.R4B.fhirtypes import Id
 from fhir.resources.R4B.identifier import Identifier
 from fhir.resources.R4B.immunization import Immunization
-from fhir.resources.R4B.operationoutcome import OperationOutcome
 
 from authorisation.api_operation_code import ApiOperationCode
 from authorisation.authoriser import Authoriser
@@ -43,9 +43,12 @@ from common.models.utils.validation_utils import (
     validate_identifiers_match,
     validate_resource_versions_match,
 )
+from constants import MAX_SEARCH_RESPONSE_SIZE_BYTES
 from filter import Filter
 from models.errors import UnauthorizedVaxError
 from repository.fhir_repository import ImmunizationRepository
+from search_size_budget import SearchSizeBudget
+from service.search_bundle import make_include_entry, make_match_entry, make_outcome_entry, make_search_bundle
 from service.search_url_helper import create_url_for_bundle_link
 
 logging.basicConfig(level="INFO")
@@ -89,22 +92,40 @@ class FhirService:
         return filtered_coding
 
     @classmethod
-    def _normalize_single_snomed_codeable_concepts(cls, immunization: dict) -> None:
+    def _normalize_single_snomed_codeable_concepts(cls, immunization: dict) -> bool:
+        """
+        Keeps only the first SNOMED coding of each single SNOMED codeable concept. The fields are replaced rather than
+        changed, so that a shallow copy of a resource can be normalised. Returns whether any codings were removed.
+        """
+        is_changed = False
         for field_name in cls._SINGLE_SNOMED_CODEABLE_CONCEPT_FIELDS:
             field = immunization.get(field_name)
             coding = field.get("coding") if isinstance(field, dict) else None
-            if isinstance(coding, list):
-                field["coding"] = cls._keep_first_snomed_coding(coding)
+            if not isinstance(coding, list):
+                continue
 
-    def _validate_immunization(self, immunization: dict) -> None:
-        immunization_to_validate = copy.deepcopy(immunization)
-        self._normalize_single_snomed_codeable_concepts(immunization_to_validate)
+            filtered_coding = cls._keep_first_snomed_coding(coding)
+            if len(filtered_coding) != len(coding):
+                immunization[field_name] = {**field, "coding": filtered_coding}
+                is_changed = True
+
+        return is_changed
+
+    def _validate_immunization(self, immunization: dict) -> Immunization:
+        """
+        Validates the immunization and returns its Immunization model. Site and route are validated against their first
+        SNOMED coding, but all of their codings are kept, so the validated model is only reused if there were no others.
+        """
+        immunization_to_validate = dict(immunization)
+        is_normalized = self._normalize_single_snomed_codeable_concepts(immunization_to_validate)
 
         try:
-            self.validator.validate(immunization_to_validate)
+            validated_immunization = self.validator.validate(immunization_to_validate)
         except (ValueError, MandatoryError) as error:
             raise CustomValidationError(message=str(error)) from error
 
+        return Immunization.parse_obj(immunization) if is_normalized else validated_immunization
+
     def get_immunization_by_identifier(
         self, identifier: Identifier, supplier_name: str, elements: set[str] | None
     ) -> FhirBundle:
@@ -149,14 +170,14 @@ class FhirService:
         if immunization.get("id") is not None:
             raise CustomValidationError("id field must not be present for CREATE operation")
 
-        self._validate_immunization(immunization)
+        immunization_fhir_entity = self._validate_immunization(immunization)
 
         vaccination_type = get_vaccine_type(immunization)
 
         if not self.authoriser.authorise(supplier_system, ApiOperationCode.CREATE, {vaccination_type}):
             raise UnauthorizedVaxError()
 
-        identifier = Identifier.parse_obj(immunization["identifier"][0])
+        identifier = immunization_fhir_entity.identifier[0]
         duplicate_identifier = f"{identifier.system}#{identifier.value}"
 
         existing_immunization_resource, existing_immunization_meta = (
@@ -167,8 +188,7 @@ class FhirService:
                 raise IdentifierDuplicationError(identifier=duplicate_identifier)
 
             immunization_id = existing_immunization_resource["id"]
-            immunization["id"] = immunization_id
-            immunization_fhir_entity = Immunization.parse_obj(immunization)
+            immunization["id"] = immunization_fhir_entity.id = immunization_id
             updated_version = self.immunization_repo.update_immunization(
                 immunization_id,
                 immunization_fhir_entity,
@@ -177,16 +197,13 @@ class FhirService:
             )
             return immunization_id, updated_version
 
-        immunization["id"] = str(uuid.uuid4())
-        immunization_fhir_entity = Immunization.parse_obj(immunization)
+        immunization["id"] = immunization_fhir_entity.id = str(uuid.uuid4())
 
         created_id = self.immunization_repo.create_immunization(immunization_fhir_entity, supplier_system)
         return created_id, 1
 
     def update_immunization(self, imms_id: str, immunization: dict, supplier_system: str, resource_version: int) -> int:
-        self._validate_immunization(immunization)
-
-        immunization_to_update = Immunization.parse_obj(immunization)
+        immunization_to_update = self._validate_immunization(immunization)
 
         existing_immunization_resource, existing_immunization_meta = (
             self.immunization_repo.get_immunization_resource_and_metadata_by_id(imms_id, include_deleted=True)
@@ -241,11 +258,12 @@ class FhirService:
         invalid_immunization_targets: list[str] | None = None,
         target_disease_codes_for_url: set[str] | None = None,
         invalid_target_diseases: list[str] | None = None,
-    ) -> FhirBundle:
+    ) -> dict:
         """
         Finds all instances of Immunization(s) for a specified patient for the given specified vaccine type(s).
-        Bundles the resources with the relevant patient resource and returns the bundle along with a boolean to state
-        whether the supplier requested vaccine types they were not authorised for.
+        Bundles the resources with the relevant patient resource and returns the bundle as a dict, ready to be
+        serialised, along with an OperationOutcome entry if the supplier requested vaccine types they were not
+        authorised for.
         When target_disease_codes_for_url is set, the bundle self link uses target-disease param instead of vaccine types.
         """
         permitted_vacc_types = self.authoriser.filter_permitted_vacc_types(
@@ -255,8 +273,9 @@ class FhirService:
         if not permitted_vacc_types:
             raise UnauthorizedVaxError()
 
-        # Have to retrieve first and then inspect resource to filter by date
-        all_resources = self.immunization_repo.find_immunizations(nhs_number, permitted_vacc_types)
+        # The repository may apply the date range in the key condition, but the resources are still filtered by date here
+        # in case it does not, and to filter by status
+        all_resources = self.immunization_repo.find_immunizations(nhs_number, permitted_vacc_types, date_from, date_to)
         filtered_resources = self._filter_search_results_by_date_and_status(
             immunizations=all_resources, date_from=date_from, date_to=date_to, status=Constants.COMPLETED_STATUS
         )
@@ -268,39 +287,33 @@ class FhirService:
         # patient resource. This is as agreed with VDS team for backwards compatibility with Immunisation History API.
         patient_full_url = f"urn:uuid:{str(uuid4())}"
 
-        # Adjust immunization resources for the SEARCH response
-        processed_resources = [Filter.search(imms, patient_full_url) for imms in copy.deepcopy(filtered_resources)]
-        entries = [
-            BundleEntry(
-                resource=Immunization.parse_obj(imms),
-                search=BundleEntrySearch(mode="match"),
-                fullUrl=f"{get_service_url(IMMUNIZATION_ENV, IMMUNIZATION_BASE_PATH)}/Immunization/{imms['id']}",
-            )
-            for imms in processed_resources
-        ]
+        # Take the patient before the contained resources are removed from the immunization resources below
+        imms_patient_record = get_contained_patient(filtered_resources[-1]) if filtered_resources else None
+
+        # Adjust immunization resources for the SEARCH response. The resources were decoded from the database for this
+        # request, so are adjusted in place rather than copied. The size of each entry is charged as it is added, so that
+        # a search whose response would be too large is abandoned without adjusting the rest of its resources
+        service_url = get_service_url(IMMUNIZATION_ENV, IMMUNIZATION_BASE_PATH)
+        budget = SearchSizeBudget("bundle assembly", MAX_SEARCH_RESPONSE_SIZE_BYTES, total_items=len(filtered_resources))
+        entries = []
+        for imms in filtered_resources:
+            entry = make_match_entry(Filter.search(imms, patient_full_url), f"{service_url}/Immunization/{imms['id']}")
+            budget.charge(len(json.dumps(entry).encode()), items=1)
+            entries.append(entry)
 
         # Add patient resource if there is at least one immunization resource
-        if len(processed_resources) > 0:
-            imms_patient_record = get_contained_patient(filtered_resources[-1])
-            entries.append(
-                BundleEntry(
-                    resource=self.process_patient_for_bundle(imms_patient_record),
-                    search=BundleEntrySearch(mode="include"),
-                    fullUrl=patient_full_url,
-                )
-            )
+        if imms_patient_record is not None:
+            entries.append(make_include_entry(self.process_patient_for_bundle(imms_patient_record), patient_full_url))
 
         if len(vaccine_types) != len(permitted_vacc_types):
             # Include Operation Outcome error in response but still return the vaccs the client was authorised for
             entries.append(
-                BundleEntry(
-                    resource=OperationOutcome.construct(
-                        **create_operation_outcome(
-                            resource_id=str(uuid.uuid4()),
-                            severity=Severity.warning,
-                            code=Code.unauthorized,
-                            diagnostics="Your search contains details that you are not authorised to request",
-                        )
+                make_outcome_entry(
+                    create_operation_outcome(
+                        resource_id=str(uuid.uuid4()),
+                        severity=Severity.warning,
+                        code=Code.unauthorized,
+                        diagnostics="Your search contains details that you are not authorised to request",
                     )
                 )
             )
@@ -308,14 +321,12 @@ class FhirService:
         if invalid_immunization_targets:
             invalid_list = ", ".join(sorted(invalid_immunization_targets))
             entries.append(
-                BundleEntry(
-                    resource=OperationOutcome.construct(
-                        **create_operation_outcome(
-                            resource_id=str(uuid.uuid4()),
-                            severity=Severity.warning,
-                            code=Code.invalid,
-                            diagnostics=f"Your search included invalid -immunization.target value(s) that were ignored: {invalid_list}. The search was performed using the valid value(s) only.",
-                        )
+                make_outcome_entry(
+                    create_operation_outcome(
+                        resource_id=str(uuid.uuid4()),
+                        severity=Severity.warning,
+                        code=Code.invalid,
+                        diagnostics=f"Your search included invalid -immunization.target value(s) that were ignored: {invalid_list}. The search was performed using the valid value(s) only.",
                     )
                 )
             )
@@ -323,14 +334,12 @@ class FhirService:
         if invalid_target_diseases:
             for diagnostics in invalid_target_diseases:
                 entries.append(
-                    BundleEntry(
-                        resource=OperationOutcome.construct(
-                            **create_operation_outcome(
-                                resource_id=str(uuid.uuid4()),
-                                severity=Severity.warning,
-                                code=Code.invalid,
-                                diagnostics=diagnostics,
-                            )
+                    make_outcome_entry(
+                        create_operation_outcome(
+                            resource_id=str(uuid.uuid4()),
+                            severity=Severity.warning,
+                            code=Code.invalid,
+                            diagnostics=diagnostics,
                         )
                     )
                 )
@@ -346,12 +355,7 @@ class FhirService:
             target_disease_codes_for_url=target_disease_codes_for_url,
         )
 
-        return FhirBundle(
-            type="searchset",
-            entry=entries,
-            link=[BundleLink(relation="self", url=bundle_link_url)],
-            total=len(processed_resources),
-        )
+        return make_search_bundle(entries, bundle_link_url, total=len(filtered_resources))
 
     def make_empty_search_bundle_with_target_disease_not_in_mapping(
         self,
@@ -360,16 +364,14 @@ class FhirService:
         date_to: datetime.date | None,
         include: str | None,
         target_disease_codes_for_url: set[str] | None = None,
-    ) -> FhirBundle:
+    ) -> dict:
         entries = [
-            BundleEntry(
-                resource=OperationOutcome.construct(
-                    **create_operation_outcome(
-                        resource_id=str(uuid.uuid4()),
-                        severity=Severity.warning,
-                        code=Code.invalid,
-                        diagnostics="This service does not contain any vaccination types with the target disease requested.",
-                    )
+            make_outcome_entry(
+                create_operation_outcome(
+                    resource_id=str(uuid.uuid4()),
+                    severity=Severity.warning,
+                    code=Code.invalid,
+                    diagnostics="This service does not contain any vaccination types with the target disease requested.",
                 )
             )
         ]
@@ -383,12 +385,7 @@ class FhirService:
             IMMUNIZATION_BASE_PATH,
             target_disease_codes_for_url=target_disease_codes_for_url or set(),
         )
-        return FhirBundle(
-            type="searchset",
-            entry=entries,
-            link=[BundleLink(relation="self", url=url)],
-            total=0,
-        )
+        return make_search_bundle(entries, url, total=0)
 
     def _filter_search_results_by_date_and_status(
         self,
@@ -0,0 +1,69 @@
+"""
+Functions for building the searchset Bundle returned by a patient search.
+
+The bundle is built as a plain dict with its keys in the order of the API response, so that it only has to be
+serialised once. The immunization resources have already been validated before being stored, so they are not parsed
+into fhir.resources models again.
+"""
+
+import json
+
+from search_size_budget import SearchSizeBudget
+
+
+def make_search_bundle(entries: list[dict], bundle_link_url: str, total: int) -> dict:
+    """Returns a searchset Bundle. The entry list is always included, even when empty, and total is the final key"""
+    return {
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "link": [{"relation": "self", "url": bundle_link_url}],
+        "entry": entries,
+        "total": total,
+    }
+
+
+def make_match_entry(imms: dict, full_url: str) -> dict:
+    """Returns a Bundle entry for an immunization resource which matched the search"""
+    if "meta" in imms:
+        # versionId is a FHIR id, so is a string in the response although it is stored as a number
+        imms["meta"]["versionId"] = str(imms["meta"]["versionId"])
+
+    return {"fullUrl": full_url, "resource": imms, "search": {"mode": "match"}}
+
+
+def make_include_entry(resource: dict, full_url: str) -> dict:
+    """Returns a Bundle entry for a resource which is included because it is referenced by the matched resources"""
+    return {"fullUrl": full_url, "resource": resource, "search": {"mode": "include"}}
+
+
+def make_outcome_entry(operation_outcome: dict) -> dict:
+    """Returns a Bundle entry for an OperationOutcome which gives a warning about the search"""
+    return {"resource": operation_outcome}
+
+
+def serialise_search_bundle(search_bundle: dict, max_size_bytes: int) -> str:
+    """
+    Serialises the search bundle to the same JSON as json.dumps, one entry at a time, raising TooManyResultsError as
+    soon as the UTF-8 encoded body exceeds max_size_bytes rather than once all of it has been serialised
+    """
+    budget = SearchSizeBudget("serialisation", max_size_bytes, total_items=len(search_bundle["entry"]))
+    chunks = []
+
+    def write(chunk: str, items: int = 0) -> None:
+        chunks.append(chunk)
+        budget.charge(len(chunk.encode()), items)
+
+    write("{")
+    for index, (key, value) in enumerate(search_bundle.items()):
+        write(f"{', ' if index else ''}{json.dumps(key)}: ")
+        if key != "entry":
+            write(json.dumps(value))
+            continue
+
+        write("[")
+        for entry_index, entry in enumerate(value):
+            write(f"{', ' if entry_index else ''}{json.dumps(entry)}", items=1)
+        write("]")
+    write("}")
+
+    return "".join(chunks)
@@ -0,0 +1,68 @@
+"""
+Compares the CPU time of validating a create request and building its Immunization model the previous way, which
+deep copied the resource for validation and parsed it into fhir.resources models a second time, against reusing the
+model returned by the validator.
+Run from the backend directory with:
+PYTHONPATH=src:tests:../shared/src:../shared/tests python -m tests.benchmark_immunization_validation [number_of_runs]
+"""
+
+import copy
+import sys
+import time
+from unittest.mock import Mock, patch
+
+from fhir.resources.R4B.immunization import Immunization
+
+from service.fhir_service import IMMUNIZATION_VALIDATOR, FhirService
+from test_common.testing_utils.generic_utils import load_json_data
+
+N_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+SAMPLE_PAYLOADS = {
+    "COVID": "completed_covid_immunization_event.json",
+    "FLU": "completed_flu_immunization_event.json",
+    "HPV": "completed_hpv_immunization_event.json",
+    "MMR": "completed_mmr_immunization_event.json",
+    "RSV": "completed_rsv_immunization_event.json",
+}
+
+
+def legacy_validate_and_parse(_service: FhirService, immunization: dict) -> Immunization:
+    """Validation and parsing as they were before the validator returned the model"""
+    immunization_to_validate = copy.deepcopy(immunization)
+    FhirService._normalize_single_snomed_codeable_concepts(immunization_to_validate)
+    IMMUNIZATION_VALIDATOR.validate(immunization_to_validate)
+    return Immunization.parse_obj(immunization)
+
+
+def validate_and_parse(service: FhirService, immunization: dict) -> Immunization:
+    return service._validate_immunization(immunization)
+
+
+def run_benchmark(name: str, validate, service: FhirService, vaccine_type: str, immunization: dict) -> float:
+    timings = []
+    for _ in range(N_RUNS):
+        start_time = time.process_time()
+        validate(service, immunization)
+        timings.append(time.process_time() - start_time)
+
+    mean_ms = sum(timings) / len(timings) * 1000
+    print(f"{name:<8} {vaccine_type:<6} {mean_ms:7.3f}ms CPU")
+    return mean_ms
+
+
+if __name__ == "__main__":
+    fhir_service = FhirService(Mock(), Mock())
+    mock_redis = Mock()
+
+    with patch("common.models.utils.validation_utils.get_redis_client", return_value=mock_redis):
+        for sample_vaccine_type, filename in SAMPLE_PAYLOADS.items():
+            # The vaccine type is looked up from the target disease codes in Redis
+            mock_redis.hget.return_value = sample_vaccine_type
+            sample_immunization = load_json_data(filename)
+            sample_immunization.pop("id", None)
+
+            legacy_ms = run_benchmark(
+                "legacy", legacy_validate_and_parse, fhir_service, sample_vaccine_type, sample_immunization
+            )
+            reuse_ms = run_benchmark("reuse", validate_and_parse, fhir_service, sample_vaccine_type, sample_immunization)
+            print(f"{'':<8} {sample_vaccine_type:<6} {legacy_ms / reuse_ms:7.2f}x faster")
@@ -0,0 +1,112 @@
+"""
+Compares the CPU time and peak memory of building the search response body the previous way, by parsing each resource
+into fhir.resources models and round-tripping the bundle through JSON, against building it as a plain dict which is
+serialised once.
+Run from the backend directory with:
+PYTHONPATH=src:tests:../shared/src:../shared/tests python -m tests.benchmark_search_bundle [number_of_runs]
+"""
+
+import copy
+import json
+import sys
+import time
+import tracemalloc
+import uuid
+from unittest.mock import Mock, patch
+
+import simplejson
+from fhir.resources.R4B.bundle import Bundle, BundleEntry, BundleEntrySearch, BundleLink
+from fhir.resources.R4B.immunization import Immunization
+
+from common.models.utils.generic_utils import get_contained_patient
+from controller.fhir_controller import FhirController
+from filter import Filter
+from service.fhir_service import FhirService
+from test_common.testing_utils.immunization_utils import VALID_NHS_NUMBER, create_covid_immunization_dict
+
+N_RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+RECORD_COUNTS = (10, 100, 1000)
+
+
+def make_stored_resources(number_of_records: int) -> list[str]:
+    """Returns the resources as they are stored in the Resource attribute of the table"""
+    return [
+        simplejson.dumps(
+            {**create_covid_immunization_dict(str(uuid.uuid4())), "meta": {"versionId": 1}}, use_decimal=True
+        )
+        for _ in range(number_of_records)
+    ]
+
+
+def legacy_search_response_body(service: FhirService, resources: list[dict]) -> str:
+    """The search response as it was built before the bundle was assembled as a dict"""
+    patient_full_url = f"urn:uuid:{uuid.uuid4()}"
+    processed_resources = [Filter.search(imms, patient_full_url) for imms in copy.deepcopy(resources)]
+    entries = [
+        BundleEntry(
+            resource=Immunization.parse_obj(imms),
+            search=BundleEntrySearch(mode="match"),
+            fullUrl=f"https://example.org/Immunization/{imms['id']}",
+        )
+        for imms in processed_resources
+    ]
+    entries.append(
+        BundleEntry(
+            resource=service.process_patient_for_bundle(get_contained_patient(resources[-1])),
+            search=BundleEntrySearch(mode="include"),
+            fullUrl=patient_full_url,
+        )
+    )
+    bundle = Bundle(
+        type="searchset", entry=entries, link=[BundleLink(relation="self", url="a-url")], total=len(entries) - 1
+    )
+    search_response_dict = json.loads(bundle.json(use_decimal=True))
+    search_response_dict["total"] = search_response_dict.pop("total")
+    return json.dumps(search_response_dict)
+
+
+def search_response_body(service: FhirService, resources: list[dict]) -> str:
+    service.immunization_repo.find_immunizations.return_value = resources
+    search_bundle = service.search_immunizations(VALID_NHS_NUMBER, {"COVID"}, "Test", None, None, None)
+    return FhirController._create_search_response(search_bundle)["body"]
+
+
+def run_benchmark(name: str, build_body, service: FhirService, stored_resources: list[str]) -> None:
+    timings = []
+    peak_memory = 0
+
+    for run in range(N_RUNS):
+        # The repository decodes the stored resources afresh for each search
+        resources = [simplejson.loads(resource) for resource in stored_resources]
+
+        if run == 0:
+            tracemalloc.start()
+            build_body(service, resources)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            continue
+
+        start_time = time.process_time()
+        build_body(service, resources)
+        timings.append(time.process_time() - start_time)
+
+    mean_ms = sum(timings) / len(timings) * 1000
+    print(
+        f"{name:<8} {len(stored_resources):>5} records: {mean_ms:9.2f}ms CPU, {peak_memory / 1024:9.0f}KiB peak memory"
+    )
+
+
+if __name__ == "__main__":
+    authoriser = Mock()
+    authoriser.filter_permitted_vacc_types.return_value = {"COVID"}
+    fhir_service = FhirService(Mock(), authoriser, Mock())
+
+    # The response size limit is lifted so that the larger searches can be compared
+    with (
+        patch("service.fhir_service.uuid4", return_value="a-patient-uuid"),
+        patch("controller.fhir_controller.MAX_SEARCH_RESPONSE_SIZE_BYTES", sys.maxsize),
+    ):
+        for record_count in RECORD_COUNTS:
+            stored = make_stored_resources(record_count)
+            run_benchmark("pydantic", legacy_search_response_body, fhir_service, stored)
+            run_benchmark("dict", search_response_body, fhir_service, stored)
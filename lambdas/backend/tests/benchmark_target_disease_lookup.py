@@ -0,0 +1,103 @@
+"""
+Compares the latency of resolving target-disease search parameters when the target disease lookup is rebuilt from
+Redis on every request against when the compiled lookup is held in the local Redis cache.
+Run from the backend directory with:
+PYTHONPATH=src:tests:../shared/src python -m tests.benchmark_target_disease_lookup [number_of_requests] [redis_latency_ms]
+"""
+
+import json
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+from common.models.constants import REDIS_CONFIG_VERSION_KEY, RedisHashKeys
+from common.redis_cache import redis_local_cache
+from controller.constants import ImmunizationSearchParameterName
+from controller.parameter_parser import TARGET_DISEASE_CODES_FIELD, validate_and_retrieve_search_params_by_disease
+
+N_REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+REDIS_LATENCY_SECONDS = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+N_VACCINE_TYPES = 40
+N_DISEASES_PER_VACCINE_TYPE = 5
+
+SEARCH_PARAMS = {
+    ImmunizationSearchParameterName.PATIENT_IDENTIFIER: ["https://fhir.nhs.uk/Id/nhs-number|9000000009"],
+    ImmunizationSearchParameterName.TARGET_DISEASE: [
+        "http://snomed.info/sct|100001",
+        "http://snomed.info/sct|100042",
+        "http://snomed.info/sct|999999",
+    ],
+}
+
+
+class StubRedis:
+    """In-memory Redis stand-in which sleeps for the given latency on every command, to simulate a network round trip"""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.commands = 0
+        vaccine_types = [f"VACC{index}" for index in range(N_VACCINE_TYPES)]
+        self.hashes = {
+            RedisHashKeys.VACCINE_TYPE_TO_DISEASES_HASH_KEY: {
+                vacc_type: json.dumps(
+                    [
+                        {"code": str(100000 + index * N_DISEASES_PER_VACCINE_TYPE + offset)}
+                        for offset in range(N_DISEASES_PER_VACCINE_TYPE)
+                    ]
+                )
+                for index, vacc_type in enumerate(vaccine_types)
+            },
+            RedisHashKeys.TARGET_DISEASE_TO_VACCS_KEY: {
+                str(100000 + index): json.dumps(vaccine_types[index % N_VACCINE_TYPES :][:3]) for index in range(100)
+            },
+            RedisHashKeys.TARGET_DISEASE_LIST_KEY: {
+                TARGET_DISEASE_CODES_FIELD: json.dumps([str(100000 + index) for index in range(250)])
+            },
+        }
+
+    def _round_trip(self):
+        self.commands += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+    def get(self, key):
+        self._round_trip()
+        return "1" if key == REDIS_CONFIG_VERSION_KEY else None
+
+    def hget(self, key, field):
+        self._round_trip()
+        return self.hashes.get(key, {}).get(field)
+
+    def hgetall(self, key):
+        self._round_trip()
+        return dict(self.hashes.get(key, {}))
+
+
+def run_benchmark(name: str, ttl_seconds: float) -> None:
+    stub_redis = StubRedis(REDIS_LATENCY_SECONDS)
+    redis_local_cache.clear()
+    timings = []
+
+    with (
+        patch("controller.parameter_parser.get_redis_client", return_value=stub_redis),
+        patch.object(redis_local_cache, "ttl_seconds", ttl_seconds),
+    ):
+        for _ in range(N_REQUESTS):
+            start_time = time.perf_counter()
+            validate_and_retrieve_search_params_by_disease(SEARCH_PARAMS)
+            timings.append((time.perf_counter() - start_time) * 1000)
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(
+        f"{name:<10} {N_REQUESTS} requests: p50 {p50:.4f}ms, p99 {p99:.4f}ms, "
+        f"{stub_redis.commands / N_REQUESTS:.3f} Redis commands per request"
+    )
+
+
+if __name__ == "__main__":
+    with patch("controller.parameter_parser.logger"), patch("common.redis_cache.logger"):
+        run_benchmark("uncached", ttl_seconds=0)
+        run_benchmark("compiled", ttl_seconds=60)
@@ -990,12 +990,13 @@ class TestSearchImmunizations(TestFhirControllerBase):
 
     def test_search_immunizations_is_successful(self):
         """it should search based on patient_identifier and immunization_target"""
-        self.service.search_immunizations.return_value = Bundle.construct(
-            entry=[BundleEntry.construct(resource=Immunization.construct(**{"id": "something"}))],
-            link=[BundleLink.construct(relation="self", url="patient-search-url")],
-            type="searchset",
-            total=1,
-        )
+        self.service.search_immunizations.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "patient-search-url"}],
+            "entry": [{"resource": {"resourceType": "Immunization", "id": "something"}}],
+            "total": 1,
+        }
         vaccine_type = "COVID"
         lambda_event = {
             "headers": {
@@ -1032,12 +1033,13 @@ class TestSearchImmunizations(TestFhirControllerBase):
         """though not properly documented or really recommended, there is a /Immunization/_search POST endpoint which
         can be used for performing patient and vacc type searches"""
         # Given
-        self.service.search_immunizations.return_value = Bundle.construct(
-            entry=[BundleEntry.construct(resource=Immunization.construct(**{"id": "something"}))],
-            link=[BundleLink.construct(relation="self", url="patient-search-url")],
-            type="searchset",
-            total=1,
-        )
+        self.service.search_immunizations.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "patient-search-url"}],
+            "entry": [{"resource": {"resourceType": "Immunization", "id": "something"}}],
+            "total": 1,
+        }
         vaccine_type = "COVID"
         form_data = {
             self.immunization_target_key: vaccine_type,
@@ -1153,12 +1155,13 @@ class TestSearchImmunizations(TestFhirControllerBase):
 
     def test_search_immunizations_returns_200_with_operation_outcome_for_invalid_targets(self):
         """it should return searchset with data for valid targets and OperationOutcome for invalid -immunization.target"""
-        self.service.search_immunizations.return_value = Bundle.construct(
-            entry=[BundleEntry.construct(resource=Immunization.construct(**{"id": "something"}))],
-            link=[BundleLink.construct(relation="self", url="patient-search-url")],
-            type="searchset",
-            total=1,
-        )
+        self.service.search_immunizations.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "patient-search-url"}],
+            "entry": [{"resource": {"resourceType": "Immunization", "id": "something"}}],
+            "total": 1,
+        }
         test_lambda_event = copy.deepcopy(self.test_lambda_event)
         test_lambda_event["multiValueQueryStringParameters"]["-immunization.target"] = ["COVID,FLU,CHICKENS"]
 
@@ -1211,12 +1214,13 @@ class TestSearchImmunizations(TestFhirControllerBase):
     def test_search_immunizations_raises_error_if_too_many_results_found(self):
         """it should return an error if there are too many results in the response for Lambda to handle. In reality,
         highly unlikely. If a concern, pagination should be implemented."""
-        self.service.search_immunizations.return_value = Bundle.construct(
-            entry=[BundleEntry.construct(resource=Immunization.construct(**{"id": "something"}))],
-            link=[BundleLink.construct(relation="self", url="patient-search-url")],
-            type="searchset",
-            total=1,
-        )
+        self.service.search_immunizations.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "patient-search-url"}],
+            "entry": [{"resource": {"resourceType": "Immunization", "id": "something"}}],
+            "total": 1,
+        }
 
         # When
         response = self.controller.search_immunizations(self.test_lambda_event)
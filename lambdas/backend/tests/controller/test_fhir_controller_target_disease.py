@@ -5,9 +5,6 @@ import unittest
 import urllib.parse
 from unittest.mock import Mock, create_autospec, patch
 
-from fhir.resources.R4B.bundle import Bundle, BundleEntry, BundleLink
-from fhir.resources.R4B.immunization import Immunization
-
 from controller.fhir_controller import FhirController
 from controller.parameter_parser import PATIENT_IDENTIFIER_SYSTEM
 from service.fhir_service import FhirService
@@ -45,12 +42,13 @@ class TestSearchImmunizationsByTargetDisease(unittest.TestCase):
     def test_search_by_target_disease_is_successful(self):
         """it should search by target-disease and call service with resolved vaccine types and target_disease_codes_for_url"""
         self.mock_redis.hget.side_effect = self._hget_target_disease_codes_and_mmr
-        self.service.search_immunizations.return_value = Bundle.construct(
-            entry=[BundleEntry.construct(resource=Immunization.construct(**{"id": "imms-1"}))],
-            link=[BundleLink.construct(relation="self", url="search-url")],
-            type="searchset",
-            total=1,
-        )
+        self.service.search_immunizations.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "search-url"}],
+            "entry": [{"resource": {"resourceType": "Immunization", "id": "imms-1"}}],
+            "total": 1,
+        }
         lambda_event = {
             "headers": {"SupplierSystem": "test"},
             "multiValueQueryStringParameters": {
@@ -78,12 +76,13 @@ class TestSearchImmunizationsByTargetDisease(unittest.TestCase):
     def test_search_by_target_disease_successful_via_post(self):
         """it should support target-disease search via POST _search endpoint"""
         self.mock_redis.hget.side_effect = self._hget_target_disease_codes_and_mmr
-        self.service.search_immunizations.return_value = Bundle.construct(
-            entry=[],
-            link=[BundleLink.construct(relation="self", url="search-url")],
-            type="searchset",
-            total=0,
-        )
+        self.service.search_immunizations.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "search-url"}],
+            "entry": [],
+            "total": 0,
+        }
         form_data = {
             self.patient_identifier_key: self.patient_identifier_valid_value,
             self.target_disease_key: f"{self.snomed_system}|{self.measles_code}",
@@ -156,12 +155,13 @@ class TestSearchImmunizationsByTargetDisease(unittest.TestCase):
                 self.target_disease_key: [f"{self.snomed_system}|{self.measles_code}"],
             },
         }
-        self.service.make_empty_search_bundle_with_target_disease_not_in_mapping.return_value = Bundle.construct(
-            entry=[],
-            link=[BundleLink.construct(relation="self", url="url")],
-            type="searchset",
-            total=0,
-        )
+        self.service.make_empty_search_bundle_with_target_disease_not_in_mapping.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "url"}],
+            "entry": [],
+            "total": 0,
+        }
 
         response = self.controller.search_immunizations(lambda_event)
 
@@ -180,12 +180,13 @@ class TestSearchImmunizationsByTargetDisease(unittest.TestCase):
         """it should return 200 with empty searchset when target-disease list is missing from cache"""
         self.mock_redis.hget.return_value = None
         self.mock_redis.hgetall.return_value = {}
-        self.service.make_empty_search_bundle_with_target_disease_not_in_mapping.return_value = Bundle.construct(
-            entry=[],
-            link=[BundleLink.construct(relation="self", url="url")],
-            type="searchset",
-            total=0,
-        )
+        self.service.make_empty_search_bundle_with_target_disease_not_in_mapping.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "url"}],
+            "entry": [],
+            "total": 0,
+        }
         lambda_event = {
             "headers": {"SupplierSystem": "test"},
             "multiValueQueryStringParameters": {
@@ -209,12 +210,13 @@ class TestSearchImmunizationsByTargetDisease(unittest.TestCase):
     def test_search_by_target_disease_with_date_range(self):
         """it should pass date params through to service when searching by target-disease"""
         self.mock_redis.hget.side_effect = self._hget_target_disease_codes_and_mmr
-        self.service.search_immunizations.return_value = Bundle.construct(
-            entry=[],
-            link=[BundleLink.construct(relation="self", url="url")],
-            type="searchset",
-            total=0,
-        )
+        self.service.search_immunizations.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "url"}],
+            "entry": [],
+            "total": 0,
+        }
         lambda_event = {
             "headers": {"SupplierSystem": "test"},
             "multiValueQueryStringParameters": {
@@ -262,12 +264,13 @@ class TestSearchImmunizationsByTargetDisease(unittest.TestCase):
     def test_search_by_target_disease_with_mixed_valid_and_invalid_returns_200_with_operation_outcome(self):
         """it should return 200 with results and OperationOutcome for invalid when one code valid and one invalid"""
         self.mock_redis.hget.side_effect = self._hget_target_disease_codes_and_mmr
-        self.service.search_immunizations.return_value = Bundle.construct(
-            entry=[BundleEntry.construct(resource=Immunization.construct(**{"id": "imms-1"}))],
-            link=[BundleLink.construct(relation="self", url="search-url")],
-            type="searchset",
-            total=1,
-        )
+        self.service.search_immunizations.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "search-url"}],
+            "entry": [{"resource": {"resourceType": "Immunization", "id": "imms-1"}}],
+            "total": 1,
+        }
         lambda_event = {
             "headers": {"SupplierSystem": "test"},
             "multiValueQueryStringParameters": {
@@ -292,12 +295,13 @@ class TestSearchImmunizationsByTargetDisease(unittest.TestCase):
     def test_search_by_target_disease_returns_400_when_response_too_large(self):
         """it should return the same narrow-the-search error for oversized target-disease searches"""
         self.mock_redis.hget.side_effect = self._hget_target_disease_codes_and_mmr
-        self.service.search_immunizations.return_value = Bundle.construct(
-            entry=[BundleEntry.construct(resource=Immunization.construct(**{"id": "imms-1"}))],
-            link=[BundleLink.construct(relation="self", url="search-url")],
-            type="searchset",
-            total=1,
-        )
+        self.service.search_immunizations.return_value = {
+            "resourceType": "Bundle",
+            "type": "searchset",
+            "link": [{"relation": "self", "url": "search-url"}],
+            "entry": [{"resource": {"resourceType": "Immunization", "id": "imms-1"}}],
+            "total": 1,
+        }
         lambda_event = {
             "headers": {"SupplierSystem": "test"},
             "multiValueQueryStringParameters": {
@@ -1,8 +1,10 @@
 import unittest
 from unittest.mock import Mock, patch
 
+from common.redis_cache import redis_local_cache
 from controller.constants import ImmunizationSearchParameterName
 from controller.parameter_parser import (
+    get_target_disease_lookup,
     validate_and_retrieve_search_params_by_disease,
     validate_search_param_mutual_exclusivity,
 )
@@ -115,3 +117,34 @@ class TestTargetDiseaseSearch(unittest.TestCase):
         self.assertIn(f"{self.snomed_system}|14189004", result.params.target_disease_codes_for_url)
         self.assertEqual(len(result.invalid_target_diseases), 1)
         self.assertIn("14189004", result.invalid_target_diseases[0])
+
+    def test_get_target_disease_lookup_builds_indexed_lookup(self):
+        self.mock_redis.hget.return_value = '["14189004", "840539006"]'
+        self.mock_redis.hgetall.side_effect = [{"14189004": '["MMR", "MMRV"]'}, {"FLU": '[{"code": "6142004"}]'}]
+
+        lookup = get_target_disease_lookup()
+
+        self.assertEqual(lookup.valid_codes, frozenset({"14189004", "840539006", "6142004"}))
+        self.assertEqual(lookup.vaccine_types_by_code["14189004"], ("MMR", "MMRV"))
+        self.assertEqual(lookup.vaccine_types_by_code["6142004"], ("FLU",))
+        with self.assertRaises(TypeError):
+            lookup.vaccine_types_by_code["14189004"] = ("RSV",)
+
+    def test_validate_and_retrieve_search_params_by_disease_compiles_lookup_once_when_cache_enabled(self):
+        self.mock_redis.hget.return_value = '["14189004"]'
+        self.mock_redis.hgetall.return_value = {"14189004": '["MMR"]'}
+        self.mock_redis.get.return_value = "1"
+        params = {
+            ImmunizationSearchParameterName.PATIENT_IDENTIFIER: [self.patient_id],
+            ImmunizationSearchParameterName.TARGET_DISEASE: [f"{self.snomed_system}|14189004"],
+        }
+        redis_local_cache.clear()
+        self.addCleanup(redis_local_cache.clear)
+
+        with patch.object(redis_local_cache, "ttl_seconds", 60):
+            results = [validate_and_retrieve_search_params_by_disease(params) for _ in range(3)]
+
+        self.assertEqual(self.mock_redis.hgetall.call_count, 2)
+        self.assertEqual(self.mock_redis.hget.call_count, 1)
+        for result in results:
+            self.assertEqual(result.params.immunization_targets, {"MMR"})
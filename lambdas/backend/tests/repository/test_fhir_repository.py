@@ -1,3 +1,4 @@
+import datetime
 import time
 import unittest
 import uuid
@@ -26,6 +27,17 @@ def _make_patient_pk(_id):
     return f"Patient#{_id}"
 
 
+def _make_patient_gsi_query_kwargs(patient_id, vaccine_type):
+    return {
+        "IndexName": "PatientGSI",
+        "KeyConditionExpression": Key("PatientPK").eq(_make_patient_pk(patient_id))
+        & Key("PatientSK").begins_with(f"{vaccine_type}#"),
+        "FilterExpression": Attr("DeletedAt").not_exists() | Attr("DeletedAt").eq("reinstated"),
+        "ProjectionExpression": "#imms_resource, #version",
+        "ExpressionAttributeNames": {"#imms_resource": "Resource", "#version": "Version"},
+    }
+
+
 class TestFhirRepositoryBase(unittest.TestCase):
     """Base class for all tests to set up common fixtures"""
 
@@ -314,6 +326,7 @@ class TestCreateImmunizationMainIndex(TestFhirRepositoryBase):
                 "PK": f"Immunization#{self._MOCK_CREATED_UUID}",
                 "PatientPK": "Patient#9990548609",
                 "PatientSK": f"COVID#{self._MOCK_CREATED_UUID}",
+                "PatientOccurrenceSK": f"COVID#2021-02-07#{self._MOCK_CREATED_UUID}",
                 "Resource": imms.json(),
                 "IdentifierPK": "https://supplierABC/identifiers/vacc#ACME-vacc123456",
                 "Operation": "CREATE",
@@ -406,7 +419,8 @@ class TestUpdateImmunization(TestFhirRepositoryBase):
         # Then
         update_exp = (
             "SET UpdatedAt = :timestamp, PatientPK = :patient_pk, "
-            "PatientSK = :patient_sk, #imms_resource = :imms_resource_val, "
+            "PatientSK = :patient_sk, PatientOccurrenceSK = :patient_occurrence_sk, "
+            "#imms_resource = :imms_resource_val, "
             "Operation = :operation, Version = :version, SupplierSystem = :supplier_system "
         )
         patient_id = imms["contained"][1]["identifier"][0]["value"]
@@ -421,6 +435,7 @@ class TestUpdateImmunization(TestFhirRepositoryBase):
                 ":timestamp": ANY,
                 ":patient_pk": _make_patient_pk(patient_id),
                 ":patient_sk": patient_sk,
+                ":patient_occurrence_sk": f"{vaccine_type}#2021-02-07#{imms_id}",
                 ":imms_resource_val": immunization.json(use_decimal=True),
                 ":operation": "UPDATE",
                 ":version": 2,
@@ -449,7 +464,7 @@ class TestUpdateImmunization(TestFhirRepositoryBase):
         # Then
         update_exp = (
             "SET UpdatedAt = :timestamp, PatientPK = :patient_pk, PatientSK = :patient_sk, "
-            "#imms_resource = :imms_resource_val, Operation = :operation, Version = :version, DeletedAt = :respawn, "
+            "PatientOccurrenceSK = :patient_occurrence_sk, #imms_resource = :imms_resource_val, Operation = :operation, Version = :version, DeletedAt = :respawn, "
             "SupplierSystem = :supplier_system "
         )
         patient_id = imms["contained"][1]["identifier"][0]["value"]
@@ -464,6 +479,7 @@ class TestUpdateImmunization(TestFhirRepositoryBase):
                 ":timestamp": ANY,
                 ":patient_pk": _make_patient_pk(patient_id),
                 ":patient_sk": patient_sk,
+                ":patient_occurrence_sk": f"{vaccine_type}#2021-02-07#{imms_id}",
                 ":imms_resource_val": immunization.json(use_decimal=True),
                 ":operation": "UPDATE",
                 ":version": 3,
@@ -599,11 +615,16 @@ class TestFindImmunizations(unittest.TestCase):
         result = self.repository.find_immunizations(nhs_number, vaccine_types={"COVID"})
 
         # Then
-        self.table.query.assert_called_once_with(
-            IndexName="PatientGSI",
-            KeyConditionExpression=Key("PatientPK").eq(_make_patient_pk(nhs_number)),
-            FilterExpression=Attr("DeletedAt").not_exists() | Attr("DeletedAt").eq("reinstated"),
-        )
+        self.table.query.assert_called_once_with(**_make_patient_gsi_query_kwargs(nhs_number, "COVID"))
+        self.assertEqual(result, [])
+
+    def test_find_immunizations_does_not_query_when_no_vaccine_types_requested(self):
+        """it should return an empty list without querying DynamoDB when no vaccine types are requested"""
+        self.table.query = MagicMock()
+
+        result = self.repository.find_immunizations("a-patient-id", vaccine_types=set())
+
+        self.table.query.assert_not_called()
         self.assertEqual(result, [])
 
     def test_find_immunizations_queries_all_dynamodb_pages(self):
@@ -639,11 +660,7 @@ class TestFindImmunizations(unittest.TestCase):
         )
 
         results = self.repository.find_immunizations(nhs_number, {"COVID"})
-        expected_query_kwargs = {
-            "IndexName": "PatientGSI",
-            "KeyConditionExpression": Key("PatientPK").eq(_make_patient_pk(nhs_number)),
-            "FilterExpression": Attr("DeletedAt").not_exists() | Attr("DeletedAt").eq("reinstated"),
-        }
+        expected_query_kwargs = _make_patient_gsi_query_kwargs(nhs_number, "COVID")
 
         self.assertEqual(
             self.table.query.call_args_list,
@@ -680,37 +697,134 @@ class TestFindImmunizations(unittest.TestCase):
         # Then
         self.assertListEqual(results, [imms1, imms2])
 
-    def test_find_immunizations_filters_any_vacc_types_not_in_the_request(self):
-        """it should filter out any returns vacc types that we not in the requested parameters"""
+    def test_find_immunizations_queries_each_requested_vacc_type_by_patient_sk_prefix(self):
+        """it should query only the requested vacc types, and return them in PatientSK order"""
         imms1 = {"id": 1, "meta": {"versionId": 1}}
         imms2 = {"id": 2, "meta": {"versionId": 2}}
         imms3 = {"id": 3, "meta": {"versionId": 4}}
-        items = [
-            {
-                "Resource": json.dumps(imms1),
-                "PatientSK": "COVID#some_other_text",
-                "Version": "1",
-            },
-            {
-                "Resource": json.dumps(imms2),
-                "PatientSK": "FLU#some_other_text",
-                "Version": "2",
-            },
-            {
-                "Resource": json.dumps(imms3),
-                "PatientSK": "MMR#some_other_text",
-                "Version": "4",
-            },
-        ]
+        items_by_vacc_type = {
+            "COVID": [{"Resource": json.dumps(imms1), "Version": "1"}],
+            "FLU": [{"Resource": json.dumps(imms2), "Version": "2"}, {"Resource": json.dumps(imms3), "Version": "4"}],
+        }
 
-        dynamo_response = {"ResponseMetadata": {"HTTPStatusCode": 200}, "Items": items}
-        self.table.query = MagicMock(return_value=dynamo_response)
+        def query(**kwargs):
+            for vacc_type, items in items_by_vacc_type.items():
+                if kwargs == _make_patient_gsi_query_kwargs("an-id", vacc_type):
+                    return {"ResponseMetadata": {"HTTPStatusCode": 200}, "Items": items}
+            raise AssertionError(f"Unexpected query: {kwargs}")
+
+        self.table.query = MagicMock(side_effect=query)
 
         # When
-        results = self.repository.find_immunizations("an-id", {"COVID", "FLU"})
+        results = self.repository.find_immunizations("an-id", {"FLU", "COVID"})
 
         # Then
-        self.assertListEqual(results, [imms1, imms2])
+        self.assertEqual(self.table.query.call_count, 2)
+        self.assertListEqual(results, [imms1, imms2, imms3])
+
+    def test_find_immunizations_queries_occurrence_date_range_when_index_enabled(self):
+        """it should apply the date range in the key condition on the PatientOccurrenceGSI when it is enabled"""
+        imms1 = {"id": 1, "meta": {"versionId": 1}}
+        self.table.query = MagicMock(
+            return_value={
+                "ResponseMetadata": {"HTTPStatusCode": 200},
+                "Items": [{"Resource": json.dumps(imms1), "Version": "1"}],
+            }
+        )
+        patient_pk = _make_patient_pk("an-id")
+        no_occurrence_condition = Key("PatientPK").eq(patient_pk) & Key("PatientOccurrenceSK").begins_with("COVID##")
+        test_cases = [
+            (
+                datetime.date(2021, 2, 6),
+                datetime.date(2023, 1, 1),
+                [no_occurrence_condition],
+                "COVID#2021-02-06",
+                "COVID#2023-01-01$",
+            ),
+            (datetime.date(2021, 2, 6), None, [no_occurrence_condition], "COVID#2021-02-06", "COVID$"),
+            # Records with no occurrence date sort before any date, so are within a range with no lower bound
+            (None, datetime.date(2023, 1, 1), [], "COVID#", "COVID#2023-01-01$"),
+        ]
+
+        for date_from, date_to, no_occurrence_conditions, lower_bound, upper_bound in test_cases:
+            with self.subTest(date_from=date_from, date_to=date_to):
+                self.table.query.reset_mock()
+
+                with patch("repository.fhir_repository.OCCURRENCE_DATE_INDEX_ENABLED", True):
+                    results = self.repository.find_immunizations("an-id", {"COVID"}, date_from, date_to)
+
+                expected_conditions = [
+                    *no_occurrence_conditions,
+                    Key("PatientPK").eq(patient_pk) & Key("PatientOccurrenceSK").between(lower_bound, upper_bound),
+                ]
+                self.assertCountEqual(
+                    self.table.query.call_args_list,
+                    [
+                        call(
+                            **{
+                                **_make_patient_gsi_query_kwargs("an-id", "COVID"),
+                                "IndexName": "PatientOccurrenceGSI",
+                                "KeyConditionExpression": condition,
+                            }
+                        )
+                        for condition in expected_conditions
+                    ],
+                )
+                self.assertListEqual(results, [imms1] * len(expected_conditions))
+
+    def test_find_immunizations_returns_records_with_no_occurrence_date_when_index_enabled(self):
+        """it should return the records with no occurrence date, before the others, when the range has a lower bound"""
+        imms_without_occurrence = {"id": 1, "meta": {"versionId": 1}}
+        imms_in_range = {"id": 2, "meta": {"versionId": 1}}
+        patient_pk = _make_patient_pk("an-id")
+        items_by_condition = [
+            (
+                Key("PatientPK").eq(patient_pk) & Key("PatientOccurrenceSK").begins_with("COVID##"),
+                [{"Resource": json.dumps(imms_without_occurrence), "Version": "1"}],
+            ),
+            (
+                Key("PatientPK").eq(patient_pk) & Key("PatientOccurrenceSK").between("COVID#2021-02-06", "COVID$"),
+                [{"Resource": json.dumps(imms_in_range), "Version": "1"}],
+            ),
+        ]
+
+        def query(**kwargs):
+            for condition, items in items_by_condition:
+                if kwargs["KeyConditionExpression"] == condition:
+                    return {"ResponseMetadata": {"HTTPStatusCode": 200}, "Items": items}
+            raise AssertionError(f"Unexpected query: {kwargs}")
+
+        self.table.query = MagicMock(side_effect=query)
+
+        with patch("repository.fhir_repository.OCCURRENCE_DATE_INDEX_ENABLED", True):
+            results = self.repository.find_immunizations("an-id", {"COVID"}, datetime.date(2021, 2, 6), None)
+
+        self.assertListEqual(results, [imms_without_occurrence, imms_in_range])
+
+    def test_find_immunizations_ignores_date_range_when_occurrence_date_index_disabled(self):
+        """it should query the PatientGSI, leaving date filtering to the caller, when the index is not enabled"""
+        self.table.query = MagicMock(return_value={"ResponseMetadata": {"HTTPStatusCode": 200}, "Items": []})
+
+        with patch("repository.fhir_repository.OCCURRENCE_DATE_INDEX_ENABLED", False):
+            self.repository.find_immunizations("an-id", {"COVID"}, datetime.date(2021, 2, 6), None)
+
+        self.table.query.assert_called_once_with(**_make_patient_gsi_query_kwargs("an-id", "COVID"))
+
+    def test_find_immunizations_reads_every_page_however_large_the_resources(self):
+        """it should read every record, as the size of the search response is only known once it has been filtered"""
+        large_imms = {"id": "a" * 1024 * 1024, "meta": {"versionId": 1}}
+        page = {
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+            "Items": [{"Resource": json.dumps(large_imms), "Version": "1"}],
+            "LastEvaluatedKey": {"PK": "Immunization#1"},
+        }
+        last_page = {key: value for key, value in page.items() if key != "LastEvaluatedKey"}
+        self.table.query = MagicMock(side_effect=[page, page, last_page])
+
+        results = self.repository.find_immunizations("an-id", {"COVID"})
+
+        self.assertListEqual(results, [large_imms] * 3)
+        self.assertEqual(self.table.query.call_count, 3)
 
     def test_bad_response_from_dynamo(self):
         """it should throw UnhandledResponse when the response from dynamodb can't be handled"""
@@ -753,6 +867,7 @@ class TestImmunizationDecimals(TestFhirRepositoryBase):
             "PK": ANY,
             "PatientPK": ANY,
             "PatientSK": ANY,
+            "PatientOccurrenceSK": ANY,
             "Resource": Immunization.parse_obj(imms).json(use_decimal=True),
             "IdentifierPK": ANY,
             "Operation": "CREATE",
@@ -787,7 +902,8 @@ class TestImmunizationDecimals(TestFhirRepositoryBase):
 
         update_exp = (
             "SET UpdatedAt = :timestamp, PatientPK = :patient_pk, "
-            "PatientSK = :patient_sk, #imms_resource = :imms_resource_val, "
+            "PatientSK = :patient_sk, PatientOccurrenceSK = :patient_occurrence_sk, "
+            "#imms_resource = :imms_resource_val, "
             "Operation = :operation, Version = :version, SupplierSystem = :supplier_system "
         )
         patient_id = imms["contained"][1]["identifier"][0]["value"]
@@ -802,6 +918,7 @@ class TestImmunizationDecimals(TestFhirRepositoryBase):
                 ":timestamp": ANY,
                 ":patient_pk": _make_patient_pk(patient_id),
                 ":patient_sk": patient_sk,
+                ":patient_occurrence_sk": f"{vaccine_type}#2021-02-07#{imms_id}",
                 ":imms_resource_val": immunization.json(use_decimal=True),
                 ":operation": "UPDATE",
                 ":version": 2,
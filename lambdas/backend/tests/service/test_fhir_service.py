@@ -3,7 +3,7 @@ import json
 import os
 import unittest
 from copy import deepcopy
-from unittest.mock import Mock, create_autospec, patch
+from unittest.mock import MagicMock, Mock, create_autospec, patch
 
 from fhir.resources.R4B.bundle import BundleLink
 from fhir.resources.R4B.identifier import Identifier
@@ -20,9 +20,11 @@ from common.models.errors import (
 )
 from common.models.fhir_immunization import ImmunizationValidator
 from common.models.immunization_record_metadata import ImmunizationRecordMetadata
-from models.errors import UnauthorizedVaxError
+from constants import MAX_SEARCH_RESPONSE_SIZE_BYTES
+from models.errors import TooManyResultsError, UnauthorizedVaxError
 from repository.fhir_repository import ImmunizationRepository
 from service.fhir_service import FhirService
+from service.search_bundle import serialise_search_bundle
 from test_common.testing_utils.generic_utils import load_json_data
 from test_common.testing_utils.immunization_utils import (
     VALID_NHS_NUMBER,
@@ -346,6 +348,8 @@ class TestCreateImmunization(TestFhirServiceBase):
         self.authoriser = create_autospec(Authoriser)
         self.imms_repo = create_autospec(ImmunizationRepository)
         self.validator = create_autospec(ImmunizationValidator)
+        # The validator returns the parsed model, which is reused to create the record
+        self.validator.validate.side_effect = Immunization.parse_obj
         self.fhir_service = FhirService(self.imms_repo, self.authoriser, self.validator)
         self.pre_validate_fhir_service = FhirService(
             self.imms_repo,
@@ -403,6 +407,24 @@ class TestCreateImmunization(TestFhirServiceBase):
         self.assertEqual(req_imms["route"]["coding"], expected_route_codings)
         self.imms_repo.create_immunization.assert_called_once_with(Immunization.parse_obj(req_imms), "Test")
 
+    def test_create_immunization_reuses_model_returned_by_validator(self):
+        """it should create the record from the validated model rather than parsing the resource again"""
+        self.mock_redis.hget.return_value = "COVID"
+        self.mock_redis_getter.return_value = self.mock_redis
+        self.authoriser.authorise.return_value = True
+        self.imms_repo.get_immunization_by_identifier.return_value = (None, None)
+        req_imms = create_covid_immunization_dict_no_id(VALID_NHS_NUMBER)
+        validated_imms = Immunization.parse_obj(req_imms)
+        self.validator.validate.side_effect = None
+        self.validator.validate.return_value = validated_imms
+
+        with patch("service.fhir_service.Immunization.parse_obj") as mock_parse_obj:
+            self.fhir_service.create_immunization(req_imms, "Test")
+
+        mock_parse_obj.assert_not_called()
+        self.imms_repo.create_immunization.assert_called_once_with(validated_imms, "Test")
+        self.assertEqual(validated_imms.id, req_imms["id"])
+
     def test_create_immunization_with_id_throws_error(self):
         """it should throw exception if id present in create Immunization"""
         imms = create_covid_immunization_dict("an-id", "9990548609")
@@ -883,28 +905,28 @@ class TestSearchImmunizations(TestFhirServiceBase):
         )
 
         # Then
-        self.imms_repo.find_immunizations.assert_called_once_with(VALID_NHS_NUMBER, {vaccine_type})
+        self.imms_repo.find_immunizations.assert_called_once_with(VALID_NHS_NUMBER, {vaccine_type}, None, None)
         mock_uuid.assert_called_once()
         self.authoriser.filter_permitted_vacc_types.assert_called_once_with(
             self.MOCK_SUPPLIER_SYSTEM_NAME, ApiOperationCode.SEARCH, {"COVID"}
         )
 
-        self.assertEqual(result.type, "searchset")
-        self.assertEqual(result.total, 1)
+        self.assertEqual(result["type"], "searchset")
+        self.assertEqual(result["total"], 1)
         self.assertEqual(
-            result.link[0],
-            BundleLink.construct(
-                relation="self",
-                url="https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
+            result["link"][0],
+            {
+                "relation": "self",
+                "url": "https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
                 "?immunization.target=COVID"
                 "&-immunization.target=COVID"
                 "&patient.identifier=https%3A%2F%2Ffhir.nhs.uk%2FId%2Fnhs-number%7C9990548609",
-            ),
+            },
         )
         # Will contain the matched immunization and then the referenced patient resource
-        self.assertEqual(len(result.entry), 2)
-        self.assertEqual(result.entry[0].resource.json(), json.dumps(ValidValues.expected_resource_in_search))
-        self.assertEqual(result.entry[-1].resource.resource_type, "Patient")
+        self.assertEqual(len(result["entry"]), 2)
+        self.assertEqual(result["entry"][0]["resource"], ValidValues.expected_resource_in_search)
+        self.assertEqual(result["entry"][-1]["resource"]["resourceType"], "Patient")
 
     @patch("service.fhir_service.uuid4", return_value="123456789-12")
     def test_search_immunizations_filters_by_date_and_status(self, mock_uuid):
@@ -938,31 +960,33 @@ class TestSearchImmunizations(TestFhirServiceBase):
         )
 
         # Then
-        self.imms_repo.find_immunizations.assert_called_once_with(VALID_NHS_NUMBER, {vaccine_type})
+        self.imms_repo.find_immunizations.assert_called_once_with(
+            VALID_NHS_NUMBER, {vaccine_type}, datetime.date(2021, 2, 6), datetime.date(2023, 1, 1)
+        )
         mock_uuid.assert_called_once()
         self.authoriser.filter_permitted_vacc_types.assert_called_once_with(
             self.MOCK_SUPPLIER_SYSTEM_NAME, ApiOperationCode.SEARCH, {"COVID"}
         )
 
-        self.assertEqual(result.type, "searchset")
-        self.assertEqual(result.total, 1)
+        self.assertEqual(result["type"], "searchset")
+        self.assertEqual(result["total"], 1)
         self.assertEqual(
-            result.link[0],
-            BundleLink.construct(
-                relation="self",
-                url="https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
+            result["link"][0],
+            {
+                "relation": "self",
+                "url": "https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
                 "?immunization.target=COVID"
                 "&-immunization.target=COVID"
                 "&patient.identifier=https%3A%2F%2Ffhir.nhs.uk%2FId%2Fnhs-number%7C9990548609"
                 "&-date.from=2021-02-06"
                 "&-date.to=2023-01-01",
-            ),
+            },
         )
         # Will contain the matched immunization and then the referenced patient resource
         # And will filter out any additional resources
-        self.assertEqual(len(result.entry), 2)
-        self.assertEqual(result.entry[0].resource.json(), json.dumps(ValidValues.expected_resource_in_search))
-        self.assertEqual(result.entry[-1].resource.resource_type, "Patient")
+        self.assertEqual(len(result["entry"]), 2)
+        self.assertEqual(result["entry"][0]["resource"], ValidValues.expected_resource_in_search)
+        self.assertEqual(result["entry"][-1]["resource"]["resourceType"], "Patient")
 
     @patch("service.fhir_service.uuid4", return_value="123456789-12")
     def test_search_immunizations_adds_include_to_searched_url(self, mock_uuid):
@@ -979,29 +1003,73 @@ class TestSearchImmunizations(TestFhirServiceBase):
         )
 
         # Then
-        self.imms_repo.find_immunizations.assert_called_once_with(VALID_NHS_NUMBER, {vaccine_type})
+        self.imms_repo.find_immunizations.assert_called_once_with(VALID_NHS_NUMBER, {vaccine_type}, None, None)
         mock_uuid.assert_called_once()
         self.authoriser.filter_permitted_vacc_types.assert_called_once_with(
             self.MOCK_SUPPLIER_SYSTEM_NAME, ApiOperationCode.SEARCH, {"COVID"}
         )
 
-        self.assertEqual(result.type, "searchset")
-        self.assertEqual(result.total, 1)
+        self.assertEqual(result["type"], "searchset")
+        self.assertEqual(result["total"], 1)
         self.assertEqual(
-            result.link[0],
-            BundleLink.construct(
-                relation="self",
-                url="https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
+            result["link"][0],
+            {
+                "relation": "self",
+                "url": "https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
                 "?immunization.target=COVID"
                 "&-immunization.target=COVID"
                 "&patient.identifier=https%3A%2F%2Ffhir.nhs.uk%2FId%2Fnhs-number%7C9990548609"
                 "&_include=Patient.identifier",
-            ),
+            },
         )
         # Will contain the matched immunization and then the referenced patient resource
-        self.assertEqual(len(result.entry), 2)
-        self.assertEqual(result.entry[0].resource.json(), json.dumps(ValidValues.expected_resource_in_search))
-        self.assertEqual(result.entry[-1].resource.resource_type, "Patient")
+        self.assertEqual(len(result["entry"]), 2)
+        self.assertEqual(result["entry"][0]["resource"], ValidValues.expected_resource_in_search)
+        self.assertEqual(result["entry"][-1]["resource"]["resourceType"], "Patient")
+
+    def test_search_immunizations_is_not_rejected_for_the_size_of_records_which_are_filtered_out(self):
+        """it should only limit the size of the response, not of the records which are read and then filtered out"""
+        vaccine_type = "COVID"
+        self.authoriser.filter_permitted_vacc_types.return_value = {vaccine_type}
+        filtered_out_imms = create_covid_immunization_dict("1237-some-id", status="entered-in-error")
+        filtered_out_imms["note"] = [{"text": "a" * MAX_SEARCH_RESPONSE_SIZE_BYTES}]
+        stored_resources = [create_covid_immunization_dict("1234-some-id"), *([filtered_out_imms] * 3)]
+        table = MagicMock()
+        table.query.return_value = {
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+            "Items": [{"Resource": json.dumps(imms, default=float), "Version": "1"} for imms in stored_resources],
+        }
+        fhir_service = FhirService(ImmunizationRepository(table), self.authoriser, self.validator)
+
+        # When
+        result = fhir_service.search_immunizations(
+            VALID_NHS_NUMBER, {vaccine_type}, self.MOCK_SUPPLIER_SYSTEM_NAME, None, None, None
+        )
+
+        # Then
+        self.assertEqual(result["total"], 1)
+        self.assertLess(len(serialise_search_bundle(result, MAX_SEARCH_RESPONSE_SIZE_BYTES)), 10_000)
+
+    @patch("search_size_budget.logger.info")
+    def test_search_immunizations_stops_adding_entries_once_the_response_is_too_large(self, mock_logger_info):
+        """it should reject the search as soon as the entries added to the bundle are over the maximum response size"""
+        vaccine_type = "COVID"
+        self.authoriser.filter_permitted_vacc_types.return_value = {vaccine_type}
+        large_imms = create_covid_immunization_dict("1234-some-id")
+        large_imms["note"] = [{"text": "a" * (MAX_SEARCH_RESPONSE_SIZE_BYTES // 3)}]
+        self.imms_repo.find_immunizations.return_value = [deepcopy(large_imms) for _ in range(10)]
+
+        with (
+            patch("service.fhir_service.Filter.search", side_effect=lambda imms, _url: imms) as filter_search_spy,
+            self.assertRaises(TooManyResultsError),
+        ):
+            self.fhir_service.search_immunizations(
+                VALID_NHS_NUMBER, {vaccine_type}, self.MOCK_SUPPLIER_SYSTEM_NAME, None, None, None
+            )
+
+        self.assertEqual(filter_search_spy.call_count, 3)
+        metrics = json.loads(mock_logger_info.call_args.args[0])["search_size_budget_exceeded"]
+        self.assertEqual((metrics["stage"], metrics["items"], metrics["total_items"]), ("bundle assembly", 3, 10))
 
     def test_search_immunizations_returns_empty_bundle_when_no_results_found(self):
         """it should return an empty search bundle when no results are found"""
@@ -1015,24 +1083,24 @@ class TestSearchImmunizations(TestFhirServiceBase):
         )
 
         # Then
-        self.imms_repo.find_immunizations.assert_called_once_with(VALID_NHS_NUMBER, {vaccine_type})
+        self.imms_repo.find_immunizations.assert_called_once_with(VALID_NHS_NUMBER, {vaccine_type}, None, None)
         self.authoriser.filter_permitted_vacc_types.assert_called_once_with(
             self.MOCK_SUPPLIER_SYSTEM_NAME, ApiOperationCode.SEARCH, {vaccine_type}
         )
 
-        self.assertEqual(result.type, "searchset")
-        self.assertEqual(result.total, 0)
+        self.assertEqual(result["type"], "searchset")
+        self.assertEqual(result["total"], 0)
         self.assertEqual(
-            result.link[0],
-            BundleLink.construct(
-                relation="self",
-                url="https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
+            result["link"][0],
+            {
+                "relation": "self",
+                "url": "https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
                 "?immunization.target=FLU"
                 "&-immunization.target=FLU"
                 "&patient.identifier=https%3A%2F%2Ffhir.nhs.uk%2FId%2Fnhs-number%7C9990548609",
-            ),
+            },
         )
-        self.assertEqual(len(result.entry), 0)
+        self.assertEqual(len(result["entry"]), 0)
 
     @patch("service.fhir_service.uuid4", return_value="123456789-12")
     def test_search_immunizations_includes_an_error_outcome_within_results_if_client_requests_unauthorised_vacc_types(
@@ -1052,29 +1120,29 @@ class TestSearchImmunizations(TestFhirServiceBase):
 
         # Then
         # Does not pass FLU in as client is only permitted to retrieve COVID vaccinations
-        self.imms_repo.find_immunizations.assert_called_once_with(VALID_NHS_NUMBER, {vaccine_type})
+        self.imms_repo.find_immunizations.assert_called_once_with(VALID_NHS_NUMBER, {vaccine_type}, None, None)
         mock_uuid.assert_called_once()
         self.authoriser.filter_permitted_vacc_types.assert_called_once_with(
             self.MOCK_SUPPLIER_SYSTEM_NAME, ApiOperationCode.SEARCH, {"COVID", "FLU"}
         )
 
-        self.assertEqual(result.type, "searchset")
-        self.assertEqual(result.total, 1)
+        self.assertEqual(result["type"], "searchset")
+        self.assertEqual(result["total"], 1)
         self.assertEqual(
-            result.link[0],
-            BundleLink.construct(
-                relation="self",
-                url="https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
+            result["link"][0],
+            {
+                "relation": "self",
+                "url": "https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
                 "?immunization.target=COVID"
                 "&-immunization.target=COVID"
                 "&patient.identifier=https%3A%2F%2Ffhir.nhs.uk%2FId%2Fnhs-number%7C9990548609",
-            ),
+            },
         )
         # Will contain the matched immunization, the referenced patient resource and an OperationOutcome
-        self.assertEqual(len(result.entry), 3)
-        self.assertEqual(result.entry[0].resource.json(), json.dumps(ValidValues.expected_resource_in_search))
-        self.assertEqual(result.entry[1].resource.resource_type, "Patient")
-        self.assertEqual(result.entry[2].resource.resource_type, "OperationOutcome")
+        self.assertEqual(len(result["entry"]), 3)
+        self.assertEqual(result["entry"][0]["resource"], ValidValues.expected_resource_in_search)
+        self.assertEqual(result["entry"][1]["resource"]["resourceType"], "Patient")
+        self.assertEqual(result["entry"][2]["resource"]["resourceType"], "OperationOutcome")
 
     def test_search_raises_unauthorised_error_if_no_permissions(self):
         """it should raise an UnauthorisedVaxError if the supplier does not have permissions for ANY of the requested
@@ -1111,19 +1179,18 @@ class TestSearchImmunizations(TestFhirServiceBase):
             invalid_immunization_targets=["TEST_VALUE", "CHICKENS"],
         )
 
-        self.assertEqual(result.type, "searchset")
-        self.assertEqual(result.total, 1)
-        self.assertEqual(len(result.entry), 3)
-        self.assertEqual(result.entry[0].resource.resource_type, "Immunization")
-        self.assertEqual(result.entry[1].resource.resource_type, "Patient")
-        self.assertEqual(result.entry[2].resource.resource_type, "OperationOutcome")
-        issue_0 = result.entry[2].resource.issue[0]
-        diagnostics = issue_0["diagnostics"] if isinstance(issue_0, dict) else issue_0.diagnostics
+        self.assertEqual(result["type"], "searchset")
+        self.assertEqual(result["total"], 1)
+        self.assertEqual(len(result["entry"]), 3)
+        self.assertEqual(result["entry"][0]["resource"]["resourceType"], "Immunization")
+        self.assertEqual(result["entry"][1]["resource"]["resourceType"], "Patient")
+        self.assertEqual(result["entry"][2]["resource"]["resourceType"], "OperationOutcome")
+        diagnostics = result["entry"][2]["resource"]["issue"][0]["diagnostics"]
         self.assertIn("TEST_VALUE", diagnostics)
         self.assertIn("CHICKENS", diagnostics)
         self.assertIn("invalid -immunization.target value(s) that were ignored", diagnostics)
         self.assertEqual(
-            result.link[0].url,
+            result["link"][0]["url"],
             "https://internal-dev.api.service.nhs.uk/immunisation-fhir-api/FHIR/R4/Immunization"
             "?immunization.target=COVID"
             "&-immunization.target=COVID"
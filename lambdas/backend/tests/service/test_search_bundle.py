@@ -0,0 +1,80 @@
+"""Tests for the search_bundle file"""
+
+import copy
+import json
+import unittest
+from unittest.mock import patch
+
+import simplejson
+from fhir.resources.R4B.immunization import Immunization
+
+from filter import Filter
+from models.errors import TooManyResultsError
+from service.search_bundle import (
+    make_include_entry,
+    make_match_entry,
+    make_outcome_entry,
+    make_search_bundle,
+    serialise_search_bundle,
+)
+from test_common.testing_utils.immunization_utils import create_covid_immunization_dict
+
+
+class TestSearchBundle(unittest.TestCase):
+    def test_make_search_bundle_keeps_empty_entry_list_and_puts_total_last(self):
+        bundle = make_search_bundle([], "a-url", total=0)
+
+        self.assertEqual(
+            json.dumps(bundle),
+            '{"resourceType": "Bundle", "type": "searchset", "link": [{"relation": "self", "url": "a-url"}], '
+            '"entry": [], "total": 0}',
+        )
+
+    def test_make_match_entry_resource_is_equivalent_to_fhir_resources_output(self):
+        imms = {**create_covid_immunization_dict("an-id"), "meta": {"versionId": 2}}
+        filtered_imms = Filter.search(copy.deepcopy(imms), "urn:uuid:a-patient-uuid")
+        expected_resource = json.loads(Immunization.parse_obj(copy.deepcopy(filtered_imms)).json())
+
+        entry = make_match_entry(filtered_imms, "a-full-url")
+
+        self.assertEqual(entry, {"fullUrl": "a-full-url", "resource": expected_resource, "search": {"mode": "match"}})
+
+    def test_make_include_and_outcome_entries(self):
+        patient = {"resourceType": "Patient", "id": "9000000009"}
+        outcome = {"resourceType": "OperationOutcome", "id": "an-id"}
+
+        self.assertEqual(
+            make_include_entry(patient, "urn:uuid:a-patient-uuid"),
+            {"fullUrl": "urn:uuid:a-patient-uuid", "resource": patient, "search": {"mode": "include"}},
+        )
+        self.assertEqual(make_outcome_entry(outcome), {"resource": outcome})
+
+    def test_serialise_search_bundle_matches_json_dumps(self):
+        # Decoded as the repository decodes stored resources
+        imms = simplejson.loads(simplejson.dumps(create_covid_immunization_dict("an-id"), use_decimal=True))
+        imms["meta"] = {"versionId": 2}
+        entries = [
+            make_match_entry(Filter.search(copy.deepcopy(imms), "urn:uuid:a-patient-uuid"), "a-full-url"),
+            make_include_entry({"resourceType": "Patient", "id": "9000000009"}, "urn:uuid:a-patient-uuid"),
+        ]
+
+        for bundle in (make_search_bundle([], "a-url", total=0), make_search_bundle(entries, "a-url", total=1)):
+            with self.subTest(entries=len(bundle["entry"])):
+                self.assertEqual(serialise_search_bundle(bundle, max_size_bytes=1024 * 1024), json.dumps(bundle))
+
+    def test_serialise_search_bundle_allows_body_of_exactly_max_size(self):
+        bundle = make_search_bundle([{"resource": {"id": "an-id"}}], "a-url", total=1)
+
+        self.assertEqual(serialise_search_bundle(bundle, len(json.dumps(bundle))), json.dumps(bundle))
+
+    @patch("search_size_budget.logger.info")
+    def test_serialise_search_bundle_stops_once_max_size_exceeded(self, mock_logger_info):
+        entry = {"resource": {"resourceType": "Immunization", "id": "an-id"}}
+        bundle = make_search_bundle([entry] * 10, "a-url", total=10)
+        max_size_bytes = len(json.dumps(make_search_bundle([entry] * 3, "a-url", total=10)))
+
+        with self.assertRaises(TooManyResultsError):
+            serialise_search_bundle(bundle, max_size_bytes)
+
+        metrics = json.loads(mock_logger_info.call_args.args[0])["search_size_budget_exceeded"]
+        self.assertEqual((metrics["stage"], metrics["items"], metrics["total_items"]), ("serialisation", 4, 10))
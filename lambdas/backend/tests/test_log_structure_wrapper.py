@@ -74,6 +74,7 @@ class TestFunctionInfoWrapper(unittest.TestCase):
         self.assertEqual(logged_info["resource_path"], test_resource_path)
         self.assertEqual(logged_info["local_id"], "12345^http://test")
         self.assertEqual(logged_info["vaccine_type"], "FLU")
+        self.assertEqual(set(logged_info["redis_cache"]), {"hits", "misses", "invalidations", "entries"})
 
     def test_successful_execution_pii(self, mock_logger, mock_send_log_to_firehose):
         """Pass personally identifiable information in an event, and ensure that it is not logged anywhere."""
@@ -0,0 +1,50 @@
+"""Tests for the SearchSizeBudget class"""
+
+import json
+import unittest
+from unittest.mock import patch
+
+from models.errors import TooManyResultsError
+from search_size_budget import SEARCH_TOO_MANY_RESULTS_MESSAGE, SearchSizeBudget
+
+
+class TestSearchSizeBudget(unittest.TestCase):
+    def setUp(self):
+        self.logger_info_patcher = patch("search_size_budget.logger.info")
+        self.mock_logger_info = self.logger_info_patcher.start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    def test_charge_allows_usage_up_to_the_limit(self):
+        budget = SearchSizeBudget("serialisation", 10)
+
+        budget.charge(4, items=1)
+        budget.charge(6, items=2)
+
+        self.assertEqual((budget.used_bytes, budget.items, budget.exceeded), (10, 3, False))
+        self.mock_logger_info.assert_not_called()
+
+    def test_charge_raises_and_logs_once_when_limit_exceeded(self):
+        budget = SearchSizeBudget("serialisation", 10, total_items=5)
+        budget.charge(8, items=1)
+
+        for _ in range(2):
+            with self.assertRaises(TooManyResultsError) as error:
+                budget.charge(8, items=1)
+            self.assertEqual(error.exception.message, SEARCH_TOO_MANY_RESULTS_MESSAGE)
+
+        self.assertTrue(budget.exceeded)
+        self.mock_logger_info.assert_called_once()
+        self.assertEqual(
+            json.loads(self.mock_logger_info.call_args.args[0]),
+            {
+                "search_size_budget_exceeded": {
+                    "stage": "serialisation",
+                    "limit_bytes": 10,
+                    "used_bytes": 16,
+                    "items": 2,
+                    "total_items": 5,
+                }
+            },
+        )
@@ -2,7 +2,7 @@
 from typing import Any
 
 import exception_messages
-from conversion_layout import ConversionField, ConversionLayout
+from conversion_layout import CONVERSION_LAYOUT, ConversionField
 from extractor import Extractor
 from mappings import ActionFlag
 
@@ -20,10 +20,9 @@ class Converter:
             raise ValueError("FHIR data is required for initialization.")
 
         self.extractor = Extractor(fhir_data)
-        self.conversion_layout = ConversionLayout(self.extractor)
 
     def run_conversion(self) -> ConvertedRecord:
-        for conversion in self.conversion_layout.get_conversion_layout():
+        for conversion in CONVERSION_LAYOUT:
             self._convert_data(conversion)
 
         self.error_records.extend(self.extractor.get_error_records())
@@ -36,11 +35,11 @@ class Converter:
         flat_field = conversion.field_name_flat
 
         try:
-            if flat_field == "ACTION_FLAG":
+            if conversion.expression_rule is None:
                 self.converted[flat_field] = self.action_flag
                 return
 
-            if (converted := conversion.expression_rule()) is not None:
+            if (converted := conversion.expression_rule(self.extractor)) is not None:
                 self.converted[flat_field] = converted
         except Exception as error:
             self._log_error(
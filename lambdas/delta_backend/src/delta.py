@@ -2,8 +2,12 @@ import decimal
 import json
 import os
 import time
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from queue import SimpleQueue
 from typing import Any
 
 from aws_lambda_powertools.utilities.data_classes.dynamo_db_stream_event import DynamoDBStreamEvent
@@ -13,7 +17,7 @@ from botocore.exceptions import ClientError
 
 from common.aws_dynamodb import get_dynamodb_table
 from common.clients import STREAM_NAME, get_sqs_client
-from common.log_firehose import send_log_to_firehose
+from common.log_firehose import send_logs_to_firehose
 from converter import Converter
 from mappings import ActionFlag, EventName, Operation
 from observability import logger
@@ -25,6 +29,9 @@ delta_source = os.environ["SOURCE"]
 delta_ttl_days = os.environ["DELTA_TTL_DAYS"]
 
 delta_table = None
+# boto3 resources are not thread safe, so each worker writes with a Table of its own. They are created on the handler
+# thread, as the default boto3 session is not thread safe either, and kept for later invocations.
+_worker_tables: list[Any] = []
 
 
 class ValidationError(Exception):
@@ -120,6 +127,17 @@ def _normalize_record(record: dict[str, Any]) -> NormalizedRecord:
     )
 
 
+def get_delta_max_workers() -> int:
+    """
+    Returns the maximum number of stream records which are processed concurrently, as set by the DELTA_MAX_WORKERS
+    environment variable. A value of 1 (the default) means records are processed serially.
+    """
+    try:
+        return max(int(os.getenv("DELTA_MAX_WORKERS", "1")), 1)
+    except ValueError:
+        return 1
+
+
 def get_delta_table():
     """
     Initialize the DynamoDB table resource with exception handling.
@@ -135,6 +153,17 @@ def get_delta_table():
     return delta_table
 
 
+def get_delta_worker_tables(count: int) -> SimpleQueue:
+    """Returns a queue of count Tables for the workers, creating any which the container does not have yet"""
+    while len(_worker_tables) < count:
+        _worker_tables.append(get_dynamodb_table(delta_table_name))
+
+    available_tables = SimpleQueue()
+    for table in _worker_tables[:count]:
+        available_tables.put(table)
+    return available_tables
+
+
 def get_creation_and_expiry_times(creation_timestamp: float) -> tuple[str, int]:
     """
     Generate timestamps for delta records.
@@ -385,6 +414,18 @@ def _send_to_dlq_if_failed(
         logger.exception("Error sending record to DLQ")
 
 
+@contextmanager
+def _record_context_keys(**keys: Any) -> Generator[None, None, None]:
+    """
+    Adds the keys to the logs of the current thread only, as records may be processed on several threads at once.
+    """
+    logger.thread_safe_append_keys(**keys)
+    try:
+        yield
+    finally:
+        logger.thread_safe_remove_keys(keys.keys())
+
+
 def process_record(
     record: dict[str, Any],
     table: Any | None = None,
@@ -401,7 +442,7 @@ def process_record(
     """
     event_name: str = str(record.get("eventName") or "")
 
-    with logger.append_context_keys(
+    with _record_context_keys(
         event_id=record.get("eventID", "unknown"),
         event_name=event_name or "UNKNOWN",
     ):
@@ -422,6 +463,35 @@ def process_record(
         return success, outcome
 
 
+def _process_stream_record(record: dict[str, Any], table: Any | None) -> tuple[bool, dict[str, Any]]:
+    """Processes a stream record, returning whether it succeeded and the log to send to Firehose for it"""
+    record_ingestion_datetime = datetime.now(UTC).isoformat()
+    record_processing_start = time.time()
+    success, operation_outcome = process_record(
+        record,
+        table=table,
+    )
+    record_processing_end = time.time()
+    log_data = {
+        "function_name": "delta_sync",
+        "operation_outcome": operation_outcome,
+        "date_time": record_ingestion_datetime,
+        "time_taken": f"{round(record_processing_end - record_processing_start, 5)}s",
+    }
+    return success, log_data
+
+
+def _process_stream_record_with_worker_table(
+    record: dict[str, Any], available_tables: SimpleQueue
+) -> tuple[bool, dict[str, Any]]:
+    """Processes a stream record with a Table which no other worker is using"""
+    table = available_tables.get()
+    try:
+        return _process_stream_record(record, table)
+    finally:
+        available_tables.put(table)
+
+
 def handler(event: dict[str, Any], _context: LambdaContext) -> bool:
     if "Records" not in event:
         # preserves existing test/contract
@@ -429,28 +499,40 @@ def handler(event: dict[str, Any], _context: LambdaContext) -> bool:
     stream_event = DynamoDBStreamEvent(event)
 
     logger.info("Delta handler invoked", extra={"record_count": len(event["Records"])})
+    start_time = time.perf_counter()
 
     table = get_delta_table()
     sqs = get_sqs_client()
 
-    for typed_record in stream_event.records:
-        # TODO: refactor process_record to accept DynamoDBRecord directly
-        record = typed_record.raw_event
-        record_ingestion_datetime = datetime.now(UTC).isoformat()
-        record_processing_start = time.time()
-        success, operation_outcome = process_record(
-            record,
-            table=table,
-        )
+    # TODO: refactor process_record to accept DynamoDBRecord directly
+    records = [typed_record.raw_event for typed_record in stream_event.records]
+
+    # Each record is written with its own conditional put, as BatchWriteItem does not support condition expressions,
+    # so the puts are made concurrently, up to the configured number of workers to avoid DynamoDB throttling. Each
+    # worker borrows a Table of its own for each record, as boto3 resources are not thread safe.
+    max_workers = min(get_delta_max_workers(), len(records))
+    if max_workers > 1:
+        available_tables = get_delta_worker_tables(max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(lambda record: _process_stream_record_with_worker_table(record, available_tables), records)
+            )
+    else:
+        results = [_process_stream_record(record, table) for record in records]
+
+    # Failed records are sent to the DLQ, and the logs to Firehose, in stream order
+    for record, (success, _) in zip(records, results, strict=True):
         _send_to_dlq_if_failed(success, record, sqs, failure_queue_url)
 
-        record_processing_end = time.time()
-        log_data = {
-            "function_name": "delta_sync",
-            "operation_outcome": operation_outcome,
-            "date_time": record_ingestion_datetime,
-            "time_taken": f"{round(record_processing_end - record_processing_start, 5)}s",
-        }
-        send_log_to_firehose(STREAM_NAME, log_data)
+    send_logs_to_firehose(STREAM_NAME, [log_data for _, log_data in results])
 
+    logger.info(
+        "Delta handler processed records",
+        extra={
+            "record_count": len(records),
+            "failure_count": sum(not success for success, _ in results),
+            "max_workers": max(max_workers, 1),
+            "duration_ms": round((time.perf_counter() - start_time) * 1000),
+        },
+    )
     return True
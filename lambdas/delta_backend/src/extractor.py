@@ -1,4 +1,5 @@
 import decimal
+import functools
 import json
 from datetime import UTC, datetime, timedelta
 
@@ -6,6 +7,31 @@ import exception_messages
 from mappings import ConversionFieldName, Gender
 
 
+def memoised(method):
+    """
+    Caches the result of an Extractor method which takes no arguments, so that a value shared by several flat fields
+    is only derived from the resource once per record. An exception is cached too, and raised again for each field
+    which depends on the value, so every one of them still records its conversion error.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self):
+        try:
+            succeeded, value = self._memo[method.__name__]
+        except KeyError:
+            try:
+                succeeded, value = True, method(self)
+            except Exception as error:
+                succeeded, value = False, error
+            self._memo[method.__name__] = succeeded, value
+
+        if not succeeded:
+            raise value
+        return value
+
+    return wrapper
+
+
 class Extractor:
     # This file holds the schema/base layout that maps FHIR fields to flat JSON fields
     # Each entry tells the converter how to extract and transform a specific value
@@ -29,13 +55,19 @@ class Extractor:
             else fhir_json_data
         )
         self.error_records = []
+        self._memo = {}
+
+    @memoised
+    def _get_contained_resources(self) -> dict[str, dict]:
+        """Returns the first contained resource of each resource type, indexed in a single scan of contained"""
+        contained_resources = {}
+        for resource in self.fhir_json_data.get("contained", []):
+            if isinstance(resource, dict) and isinstance(resource_type := resource.get("resourceType"), str):
+                contained_resources.setdefault(resource_type, resource)
+        return contained_resources
 
     def _get_patient(self):
-        contained = self.fhir_json_data.get("contained", [])
-        return next(
-            (c for c in contained if isinstance(c, dict) and c.get("resourceType") == "Patient"),
-            "",
-        )
+        return self._get_contained_resources().get("Patient", "")
 
     def _get_valid_names(self, names, occurrence_time):
         official_names = [n for n in names if n.get("use") == "official" and self._is_current_period(n, occurrence_time)]
@@ -48,6 +80,7 @@ class Extractor:
 
         return names[0]
 
+    @memoised
     def _get_person_names(self):
         occurrence_time = self._get_occurrence_date_time()
         patient = self._get_patient()
@@ -65,13 +98,10 @@ class Extractor:
 
         return "", ""
 
+    @memoised
     def _get_practitioner_names(self):
-        contained = self.fhir_json_data.get("contained", [])
         occurrence_time = self._get_occurrence_date_time()
-        practitioner = next(
-            (c for c in contained if isinstance(c, dict) and c.get("resourceType") == "Practitioner"),
-            None,
-        )
+        practitioner = self._get_contained_resources().get("Practitioner")
         if not practitioner or "name" not in practitioner:
             return "", ""
 
@@ -106,6 +136,7 @@ class Extractor:
 
         return (not start or start <= occurrence_time) and (not end or occurrence_time <= end)
 
+    @memoised
     def _get_occurrence_date_time(self) -> datetime:
         occurrence_time = datetime.fromisoformat(self.fhir_json_data.get("occurrenceDateTime", ""))
         if occurrence_time and occurrence_time.tzinfo is None:
@@ -139,6 +170,7 @@ class Extractor:
 
         return coding.get("display", "")
 
+    @memoised
     def _get_site_information(self):
         performers = self.fhir_json_data.get("performer", [])
         if not isinstance(performers, list) or not performers:
@@ -344,19 +376,19 @@ class Extractor:
             return str(primary_source).upper()
         return ""
 
-    def extract_vaccination_procedure_code(self) -> str:
+    @memoised
+    def _get_vaccination_procedure_extension(self) -> dict | None:
         extensions = self.fhir_json_data.get("extension", [])
-        for ext in extensions:
-            if ext.get("url") == self.EXTENSION_URL_VACCINATION_PRODEDURE:
-                value_cc = ext.get("valueCodeableConcept", {})
-                return self._get_first_snomed_code(value_cc)
+        return next((ext for ext in extensions if ext.get("url") == self.EXTENSION_URL_VACCINATION_PRODEDURE), None)
+
+    def extract_vaccination_procedure_code(self) -> str:
+        if (ext := self._get_vaccination_procedure_extension()) is not None:
+            return self._get_first_snomed_code(ext.get("valueCodeableConcept", {}))
         return ""
 
     def extract_vaccination_procedure_term(self) -> str:
-        extensions = self.fhir_json_data.get("extension", [])
-        for ext in extensions:
-            if ext.get("url") == self.EXTENSION_URL_VACCINATION_PRODEDURE:
-                return self._get_codeable_term(ext.get("valueCodeableConcept", {}))
+        if (ext := self._get_vaccination_procedure_extension()) is not None:
+            return self._get_codeable_term(ext.get("valueCodeableConcept", {}))
         return ""
 
     def extract_dose_sequence(self) -> str:
@@ -0,0 +1,48 @@
+"""
+Compares the throughput of the Converter, which derives the values shared by several flat fields once per record,
+against an UnmemoisedConverter, which derives them again for every field which uses them, as the Converter used to.
+The resources in tests/sample_data are converted, and both must give identical output for every one of them.
+Run from the delta_backend directory with:
+PYTHONPATH=src:tests python -m tests.benchmark_flat_conversion [number_of_records] [number_of_runs]
+"""
+
+import copy
+import sys
+import time
+
+from converter import Converter
+from mappings import ActionFlag
+from utils_for_converter_tests import UnmemoisedConverter, load_sample_immunizations
+
+N_RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+N_RUNS = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+
+def time_conversion(converter_class: type[Converter], resources: list[dict]) -> float:
+    """Returns the best time taken over N_RUNS to convert N_RECORDS of the resources, in seconds"""
+    timings = []
+    for _ in range(N_RUNS):
+        start_time = time.perf_counter()
+        for index in range(N_RECORDS):
+            converter_class(resources[index % len(resources)], action_flag=ActionFlag.CREATE).run_conversion()
+        timings.append(time.perf_counter() - start_time)
+
+    return min(timings)
+
+
+if __name__ == "__main__":
+    resources = load_sample_immunizations()
+
+    for resource in resources:
+        converted = Converter(copy.deepcopy(resource)).run_conversion()
+        expected = UnmemoisedConverter(copy.deepcopy(resource)).run_conversion()
+        assert converted == expected, f"Output differs for Immunization {resource.get('id')}"
+    print(f"Output identical for all {len(resources)} sample Immunizations")
+
+    reference_seconds = time_conversion(UnmemoisedConverter, resources)
+    converter_seconds = time_conversion(Converter, resources)
+    for name, seconds in (("unmemoised", reference_seconds), ("Converter", converter_seconds)):
+        print(
+            f"{name:<15} {N_RECORDS} records in {seconds:.2f}s ({N_RECORDS / seconds:6.0f} records/sec), "
+            f"{reference_seconds / seconds:5.2f}x speedup"
+        )
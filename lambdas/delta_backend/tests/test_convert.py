@@ -73,8 +73,8 @@ class TestConvertToFlatJson(unittest.TestCase):
         self.logger_patcher = patch("delta.logger", make_mock_logger())
         self.logger_patcher.start()
 
-        self.send_log_to_firehose_patcher = patch("delta.send_log_to_firehose")
-        self.mock_send_log_to_firehose = self.send_log_to_firehose_patcher.start()
+        self.send_logs_to_firehose_patcher = patch("delta.send_logs_to_firehose")
+        self.mock_send_logs_to_firehose = self.send_logs_to_firehose_patcher.start()
 
         self.sqs_client_patcher = patch("common.clients.global_sqs_client")
         self.mock_sqs_client = self.sqs_client_patcher.start()
@@ -0,0 +1,82 @@
+import copy
+import unittest
+
+from converter import Converter
+from mappings import ConversionFieldName
+from utils_for_converter_tests import UnmemoisedConverter, load_sample_immunizations
+
+
+class CountingDict(dict):
+    """A dict which counts how many times each key is looked up with get"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.get_counts = {}
+
+    def get(self, key, default=None):
+        self.get_counts[key] = self.get_counts.get(key, 0) + 1
+        return super().get(key, default)
+
+
+class TestConvertSharedValues(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        self.sample_immunizations = load_sample_immunizations()
+
+    def test_output_matches_unmemoised_conversion_for_sample_data(self):
+        for index, resource in enumerate(self.sample_immunizations):
+            with self.subTest(sample=index):
+                self.assertEqual(
+                    Converter(copy.deepcopy(resource)).run_conversion(),
+                    UnmemoisedConverter(copy.deepcopy(resource)).run_conversion(),
+                )
+
+    def test_output_matches_unmemoised_conversion_with_invalid_shared_values(self):
+        """Each field which depends on a value which cannot be derived still records its own error"""
+        invalid_values = {
+            "occurrenceDateTime": "not-a-date",
+            "contained": None,
+            "performer": [{"actor": None}],
+            "extension": [None],
+        }
+        for resource in self.sample_immunizations:
+            for key, value in invalid_values.items():
+                with self.subTest(key=key):
+                    invalid_resource = {**copy.deepcopy(resource), key: value}
+                    self.assertEqual(
+                        Converter(copy.deepcopy(invalid_resource)).run_conversion(),
+                        UnmemoisedConverter(copy.deepcopy(invalid_resource)).run_conversion(),
+                    )
+
+    def test_invalid_occurrence_date_time_is_recorded_for_each_dependent_field(self):
+        resource = copy.deepcopy(self.sample_immunizations[0])
+        resource["occurrenceDateTime"] = "not-a-date"
+
+        converter = Converter(resource)
+        converter.run_conversion()
+
+        fields_with_errors = [error["field"] for error in converter.get_error_records()]
+        self.assertIn(ConversionFieldName.PERSON_FORENAME, fields_with_errors)
+        self.assertIn(ConversionFieldName.PERSON_SURNAME, fields_with_errors)
+        self.assertIn(ConversionFieldName.PERFORMING_PROFESSIONAL_FORENAME, fields_with_errors)
+        self.assertIn(ConversionFieldName.PERFORMING_PROFESSIONAL_SURNAME, fields_with_errors)
+
+    def test_shared_values_are_derived_once(self):
+        resource = CountingDict(copy.deepcopy(self.sample_immunizations[0]))
+
+        Converter(resource).run_conversion()
+
+        self.assertEqual(resource.get_counts["contained"], 1)
+        self.assertEqual(resource.get_counts["performer"], 1)
+        self.assertEqual(resource.get_counts["extension"], 1)
+        # Once to convert DATE_AND_TIME, and once to select the current names and address
+        self.assertEqual(resource.get_counts["occurrenceDateTime"], 2)
+
+    def test_shared_values_are_not_shared_between_records(self):
+        first_resource, second_resource = self.sample_immunizations[:2]
+
+        Converter(first_resource).run_conversion()
+        converted = Converter(copy.deepcopy(second_resource)).run_conversion()
+
+        self.assertEqual(converted, UnmemoisedConverter(copy.deepcopy(second_resource)).run_conversion())
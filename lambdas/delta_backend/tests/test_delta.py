@@ -1,6 +1,7 @@
 import decimal
 import json
 import os
+import threading
 import time
 import unittest
 from unittest.mock import MagicMock, patch
@@ -307,9 +308,11 @@ class DeltaHandlerTestCase(unittest.TestCase):
 
         self.get_delta_table_patcher = patch("delta.get_delta_table", return_value=self.mock_delta_table)
         self.get_delta_table_patcher.start()
+        patch("delta.get_dynamodb_table", return_value=self.mock_delta_table).start()
+        patch("delta._worker_tables", []).start()
 
-        self.send_log_to_firehose_patcher = patch("delta.send_log_to_firehose")
-        self.mock_send_log_to_firehose = self.send_log_to_firehose_patcher.start()
+        self.send_logs_to_firehose_patcher = patch("delta.send_logs_to_firehose")
+        self.mock_send_logs_to_firehose = self.send_logs_to_firehose_patcher.start()
 
         self.sqs_client_patcher = patch("delta.get_sqs_client", return_value=self.mock_sqs_client)
         self.sqs_client_patcher.start()
@@ -317,6 +320,11 @@ class DeltaHandlerTestCase(unittest.TestCase):
     def tearDown(self):
         patch.stopall()
 
+    def _get_sent_logs(self) -> list[dict]:
+        """Helper: return the logs sent to Firehose by the handler in its single batch."""
+        self.mock_send_logs_to_firehose.assert_called_once()
+        return self.mock_send_logs_to_firehose.call_args.args[1]
+
     def _call_process_record(self, record):
         return process_record(
             record,
@@ -342,7 +350,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
             # Assert
             self.assertTrue(result)
             self.mock_delta_table.put_item.assert_called()
-            self.mock_send_log_to_firehose.assert_called()  # check logged
+            self.mock_send_logs_to_firehose.assert_called()  # check logged
             put_item_call_args = self.mock_delta_table.put_item.call_args  # check data written to DynamoDB
             put_item_data = put_item_call_args.kwargs["Item"]
             self.assertIn("Imms", put_item_data)
@@ -379,10 +387,10 @@ class DeltaHandlerTestCase(unittest.TestCase):
         response = handler(event, None)
 
         self.assertTrue(response)
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, 3)
+        self.assertEqual(len(self._get_sent_logs()), 3)
         self.assertEqual(self.mock_sqs_client.send_message.call_count, 1)
 
-        sent_payloads = [c.args[1] for c in self.mock_send_log_to_firehose.call_args_list]
+        sent_payloads = self._get_sent_logs()
         self.assertTrue(any(p["operation_outcome"]["statusDesc"] == partial_msg for p in sent_payloads))
 
     def test_handler_exception(self):
@@ -439,7 +447,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.mock_delta_table.put_item.assert_called()
-        self.mock_send_log_to_firehose.assert_called()  # check logged
+        self.mock_send_logs_to_firehose.assert_called()  # check logged
         put_item_call_args = self.mock_delta_table.put_item.call_args  # check data written to DynamoDB
         put_item_data = put_item_call_args.kwargs["Item"]
         self.assertIn("Imms", put_item_data)
@@ -464,7 +472,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.mock_delta_table.put_item.assert_called()
-        self.mock_send_log_to_firehose.assert_called()  # check logged
+        self.mock_send_logs_to_firehose.assert_called()  # check logged
         put_item_call_args = self.mock_delta_table.put_item.call_args  # check data written to DynamoDB
         put_item_data = put_item_call_args.kwargs["Item"]
         self.assertIn("Imms", put_item_data)
@@ -487,7 +495,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.mock_delta_table.put_item.assert_called()
-        self.mock_send_log_to_firehose.assert_called()  # check logged
+        self.mock_send_logs_to_firehose.assert_called()  # check logged
         put_item_call_args = self.mock_delta_table.put_item.call_args  # check data written to DynamoDB
         put_item_data = put_item_call_args.kwargs["Item"]
         self.assertIn("Imms", put_item_data)
@@ -506,7 +514,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
 
         # Check logging and Firehose were called
         mock_logger_info.assert_any_call("Record from DPS skipped")
-        self.mock_send_log_to_firehose.assert_called()
+        self.mock_send_logs_to_firehose.assert_called()
         self.mock_sqs_client.send_message.assert_not_called()
 
     @patch("delta.Converter")
@@ -534,12 +542,10 @@ class DeltaHandlerTestCase(unittest.TestCase):
         self.assertTrue(response)
         # Check logging and Firehose were called
         self.mock_logger.info.assert_called()
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, 1)
-        self.mock_send_log_to_firehose.assert_called_once()
+        self.assertEqual(len(self._get_sent_logs()), 1)
 
-        # Get the actual argument passed to send_log_to_firehose
-        args, kwargs = self.mock_send_log_to_firehose.call_args
-        sent_payload = args[1]  # Second positional arg
+        # Get the log sent to Firehose for the record
+        sent_payload = self._get_sent_logs()[0]
 
         operation_outcome = sent_payload["operation_outcome"]
 
@@ -575,7 +581,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.assertEqual(self.mock_delta_table.put_item.call_count, len(records_config))
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, len(records_config))
+        self.assertEqual(len(self._get_sent_logs()), len(records_config))
 
     def test_send_message_skipped_records_diverse(self):
         """Check skipped records sent to firehose but not to DynamoDB"""
@@ -601,7 +607,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.assertEqual(self.mock_delta_table.put_item.call_count, 3)
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, len(records_config))
+        self.assertEqual(len(self._get_sent_logs()), len(records_config))
 
     def test_send_message_multi_create(self):
         # Arrange
@@ -619,7 +625,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.assertEqual(self.mock_delta_table.put_item.call_count, 3)
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, 3)
+        self.assertEqual(len(self._get_sent_logs()), 3)
 
     def test_send_message_multi_update(self):
         # Arrange
@@ -637,7 +643,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.assertEqual(self.mock_delta_table.put_item.call_count, 3)
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, 3)
+        self.assertEqual(len(self._get_sent_logs()), 3)
 
     def test_send_message_multi_logical_delete(self):
         # Arrange
@@ -671,7 +677,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.assertEqual(self.mock_delta_table.put_item.call_count, 3)
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, 3)
+        self.assertEqual(len(self._get_sent_logs()), 3)
 
     def test_send_message_multi_physical_delete(self):
         # Arrange
@@ -689,7 +695,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.assertEqual(self.mock_delta_table.put_item.call_count, 3)
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, 3)
+        self.assertEqual(len(self._get_sent_logs()), 3)
 
     def test_single_error_in_multi(self):
         # Arrange
@@ -712,7 +718,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.assertEqual(self.mock_delta_table.put_item.call_count, 3)
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, 3)
+        self.assertEqual(len(self._get_sent_logs()), 3)
         self.assertEqual(self.mock_logger.error.call_count, 1)
         self.assertEqual(self.mock_sqs_client.send_message.call_count, 1)
 
@@ -739,7 +745,7 @@ class DeltaHandlerTestCase(unittest.TestCase):
         self.assertTrue(result)
         self.assertEqual(self.mock_sqs_client.send_message.call_count, 1)
         self.assertEqual(self.mock_delta_table.put_item.call_count, len(records_config))
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, len(records_config))
+        self.assertEqual(len(self._get_sent_logs()), len(records_config))
 
     def test_single_duplicate_in_multi(self):
         # Arrange
@@ -762,16 +768,16 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.assertEqual(self.mock_delta_table.put_item.call_count, len(records_config))
-        self.assertEqual(self.mock_send_log_to_firehose.call_count, len(records_config))
+        self.assertEqual(len(self._get_sent_logs()), len(records_config))
 
     @patch("delta.process_record")
-    @patch("delta.send_log_to_firehose")
-    def test_handler_calls_process_record_for_each_event(self, mock_send_log_to_firehose, mock_process_record):
+    @patch("delta.send_logs_to_firehose")
+    def test_handler_calls_process_record_for_each_event(self, mock_send_logs_to_firehose, mock_process_record):
         # Arrange
         event = {"Records": [{"a": "record1"}, {"a": "record2"}, {"a": "record3"}]}
         # Mock process_record to always return True
         mock_process_record.return_value = True, {}
-        mock_send_log_to_firehose.return_value = None
+        mock_send_logs_to_firehose.return_value = None
 
         # Act
         result = handler(event, {})
@@ -781,13 +787,13 @@ class DeltaHandlerTestCase(unittest.TestCase):
         self.assertEqual(mock_process_record.call_count, len(event["Records"]))
 
     @patch("delta.process_record")
-    @patch("delta.send_log_to_firehose")
-    def test_handler_sends_all_to_firehose(self, mock_send_log_to_firehose, mock_process_record):
+    @patch("delta.send_logs_to_firehose")
+    def test_handler_sends_all_to_firehose(self, mock_send_logs_to_firehose, mock_process_record):
         # event with 3 records
         event = {"Records": [{"a": "record1"}, {"a": "record2"}, {"a": "record3"}]}
         return_ok = (True, {})
         return_fail = (False, {})
-        mock_send_log_to_firehose.return_value = None
+        mock_send_logs_to_firehose.return_value = None
         mock_process_record.side_effect = [return_ok, return_fail, return_ok]
 
         # Act
@@ -796,11 +802,90 @@ class DeltaHandlerTestCase(unittest.TestCase):
         # Assert
         self.assertTrue(result)
         self.assertEqual(mock_process_record.call_count, len(event["Records"]))
-        # check that all records were sent to firehose
-        self.assertEqual(mock_send_log_to_firehose.call_count, len(event["Records"]))
+        # check that all records were sent to firehose in one batch
+        mock_send_logs_to_firehose.assert_called_once()
+        self.assertEqual(len(mock_send_logs_to_firehose.call_args.args[1]), len(event["Records"]))
         # Only send the failed record to SQS DLQ
         self.assertEqual(self.mock_sqs_client.send_message.call_count, 1)
 
+    @patch.dict("os.environ", {"DELTA_MAX_WORKERS": "4"})
+    def test_handler_writes_records_concurrently(self):
+        """Records are written concurrently, but their logs and DLQ messages are still sent in stream order"""
+        all_puts_started = threading.Barrier(4, timeout=5)
+
+        def put_item(Item, **_kwargs):
+            all_puts_started.wait()
+            return FAIL_RESPONSE if Item["ImmsID"].startswith("fail") else SUCCESS_RESPONSE
+
+        self.mock_delta_table.put_item.side_effect = put_item
+        records_config = [
+            RecordConfig(EventName.CREATE, Operation.CREATE, "ok-id3.1", ActionFlag.CREATE),
+            RecordConfig(EventName.UPDATE, Operation.UPDATE, "fail-id3.2", ActionFlag.UPDATE),
+            RecordConfig(EventName.CREATE, Operation.CREATE, "ok-id3.3", ActionFlag.CREATE),
+            RecordConfig(EventName.UPDATE, Operation.DELETE_LOGICAL, "fail-id3.4", ActionFlag.DELETE_LOGICAL),
+        ]
+        event = ValuesForTests.get_multi_record_event(records_config)
+
+        # Act
+        result = handler(event, None)
+
+        # Assert
+        self.assertTrue(result)
+        self.assertEqual(self.mock_delta_table.put_item.call_count, len(records_config))
+        self.assertEqual(
+            [log["operation_outcome"]["record"] for log in self._get_sent_logs()],
+            [config.imms_id for config in records_config],
+        )
+        dlq_records = [json.loads(c.kwargs["MessageBody"]) for c in self.mock_sqs_client.send_message.call_args_list]
+        self.assertEqual([record["eventID"] for record in dlq_records], [event["Records"][i]["eventID"] for i in (1, 3)])
+
+    @patch.dict("os.environ", {"DELTA_MAX_WORKERS": "4"})
+    def test_handler_does_not_share_a_table_between_threads(self):
+        """Each Table is only used on one thread at a time, as boto3 resources are not thread safe"""
+        tables_in_use = set()
+        tables_used = []
+        created_tables = []
+        lock = threading.Lock()
+
+        def put_item(table, **_kwargs):
+            with lock:
+                self.assertNotIn(id(table), tables_in_use)
+                tables_in_use.add(id(table))
+                tables_used.append(id(table))
+            time.sleep(0.01)
+            with lock:
+                tables_in_use.remove(id(table))
+            return SUCCESS_RESPONSE
+
+        def create_table(_table_name):
+            table = MagicMock()
+            table.put_item.side_effect = lambda **kwargs: put_item(table, **kwargs)
+            created_tables.append(table)
+            return table
+
+        records_config = [
+            RecordConfig(EventName.CREATE, Operation.CREATE, f"id-{index}", ActionFlag.CREATE) for index in range(8)
+        ]
+        event = ValuesForTests.get_multi_record_event(records_config)
+
+        with patch("delta.get_dynamodb_table", side_effect=create_table):
+            handler(event, None)
+            # The worker Tables are kept for the next invocation
+            handler(event, None)
+
+        self.assertEqual(len(created_tables), 4)
+        self.assertEqual(len(tables_used), 16)
+        self.assertEqual(set(tables_used), {id(table) for table in created_tables})
+        self.mock_delta_table.put_item.assert_not_called()
+
+    @patch.dict("os.environ", {"DELTA_MAX_WORKERS": "4"})
+    def test_handler_with_workers_handles_empty_batch(self):
+        result = handler({"Records": []}, None)
+
+        self.assertTrue(result)
+        self.mock_delta_table.put_item.assert_not_called()
+        self.assertEqual(self._get_sent_logs(), [])
+
     def _get_put_item_payload(self) -> dict:
         """Helper: return the Item dict from the most recent put_item call."""
         return self.mock_delta_table.put_item.call_args.kwargs["Item"]
@@ -966,6 +1051,11 @@ class DeltaRecordProcessorTestCase(unittest.TestCase):
     def tearDown(self):
         patch.stopall()
 
+    def _get_sent_logs(self) -> list[dict]:
+        """Helper: return the logs sent to Firehose by the handler in its single batch."""
+        self.mock_send_logs_to_firehose.assert_called_once()
+        return self.mock_send_logs_to_firehose.call_args.args[1]
+
     def _call_process_record(self, record):
         return process_record(
             record,
@@ -1078,7 +1168,7 @@ class DeltaRecordProcessorTestCase(unittest.TestCase):
         """Verify the handler correctly processes the real production event shape"""
         self.mock_delta_table.put_item.return_value = SUCCESS_RESPONSE
 
-        with patch("delta.get_sqs_client", return_value=MagicMock()), patch("delta.send_log_to_firehose"):
+        with patch("delta.get_sqs_client", return_value=MagicMock()), patch("delta.send_logs_to_firehose"):
             real_record = {
                 "eventID": "3a3c4907ccf4f102e9ec88be141da1ad",
                 "eventName": "INSERT",
@@ -1150,6 +1240,21 @@ class TestGetDeltaTable(unittest.TestCase):
             delta.get_delta_table()
 
 
+class TestGetDeltaMaxWorkers(unittest.TestCase):
+    def test_defaults_to_one(self):
+        with patch.dict("os.environ", {}, clear=True):
+            self.assertEqual(delta.get_delta_max_workers(), 1)
+
+    def test_reads_environment_variable(self):
+        with patch.dict("os.environ", {"DELTA_MAX_WORKERS": "10"}):
+            self.assertEqual(delta.get_delta_max_workers(), 10)
+
+    def test_invalid_values_fall_back_to_one(self):
+        for value in ("0", "-3", "many"):
+            with self.subTest(value=value), patch.dict("os.environ", {"DELTA_MAX_WORKERS": value}):
+                self.assertEqual(delta.get_delta_max_workers(), 1)
+
+
 class TestActionFlagMappingContract(unittest.TestCase):
     def test_operation_update_equals_action_flag_update(self):
         self.assertEqual(Operation.UPDATE, ActionFlag.UPDATE)
@@ -1,10 +1,16 @@
+import glob
 import json
+import os
 import uuid
 from contextlib import contextmanager
 from decimal import Decimal
 from unittest.mock import MagicMock
 
-from mappings import EventName, Operation
+from converter import Converter
+from extractor import Extractor
+from mappings import ActionFlag, EventName, Operation
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(__file__), "sample_data")
 
 
 def make_mock_logger() -> MagicMock:
@@ -28,6 +34,37 @@ def make_mock_logger() -> MagicMock:
     return mock
 
 
+def load_sample_immunizations() -> list[dict]:
+    """Returns the FHIR Immunization resources in tests/sample_data"""
+    resources = []
+    for path in sorted(glob.glob(os.path.join(SAMPLE_DATA_DIR, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f, parse_float=Decimal)
+        if data.get("resourceType") == "Immunization":
+            resources.append(data)
+    return resources
+
+
+class UnmemoisedExtractor(Extractor):
+    """An Extractor which derives the values shared by several fields again for every field which uses them"""
+
+
+for _name, _method in vars(Extractor).items():
+    if hasattr(_method, "__wrapped__"):
+        setattr(UnmemoisedExtractor, _name, _method.__wrapped__)
+
+
+class UnmemoisedConverter(Converter):
+    """
+    A Converter which uses an UnmemoisedExtractor. This is the reference which the Converter's output is checked
+    against.
+    """
+
+    def __init__(self, fhir_data, action_flag=ActionFlag.UPDATE):
+        super().__init__(fhir_data, action_flag)
+        self.extractor = UnmemoisedExtractor(fhir_data)
+
+
 class RecordConfig:
     def __init__(self, event_name, operation, imms_id, expected_action_flag=None, supplier="EMIS"):
         self.event_name = event_name
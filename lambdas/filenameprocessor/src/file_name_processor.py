@@ -18,6 +18,7 @@ from common.clients import STREAM_NAME, get_s3_client, logger
 from common.log_decorator import logging_decorator
 from common.models.batch_constants import SOURCE_BUCKET_NAME, FileStatus
 from common.models.errors import UnhandledAuditTableError
+from common.redis_cache import get_redis_cache_stats
 from constants import (
     DPS_DESTINATION_BUCKET_NAME,
     DPS_DESTINATION_PREFIX,
@@ -327,4 +328,4 @@ def lambda_handler(event: dict, context) -> None:  # pylint: disable=unused-argu
     for record in event["Records"]:
         handle_record(record)
 
-    logger.info("Filename processor lambda task completed")
+    logger.info("Filename processor lambda task completed (Redis cache: %s)", get_redis_cache_stats())
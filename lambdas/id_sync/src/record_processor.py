@@ -36,7 +36,8 @@ def process_record(event_record: dict[str, Any]) -> dict[str, Any]:
 
 def process_nhs_number(nhs_number: str) -> dict[str, Any]:
     try:
-        pds_patient_resource = pds_get_patient_details(nhs_number)
+        # The cache may hold details read before the NHS number changed, so the details are always fetched from PDS
+        pds_patient_resource = pds_get_patient_details(nhs_number, use_cache=False)
     except IdSyncException as e:
         return make_status(str(e), status="error")
 
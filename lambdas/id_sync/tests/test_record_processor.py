@@ -57,7 +57,7 @@ class TestRecordProcessor(unittest.TestCase):
         self.assertEqual(result["status"], "success")
 
         # Verify calls
-        self.mock_pds_get_patient_details.assert_called_once_with(test_id)
+        self.mock_pds_get_patient_details.assert_called_once_with(test_id, use_cache=False)
 
     def test_process_record_success_update_required(self):
         """Test successful processing when patient ID differs and demographics match"""
@@ -107,7 +107,7 @@ class TestRecordProcessor(unittest.TestCase):
 
         # Assert
         self.assertEqual(result, success_response)
-        self.mock_pds_get_patient_details.assert_called_once_with(nhs_number)
+        self.mock_pds_get_patient_details.assert_called_once_with(nhs_number, use_cache=False)
         self.mock_logger.info.assert_has_calls(
             [
                 call("Processing record with SQS messageId: %s", "test-sqs-message-id"),
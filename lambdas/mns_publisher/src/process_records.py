@@ -1,5 +1,7 @@
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from aws_lambda_powertools.utilities.data_classes.sqs_event import SQSRecord
 from aws_lambda_typing.events.sqs import SQSMessage
@@ -7,6 +9,7 @@ from aws_lambda_typing.events.sqs import SQSMessage
 from common.api_clients.mns_service import MnsService
 from common.api_clients.mns_setup import get_mns_service
 from common.api_clients.mock_mns_service import MockMnsService
+from common.api_clients.pds_cache import get_pds_cache_stats
 from create_notification import create_mns_notification
 from observability import logger
 
@@ -44,22 +47,94 @@ def _get_runtime_mns_service() -> MnsService | MockMnsService:
     return _mns_service
 
 
+def get_max_workers() -> int:
+    """
+    Returns the maximum number of records processed concurrently, as set by the MNS_PUBLISHER_MAX_WORKERS environment
+    variable. A value of 1 (the default) means records are processed serially.
+    """
+    try:
+        return max(int(os.getenv("MNS_PUBLISHER_MAX_WORKERS", "1")), 1)
+    except ValueError:
+        return 1
+
+
+def _get_immunisation_id(record: SqsRecord) -> str | None:
+    sqs_event_body = _get_body(record)
+    if isinstance(sqs_event_body, str):
+        sqs_event_body = json.loads(sqs_event_body)
+
+    return sqs_event_body.get("dynamodb", {}).get("NewImage", {}).get("ImmsID", {}).get("S")
+
+
+def group_records_by_immunisation_id(records: list[SqsRecord]) -> list[list[int]]:
+    """
+    Returns the indices of the records grouped by ImmsID, each group in batch order. Each record whose ImmsID cannot be
+    read is in a group of its own.
+    """
+    groups = {}
+    for index, record in enumerate(records):
+        try:
+            immunisation_id = _get_immunisation_id(record)
+        except Exception:
+            # The record will fail when it is processed, and the error is logged then
+            immunisation_id = None
+        groups.setdefault(immunisation_id if immunisation_id is not None else index, []).append(index)
+
+    return list(groups.values())
+
+
+def _try_process_record(record: SqsRecord, mns_service: MnsService | MockMnsService) -> bool:
+    """Processes the record, returning whether it succeeded. Failures are logged and not raised."""
+    try:
+        process_record(record, mns_service)
+        return True
+    except Exception:
+        logger.exception("Failed to process record", extra={"message_id": _get_message_id(record)})
+        return False
+
+
 def process_records(records: list[SqsRecord]) -> dict[str, list]:
     """
     Process multiple SQS records.
+    The records for each ImmsID are processed in batch order, so that MNS receives its notifications in the order the
+    changes were made. Records for different ImmsIDs are independent, so up to MNS_PUBLISHER_MAX_WORKERS of them are
+    processed concurrently, and a record waiting on PDS or MNS (including retry backoff) only holds up later records
+    for the same ImmsID.
     Args: records: List of SQS records to process
     Returns: List of failed item identifiers for partial batch failure
     """
-    batch_item_failures = []
+    start_time = time.perf_counter()
     mns_service = _get_runtime_mns_service()
 
-    for record in records:
-        try:
-            process_record(record, mns_service)
-        except Exception:
-            message_id = _get_message_id(record)
-            batch_item_failures.append({"itemIdentifier": message_id})
-            logger.exception("Failed to process record", extra={"message_id": message_id})
+    results = [False] * len(records)
+
+    def process_group(indices: list[int]) -> None:
+        for index in indices:
+            results[index] = _try_process_record(records[index], mns_service)
+
+    groups = group_records_by_immunisation_id(records)
+    max_workers = min(get_max_workers(), len(groups))
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(process_group, groups))
+    else:
+        process_group(list(range(len(records))))
+
+    # Failures are reported in the order of the batch, whichever order the records finished in
+    batch_item_failures = [
+        {"itemIdentifier": _get_message_id(record)}
+        for record, succeeded in zip(records, results, strict=True)
+        if not succeeded
+    ]
+
+    logger.info(
+        "Processed batch",
+        record_count=len(records),
+        failure_count=len(batch_item_failures),
+        max_workers=max(max_workers, 1),
+        duration_ms=round((time.perf_counter() - start_time) * 1000),
+        pds_cache=get_pds_cache_stats(),
+    )
 
     if batch_item_failures:
         logger.warning(f"Batch completed with {len(batch_item_failures)} failures")
@@ -108,11 +183,7 @@ def extract_trace_ids(record: SqsRecord) -> tuple[str, str | None]:
     immunisation_id = None
 
     try:
-        sqs_event_body = _get_body(record)
-        if isinstance(sqs_event_body, str):
-            sqs_event_body = json.loads(sqs_event_body)
-
-        immunisation_id = sqs_event_body.get("dynamodb", {}).get("NewImage", {}).get("ImmsID", {}).get("S")
+        immunisation_id = _get_immunisation_id(record)
     except Exception as e:
         logger.warning(f"Could not extract immunisation_id: {immunisation_id}: {e}")
 
@@ -0,0 +1,118 @@
+"""
+Compares the time taken by process_records to publish a batch of SQS records serially against publishing them with a
+pool of workers. PDS and MNS are replaced by a local stub server which delays each response to simulate the round
+trip, and which responds with 429 to the first attempt to publish the notification of each throttled record, so that
+the record is retried after the client's backoff.
+Run from the mns_publisher directory with:
+PYTHONPATH=src:tests:../shared/src:../shared/tests python -m tests.benchmark_concurrent_publishing \
+    [batch_size] [round_trip_ms] [throttled_records] [number_of_runs]
+"""
+
+import copy
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import process_records
+from common.api_clients.mns_service import MnsService
+from common.api_clients.pds_service import PdsService
+from test_utils import load_sample_sqs_event
+
+BATCH_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+ROUND_TRIP_SECONDS = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+THROTTLED_RECORDS = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+N_RUNS = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+WORKER_COUNTS = (1, 5, 10)
+THROTTLED_IMMS_ID_PREFIX = "throttled-"
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    throttled_notifications = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        time.sleep(ROUND_TRIP_SECONDS)
+        self._respond(200, {"generalPractitioner": [{"identifier": {"value": "Y12345"}}]})
+
+    def do_POST(self):
+        notification = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(ROUND_TRIP_SECONDS)
+        with StubApiHandler.lock:
+            throttle = (
+                THROTTLED_IMMS_ID_PREFIX in notification["dataref"]
+                and notification["dataref"] not in StubApiHandler.throttled_notifications
+            )
+            StubApiHandler.throttled_notifications.add(notification["dataref"])
+        self._respond(429 if throttle else 200, {"id": notification["id"]})
+
+    def _respond(self, status: int, body: dict):
+        encoded_body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded_body)))
+        self.end_headers()
+        self.wfile.write(encoded_body)
+
+    def log_message(self, *_args):
+        pass
+
+
+def make_records(run: str) -> list[dict]:
+    """Returns a batch of SQS records, the first THROTTLED_RECORDS of which will be throttled by MNS"""
+    sample_record = load_sample_sqs_event()
+    records = []
+    for index in range(BATCH_SIZE):
+        body = copy.deepcopy(json.loads(sample_record["body"]))
+        prefix = THROTTLED_IMMS_ID_PREFIX if index < THROTTLED_RECORDS else ""
+        body["dynamodb"]["NewImage"]["ImmsID"]["S"] = f"{prefix}{run}-{index}"
+        records.append({**sample_record, "messageId": f"msg-{run}-{index}", "body": json.dumps(body)})
+
+    return records
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub_url = f"http://127.0.0.1:{server.server_port}"
+
+    authenticator = Mock()
+    authenticator.get_access_token.return_value = "an-access-token"
+    pds_service = PdsService(authenticator, "int")
+    pds_service.base_url = f"{stub_url}/personal-demographics/FHIR/R4/Patient"
+
+    with (
+        patch("common.api_clients.mns_service.MNS_BASE_URL", f"{stub_url}/multicast-notification-service"),
+        patch("common.api_clients.get_pds_details._pds_service", pds_service),
+        patch("process_records._mns_service", MnsService(authenticator)),
+        patch("process_records.logger"),
+        patch("create_notification.logger"),
+        patch("common.api_clients.retry.logger"),
+        patch("common.api_clients.pds_service.logger"),
+    ):
+        serial_seconds = None
+        for worker_count in WORKER_COUNTS:
+            timings = []
+            for run_number in range(N_RUNS):
+                # The records of each run have their own ids, so that they are throttled again
+                records = make_records(f"{worker_count}-{run_number}")
+                with patch.dict("os.environ", {"MNS_PUBLISHER_MAX_WORKERS": str(worker_count)}):
+                    start_time = time.perf_counter()
+                    result = process_records.process_records(records)
+                    timings.append(time.perf_counter() - start_time)
+
+                assert result == {"batchItemFailures": []}, result
+
+            mean_seconds = sum(timings) / len(timings)
+            serial_seconds = serial_seconds or mean_seconds
+            print(
+                f"{worker_count:>3} workers, {BATCH_SIZE} records ({THROTTLED_RECORDS} throttled), "
+                f"{ROUND_TRIP_SECONDS * 1000:.0f}ms round trip: {mean_seconds * 1000:8.0f}ms per batch, "
+                f"{serial_seconds / mean_seconds:5.2f}x speedup"
+            )
+
+    server.shutdown()
@@ -1,4 +1,7 @@
 import json
+import os
+import threading
+import time
 import unittest
 from unittest.mock import Mock, patch
 
@@ -7,7 +10,7 @@ import responses
 from moto import mock_aws
 
 from lambda_handler import lambda_handler
-from process_records import extract_trace_ids, process_record, process_records
+from process_records import extract_trace_ids, get_max_workers, process_record, process_records
 from test_utils import generate_private_key_b64, load_sample_sqs_event
 
 
@@ -196,6 +199,101 @@ class TestProcessRecords(unittest.TestCase):
         mock_get_mns.assert_called_once()
 
 
+@patch.dict(os.environ, {"MNS_PUBLISHER_MAX_WORKERS": "4"})
+class TestProcessRecordsConcurrently(unittest.TestCase):
+    """Tests for process_records with several workers."""
+
+    def setUp(self):
+        self.records = [self.make_record(f"msg-{index}", f"imms-{index}") for index in range(4)]
+
+        patch("process_records.logger").start()
+        patch("process_records._get_runtime_mns_service").start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    @staticmethod
+    def make_record(message_id: str, immunisation_id: str) -> dict:
+        sample_sqs_record = load_sample_sqs_event()
+        body = json.loads(sample_sqs_record["body"])
+        body["dynamodb"]["NewImage"]["ImmsID"]["S"] = immunisation_id
+        return {**sample_sqs_record, "messageId": message_id, "body": json.dumps(body)}
+
+    @patch("process_records.process_record")
+    def test_process_records_processes_records_concurrently(self, mock_process_record):
+        """Test that records are processed at the same time, so one slow record does not hold up the others."""
+        # Each record waits for all the others to start, which only happens if they are processed concurrently
+        barrier = threading.Barrier(len(self.records), timeout=5)
+        mock_process_record.side_effect = lambda record, _: barrier.wait()
+
+        result = process_records(self.records)
+
+        self.assertEqual(result, {"batchItemFailures": []})
+        self.assertEqual(mock_process_record.call_count, 4)
+
+    @patch("process_records.process_record")
+    def test_process_records_reports_failures_in_batch_order(self, mock_process_record):
+        """Test that each failed record is reported once, in the order of the batch."""
+        failed_message_ids = {"msg-0", "msg-2"}
+        finished_message_ids = []
+
+        def process_record(record, _):
+            if record["messageId"] == "msg-0":
+                # The first record fails last
+                while len(finished_message_ids) < 3:
+                    time.sleep(0.01)
+            finished_message_ids.append(record["messageId"])
+            if record["messageId"] in failed_message_ids:
+                raise Exception("Processing error")
+
+        mock_process_record.side_effect = process_record
+
+        result = process_records(self.records)
+
+        self.assertEqual(finished_message_ids[-1], "msg-0")
+        self.assertEqual(result, {"batchItemFailures": [{"itemIdentifier": "msg-0"}, {"itemIdentifier": "msg-2"}]})
+
+    @patch("process_records.process_record")
+    def test_process_records_processes_records_for_an_immunisation_in_order(self, mock_process_record):
+        """Test that the records for an ImmsID are processed one at a time, in the order of the batch."""
+        self.records = [
+            self.make_record("create", "imms-a"),
+            self.make_record("other", "imms-b"),
+            self.make_record("update", "imms-a"),
+            self.make_record("delete", "imms-a"),
+        ]
+        processing = set()
+        processed_message_ids = []
+
+        def process_record(record, _):
+            immunisation_id = json.loads(record["body"])["dynamodb"]["NewImage"]["ImmsID"]["S"]
+            self.assertNotIn(immunisation_id, processing)
+            processing.add(immunisation_id)
+            # The first record for imms-a is the slowest, so a later record for it would overtake it if not held back
+            time.sleep(0.1 if record["messageId"] == "create" else 0.01)
+            processed_message_ids.append(record["messageId"])
+            processing.remove(immunisation_id)
+
+        mock_process_record.side_effect = process_record
+
+        result = process_records(self.records)
+
+        self.assertEqual(result, {"batchItemFailures": []})
+        self.assertEqual(processed_message_ids[0], "other")
+        self.assertEqual(
+            [message_id for message_id in processed_message_ids if message_id != "other"], ["create", "update", "delete"]
+        )
+
+    def test_get_max_workers(self):
+        """Test that the number of workers is read from the environment, defaulting to 1."""
+        self.assertEqual(get_max_workers(), 4)
+        for value, expected in (("0", 1), ("not-a-number", 1)):
+            with patch.dict(os.environ, {"MNS_PUBLISHER_MAX_WORKERS": value}):
+                self.assertEqual(get_max_workers(), expected)
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(get_max_workers(), 1)
+
+
 class TestLambdaHandler(unittest.TestCase):
     """Tests for lambda_handler function."""
 
@@ -1,5 +1,7 @@
 """Function to send the request directly to lambda (or return appropriate diagnostics if this is not possible)"""
 
+from functools import partial
+
 from repository.fhir_batch_repository import ImmunizationBatchRepository
 from service.fhir_batch_service import ImmunizationBatchService
 
@@ -19,8 +21,55 @@ class ImmunizationBatchController:
         self.immunization_repo = immunization_repo
         self.fhir_service = fhir_service
 
-    def send_request_to_dynamo(self, message_body: dict, table: any, imms_pk: str | None) -> str:
-        """Sends request to the Imms API. Returns the imms id."""
+    def validate_requests(self, message_bodies: list[dict]) -> list[Exception | None]:
+        """
+        Validates the Immunizations of all the CREATE and UPDATE requests together, returning for each request, in the
+        same order, the validation error to report for it, or None if it is valid or is not validated. Requests which
+        failed in the record processor are not validated.
+        """
+        to_validate = [
+            index
+            for index, message_body in enumerate(message_bodies)
+            if message_body.get("operation_requested") in ("CREATE", "UPDATE")
+            and message_body.get("fhir_json")
+            and not message_body.get("diagnostics")
+        ]
+        validation_errors = self.fhir_service.validate_immunizations(
+            [message_bodies[index]["fhir_json"] for index in to_validate]
+        )
+
+        results = [None] * len(message_bodies)
+        for index, validation_error in zip(to_validate, validation_errors):
+            results[index] = validation_error
+        return results
+
+    def prefetch_existing_records(self, table: any, identifiers: list[str], max_workers: int = 1) -> None:
+        """
+        Looks up the existing records for the identifiers of all the requests in the batch together, so that each
+        request does not need to look up its own
+        """
+        self.immunization_repo.prefetch_identifiers(table, identifiers, max_workers)
+
+    def send_new_create_requests_to_dynamo(self, message_bodies: list[dict], table: any) -> list[str | None]:
+        """
+        Sends the validated CREATE requests for identifiers with no existing record to DynamoDB together. Returns, in the
+        same order, the imms id of each one created, or None for each one to be sent with send_request_to_dynamo.
+        """
+        return self.fhir_service.create_new_immunizations(
+            [
+                (message_body.get("fhir_json"), message_body.get("supplier"), message_body.get("vax_type"))
+                for message_body in message_bodies
+            ],
+            table,
+        )
+
+    def send_request_to_dynamo(
+        self, message_body: dict, table: any, imms_pk: str | None, validated: bool = False
+    ) -> str:
+        """
+        Sends request to the Imms API. Returns the imms id. The Immunization is not validated again if it has already
+        been validated by validate_requests.
+        """
         supplier = message_body.get("supplier")
         fhir_json = message_body.get("fhir_json")
         vax_type = message_body.get("vax_type")
@@ -28,8 +77,8 @@ class ImmunizationBatchController:
 
         # Send request to Imms FHIR API and return the imms_id
         function_map = {
-            "CREATE": self.fhir_service.create_immunization,
-            "UPDATE": self.fhir_service.update_immunization,
+            "CREATE": partial(self.fhir_service.create_immunization, validated=validated),
+            "UPDATE": partial(self.fhir_service.update_immunization, validated=validated),
             "DELETE": self.fhir_service.delete_immunization,
         }
         return function_map[operation_requested](
@@ -3,7 +3,10 @@
 import base64
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from queue import SimpleQueue
 
 import simplejson as json
 from mypy_boto3_dynamodb import DynamoDBServiceResource
@@ -17,6 +20,7 @@ from common.models.errors import (
     ResourceFoundError,
     ResourceNotFoundError,
 )
+from common.redis_cache import get_redis_cache_stats
 from controller.fhir_batch_controller import (
     ImmunizationBatchController,
     make_batch_controller,
@@ -32,6 +36,10 @@ logger = logging.getLogger()
 
 QUEUE_URL = os.getenv("SQS_QUEUE_URL")
 
+# boto3 resources are not thread safe, so each forwarding worker uses a Table of its own. They are created on the
+# handler thread, as the default boto3 session is not thread safe either, and kept for later invocations.
+_worker_tables: list[DynamoDBServiceResource] = []
+
 
 def create_diagnostics_dictionary(error: Exception) -> dict:
     """Returns a dictionary containing the error_type, statusCode, and error_message based on the type of the error"""
@@ -60,35 +68,133 @@ def forward_request_to_dynamo(
     table: DynamoDBServiceResource,
     imms_pk: str | None,
     batch_controller: ImmunizationBatchController,
+    validated: bool = False,
 ) -> str:
     """Forwards the request to the Imms API (where possible) and updates the ack file with the outcome"""
     row_id = message_body.get("row_id")
     logger.info("FORWARDED MESSAGE: ID %s", row_id)
-    return batch_controller.send_request_to_dynamo(message_body, table, imms_pk)
+    return batch_controller.send_request_to_dynamo(message_body, table, imms_pk, validated)
 
 
-def forward_lambda_handler(event, _):
-    """Forward each row to the Imms API"""
-    logger.info("Processing started")
-    table = create_table()
-    filename_to_events_mapper = BatchFilenameToEventsMapper()
-    identifier_to_pk_map = {}
-    controller = make_batch_controller()
+def get_forwarding_max_workers() -> int:
+    """
+    Returns the maximum number of identifiers whose records are forwarded to DynamoDB concurrently, as set by the
+    FORWARDING_MAX_WORKERS environment variable. A value of 1 (the default) means records are forwarded serially.
+    """
+    try:
+        return max(int(os.getenv("FORWARDING_MAX_WORKERS", "1")), 1)
+    except ValueError:
+        return 1
 
-    for record in event["Records"]:
-        operation_start_time = str(datetime.now())
-        kinesis_payload = record["kinesis"]["data"]
-        decoded_payload = base64.b64decode(kinesis_payload).decode("utf-8")
-        incoming_message_body = json.loads(decoded_payload, use_decimal=True)
-        file_key = incoming_message_body.get("file_key")
-        local_id = incoming_message_body.get("local_id")
 
-        if is_eof_message(incoming_message_body):
-            logger.info("Received EOF message for file key: %s", file_key)
-            filename_to_events_mapper.add_event(incoming_message_body)
+def get_worker_tables(count: int) -> SimpleQueue:
+    """Returns a queue of count Tables for the forwarding workers, creating any which the container does not have yet"""
+    while len(_worker_tables) < count:
+        _worker_tables.append(create_table())
+
+    available_tables = SimpleQueue()
+    for table in _worker_tables[:count]:
+        available_tables.put(table)
+    return available_tables
+
+
+def get_identifier(message_body: dict) -> str | None:
+    """Returns the identifier of the immunization in the message, or None if it does not have one"""
+    try:
+        identifier = message_body["fhir_json"]["identifier"][0]
+        return f"{identifier['system']}#{identifier['value']}"
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def group_messages_by_identifier(incoming_messages: list[dict]) -> list[list[int]]:
+    """
+    Returns the indices of the messages grouped by immunization identifier, each group in stream order. EOF messages
+    are not included, and each message without an identifier is in a group of its own.
+    """
+    groups = {}
+    for index, message_body in enumerate(incoming_messages):
+        if is_eof_message(message_body):
             continue
 
-        base_outgoing_message_body = {
+        identifier = get_identifier(message_body)
+        groups.setdefault(identifier if identifier is not None else index, []).append(index)
+
+    return list(groups.values())
+
+
+def is_repeat_of_forwarded_row(message_body: dict, error: Exception) -> bool:
+    """
+    Returns whether the error is from repeating a CREATE or DELETE for a row which may already have been forwarded, as
+    the record processor resends the rows after its last checkpoint when it resumes processing of a file
+    """
+    try:
+        row_number = int(message_body["row_id"].split("^")[-1])
+        is_possibly_sent = row_number <= message_body["possibly_sent_up_to_row"]
+    except (KeyError, ValueError, TypeError, AttributeError):
+        return False
+
+    operation_requested = message_body.get("operation_requested")
+    return is_possibly_sent and (
+        (operation_requested == "CREATE" and isinstance(error, IdentifierDuplicationError))
+        or (operation_requested == "DELETE" and isinstance(error, ResourceNotFoundError))
+    )
+
+
+def is_new_create_request(message_body: dict) -> bool:
+    """Returns whether the message is a CREATE request which may be sent to DynamoDB with other CREATE requests"""
+    return (
+        message_body.get("operation_requested") == "CREATE"
+        and bool(message_body.get("fhir_json"))
+        and not message_body.get("diagnostics")
+    )
+
+
+def process_message(
+    incoming_message_body: dict,
+    validation_error: Exception | None,
+    table: DynamoDBServiceResource,
+    identifier_to_pk_map: dict,
+    batch_controller: ImmunizationBatchController,
+) -> dict | None:
+    """Forwards a (non EOF) message to DynamoDB, returning the event to send to SQS if it was not successful"""
+    operation_start_time = str(datetime.now())
+    file_key = incoming_message_body.get("file_key")
+    local_id = incoming_message_body.get("local_id")
+    logger.info("Received message for file %s with local id: %s", file_key, local_id)
+
+    try:
+        if incoming_diagnostics := incoming_message_body.get("diagnostics"):
+            raise RecordProcessorError(incoming_diagnostics)
+
+        if not (fhir_json := incoming_message_body.get("fhir_json")):
+            raise MessageNotSuccessfulError("Server error - FHIR JSON not correctly sent to forwarder")
+
+        if validation_error is not None:
+            raise validation_error
+
+        # Check if the identifier is already present in the list i.e. if we have already processed a
+        # message for the same identifier in this batch
+        identifier_system = fhir_json["identifier"][0]["system"]
+        identifier_value = fhir_json["identifier"][0]["value"]
+        identifier = f"{identifier_system}#{identifier_value}"
+        imms_pk_from_map = identifier_to_pk_map.get(identifier)
+
+        imms_pk = forward_request_to_dynamo(
+            incoming_message_body, table, imms_pk_from_map, batch_controller, validated=True
+        )
+        identifier_to_pk_map[identifier] = imms_pk
+        logger.info("Successfully processed message. Local id: %s, PK: %s", local_id, imms_pk)
+        return None
+
+    except Exception as error:  # pylint: disable = broad-exception-caught
+        if is_repeat_of_forwarded_row(incoming_message_body, error):
+            # The row was forwarded before processing of the file was resumed, so it is not reported as a failure
+            logger.info("Row %s was already forwarded: %s", incoming_message_body.get("row_id"), error)
+            return None
+
+        logger.error("Error processing message: %s", error)
+        return {
             "file_key": incoming_message_body.get("file_key"),
             "row_id": incoming_message_body.get("row_id"),
             "created_at_formatted_string": incoming_message_body.get("created_at_formatted_string"),
@@ -96,37 +202,111 @@ def forward_lambda_handler(event, _):
             "operation_requested": incoming_message_body.get("operation_requested"),
             "supplier": incoming_message_body.get("supplier"),
             "vaccine_type": incoming_message_body.get("vax_type"),
+            "operation_start_time": operation_start_time,
+            "operation_end_time": str(datetime.now()),
+            "diagnostics": create_diagnostics_dictionary(error),
         }
-        logger.info("Received message for file %s with local id: %s", file_key, local_id)
-
-        try:
-            if incoming_diagnostics := incoming_message_body.get("diagnostics"):
-                raise RecordProcessorError(incoming_diagnostics)
-
-            if not (fhir_json := incoming_message_body.get("fhir_json")):
-                raise MessageNotSuccessfulError("Server error - FHIR JSON not correctly sent to forwarder")
-
-            # Check if the identifier is already present in the list i.e. if we have already processed a
-            # message for the same identifier in this batch
-            identifier_system = fhir_json["identifier"][0]["system"]
-            identifier_value = fhir_json["identifier"][0]["value"]
-            identifier = f"{identifier_system}#{identifier_value}"
-            imms_pk_from_map = identifier_to_pk_map.get(identifier)
-
-            imms_pk = forward_request_to_dynamo(incoming_message_body, table, imms_pk_from_map, controller)
-            identifier_to_pk_map[identifier] = imms_pk
-            logger.info("Successfully processed message. Local id: %s, PK: %s", local_id, imms_pk)
-
-        except Exception as error:  # pylint: disable = broad-exception-caught
-            filename_to_events_mapper.add_event(
-                {
-                    **base_outgoing_message_body,
-                    "operation_start_time": operation_start_time,
-                    "operation_end_time": str(datetime.now()),
-                    "diagnostics": create_diagnostics_dictionary(error),
-                }
+
+
+def forward_lambda_handler(event, _):
+    """Forward each row to the Imms API"""
+    logger.info("Processing started")
+    start_time = time.perf_counter()
+    table = create_table()
+    filename_to_events_mapper = BatchFilenameToEventsMapper()
+    controller = make_batch_controller()
+
+    # Decode every record first, so that the immunizations of the batch can be validated together
+    incoming_messages = [
+        json.loads(base64.b64decode(record["kinesis"]["data"]).decode("utf-8"), use_decimal=True)
+        for record in event["Records"]
+    ]
+
+    # The existing records for the identifiers of the rows are looked up in bulk while the batch is validated, so that
+    # the first row for each identifier then only needs to write to DynamoDB
+    forwarding_max_workers = get_forwarding_max_workers()
+    identifiers = [
+        identifier
+        for message_body in incoming_messages
+        if not message_body.get("diagnostics") and (identifier := get_identifier(message_body)) is not None
+    ]
+    with ThreadPoolExecutor(max_workers=1) as prefetch_executor:
+        prefetch = prefetch_executor.submit(
+            controller.prefetch_existing_records, table, identifiers, forwarding_max_workers
+        )
+        validation_errors = controller.validate_requests(incoming_messages)
+        prefetch.result()
+
+    failure_events = [None] * len(incoming_messages)
+    groups = group_messages_by_identifier(incoming_messages)
+
+    # The first rows for identifiers with no existing record which are valid CREATEs are written together
+    new_create_indices = [
+        group[0]
+        for group in groups
+        if validation_errors[group[0]] is None and is_new_create_request(incoming_messages[group[0]])
+    ]
+    created_pks = dict(
+        zip(
+            new_create_indices,
+            controller.send_new_create_requests_to_dynamo(
+                [incoming_messages[index] for index in new_create_indices], table
+            ),
+            strict=True,
+        )
+    )
+
+    def process_messages(indices: list[int], table: DynamoDBServiceResource) -> None:
+        """Processes the messages in order, so that each sees the PK written by the last for the same identifier"""
+        identifier_to_pk_map = {}
+        for index in indices:
+            if (imms_pk := created_pks.get(index)) is not None:
+                identifier_to_pk_map[get_identifier(incoming_messages[index])] = imms_pk
+                logger.info(
+                    "Successfully processed message. Local id: %s, PK: %s",
+                    incoming_messages[index].get("local_id"),
+                    imms_pk,
+                )
+                continue
+
+            failure_events[index] = process_message(
+                incoming_messages[index], validation_errors[index], table, identifier_to_pk_map, controller
             )
-            logger.error("Error processing message: %s", error)
+
+    # Records for different identifiers are independent, so they are forwarded concurrently, up to the configured
+    # number of workers to avoid DynamoDB throttling. Each group borrows a Table which no other thread is using.
+    max_workers = min(forwarding_max_workers, len(groups))
+    if max_workers > 1:
+        available_tables = get_worker_tables(max_workers)
+
+        def process_messages_with_worker_table(indices: list[int]) -> None:
+            worker_table = available_tables.get()
+            try:
+                process_messages(indices, worker_table)
+            finally:
+                available_tables.put(worker_table)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(process_messages_with_worker_table, groups))
+    else:
+        process_messages(sorted(index for group in groups for index in group), table)
+
+    # Events are sent in stream order, whichever order the records were processed in
+    for incoming_message_body, failure_event in zip(incoming_messages, failure_events, strict=True):
+        if is_eof_message(incoming_message_body):
+            logger.info("Received EOF message for file key: %s", incoming_message_body.get("file_key"))
+            filename_to_events_mapper.add_event(incoming_message_body)
+        elif failure_event is not None:
+            filename_to_events_mapper.add_event(failure_event)
+
+    logger.info(
+        "Forwarded %d records for %d identifiers with %d workers in %.0fms (Redis cache: %s)",
+        len(incoming_messages),
+        len(groups),
+        max(max_workers, 1),
+        (time.perf_counter() - start_time) * 1000,
+        get_redis_cache_stats(),
+    )
 
     # Send to SQS
     for filename_key, events in filename_to_events_mapper.get_map().items():
@@ -1,6 +1,7 @@
 import os
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 import boto3
@@ -8,13 +9,23 @@ import botocore.exceptions
 import simplejson as json
 from boto3.dynamodb.conditions import Attr, Key
 
+from common.clients import logger
 from common.models.errors import (
     IdentifierDuplicationError,
     ResourceFoundError,
     ResourceNotFoundError,
     UnhandledResponseError,
 )
-from common.models.utils.generic_utils import get_nhs_number
+from common.models.utils.generic_utils import get_nhs_number, make_patient_occurrence_sk
+
+# The maximum number of keys which may be read with a single BatchGetItem request
+BATCH_GET_ITEM_MAX_KEYS = 100
+BATCH_GET_ITEM_MAX_ATTEMPTS = 3
+# The maximum number of items which may be written with a single BatchWriteItem request
+BATCH_WRITE_ITEM_MAX_ITEMS = 25
+BATCH_WRITE_ITEM_MAX_ATTEMPTS = 3
+
+_NOT_PREFETCHED = object()
 
 
 def create_table(region_name="eu-west-2"):
@@ -59,6 +70,7 @@ class RecordAttributes:
     pk: str
     patient_pk: str
     patient_sk: str
+    patient_occurrence_sk: str
     resource: dict
     vaccine_type: str
     timestamp: int
@@ -80,10 +92,127 @@ class RecordAttributes:
         self.system_id = imms["identifier"][0]["system"]
         self.system_value = imms["identifier"][0]["value"]
         self.patient_sk = f"{self.vaccine_type}#{imms_id}"
+        self.patient_occurrence_sk = make_patient_occurrence_sk(
+            self.vaccine_type, imms.get("occurrenceDateTime"), imms_id
+        )
         self.identifier = f"{self.system_id}#{self.system_value}"
 
 
+def _query_identifier_pk(client: any, table_name: str, identifier: str) -> str | None:
+    """
+    Returns the PK of the record for the identifier, or None if there is no record for it. The table's client is used
+    rather than the Table, as it is thread safe.
+    """
+    response = client.query(
+        TableName=table_name,
+        IndexName="IdentifierGSI",
+        KeyConditionExpression=Key("IdentifierPK").eq(identifier),
+        ProjectionExpression="PK",
+        Limit=1,
+    )
+    return response["Items"][0]["PK"] if response.get("Count", 0) > 0 else None
+
+
+def _batch_get_items(table: any, pks: list[str]) -> dict[str, dict]:
+    """
+    Returns the records with the PKs, keyed by PK, read with consistent BatchGetItem reads. Records which do not exist
+    are omitted. Raises UnhandledResponseError if some keys remain unprocessed after retrying.
+    """
+    items = {}
+    for start in range(0, len(pks), BATCH_GET_ITEM_MAX_KEYS):
+        keys = [{"PK": pk} for pk in pks[start : start + BATCH_GET_ITEM_MAX_KEYS]]
+        for _ in range(BATCH_GET_ITEM_MAX_ATTEMPTS):
+            response = table.meta.client.batch_get_item(
+                RequestItems={table.name: {"Keys": keys, "ConsistentRead": True}}
+            )
+            items.update({item["PK"]: item for item in response["Responses"].get(table.name, [])})
+            if not (keys := response.get("UnprocessedKeys", {}).get(table.name, {}).get("Keys")):
+                break
+        else:
+            raise UnhandledResponseError(message="Unprocessed keys from dynamodb batch_get_item", response=response)
+
+    return items
+
+
+def _batch_write_items(table: any, items: list[dict]) -> set[str]:
+    """
+    Puts the items (no more than 25) with BatchWriteItem, retrying any which are unprocessed, and returns the PKs of the
+    items which remain unprocessed
+    """
+    requests = [{"PutRequest": {"Item": item}} for item in items]
+    for _ in range(BATCH_WRITE_ITEM_MAX_ATTEMPTS):
+        response = table.meta.client.batch_write_item(RequestItems={table.name: requests})
+        if not (requests := response.get("UnprocessedItems", {}).get(table.name)):
+            return set()
+
+    return {request["PutRequest"]["Item"]["PK"] for request in requests}
+
+
 class ImmunizationBatchRepository:
+    def __init__(self):
+        self._prefetched_query_responses: dict[str, dict | None] = {}
+
+    def prefetch_identifiers(self, table: any, identifiers: list[str], max_workers: int = 1) -> None:
+        """
+        Looks up the existing records for the identifiers in bulk, so that the first create, update or delete for each
+        identifier does not need to look up its own. The PK of each identifier is found by querying IdentifierGSI, with
+        up to max_workers queries in parallel on the table's client, and the records are then read from the table with
+        consistent BatchGetItem reads. Each prefetched lookup is only used once, as the record may then be changed. If
+        the queries fail, each create, update or delete looks up its own record. If only reading the records fails, the
+        identifiers which were found to have no record are still known to be new.
+        """
+        identifiers = list(dict.fromkeys(identifiers))
+        if not identifiers:
+            return
+
+        client, table_name = table.meta.client, table.name
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(identifiers)))) as executor:
+                pks = dict(
+                    zip(
+                        identifiers,
+                        executor.map(
+                            lambda identifier: _query_identifier_pk(client, table_name, identifier), identifiers
+                        ),
+                    )
+                )
+        except (
+            botocore.exceptions.ClientError,
+            botocore.exceptions.BotoCoreError,
+        ) as error:
+            logger.warning("Unable to prefetch the existing records for the batch: %s", error)
+            return
+
+        for identifier, pk in pks.items():
+            if pk is None:
+                self._prefetched_query_responses[identifier] = None
+
+        try:
+            items = _batch_get_items(table, [pk for pk in pks.values() if pk is not None])
+        except (
+            botocore.exceptions.ClientError,
+            botocore.exceptions.BotoCoreError,
+            UnhandledResponseError,
+        ) as error:
+            logger.warning("Unable to read the prefetched records for the batch: %s", error)
+            return
+
+        for identifier, pk in pks.items():
+            if pk is not None:
+                item = items.get(pk)
+                self._prefetched_query_responses[identifier] = (
+                    {"Count": 1, "Items": [item]} if item is not None else None
+                )
+
+    def _find_existing_record(self, table: any, identifier: str, imms_pk: str | None) -> dict | None:
+        """Returns the lookup of the existing record for the identifier, using the prefetched lookup if there is one"""
+        if imms_pk is None:
+            query_response = self._prefetched_query_responses.pop(identifier, _NOT_PREFETCHED)
+            if query_response is not _NOT_PREFETCHED:
+                return query_response
+
+        return _query_identifier(table, identifier, imms_pk)
+
     def create_immunization(
         self,
         immunization: any,
@@ -93,7 +222,7 @@ class ImmunizationBatchRepository:
         imms_pk: str | None,
     ) -> str:
         identifier = self._identifier_response(immunization)
-        query_response = _query_identifier(table, identifier, imms_pk)
+        query_response = self._find_existing_record(table, identifier, imms_pk)
         if query_response is not None:
             deleted_at_required, update_reinstated, is_reinstate = self._get_record_status(query_response)
             if not deleted_at_required or update_reinstated:
@@ -110,33 +239,22 @@ class ImmunizationBatchRepository:
                 is_reinstate,
             )
 
-        new_id = str(uuid.uuid4())
-        immunization["id"] = new_id
-        attr = RecordAttributes(immunization, vax_type, supplier_system, 0)
+        item = self._make_new_item(immunization, supplier_system, vax_type)
 
         try:
             response = table.put_item(
-                Item={
-                    "PK": attr.pk,
-                    "PatientPK": attr.patient_pk,
-                    "PatientSK": attr.patient_sk,
-                    "Resource": json.dumps(attr.resource, use_decimal=True),
-                    "IdentifierPK": attr.identifier,
-                    "Operation": "CREATE",
-                    "Version": attr.version,
-                    "SupplierSystem": attr.supplier,
-                },
-                ConditionExpression=Attr("PK").ne(attr.pk),
+                Item=item,
+                ConditionExpression=Attr("PK").ne(item["PK"]),
             )
 
             if response["ResponseMetadata"]["HTTPStatusCode"] == 200:
-                return attr.pk
+                return item["PK"]
             else:
                 raise UnhandledResponseError(message="Non-200 response from dynamodb", response=response)
 
         except botocore.exceptions.ClientError as error:
             if error.response["Error"]["Code"] == "ConditionalCheckFailedException":
-                raise ResourceFoundError(resource_type="Immunization", resource_id=attr.pk)
+                raise ResourceFoundError(resource_type="Immunization", resource_id=item["PK"])
             raise UnhandledResponseError(
                 message=f"Unhandled error from dynamodb: {error.response['Error']['Code']}",
                 response=error.response,
@@ -151,7 +269,7 @@ class ImmunizationBatchRepository:
         imms_pk: str | None,
     ) -> str:
         identifier = self._identifier_response(immunization)
-        query_response = _query_identifier(table, identifier, imms_pk)
+        query_response = self._find_existing_record(table, identifier, imms_pk)
         if query_response is None:
             raise ResourceNotFoundError(resource_type="Immunization", resource_id=identifier)
         deleted_at_required, update_reinstated, is_reinstate = self._get_record_status(query_response)
@@ -176,7 +294,7 @@ class ImmunizationBatchRepository:
         imms_pk: str | None,
     ) -> str:
         identifier = self._identifier_response(immunization)
-        query_response = _query_identifier(table, identifier, imms_pk)
+        query_response = self._find_existing_record(table, identifier, imms_pk)
         if query_response is None:
             raise ResourceNotFoundError(resource_type="Immunization", resource_id=identifier)
         try:
@@ -206,6 +324,64 @@ class ImmunizationBatchRepository:
                     response=error.response,
                 )
 
+    def create_new_immunizations(self, requests: list[tuple[dict, str, str]], table: any) -> list[str | None]:
+        """
+        Creates the Immunizations of the (immunization, supplier_system, vax_type) requests whose identifiers were
+        prefetched and found to have no existing record, writing them with BatchWriteItem in groups of 25. Returns, in
+        the same order, the PK of each record created, or None for each request which was not created, which should
+        then be created with create_immunization. A conditional put is not needed, as each record has a new PK.
+        """
+        pks = [None] * len(requests)
+        items_to_write = []
+        for index, (immunization, supplier_system, vax_type) in enumerate(requests):
+            try:
+                identifier = self._identifier_response(immunization)
+                if self._prefetched_query_responses.get(identifier, _NOT_PREFETCHED) is not None:
+                    continue
+                items_to_write.append((index, identifier, self._make_new_item(immunization, supplier_system, vax_type)))
+            except Exception:  # pylint: disable = broad-exception-caught
+                # create_immunization will raise the appropriate error for the request
+                continue
+
+        for start in range(0, len(items_to_write), BATCH_WRITE_ITEM_MAX_ITEMS):
+            chunk = items_to_write[start : start + BATCH_WRITE_ITEM_MAX_ITEMS]
+            try:
+                unprocessed_pks = _batch_write_items(table, [item for _, _, item in chunk])
+            except (
+                botocore.exceptions.ClientError,
+                botocore.exceptions.BotoCoreError,
+                UnhandledResponseError,
+            ) as error:
+                # The outcome of the write is unknown, so the identifiers will be looked up again before creating
+                logger.warning("Unable to batch create immunizations: %s", error)
+                for _, identifier, _ in chunk:
+                    self._prefetched_query_responses.pop(identifier, None)
+                continue
+
+            for index, identifier, item in chunk:
+                if item["PK"] not in unprocessed_pks:
+                    self._prefetched_query_responses.pop(identifier, None)
+                    pks[index] = item["PK"]
+
+        return pks
+
+    @staticmethod
+    def _make_new_item(immunization: dict, supplier_system: str, vax_type: str) -> dict:
+        """Gives the Immunization a new id and returns the item to put in the table to create it"""
+        immunization["id"] = str(uuid.uuid4())
+        attr = RecordAttributes(immunization, vax_type, supplier_system, 0)
+        return {
+            "PK": attr.pk,
+            "PatientPK": attr.patient_pk,
+            "PatientSK": attr.patient_sk,
+            "PatientOccurrenceSK": attr.patient_occurrence_sk,
+            "Resource": json.dumps(attr.resource, use_decimal=True),
+            "IdentifierPK": attr.identifier,
+            "Operation": "CREATE",
+            "Version": attr.version,
+            "SupplierSystem": attr.supplier,
+        }
+
     @staticmethod
     def _handle_dynamo_response(response: any, imms_id: str) -> str:
         if response["ResponseMetadata"]["HTTPStatusCode"] == 200:
@@ -251,13 +427,15 @@ class ImmunizationBatchRepository:
         if is_reinstate:
             return (
                 "SET UpdatedAt = :timestamp, PatientPK = :patient_pk, "
-                "PatientSK = :patient_sk, #imms_resource = :imms_resource_val, "
+                "PatientSK = :patient_sk, PatientOccurrenceSK = :patient_occurrence_sk, "
+                "#imms_resource = :imms_resource_val, "
                 "Operation = :operation, Version = :version, DeletedAt = :respawn, SupplierSystem = :supplier_system "
             )
         else:
             return (
                 "SET UpdatedAt = :timestamp, PatientPK = :patient_pk, "
-                "PatientSK = :patient_sk, #imms_resource = :imms_resource_val, "
+                "PatientSK = :patient_sk, PatientOccurrenceSK = :patient_occurrence_sk, "
+                "#imms_resource = :imms_resource_val, "
                 "Operation = :operation, Version = :version, SupplierSystem = :supplier_system "
             )
 
@@ -303,6 +481,7 @@ class ImmunizationBatchRepository:
                 ":timestamp": attr.timestamp,
                 ":patient_pk": attr.patient_pk,
                 ":patient_sk": attr.patient_sk,
+                ":patient_occurrence_sk": attr.patient_occurrence_sk,
                 ":imms_resource_val": json.dumps(attr.resource, use_decimal=True),
                 ":operation": "UPDATE",
                 ":version": attr.version,
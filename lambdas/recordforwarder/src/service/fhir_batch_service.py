@@ -1,3 +1,5 @@
+from fhir.resources.R4B.immunization import Immunization
+
 from common.models.errors import CustomValidationError, MandatoryError
 from common.models.fhir_immunization import ImmunizationValidator
 from repository.fhir_batch_repository import ImmunizationBatchRepository
@@ -14,6 +16,31 @@ class ImmunizationBatchService:
         self.immunization_repo = immunization_repo
         self.validator = validator
 
+    def validate_immunizations(self, immunizations: list[dict]) -> list[Exception | None]:
+        """
+        Validates a batch of Immunizations together, returning for each one, in the same order, None if it is valid or
+        else the error which create_immunization or update_immunization would have raised when validating it.
+        """
+        return [
+            None if isinstance(result, Immunization) else self._to_validation_error(result)
+            for result in self.validator.validate_batch(immunizations)
+        ]
+
+    def _validate_immunization(self, immunization: dict) -> None:
+        try:
+            self.validator.validate(immunization)
+        except (ValueError, MandatoryError) as error:
+            raise CustomValidationError(message=str(error)) from error
+
+    @staticmethod
+    def _to_validation_error(error: Exception) -> Exception:
+        if isinstance(error, (ValueError, MandatoryError)):
+            validation_error = CustomValidationError(message=str(error))
+            validation_error.__cause__ = error
+            return validation_error
+
+        return error
+
     def create_immunization(
         self,
         immunization: any,
@@ -21,19 +48,26 @@ class ImmunizationBatchService:
         vax_type: str,
         table: any,
         imms_pk: str | None,
+        validated: bool = False,
     ) -> str:
         """
         Creates an Immunization if it does not exits and return the ID back if successful.
         Exception will be raised if resource exits. Multiple calls to this method won't change
-        the record in the database.
+        the record in the database. Validation is skipped if the Immunization has already been validated.
         """
-        try:
-            self.validator.validate(immunization)
-        except (ValueError, MandatoryError) as error:
-            raise CustomValidationError(message=str(error)) from error
+        if not validated:
+            self._validate_immunization(immunization)
 
         return self.immunization_repo.create_immunization(immunization, supplier_system, vax_type, table, imms_pk)
 
+    def create_new_immunizations(self, requests: list[tuple[dict, str, str]], table: any) -> list[str | None]:
+        """
+        Creates the already validated Immunizations of the (immunization, supplier_system, vax_type) requests whose
+        identifiers are known to have no existing record together, returning the ID of each one created, or None for
+        each one which should be created with create_immunization instead
+        """
+        return self.immunization_repo.create_new_immunizations(requests, table)
+
     def update_immunization(
         self,
         immunization: any,
@@ -41,16 +75,15 @@ class ImmunizationBatchService:
         vax_type: str,
         table: any,
         imms_pk: str | None,
+        validated: bool = False,
     ) -> str:
         """
         Updates an Immunization if it exists and return the ID back if successful.
         Exception will be raised if resource didn't exist.Multiple calls to this method won't change
-        the record in the database.
+        the record in the database. Validation is skipped if the Immunization has already been validated.
         """
-        try:
-            self.validator.validate(immunization)
-        except (ValueError, MandatoryError) as error:
-            raise CustomValidationError(message=str(error)) from error
+        if not validated:
+            self._validate_immunization(immunization)
 
         return self.immunization_repo.update_immunization(immunization, supplier_system, vax_type, table, imms_pk)
 
@@ -35,6 +35,46 @@ class TestCreateImmunizationBatchController(unittest.TestCase):
         self.mock_table = Mock()
         self.controller = ImmunizationBatchController(immunization_repo=self.mock_repo, fhir_service=self.mock_service)
 
+    def test_validate_requests_validates_create_and_update_requests_together(self):
+        """it should validate the CREATE and UPDATE requests in one call and return a result for every request"""
+
+        validation_error = CustomValidationError(message="Validation errors: status must be one of the following")
+        message_bodies = [
+            {"operation_requested": "CREATE", "fhir_json": {"id": "create"}},
+            {"operation_requested": "DELETE", "fhir_json": {"id": "delete"}},
+            {"operation_requested": "UPDATE", "fhir_json": {"id": "update"}},
+            {"operation_requested": "CREATE", "diagnostics": {"statusCode": 400}},
+            {"operation_requested": "UPDATE", "fhir_json": {"id": "update"}, "diagnostics": {"statusCode": 400}},
+        ]
+        self.mock_service.validate_immunizations.return_value = [None, validation_error]
+
+        results = self.controller.validate_requests(message_bodies)
+
+        self.assertEqual(results, [None, None, validation_error, None, None])
+        self.mock_service.validate_immunizations.assert_called_once_with([{"id": "create"}, {"id": "update"}])
+
+    def test_prefetch_existing_records(self):
+        """it should look up the existing records for all the identifiers together"""
+
+        self.controller.prefetch_existing_records(self.mock_table, ["a-system#a", "a-system#b"], max_workers=4)
+
+        self.mock_repo.prefetch_identifiers.assert_called_once_with(self.mock_table, ["a-system#a", "a-system#b"], 4)
+
+    def test_send_new_create_requests_to_dynamo(self):
+        """it should create the immunizations of all the requests together"""
+        message_bodies = [
+            {"supplier": "supplier_a", "fhir_json": {"id": "a"}, "vax_type": "RSV", "operation_requested": "CREATE"},
+            {"supplier": "supplier_b", "fhir_json": {"id": "b"}, "vax_type": "FLU", "operation_requested": "CREATE"},
+        ]
+        self.mock_service.create_new_immunizations.return_value = ["Immunization#a", None]
+
+        result = self.controller.send_new_create_requests_to_dynamo(message_bodies, self.mock_table)
+
+        self.assertEqual(result, ["Immunization#a", None])
+        self.mock_service.create_new_immunizations.assert_called_once_with(
+            [({"id": "a"}, "supplier_a", "RSV"), ({"id": "b"}, "supplier_b", "FLU")], self.mock_table
+        )
+
     def test_send_request_to_dynamo_create_success(self):
         """it should create Immunization and return imms id location"""
 
@@ -59,6 +99,7 @@ class TestCreateImmunizationBatchController(unittest.TestCase):
             vax_type=message_body["vax_type"],
             table=self.mock_table,
             imms_pk=imms_pk,
+            validated=False,
         )
 
     def test_send_request_to_dynamo_create_badrequest(self):
@@ -87,6 +128,7 @@ class TestCreateImmunizationBatchController(unittest.TestCase):
             vax_type=message_body["vax_type"],
             table=self.mock_table,
             imms_pk=imms_pk,
+            validated=False,
         )
 
     def test_send_request_to_dynamo_create_duplicate(self):
@@ -114,6 +156,7 @@ class TestCreateImmunizationBatchController(unittest.TestCase):
             vax_type=message_body["vax_type"],
             table=self.mock_table,
             imms_pk=imms_pk,
+            validated=False,
         )
 
     def test_send_request_to_dynamo_create_unhandled_error(self):
@@ -143,6 +186,7 @@ class TestCreateImmunizationBatchController(unittest.TestCase):
             vax_type=message_body["vax_type"],
             table=self.mock_table,
             imms_pk=imms_pk,
+            validated=False,
         )
 
 
@@ -177,6 +221,7 @@ class TestUpdateImmunizationBatchController(unittest.TestCase):
             vax_type=message_body["vax_type"],
             table=self.mock_table,
             imms_pk=imms_pk,
+            validated=False,
         )
 
     def test_send_request_to_dynamo_update_badrequest(self):
@@ -204,6 +249,7 @@ class TestUpdateImmunizationBatchController(unittest.TestCase):
             vax_type=message_body["vax_type"],
             table=self.mock_table,
             imms_pk=imms_pk,
+            validated=False,
         )
 
     def test_send_request_to_dynamo_update_resource_not_found(self):
@@ -231,6 +277,7 @@ class TestUpdateImmunizationBatchController(unittest.TestCase):
             vax_type=message_body["vax_type"],
             table=self.mock_table,
             imms_pk=imms_pk,
+            validated=False,
         )
 
     def test_send_request_to_dynamo_update_unhandled_error(self):
@@ -260,6 +307,7 @@ class TestUpdateImmunizationBatchController(unittest.TestCase):
             vax_type=message_body["vax_type"],
             table=self.mock_table,
             imms_pk=imms_pk,
+            validated=False,
         )
 
 
@@ -71,6 +71,7 @@ class TestCreateImmunization(TestImmunizationBatchRepository):
                 "PK": ANY,
                 "PatientPK": ANY,
                 "PatientSK": ANY,
+                "PatientOccurrenceSK": f"vax-type#2021-02-07#{self.immunization['id']}",
                 "Resource": json.dumps(self.immunization, use_decimal=True),
                 "IdentifierPK": ANY,
                 "Operation": "CREATE",
@@ -135,6 +136,7 @@ class TestCreateImmunization(TestImmunizationBatchRepository):
                 ":timestamp": ANY,
                 ":patient_pk": ANY,
                 ":patient_sk": ANY,
+                ":patient_occurrence_sk": ANY,
                 ":imms_resource_val": json.dumps(self.immunization),
                 ":operation": "UPDATE",
                 ":version": 3,
@@ -251,6 +253,7 @@ class TestUpdateImmunization(TestImmunizationBatchRepository):
                         ":timestamp": ANY,
                         ":patient_pk": ANY,
                         ":patient_sk": ANY,
+                        ":patient_occurrence_sk": ANY,
                         ":imms_resource_val": json.dumps(self.immunization),
                         ":operation": "UPDATE",
                         ":version": 2,
@@ -490,3 +493,244 @@ class TestCreateTable(TestImmunizationBatchRepository):
 
         # Assertions
         self.assertEqual(table.table_name, table_name)
+
+
+@mock_aws
+class TestPrefetchIdentifiers(unittest.TestCase):
+    def setUp(self):
+        self.table = boto3.resource("dynamodb", region_name="eu-west-2").create_table(
+            TableName="test-immunization-table",
+            KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "IdentifierPK", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "IdentifierGSI",
+                    "KeySchema": [{"AttributeName": "IdentifierPK", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            ],
+        )
+        self.repository = ImmunizationBatchRepository()
+        self.immunization = create_covid_immunization_dict(imms_id)
+        identifier = self.immunization["identifier"][0]
+        self.identifier = f"{identifier['system']}#{identifier['value']}"
+        self.table.put_item(
+            Item={
+                "PK": _make_immunization_pk(imms_id),
+                "IdentifierPK": self.identifier,
+                "Resource": json.dumps(self.immunization),
+                "Version": 1,
+            }
+        )
+        self.table.put_item(
+            Item={"PK": "Immunization#deleted", "IdentifierPK": "a-system#deleted", "Version": 3, "DeletedAt": 1}
+        )
+        self.logger_info_patcher = patch("logging.Logger.info")
+        self.logger_info_patcher.start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    def test_prefetch_identifiers_reads_records_with_a_single_batch_get(self):
+        """it should query IdentifierGSI for each identifier and read the records with one consistent BatchGetItem"""
+        with (
+            patch.object(self.table.meta.client, "query", wraps=self.table.meta.client.query) as query_spy,
+            patch.object(
+                self.table.meta.client, "batch_get_item", wraps=self.table.meta.client.batch_get_item
+            ) as batch_get_spy,
+        ):
+            self.repository.prefetch_identifiers(
+                self.table, [self.identifier, "a-system#deleted", "a-system#new", self.identifier], max_workers=4
+            )
+
+        self.assertEqual(query_spy.call_count, 3)
+        batch_get_spy.assert_called_once()
+        request = batch_get_spy.call_args.kwargs["RequestItems"]["test-immunization-table"]
+        self.assertTrue(request["ConsistentRead"])
+        self.assertCountEqual(request["Keys"], [{"PK": _make_immunization_pk(imms_id)}, {"PK": "Immunization#deleted"}])
+
+    def test_prefetched_lookup_is_used_once_in_place_of_the_identifier_query(self):
+        """it should update the prefetched record without querying, and query again for a later row"""
+        self.repository.prefetch_identifiers(self.table, [self.identifier])
+
+        with patch.object(self.table, "query", wraps=self.table.query) as query_spy:
+            self.repository.update_immunization(self.immunization, "supplier", "vax-type", self.table, None)
+            query_spy.assert_not_called()
+
+            with self.assertRaises(IdentifierDuplicationError):
+                self.repository.create_immunization(self.immunization, "supplier", "vax-type", self.table, None)
+            query_spy.assert_called_once()
+
+        self.assertEqual(self.table.get_item(Key={"PK": _make_immunization_pk(imms_id)})["Item"]["Version"], 2)
+
+    def test_prefetched_missing_identifier_is_created_without_querying(self):
+        """it should create a record for an identifier the prefetch found no record for without querying"""
+        self.immunization["identifier"][0]["value"] = "new"
+        self.repository.prefetch_identifiers(self.table, [f"{self.immunization['identifier'][0]['system']}#new"])
+
+        with patch.object(self.table, "query", wraps=self.table.query) as query_spy:
+            pk = self.repository.create_immunization(self.immunization, "supplier", "vax-type", self.table, None)
+
+        query_spy.assert_not_called()
+        self.assertEqual(self.table.get_item(Key={"PK": pk})["Item"]["Operation"], "CREATE")
+
+    @patch("repository.fhir_batch_repository.logger.warning")
+    def test_each_row_looks_up_its_own_record_if_prefetch_fails(self, mock_logger_warning):
+        """it should fall back to querying for each row if the prefetch fails"""
+        error = botocore.exceptions.ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "Query")
+        with patch.object(self.table.meta.client, "query", side_effect=error):
+            self.repository.prefetch_identifiers(self.table, [self.identifier])
+
+        mock_logger_warning.assert_called_once()
+        with patch.object(self.table, "query", wraps=self.table.query) as query_spy:
+            self.repository.update_immunization(self.immunization, "supplier", "vax-type", self.table, None)
+        query_spy.assert_called_once()
+
+    @patch("repository.fhir_batch_repository.logger.warning")
+    def test_each_row_looks_up_its_own_record_if_prefetch_times_out(self, mock_logger_warning):
+        """it should fall back to querying for each row if reading the prefetched records times out"""
+        error = botocore.exceptions.ReadTimeoutError(endpoint_url="https://dynamodb.eu-west-2.amazonaws.com")
+        with patch.object(self.table.meta.client, "batch_get_item", side_effect=error):
+            self.repository.prefetch_identifiers(self.table, [self.identifier])
+
+        mock_logger_warning.assert_called_once()
+        with patch.object(self.table, "query", wraps=self.table.query) as query_spy:
+            self.repository.update_immunization(self.immunization, "supplier", "vax-type", self.table, None)
+        query_spy.assert_called_once()
+
+    def test_prefetch_identifiers_retries_unprocessed_keys(self):
+        """it should read the keys left unprocessed by BatchGetItem again"""
+        table = MagicMock()
+        table.name = "test-immunization-table"
+        table.meta.client.query.side_effect = lambda **kwargs: {
+            "Count": 1,
+            "Items": [{"PK": f"Immunization#{kwargs['KeyConditionExpression'].get_expression()['values'][1]}"}],
+        }
+        table.meta.client.batch_get_item.side_effect = [
+            {
+                "Responses": {table.name: [{"PK": "Immunization#a", "Version": 1}]},
+                "UnprocessedKeys": {table.name: {"Keys": [{"PK": "Immunization#b"}]}},
+            },
+            {"Responses": {table.name: [{"PK": "Immunization#b", "Version": 2}]}, "UnprocessedKeys": {}},
+        ]
+
+        self.repository.prefetch_identifiers(table, ["a", "b"])
+
+        self.assertEqual(table.meta.client.batch_get_item.call_count, 2)
+        self.assertEqual(
+            table.meta.client.batch_get_item.call_args.kwargs["RequestItems"][table.name]["Keys"],
+            [{"PK": "Immunization#b"}],
+        )
+        self.assertEqual(self.repository._find_existing_record(table, "b", None)["Items"][0]["Version"], 2)
+
+    def make_new_requests(self, count: int) -> list[tuple[dict, str, str]]:
+        """Returns requests to create immunizations with new identifiers, having prefetched their identifiers"""
+        requests = []
+        for index in range(count):
+            immunization = deepcopy(self.immunization)
+            immunization["identifier"][0]["value"] = f"new-{index}"
+            requests.append((immunization, "supplier", "vax-type"))
+        self.repository.prefetch_identifiers(
+            self.table, [f"{immunization['identifier'][0]['system']}#new-{index}" for index in range(count)]
+        )
+        return requests
+
+    def test_create_new_immunizations_writes_25_records_per_batch_write(self):
+        """it should create the records for the new identifiers with one BatchWriteItem for each 25"""
+        requests = self.make_new_requests(30)
+
+        with patch.object(
+            self.table.meta.client, "batch_write_item", wraps=self.table.meta.client.batch_write_item
+        ) as batch_write_spy:
+            pks = self.repository.create_new_immunizations(requests, self.table)
+
+        self.assertEqual(batch_write_spy.call_count, 2)
+        self.assertEqual(len(set(pks)), 30)
+        for pk, (immunization, _, _) in zip(pks, requests):
+            item = self.table.get_item(Key={"PK": pk})["Item"]
+            self.assertEqual(pk, _make_immunization_pk(immunization["id"]))
+            self.assertEqual(item["Operation"], "CREATE")
+            self.assertEqual(item["Version"], 1)
+            self.assertEqual(item["IdentifierPK"], f"{immunization['identifier'][0]['system']}#new-{pks.index(pk)}")
+
+        # The prefetched lookups are used up, so that a later row for the same identifier looks up the new record
+        with self.assertRaises(IdentifierDuplicationError):
+            self.repository.create_immunization(deepcopy(requests[0][0]), "supplier", "vax-type", self.table, None)
+
+    def test_create_new_immunizations_skips_identifiers_without_a_prefetched_missing_record(self):
+        """it should not create records for identifiers which exist or were not prefetched"""
+        requests = self.make_new_requests(1)
+        not_prefetched = deepcopy(self.immunization)
+        not_prefetched["identifier"][0]["value"] = "not-prefetched"
+        self.repository.prefetch_identifiers(self.table, [self.identifier])
+
+        pks = self.repository.create_new_immunizations(
+            [(self.immunization, "supplier", "vax-type"), *requests, (not_prefetched, "supplier", "vax-type")],
+            self.table,
+        )
+
+        self.assertIsNone(pks[0])
+        self.assertIsNotNone(pks[1])
+        self.assertIsNone(pks[2])
+        self.assertEqual(self.table.scan(Select="COUNT")["Count"], 3)
+
+    def test_create_new_immunizations_returns_none_for_unprocessed_items(self):
+        """it should retry unprocessed items, and return None for those which remain unprocessed"""
+        requests = self.make_new_requests(2)
+        batch_write_item = self.table.meta.client.batch_write_item
+
+        def leave_last_item_unprocessed(**kwargs):
+            request_items = kwargs["RequestItems"][self.table.name]
+            if request_items[:-1]:
+                batch_write_item(RequestItems={self.table.name: request_items[:-1]})
+            return {"UnprocessedItems": {self.table.name: request_items[-1:]}}
+
+        with patch.object(
+            self.table.meta.client, "batch_write_item", side_effect=leave_last_item_unprocessed
+        ) as batch_write_mock:
+            pks = self.repository.create_new_immunizations(requests, self.table)
+
+        self.assertEqual(batch_write_mock.call_count, 3)
+        self.assertIsNotNone(pks[0])
+        self.assertIsNone(pks[1])
+        # The unprocessed request can still be created without querying
+        with patch.object(self.table, "query", wraps=self.table.query) as query_spy:
+            self.repository.create_immunization(requests[1][0], "supplier", "vax-type", self.table, None)
+        query_spy.assert_not_called()
+
+    @patch("repository.fhir_batch_repository.logger.warning")
+    def test_create_new_immunizations_looks_up_identifiers_again_if_batch_write_fails(self, mock_logger_warning):
+        """it should return None for each request and drop the prefetched lookups if BatchWriteItem fails"""
+        requests = self.make_new_requests(2)
+        error = botocore.exceptions.ClientError({"Error": {"Code": "InternalServerError"}}, "BatchWriteItem")
+
+        with patch.object(self.table.meta.client, "batch_write_item", side_effect=error):
+            pks = self.repository.create_new_immunizations(requests, self.table)
+
+        self.assertEqual(pks, [None, None])
+        mock_logger_warning.assert_called_once()
+        with patch.object(self.table, "query", wraps=self.table.query) as query_spy:
+            self.repository.create_immunization(requests[0][0], "supplier", "vax-type", self.table, None)
+        query_spy.assert_called_once()
+
+    @patch("repository.fhir_batch_repository.logger.warning")
+    def test_create_new_immunizations_looks_up_identifiers_again_if_batch_write_cannot_connect(
+        self, mock_logger_warning
+    ):
+        """it should return None for each request and drop the prefetched lookups if BatchWriteItem cannot connect"""
+        requests = self.make_new_requests(2)
+        error = botocore.exceptions.EndpointConnectionError(endpoint_url="https://dynamodb.eu-west-2.amazonaws.com")
+
+        with patch.object(self.table.meta.client, "batch_write_item", side_effect=error):
+            pks = self.repository.create_new_immunizations(requests, self.table)
+
+        self.assertEqual(pks, [None, None])
+        mock_logger_warning.assert_called_once()
+        with patch.object(self.table, "query", wraps=self.table.query) as query_spy:
+            pk = self.repository.create_immunization(requests[0][0], "supplier", "vax-type", self.table, None)
+        query_spy.assert_called_once()
+        self.assertEqual(self.table.get_item(Key={"PK": pk})["Item"]["Operation"], "CREATE")
@@ -143,6 +143,41 @@ class TestCreateImmunizationBatchService(TestFhirBatchServiceBase):
         self.assertEqual(expected_msg, error.exception.message)
         self.mock_repo.create_immunization.assert_not_called()
 
+    def test_create_immunization_skips_validation_when_already_validated(self):
+        """it should not validate the Immunization again if it was validated with the rest of the batch"""
+
+        self.mock_repo.create_immunization.return_value = "an-imms-id"
+
+        result = self.service.create_immunization(
+            immunization=create_covid_immunization_dict_no_id(),
+            supplier_system="test_supplier",
+            vax_type="test_vax",
+            table=self.mock_table,
+            imms_pk=None,
+            validated=True,
+        )
+
+        self.assertEqual(result, "an-imms-id")
+        self.mock_validator.validate.assert_not_called()
+
+    def test_validate_immunizations_returns_validation_errors_in_order(self):
+        """it should return None for each valid Immunization and the CustomValidationError for each invalid one"""
+
+        valid_imms = create_covid_immunization_dict_no_id()
+        invalid_imms = create_covid_immunization_dict_no_id()
+        invalid_imms["status"] = "not-completed"
+        self.mock_redis.hmget.return_value = ["COVID"]
+        self.mock_redis_getter.return_value = self.mock_redis
+
+        results = self.pre_validate_fhir_service.validate_immunizations([valid_imms, invalid_imms, valid_imms])
+
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], CustomValidationError)
+        self.assertEqual(results[1].message, "Validation errors: status must be one of the following: completed")
+        self.assertIsNone(results[2])
+        self.mock_redis.hmget.assert_called_once()
+        self.mock_redis.hget.assert_not_called()
+
 
 class TestUpdateImmunizationBatchService(TestFhirBatchServiceBase):
     def setUp(self):
@@ -2,11 +2,14 @@ import base64
 import copy
 import json
 import os
+import threading
+import time
 import unittest
 from unittest import TestCase
 from unittest.mock import ANY, MagicMock, Mock, patch
 
 from boto3 import resource as boto3_resource
+from botocore.exceptions import ClientError
 from moto import mock_aws
 
 from common.models.errors import (
@@ -25,7 +28,10 @@ with patch.dict("os.environ", ForwarderValues.MOCK_ENVIRONMENT_DICT):
     from forwarding_batch_lambda import (
         create_diagnostics_dictionary,
         forward_lambda_handler,
+        get_forwarding_max_workers,
+        group_messages_by_identifier,
     )
+    from repository import fhir_batch_repository
 
 
 @mock_aws
@@ -222,7 +228,7 @@ class TestForwardLambdaHandler(TestCase):
                 "PatientSK": "RSV#4d2ac1eb-080f-4e54-9598-f2d53334681c",
             }
         )
-        self.mock_redis.hget.return_value = "RSV"
+        self.mock_redis.hmget.return_value = ["RSV"]
         self.mock_redis_getter.return_value = self.mock_redis
 
         test_cases = [
@@ -464,13 +470,16 @@ class TestForwardLambdaHandler(TestCase):
         self.mock_sqs_client.send_message.reset_mock()
         event = self.generate_event(test_cases)
 
-        self.mock_redis.hget.return_value = "RSV"
+        self.mock_redis.hmget.return_value = ["RSV"]
         self.mock_redis_getter.return_value = self.mock_redis
 
         forward_lambda_handler(event, {})
 
         self.assert_dynamo_item(table_item)
         self.assert_values_in_sqs_messages(self.mock_sqs_client.send_message, test_cases)
+        # The vaccine types of the whole batch are read together
+        self.mock_redis.hmget.assert_called_once()
+        self.mock_redis.hget.assert_not_called()
 
     def test_forward_lambda_handler_groups_and_sends_events_by_filename(self):
         """VED-734 - each batch handled by the Lambda may have events relating to different parent CSV files. This
@@ -500,7 +509,7 @@ class TestForwardLambdaHandler(TestCase):
         ]
         mock_kinesis_event = self.generate_event(mock_records)
 
-        self.mock_redis.hget.return_value = "RSV"
+        self.mock_redis.hmget.return_value = ["RSV"]
         self.mock_redis_getter.return_value = self.mock_redis
 
         forward_lambda_handler(mock_kinesis_event, {})
@@ -586,7 +595,7 @@ class TestForwardLambdaHandler(TestCase):
         ]
         mock_kinesis_event = self.generate_event(mock_records)
 
-        self.mock_redis.hget.return_value = "RSV"
+        self.mock_redis.hmget.return_value = ["RSV"]
         self.mock_redis_getter.return_value = self.mock_redis
 
         forward_lambda_handler(mock_kinesis_event, {})
@@ -633,7 +642,7 @@ class TestForwardLambdaHandler(TestCase):
             input: generates the kinesis row data for the event,
             expected_keys (list): expected output dictionary keys,
             expected_values (dict): expected output dictionary values"""
-        self.mock_redis.hget.return_value = "RSV"
+        self.mock_redis.hmget.return_value = ["RSV"]
         self.mock_redis_getter.return_value = self.mock_redis
 
         pk_test_update = "Immunization#4d2ac1eb-080f-4e54-9598-f2d53334687r"
@@ -749,7 +758,7 @@ class TestForwardLambdaHandler(TestCase):
 
     def test_forward_lambda_handler_reinstates_deleted_record_on_create(self):
         """it should treat a create row for a deleted identifier as a reinstate update"""
-        self.mock_redis.hget.return_value = "RSV"
+        self.mock_redis.hmget.return_value = ["RSV"]
         self.mock_redis_getter.return_value = self.mock_redis
 
         pk_test_update = "Immunization#4d2ac1eb-080f-4e54-9598-f2d53334687r"
@@ -867,6 +876,8 @@ class TestForwardLambdaHandler(TestCase):
         """
         mock_create_table.return_value = {}
         mock_make_controller.return_value = MagicMock()
+        mock_make_controller.return_value.validate_requests.return_value = [None]
+        mock_make_controller.return_value.send_new_create_requests_to_dynamo.return_value = [None]
         mock_forward_request_to_dynamo.side_effect = [
             "IMMS123",
         ]
@@ -897,6 +908,136 @@ class TestForwardLambdaHandler(TestCase):
         expected_values = test_case[0]["expected_values"]
         assert expected_values.items() <= call_data.items()
 
+    def test_forward_lambda_handler_writes_new_creates_together(self):
+        """it should write the CREATE rows for new identifiers with one BatchWriteItem, with the same outcomes"""
+        self.table.put_item(
+            Item={
+                "PK": "Immunization#4d2ac1eb-080f-4e54-9598-f2d53334681c",
+                "PatientPK": "Patient#9732928395",
+                "IdentifierPK": "https://www.ravs.england.nhs.uk/#RSV_EXISTING",
+                "Version": 1,
+            }
+        )
+        test_cases = [
+            {"input": self.generate_input(row_id=1, operation_requested="CREATE", identifier_value="RSV_NEW_1")},
+            {
+                "name": "CREATE for an existing identifier",
+                "input": self.generate_input(row_id=2, operation_requested="CREATE", identifier_value="RSV_EXISTING"),
+                "expected_keys": ForwarderValues.EXPECTED_KEYS_DIAGNOSTICS,
+                "expected_values": {
+                    "row_id": "row-2",
+                    "diagnostics": create_diagnostics_dictionary(
+                        IdentifierDuplicationError("https://www.ravs.england.nhs.uk/#RSV_EXISTING")
+                    ),
+                },
+                "is_failure": True,
+            },
+            {"input": self.generate_input(row_id=3, operation_requested="CREATE", identifier_value="RSV_NEW_2")},
+            {"input": self.generate_input(row_id=4, operation_requested="UPDATE", identifier_value="RSV_NEW_2")},
+        ]
+        self.mock_redis.hmget.return_value = ["RSV"]
+        self.mock_redis_getter.return_value = self.mock_redis
+
+        with patch(
+            "repository.fhir_batch_repository._batch_write_items", wraps=fhir_batch_repository._batch_write_items
+        ) as batch_write_spy:
+            forward_lambda_handler(self.generate_event(test_cases), {})
+
+        batch_write_spy.assert_called_once()
+        self.assertEqual(
+            sorted(item["IdentifierPK"] for item in batch_write_spy.call_args.args[1]),
+            ["https://www.ravs.england.nhs.uk/#RSV_NEW_1", "https://www.ravs.england.nhs.uk/#RSV_NEW_2"],
+        )
+        items = {item["IdentifierPK"]: item for item in self.table.scan()["Items"]}
+        self.assertEqual(items["https://www.ravs.england.nhs.uk/#RSV_NEW_1"]["Operation"], "CREATE")
+        self.assertEqual(items["https://www.ravs.england.nhs.uk/#RSV_NEW_2"]["Operation"], "UPDATE")
+        self.assertEqual(items["https://www.ravs.england.nhs.uk/#RSV_NEW_2"]["Version"], 2)
+        self.assert_values_in_sqs_messages(self.mock_sqs_client.send_message, test_cases)
+
+    def test_forward_lambda_handler_writes_new_creates_together_if_prefetched_records_cannot_be_read(self):
+        """it should still write the CREATE rows for new identifiers together if the BatchGetItem of the prefetch fails"""
+        self.table.put_item(
+            Item={
+                "PK": "Immunization#4d2ac1eb-080f-4e54-9598-f2d53334681c",
+                "PatientPK": "Patient#9732928395",
+                "IdentifierPK": "https://www.ravs.england.nhs.uk/#RSV_EXISTING",
+                "Version": 1,
+            }
+        )
+        test_cases = [
+            {"input": self.generate_input(row_id=1, operation_requested="CREATE", identifier_value="RSV_NEW_1")},
+            {
+                "name": "CREATE for an existing identifier",
+                "input": self.generate_input(row_id=2, operation_requested="CREATE", identifier_value="RSV_EXISTING"),
+                "expected_keys": ForwarderValues.EXPECTED_KEYS_DIAGNOSTICS,
+                "expected_values": {
+                    "row_id": "row-2",
+                    "diagnostics": create_diagnostics_dictionary(
+                        IdentifierDuplicationError("https://www.ravs.england.nhs.uk/#RSV_EXISTING")
+                    ),
+                },
+                "is_failure": True,
+            },
+            {"input": self.generate_input(row_id=3, operation_requested="CREATE", identifier_value="RSV_NEW_2")},
+        ]
+        self.mock_redis.hmget.return_value = ["RSV"]
+        self.mock_redis_getter.return_value = self.mock_redis
+        access_denied = ClientError({"Error": {"Code": "AccessDeniedException"}}, "BatchGetItem")
+
+        with (
+            patch("repository.fhir_batch_repository._batch_get_items", side_effect=access_denied),
+            patch(
+                "repository.fhir_batch_repository._batch_write_items", wraps=fhir_batch_repository._batch_write_items
+            ) as batch_write_spy,
+        ):
+            forward_lambda_handler(self.generate_event(test_cases), {})
+
+        batch_write_spy.assert_called_once()
+        self.assertEqual(
+            sorted(item["IdentifierPK"] for item in batch_write_spy.call_args.args[1]),
+            ["https://www.ravs.england.nhs.uk/#RSV_NEW_1", "https://www.ravs.england.nhs.uk/#RSV_NEW_2"],
+        )
+        self.assertEqual(len(self.table.scan()["Items"]), 3)
+        self.assert_values_in_sqs_messages(self.mock_sqs_client.send_message, test_cases)
+
+    def test_forward_lambda_handler_does_not_report_repeats_of_rows_sent_before_resuming(self):
+        """it should not report a repeated CREATE or DELETE as a failure for a row which may already have been sent"""
+        self.table.put_item(
+            Item={
+                "PK": "Immunization#4d2ac1eb-080f-4e54-9598-f2d53334681c",
+                "PatientPK": "Patient#9732928395",
+                "IdentifierPK": "https://www.ravs.england.nhs.uk/#RSV_EXISTING",
+                "Version": 1,
+            }
+        )
+        test_cases = [
+            {"input": self.generate_input(row_id=2, operation_requested="CREATE", identifier_value="RSV_EXISTING")},
+            {"input": self.generate_input(row_id=3, operation_requested="DELETE", identifier_value="RSV_MISSING")},
+            {
+                "name": "CREATE for an existing identifier after the rows which may have been sent",
+                "input": self.generate_input(row_id=502, operation_requested="CREATE", identifier_value="RSV_EXISTING"),
+                "expected_keys": ForwarderValues.EXPECTED_KEYS_DIAGNOSTICS,
+                "expected_values": {
+                    "row_id": "test_file_id^502",
+                    "diagnostics": create_diagnostics_dictionary(
+                        IdentifierDuplicationError("https://www.ravs.england.nhs.uk/#RSV_EXISTING")
+                    ),
+                },
+                "is_failure": True,
+            },
+        ]
+        for test_case in test_cases:
+            test_case["input"]["row_id"] = f"test_file_id^{test_case['input']['row_id'].removeprefix('row-')}"
+            test_case["input"]["possibly_sent_up_to_row"] = 501
+        self.mock_redis.hmget.return_value = ["RSV"]
+        self.mock_redis_getter.return_value = self.mock_redis
+
+        forward_lambda_handler(self.generate_event(test_cases), {})
+
+        self.mock_sqs_client.send_message.assert_called_once()
+        self.assertEqual(len(json.loads(self.mock_sqs_client.send_message.call_args.kwargs["MessageBody"])), 1)
+        self.assert_values_in_sqs_messages(self.mock_sqs_client.send_message, test_cases)
+
     def test_forward_lambda_handler_exception_handler(self):
         """Test exception handling when sqs_client fails"""
         # Arrange
@@ -930,7 +1071,7 @@ class TestForwardLambdaHandler(TestCase):
 
         event = self.generate_event(test_cases)
 
-        self.mock_redis.hget.return_value = "RSV"
+        self.mock_redis.hmget.return_value = ["RSV"]
         self.mock_redis_getter.return_value = self.mock_redis
 
         # Act & Assert
@@ -940,5 +1081,105 @@ class TestForwardLambdaHandler(TestCase):
         self.assertEqual("Unknown Exception in SQS client", str(context.exception))
 
 
+@mock_aws
+@patch.dict(os.environ, {**ForwarderValues.MOCK_ENVIRONMENT_DICT, "FORWARDING_MAX_WORKERS": "4"})
+class TestForwardLambdaHandlerConcurrent(TestForwardLambdaHandler):
+    """Runs the forward lambda handler tests again with records for different identifiers forwarded concurrently"""
+
+    def test_forward_lambda_handler_forwards_identifiers_concurrently_and_each_identifier_in_order(self):
+        """it should forward different identifiers on different threads, and the rows for one identifier in order"""
+        test_cases = [
+            {"input": self.generate_input(row_id=1, operation_requested="UPDATE", identifier_value="RSV_A")},
+            {"input": self.generate_input(row_id=2, operation_requested="UPDATE", identifier_value="RSV_B")},
+            {"input": self.generate_input(row_id=3, operation_requested="UPDATE", identifier_value="RSV_A")},
+            {"input": self.generate_input(row_id=4, operation_requested="DELETE", identifier_value="RSV_A")},
+        ]
+        calls = []
+        self.mock_redis.hmget.return_value = ["RSV"]
+        self.mock_redis_getter.return_value = self.mock_redis
+
+        def record_call(message_body, _table, imms_pk, _controller, validated):
+            calls.append((message_body["row_id"], imms_pk, threading.current_thread().name))
+            return f"Immunization#{message_body['row_id']}"
+
+        with patch("forwarding_batch_lambda.forward_request_to_dynamo", side_effect=record_call):
+            forward_lambda_handler(self.generate_event(test_cases), {})
+
+        identifier_a_calls = [call for call in calls if call[0] != "row-2"]
+        self.assertEqual(
+            [call[:2] for call in identifier_a_calls],
+            [("row-1", None), ("row-3", "Immunization#row-1"), ("row-4", "Immunization#row-3")],
+        )
+        self.assertEqual(len({call[2] for call in identifier_a_calls}), 1)
+        self.assertNotIn(threading.main_thread().name, {call[2] for call in calls})
+
+    def test_forward_lambda_handler_does_not_share_a_table_between_threads(self):
+        """it should only use each Table on one thread at a time, as boto3 resources are not thread safe"""
+        test_cases = [
+            {"input": self.generate_input(row_id=row_id, operation_requested="UPDATE", identifier_value=f"RSV_{row_id}")}
+            for row_id in range(1, 9)
+        ]
+        self.mock_redis.hmget.return_value = ["RSV"]
+        self.mock_redis_getter.return_value = self.mock_redis
+        tables_in_use = set()
+        tables_used = []
+        created_tables = []
+        lock = threading.Lock()
+
+        def create_table():
+            created_tables.append(fhir_batch_repository.create_table())
+            return created_tables[-1]
+
+        def record_call(message_body, table, _imms_pk, _controller, validated):
+            with lock:
+                self.assertNotIn(id(table), tables_in_use)
+                tables_in_use.add(id(table))
+                tables_used.append(id(table))
+            time.sleep(0.01)
+            with lock:
+                tables_in_use.remove(id(table))
+            return f"Immunization#{message_body['row_id']}"
+
+        with (
+            patch("forwarding_batch_lambda.forward_request_to_dynamo", side_effect=record_call),
+            patch("forwarding_batch_lambda.create_table", side_effect=create_table),
+            patch("forwarding_batch_lambda._worker_tables", []),
+        ):
+            forward_lambda_handler(self.generate_event(test_cases), {})
+            # The worker Tables are kept for the next invocation
+            forward_lambda_handler(self.generate_event(test_cases), {})
+
+        # One Table is created for each invocation, and one for each worker by the first invocation only
+        self.assertEqual(len(created_tables), 2 + 4)
+        self.assertEqual(len(tables_used), 16)
+        self.assertEqual(set(tables_used), {id(table) for table in created_tables[1:5]})
+
+
+class TestForwardingConcurrencyHelpers(TestCase):
+    def test_get_forwarding_max_workers(self):
+        for value, expected in (("8", 8), ("0", 1), ("not-a-number", 1)):
+            with self.subTest(value=value), patch.dict(os.environ, {"FORWARDING_MAX_WORKERS": value}):
+                self.assertEqual(get_forwarding_max_workers(), expected)
+
+        with patch.dict(os.environ, clear=True):
+            self.assertEqual(get_forwarding_max_workers(), 1)
+
+    def test_group_messages_by_identifier(self):
+        def message(identifier_value):
+            return {"fhir_json": {"identifier": [{"system": "a-system", "value": identifier_value}]}}
+
+        messages = [
+            message("A"),
+            message("B"),
+            {"diagnostics": {"statusCode": 400}},
+            message("A"),
+            {"message": "EOF", "row_count": 5},
+            {"fhir_json": {}},
+            message("B"),
+        ]
+
+        self.assertEqual(group_messages_by_identifier(messages), [[0, 3], [1, 6], [2], [5]])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,20 +3,24 @@
 import json
 import os
 import time
+from collections.abc import Iterator
 from csv import DictReader
+from functools import partial
 from json import JSONDecodeError
 
+from checkpoint import ProcessingCheckpointer
 from common.aws_s3_utils import move_file
-from common.batch.audit_table import update_audit_table_item
+from common.batch.audit_table import get_processing_checkpoint_by_message_id, update_audit_table_item
 from common.batch.eof_utils import make_batch_eof_message
 from common.clients import logger
 from common.models.batch_constants import SOURCE_BUCKET_NAME, AuditTableKeys, FileStatus
-from constants import ARCHIVE_DIR_NAME, PROCESSING_DIR_NAME
-from file_level_validation import file_is_empty, file_level_validation
+from common.redis_cache import get_redis_cache_stats
+from constants import ARCHIVE_DIR_NAME, KINESIS_PUT_RECORDS_MAX_RECORDS, PROCESSING_DIR_NAME
+from file_level_validation import file_is_empty, file_level_validation, get_resumed_message_body
 from mappings import map_target_disease
 from process_row import process_row
-from send_to_kinesis import send_to_kinesis
-from utils_for_recordprocessor import get_csv_content_dict_reader
+from row_pipeline import convert_rows_to_kinesis_messages, get_row_processing_workers, run_row_pipeline
+from send_to_kinesis import KinesisRecordBatcher, send_to_kinesis
 
 
 def process_csv_to_fhir(incoming_message_body: dict) -> int:
@@ -26,13 +30,21 @@ def process_csv_to_fhir(incoming_message_body: dict) -> int:
     Returns the number of rows processed. While this is not used by the handler, the number of rows
     processed must be correct and therefore is returned for logging and test purposes.
     """
-    encoder = "utf-8"  # default encoding
-    try:
-        incoming_message_body["encoder"] = encoder
-        interim_message_body = file_level_validation(incoming_message_body=incoming_message_body)
-    except Exception as e:  # pylint: disable=broad-exception-caught
-        logger.error(f"File level validation failed: {e}")  # If the file is invalid, processing should cease
-        return 0
+    message_id = incoming_message_body.get("message_id")
+    checkpoint = _get_processing_checkpoint(message_id) if message_id else None
+
+    if checkpoint:
+        # The file has already passed file level validation, and processing was interrupted part way through
+        rows_already_sent, byte_offset = checkpoint
+        logger.info("Resuming processing of file after row %s (byte offset %s)", rows_already_sent, byte_offset)
+        interim_message_body = get_resumed_message_body(incoming_message_body, byte_offset)
+    else:
+        rows_already_sent = 0
+        try:
+            interim_message_body = file_level_validation(incoming_message_body=incoming_message_body)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"File level validation failed: {e}")  # If the file is invalid, processing should cease
+            return 0
 
     file_id = interim_message_body.get("message_id")
     vaccine = interim_message_body.get("vaccine")
@@ -44,7 +56,7 @@ def process_csv_to_fhir(incoming_message_body: dict) -> int:
 
     target_disease = map_target_disease(vaccine)
 
-    row_count, err = process_rows(
+    row_count = process_rows(
         file_id,
         vaccine,
         supplier,
@@ -53,34 +65,10 @@ def process_csv_to_fhir(incoming_message_body: dict) -> int:
         created_at_formatted_string,
         csv_reader,
         target_disease,
+        rows_already_sent,
+        ProcessingCheckpointer(file_key, file_id, rows_already_sent),
     )
 
-    if err:
-        if isinstance(err, UnicodeDecodeError):
-            """resolves encoding issue VED-754"""
-            logger.warning(f"Encoding Error: {err}.")
-            new_encoder = "cp1252"
-            logger.info(f"Encode error at row {row_count} with {encoder}. Switch to {new_encoder}")
-            encoding = new_encoder
-
-            # load alternative encoder
-            csv_reader = get_csv_content_dict_reader(f"{PROCESSING_DIR_NAME}/{file_key}", encoding=encoding)
-            # re-read the file and skip processed rows
-            row_count, err = process_rows(
-                file_id,
-                vaccine,
-                supplier,
-                file_key,
-                allowed_operations,
-                created_at_formatted_string,
-                csv_reader,
-                target_disease,
-                row_count,
-            )
-        else:
-            logger.error(f"Row Processing error: {err}")
-            raise err
-
     if file_is_empty(row_count):
         logger.warning("File was empty: %s. Moving file to archive directory.", file_key)
         move_file(
@@ -113,6 +101,58 @@ def process_csv_to_fhir(incoming_message_body: dict) -> int:
     return row_count
 
 
+def _get_processing_checkpoint(message_id: str) -> tuple[int, int] | None:
+    """
+    Returns the checkpoint saved for the file, or None if there is none. If the checkpoint cannot be read, the file is
+    processed from the start rather than failed.
+    """
+    try:
+        return get_processing_checkpoint_by_message_id(message_id)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        logger.warning("Unable to read the processing checkpoint, so processing from the start of the file: %s", error)
+        return None
+
+
+class _RowsToProcess:
+    """
+    Iterates over the row_id and content of each row in the csv_reader, which starts after the given number of rows.
+    If a checkpointer is given, the byte offset of each row read is recorded with it.
+    """
+
+    def __init__(
+        self,
+        csv_reader: DictReader,
+        file_id: str,
+        start_row: int,
+        checkpointer: ProcessingCheckpointer | None = None,
+    ):
+        self.csv_reader = csv_reader
+        self.file_id = file_id
+        self.start_row = start_row
+        self.checkpointer = checkpointer
+        self.rows_read = 0
+
+    def __iter__(self) -> Iterator[tuple[str, dict]]:
+        row_count = self.start_row
+        for row in self.csv_reader:
+            row_count += 1
+            row_id = f"{self.file_id}^{row_count}"
+            logger.info("MESSAGE ID : %s", row_id)
+            # Log progress every 1000 rows and the first 10 rows after a restart
+            if (row_count - 1) % 1000 == 0:
+                logger.info(f"Process: {row_count}")
+            if self.start_row > 0 and row_count <= self.start_row + 10:
+                logger.info(f"Restarted Process (log up to first 10): {row_count}")
+            if self.checkpointer:
+                self.checkpointer.record_row_read(row_count, self.csv_reader.byte_offset)
+            self.rows_read += 1
+            yield row_id, row
+
+
+def _record_rows_sent(checkpointer: ProcessingCheckpointer, start_row: int, records_sent: int) -> None:
+    checkpointer.record_rows_sent(start_row + records_sent)
+
+
 # Process the row to obtain the details needed for the message_body and ack file
 def process_rows(
     file_id: str,
@@ -124,40 +164,51 @@ def process_rows(
     csv_reader: DictReader,
     target_disease: list[dict],
     total_rows_processed_count: int = 0,
-) -> tuple[int, Exception | None]:
+    checkpointer: ProcessingCheckpointer | None = None,
+) -> int:
     """
-    Processes each row in the csv_reader starting from start_row.
+    Processes each row in the csv_reader, which starts after total_rows_processed_count rows of the file, and returns
+    the total number of rows processed. Row messages are sent to Kinesis in batches, all of which have been sent by the
+    time this function returns.
+    When resuming part way through the file, the rows of the first batch may already have been sent before processing
+    was interrupted, so each message gives the last row which may have been, for the forwarder to allow for repeats.
+    If ROW_PROCESSING_WORKERS is greater than 1, rows are converted by a pool of worker processes while the file is
+    read, otherwise each row is converted in turn. Either way, messages are sent in row order.
     """
-    row_count = 0
-    start_row = total_rows_processed_count
-    try:
-        for row in csv_reader:
-            row_count += 1
-            if row_count > start_row:
-                row_id = f"{file_id}^{row_count}"
-                logger.info("MESSAGE ID : %s", row_id)
-                # Log progress every 1000 rows and the first 10 rows after a restart
-                if total_rows_processed_count % 1000 == 0:
-                    logger.info(f"Process: {total_rows_processed_count + 1}")
-                if start_row > 0 and row_count <= start_row + 10:
-                    logger.info(f"Restarted Process (log up to first 10): {total_rows_processed_count + 1}")
-                # Process the row to obtain the details needed for the message_body and ack file
-                details_from_processing = process_row(target_disease, allowed_operations, row)
-                # Create the message body for sending
-                outgoing_message_body = {
-                    "row_id": row_id,
-                    "file_key": file_key,
-                    "supplier": supplier,
-                    "vax_type": vaccine,
-                    "created_at_formatted_string": created_at_formatted_string,
-                    **details_from_processing,
-                }
-                send_to_kinesis(supplier, outgoing_message_body, vaccine)
-                total_rows_processed_count += 1
-    except UnicodeDecodeError as error:  # pylint: disable=broad-exception-caught
-        return total_rows_processed_count, error
-
-    return total_rows_processed_count, None
+    kinesis_batcher = KinesisRecordBatcher(
+        supplier,
+        vaccine,
+        on_flush=partial(_record_rows_sent, checkpointer, total_rows_processed_count) if checkpointer else None,
+    )
+    message_details = {
+        "file_key": file_key,
+        "supplier": supplier,
+        "vax_type": vaccine,
+        "created_at_formatted_string": created_at_formatted_string,
+    }
+    if total_rows_processed_count > 0:
+        message_details["possibly_sent_up_to_row"] = total_rows_processed_count + KINESIS_PUT_RECORDS_MAX_RECORDS
+    rows_to_process = _RowsToProcess(csv_reader, file_id, total_rows_processed_count, checkpointer)
+    row_processing_workers = get_row_processing_workers()
+
+    if row_processing_workers > 1:
+        run_row_pipeline(
+            rows_to_process,
+            partial(convert_rows_to_kinesis_messages, message_details, target_disease, allowed_operations),
+            lambda encoded_message: kinesis_batcher.add_encoded(*encoded_message),
+            row_processing_workers,
+        )
+    else:
+        for row_id, row in rows_to_process:
+            # Process the row to obtain the details needed for the message_body and ack file
+            details_from_processing = process_row(target_disease, allowed_operations, row)
+            kinesis_batcher.add({"row_id": row_id, **message_details, **details_from_processing})
+
+    # The last batch is only sent once every row has been processed, so that an error sending it cannot hide an error
+    # raised while processing the rows
+    kinesis_batcher.flush()
+    kinesis_batcher.log_summary()
+    return total_rows_processed_count + rows_to_process.rows_read
 
 
 def main(event: str) -> None:
@@ -191,6 +242,7 @@ def main(event: str) -> None:
     end = time.time()
     logger.info("Total rows processed: %s", n_rows_processed)
     logger.info("Total time for completion: %ss", round(end - start, 5))
+    logger.info("Redis cache: %s", get_redis_cache_stats())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+"""Checkpointing of progress through a batch file, so that a restarted task can resume part way through the file"""
+
+from collections import deque
+
+from common.batch.audit_table import update_audit_table_item
+from common.clients import logger
+from common.models.batch_constants import AuditTableKeys
+
+
+class ProcessingCheckpointer:
+    """
+    Saves the number of rows which have been sent to Kinesis, and the byte offset of the end of the last of those rows,
+    on the audit table item for the file.
+    The byte offset of each row is recorded as the row is read, and a checkpoint is saved each time a Kinesis batch
+    has been sent, so at most one batch of rows is sent again if processing is resumed. The messages for those rows are
+    marked as possibly sent already, and the forwarder does not report a repeated CREATE (a duplicate) or DELETE (not
+    found) for them as a failure. A repeated UPDATE is applied again as a new version.
+    """
+
+    def __init__(self, file_key: str, message_id: str, rows_already_sent: int = 0):
+        self.file_key = file_key
+        self.message_id = message_id
+        self.last_checkpoint_row_count = rows_already_sent
+        self.row_byte_offsets: deque[tuple[int, int]] = deque()
+
+    def record_row_read(self, row_number: int, byte_offset: int) -> None:
+        """Records the byte offset of the end of the given row"""
+        self.row_byte_offsets.append((row_number, byte_offset))
+
+    def record_rows_sent(self, total_rows_sent: int) -> None:
+        """Saves a checkpoint if any rows have been sent since the last one"""
+        if total_rows_sent <= self.last_checkpoint_row_count:
+            return
+
+        byte_offset = None
+        while self.row_byte_offsets and self.row_byte_offsets[0][0] <= total_rows_sent:
+            _row_number, byte_offset = self.row_byte_offsets.popleft()
+
+        if byte_offset is None:
+            return
+
+        update_audit_table_item(
+            file_key=self.file_key,
+            message_id=self.message_id,
+            attrs_to_update={
+                AuditTableKeys.CHECKPOINT_ROW_COUNT: total_rows_sent,
+                AuditTableKeys.CHECKPOINT_BYTE_OFFSET: byte_offset,
+            },
+        )
+        self.last_checkpoint_row_count = total_rows_sent
+        logger.info("Checkpoint saved at row %s (byte offset %s)", total_rows_sent, byte_offset)
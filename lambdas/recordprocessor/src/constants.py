@@ -3,6 +3,21 @@
 ARCHIVE_DIR_NAME = "archive"
 PROCESSING_DIR_NAME = "processing"
 
+# Batch files are expected to be utf-8, but some suppliers send cp1252 (see VED-754)
+DEFAULT_ENCODING = "utf-8"
+FALLBACK_ENCODING = "cp1252"
+CSV_READ_CHUNK_SIZE = 1024 * 1024
+
+# Kinesis PutRecords limits and retry settings
+KINESIS_PUT_RECORDS_MAX_RECORDS = 500
+KINESIS_PUT_RECORDS_MAX_BYTES = 5 * 1024 * 1024
+KINESIS_PUT_RECORDS_MAX_ATTEMPTS = 5
+KINESIS_PUT_RECORDS_BASE_BACKOFF_SECONDS = 0.1
+
+# Number of rows sent to a worker process at a time, and how many chunks each worker may have queued
+ROW_PIPELINE_CHUNK_SIZE = 100
+ROW_PIPELINE_MAX_PENDING_CHUNKS_PER_WORKER = 4
+
 EXPECTED_CSV_HEADERS = [
     "NHS_NUMBER",
     "PERSON_FORENAME",
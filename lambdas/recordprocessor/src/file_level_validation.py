@@ -81,10 +81,9 @@ def file_level_validation(incoming_message_body: dict) -> dict:
         file_key = incoming_message_body.get("filename")
         permission = incoming_message_body.get("permission")
         created_at_formatted_string = incoming_message_body.get("created_at_formatted_string")
-        encoding = incoming_message_body.get("encoding", "utf-8")
 
         # Fetch the data
-        csv_reader = get_validated_csv_reader(file_key, encoding=encoding)
+        csv_reader = get_validated_csv_reader(file_key)
 
         # Validate has permission to perform at least one of the requested actions
         allowed_operations_set = get_permitted_operations(supplier, vaccine, permission)
@@ -119,18 +118,33 @@ def file_level_validation(incoming_message_body: dict) -> dict:
         raise
 
 
-def get_validated_csv_reader(file_key: str, encoding: str = "utf-8") -> DictReader:
-    """Helper function to get a validated CSV DictReader object."""
-    try:
-        csv_reader = get_csv_content_dict_reader(file_key, encoding=encoding)
-        validate_content_headers(csv_reader)
-        return csv_reader
-    except UnicodeDecodeError as e:
-        logger.warning("Invalid Encoding detected: %s", e)
-        # Retry using cp-1252 encoding if the expected utf-8 fails
-        # This is a known issue with a supplier - see VED-754 for details
-        csv_reader = get_csv_content_dict_reader(file_key, encoding="cp1252")
+def get_resumed_message_body(incoming_message_body: dict, byte_offset: int) -> dict:
+    """
+    Returns the interim message body for resuming row level processing of a file which has already passed file level
+    validation and been moved to the processing folder. The csv reader starts from the given byte offset.
+    """
+    message_id = incoming_message_body.get("message_id")
+    vaccine = incoming_message_body.get("vaccine_type").upper()
+    supplier = incoming_message_body.get("supplier").upper()
+    file_key = incoming_message_body.get("filename")
+    permission = incoming_message_body.get("permission")
+
+    return {
+        "message_id": message_id,
+        "vaccine": vaccine,
+        "supplier": supplier,
+        "file_key": file_key,
+        "allowed_operations": get_permitted_operations(supplier, vaccine, permission),
+        "created_at_formatted_string": incoming_message_body.get("created_at_formatted_string"),
+        "csv_dict_reader": get_csv_content_dict_reader(
+            f"{PROCESSING_DIR_NAME}/{file_key}", byte_offset=byte_offset, fieldnames=EXPECTED_CSV_HEADERS
+        ),
+    }
+
 
+def get_validated_csv_reader(file_key: str) -> DictReader:
+    """Helper function to get a validated CSV DictReader object."""
+    csv_reader = get_csv_content_dict_reader(file_key)
     validate_content_headers(csv_reader)
     return csv_reader
 
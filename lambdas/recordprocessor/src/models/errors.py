@@ -7,3 +7,7 @@ class NoOperationPermissions(Exception):
 
 class InvalidHeaders(Exception):
     """A custom exception for when the file headers are invalid."""
+
+
+class KinesisBatchSendError(Exception):
+    """A custom exception for when records in a batch are still rejected by Kinesis after all retries."""
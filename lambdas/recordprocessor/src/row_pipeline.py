@@ -0,0 +1,83 @@
+"""
+Staged pipeline for converting csv rows into Kinesis messages across multiple worker processes.
+The calling process reads the rows, a pool of worker processes converts chunks of rows into encoded messages, and
+the converted chunks are passed to the sink in the same order in which the rows were read.
+"""
+
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from constants import ROW_PIPELINE_CHUNK_SIZE, ROW_PIPELINE_MAX_PENDING_CHUNKS_PER_WORKER
+from process_row import process_row
+from send_to_kinesis import encode_kinesis_message, get_ordering_key
+
+
+def get_row_processing_workers() -> int:
+    """
+    Returns the number of worker processes to use for converting rows, as set by the ROW_PROCESSING_WORKERS environment
+    variable. A value of 1 (the default) means rows are converted serially in the calling process.
+    """
+    try:
+        return max(int(os.getenv("ROW_PROCESSING_WORKERS", "1")), 1)
+    except ValueError:
+        return 1
+
+
+def convert_rows_to_kinesis_messages(
+    message_details: dict, target_disease: list, allowed_operations: set, rows: list[tuple[str, dict]]
+) -> list[tuple[bytes, str | None]]:
+    """
+    Processes each (row_id, row) pair and returns the encoded Kinesis message for each row, with its ordering key, in
+    the same order
+    """
+    messages = []
+    for row_id, row in rows:
+        message_body = {"row_id": row_id, **message_details, **process_row(target_disease, allowed_operations, row)}
+        messages.append((encode_kinesis_message(message_body), get_ordering_key(message_body)))
+    return messages
+
+
+def _chunk_rows(rows: Iterable[tuple[str, dict]], chunk_size: int) -> Iterator[list[tuple[str, dict]]]:
+    """Yields lists of up to chunk_size rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _sink_converted_chunks(pending_chunks: deque[Future], sink: Callable[[Any], None], max_pending: int) -> None:
+    """Passes the oldest converted chunks to the sink until no more than max_pending chunks are outstanding"""
+    while len(pending_chunks) > max_pending:
+        for message in pending_chunks.popleft().result():
+            sink(message)
+
+
+def run_row_pipeline(
+    rows: Iterable[tuple[str, dict]],
+    convert_rows: Callable[[list[tuple[str, dict]]], list[Any]],
+    sink: Callable[[Any], None],
+    workers: int,
+) -> None:
+    """
+    Converts the rows using a pool of worker processes and passes each converted message to the sink in row order.
+    The number of chunks read ahead of the sink is bounded so that memory use does not grow with the file size.
+    """
+    max_pending = workers * ROW_PIPELINE_MAX_PENDING_CHUNKS_PER_WORKER
+    pending_chunks: deque[Future] = deque()
+    executor = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        for chunk in _chunk_rows(rows, ROW_PIPELINE_CHUNK_SIZE):
+            pending_chunks.append(executor.submit(convert_rows, chunk))
+            _sink_converted_chunks(pending_chunks, sink, max_pending)
+        _sink_converted_chunks(pending_chunks, sink, 0)
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -1,11 +1,20 @@
-"""Function to send the message to kinesis"""
+"""Functions and classes to send messages to kinesis"""
 
 import os
+import time
+from collections.abc import Callable
 
 import simplejson as json
 from botocore.exceptions import ClientError
 
 from common.clients import get_kinesis_client, logger
+from constants import (
+    KINESIS_PUT_RECORDS_BASE_BACKOFF_SECONDS,
+    KINESIS_PUT_RECORDS_MAX_ATTEMPTS,
+    KINESIS_PUT_RECORDS_MAX_BYTES,
+    KINESIS_PUT_RECORDS_MAX_RECORDS,
+)
+from models.errors import KinesisBatchSendError
 
 
 def send_to_kinesis(supplier: str, message_body: dict, vaccine_type: str) -> bool:
@@ -21,3 +30,141 @@ def send_to_kinesis(supplier: str, message_body: dict, vaccine_type: str) -> boo
     except ClientError as error:
         logger.error("Error sending message to Kinesis: %s", error)
         raise
+
+
+def encode_kinesis_message(message_body: dict) -> bytes:
+    """Returns the message body encoded as it should be sent to Kinesis"""
+    return json.dumps(message_body, ensure_ascii=False).encode("utf-8")
+
+
+def get_ordering_key(message_body: dict) -> str | None:
+    """
+    Returns the identifier of the immunization in the message, which the forwarder processes the rows for in stream
+    order, or None if the message does not have one
+    """
+    try:
+        identifier = message_body["fhir_json"]["identifier"][0]
+        return f"{identifier['system']}#{identifier['value']}"
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+class KinesisRecordBatcher:
+    """
+    Buffers row messages for a single supplier and vaccine type and sends them to Kinesis using PutRecords.
+    A batch is sent once adding another record would exceed the PutRecords record count or payload size limits, or
+    before adding a record with the same ordering key (immunization identifier) as a record already in the batch.
+    Records rejected by Kinesis (e.g. due to throttling) are retried with exponential backoff, and the next batch is
+    not sent until they have succeeded. A retried record lands after the other records which succeeded in the same
+    request, but as none of those are for the same immunization, the rows for each immunization stay in file order.
+    The caller must call flush once all rows have been added, and before sending the EOF message.
+    If on_flush is given, it is called with the total number of records sent after each batch has been sent.
+    """
+
+    def __init__(self, supplier: str, vaccine_type: str, on_flush: Callable[[int], None] | None = None):
+        self.partition_key = f"{supplier}_{vaccine_type}"
+        self.on_flush = on_flush
+        self.pending_records: list[dict] = []
+        self.pending_bytes = 0
+        self.pending_ordering_keys: set[str] = set()
+        self.batches_sent = 0
+        self.records_sent = 0
+        self.throttled_records = 0
+        self.total_send_time = 0.0
+
+    def add(self, message_body: dict) -> None:
+        """Adds the message to the buffer, sending the buffered batch first if the message cannot join it"""
+        self.add_encoded(encode_kinesis_message(message_body), get_ordering_key(message_body))
+
+    def add_encoded(self, data: bytes, ordering_key: str | None = None) -> None:
+        """
+        Adds an already encoded message, with the ordering key returned by get_ordering_key for it, to the buffer,
+        sending the buffered batch first if the message cannot join it
+        """
+        record_size = len(data) + len(self.partition_key.encode("utf-8"))
+
+        if self.pending_records and (
+            len(self.pending_records) >= KINESIS_PUT_RECORDS_MAX_RECORDS
+            or self.pending_bytes + record_size > KINESIS_PUT_RECORDS_MAX_BYTES
+            or ordering_key in self.pending_ordering_keys
+        ):
+            self.flush()
+
+        self.pending_records.append({"Data": data, "PartitionKey": self.partition_key})
+        self.pending_bytes += record_size
+        if ordering_key is not None:
+            self.pending_ordering_keys.add(ordering_key)
+
+    def flush(self) -> None:
+        """Sends all buffered records to Kinesis"""
+        if not self.pending_records:
+            return
+
+        records = self.pending_records
+        self.pending_records = []
+        self.pending_bytes = 0
+        self.pending_ordering_keys = set()
+
+        start_time = time.time()
+        throttled_count = self._put_records_with_retry(records)
+        batch_time = time.time() - start_time
+
+        self.batches_sent += 1
+        self.records_sent += len(records)
+        self.throttled_records += throttled_count
+        self.total_send_time += batch_time
+        logger.info(
+            "Sent batch of %s records to Kinesis in %sms (%s throttled)",
+            len(records),
+            round(batch_time * 1000, 2),
+            throttled_count,
+        )
+
+        if self.on_flush:
+            self.on_flush(self.records_sent)
+
+    def log_summary(self) -> None:
+        """Logs the totals for all batches sent by this batcher"""
+        logger.info(
+            "Kinesis totals: %s records in %s batches, %s throttled, %ss spent sending",
+            self.records_sent,
+            self.batches_sent,
+            self.throttled_records,
+            round(self.total_send_time, 5),
+        )
+
+    def _put_records_with_retry(self, records: list[dict]) -> int:
+        """
+        Sends the records with PutRecords, resending only the failed entries until all succeed.
+        Returns the number of entries which were rejected because the stream's throughput was exceeded.
+        Raises a KinesisBatchSendError if any records still fail after the maximum number of attempts.
+        """
+        throttled_count = 0
+
+        for attempt in range(KINESIS_PUT_RECORDS_MAX_ATTEMPTS):
+            if attempt > 0:
+                time.sleep(KINESIS_PUT_RECORDS_BASE_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+            try:
+                response = get_kinesis_client().put_records(
+                    StreamName=os.getenv("KINESIS_STREAM_NAME"),
+                    StreamARN=os.getenv("KINESIS_STREAM_ARN"),
+                    Records=records,
+                )
+            except ClientError as error:
+                logger.error("Error sending batch of messages to Kinesis: %s", error)
+                raise
+
+            if not response.get("FailedRecordCount"):
+                return throttled_count
+
+            results = list(zip(records, response["Records"], strict=True))
+            records = [record for record, result in results if result.get("ErrorCode")]
+            throttled_count += sum(
+                result.get("ErrorCode") == "ProvisionedThroughputExceededException" for _record, result in results
+            )
+            logger.warning("%s records were rejected by Kinesis on attempt %s", len(records), attempt + 1)
+
+        raise KinesisBatchSendError(
+            f"{len(records)} records could not be sent to Kinesis after {KINESIS_PUT_RECORDS_MAX_ATTEMPTS} attempts"
+        )
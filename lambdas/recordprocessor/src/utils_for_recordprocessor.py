@@ -1,10 +1,12 @@
 """Utils for filenameprocessor lambda"""
 
 import os
+from collections.abc import Iterator
 from csv import DictReader
-from io import TextIOWrapper
+from typing import BinaryIO
 
-from common.clients import get_s3_client
+from common.clients import get_s3_client, logger
+from constants import CSV_READ_CHUNK_SIZE, DEFAULT_ENCODING, FALLBACK_ENCODING
 
 
 def get_environment() -> str:
@@ -14,12 +16,87 @@ def get_environment() -> str:
     return _env if _env in ["internal-dev", "int", "ref", "sandbox", "prod"] else "internal-dev"
 
 
-def get_csv_content_dict_reader(file_key: str, encoding="utf-8") -> DictReader:
-    """Returns the requested file contents from the source bucket in the form of a DictReader"""
-    response = get_s3_client().get_object(Bucket=os.getenv("SOURCE_BUCKET_NAME"), Key=file_key)
-    binary_io = response["Body"]
-    text_io = TextIOWrapper(binary_io, encoding=encoding, newline="")
-    return DictReader(text_io, delimiter="|")
+class DecodedLines:
+    """
+    Reads a binary stream in chunks and iterates over each line (including its line ending) as a string.
+    Each line is decoded with the given encoding, falling back to the fallback_encoding for any line which cannot be
+    decoded. This is a known issue with a supplier - see VED-754 for details. Decoding line by line means that an
+    invalid byte late in the file does not require the file to be downloaded and read again.
+    The byte_offset is the position in the file of the end of the last line returned, so that reading can be resumed
+    from that point.
+    """
+
+    def __init__(
+        self,
+        binary_io: BinaryIO,
+        encoding: str = DEFAULT_ENCODING,
+        fallback_encoding: str = FALLBACK_ENCODING,
+        start_byte_offset: int = 0,
+    ):
+        self.binary_io = binary_io
+        self.encoding = encoding
+        self.fallback_encoding = fallback_encoding
+        self.byte_offset = start_byte_offset
+
+    def __iter__(self) -> Iterator[str]:
+        fallback_line_count = 0
+        line_number = 0
+        pending = b""
+
+        while True:
+            chunk = self.binary_io.read(CSV_READ_CHUNK_SIZE)
+            lines = (pending + chunk).splitlines(keepends=True)
+            # The last line may be incomplete (or a "\r" whose "\n" is in the next chunk), so keep it until more is read
+            pending = lines.pop() if chunk and lines else b""
+
+            for line in lines:
+                line_number += 1
+                try:
+                    decoded_line = line.decode(self.encoding)
+                except UnicodeDecodeError as error:
+                    if fallback_line_count == 0:
+                        logger.warning(
+                            "Invalid Encoding detected in line %s: %s. Decoding with %s instead",
+                            line_number,
+                            error,
+                            self.fallback_encoding,
+                        )
+                    fallback_line_count += 1
+                    decoded_line = line.decode(self.fallback_encoding)
+
+                self.byte_offset += len(line)
+                yield decoded_line
+
+            if not chunk:
+                break
+
+        if fallback_line_count:
+            logger.info("%s lines were decoded with %s", fallback_line_count, self.fallback_encoding)
+
+
+class CsvContentDictReader(DictReader):
+    """A DictReader over the lines of a batch file which also tracks the byte offset of the end of the last row read"""
+
+    def __init__(self, lines: DecodedLines, fieldnames: list[str] | None = None):
+        super().__init__(lines, fieldnames=fieldnames, delimiter="|")
+        self.lines = lines
+
+    @property
+    def byte_offset(self) -> int:
+        return self.lines.byte_offset
+
+
+def get_csv_content_dict_reader(
+    file_key: str, byte_offset: int = 0, fieldnames: list[str] | None = None
+) -> CsvContentDictReader:
+    """
+    Returns the requested file contents from the source bucket in the form of a DictReader.
+    If a byte_offset is given, only the content after it is downloaded. As this will not include the header row, the
+    fieldnames must also be given.
+    """
+    get_object_kwargs = {"Range": f"bytes={byte_offset}-"} if byte_offset else {}
+    response = get_s3_client().get_object(Bucket=os.getenv("SOURCE_BUCKET_NAME"), Key=file_key, **get_object_kwargs)
+    return CsvContentDictReader(DecodedLines(response["Body"], start_byte_offset=byte_offset), fieldnames=fieldnames)
 
 
 def create_diagnostics_dictionary(error_type, status_code, error_message) -> dict:
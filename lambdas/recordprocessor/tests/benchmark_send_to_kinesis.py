@@ -0,0 +1,67 @@
+"""
+Compares the throughput of sending rows to a moto Kinesis stream one at a time with send_to_kinesis against
+sending them in PutRecords batches with KinesisRecordBatcher.
+Run from the recordprocessor directory with:
+PYTHONPATH=src:tests:../shared/src python -m tests.benchmark_send_to_kinesis [number_of_rows]
+"""
+
+import os
+import sys
+import time
+from unittest.mock import patch
+
+from moto import mock_aws
+
+from utils_for_recordprocessor_tests.mock_environment_variables import MOCK_ENVIRONMENT_DICT, Kinesis
+from utils_for_recordprocessor_tests.utils_for_recordprocessor_tests import create_boto3_clients
+
+with patch.dict("os.environ", MOCK_ENVIRONMENT_DICT):
+    from send_to_kinesis import KinesisRecordBatcher, send_to_kinesis
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+SUPPLIER = "EMIS"
+VACCINE_TYPE = "RSV"
+
+
+def make_message_body(row_number: int) -> dict:
+    return {
+        "row_id": f"benchmark_file_id^{row_number}",
+        "file_key": "RSV_Vaccinations_v5_8HK48_20210730T12000000.csv",
+        "supplier": SUPPLIER,
+        "vax_type": VACCINE_TYPE,
+        "created_at_formatted_string": "20210730T12000000",
+        "operation_requested": "CREATE",
+        "fhir_json": {"resourceType": "Immunization", "status": "completed", "lotNumber": "A" * 1500},
+    }
+
+
+def send_rows_individually() -> None:
+    for row_number in range(1, N_ROWS + 1):
+        send_to_kinesis(SUPPLIER, make_message_body(row_number), VACCINE_TYPE)
+
+
+def send_rows_in_batches() -> None:
+    batcher = KinesisRecordBatcher(SUPPLIER, VACCINE_TYPE)
+    for row_number in range(1, N_ROWS + 1):
+        batcher.add(make_message_body(row_number))
+    batcher.flush()
+
+
+def run_benchmark(name: str, send_rows) -> None:
+    with mock_aws():
+        (kinesis_client,) = create_boto3_clients("kinesis")
+        kinesis_client.create_stream(StreamName=Kinesis.STREAM_NAME, ShardCount=1)
+
+        with patch("common.clients.global_kinesis_client", kinesis_client):
+            start_time = time.perf_counter()
+            send_rows()
+            elapsed = time.perf_counter() - start_time
+
+    print(f"{name:<12} {N_ROWS} rows in {elapsed:.2f}s ({N_ROWS / elapsed:.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    os.environ.update(MOCK_ENVIRONMENT_DICT)
+    with patch("send_to_kinesis.logger"):
+        run_benchmark("put_record", send_rows_individually)
+        run_benchmark("put_records", send_rows_in_batches)
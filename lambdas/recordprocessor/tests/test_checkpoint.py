@@ -0,0 +1,54 @@
+"""Tests for the checkpoint module"""
+
+import unittest
+from unittest.mock import patch
+
+from utils_for_recordprocessor_tests.mock_environment_variables import MOCK_ENVIRONMENT_DICT
+
+with patch("os.environ", MOCK_ENVIRONMENT_DICT):
+    from checkpoint import ProcessingCheckpointer
+    from common.models.batch_constants import AuditTableKeys
+
+
+class TestProcessingCheckpointer(unittest.TestCase):
+    """Tests for ProcessingCheckpointer"""
+
+    def setUp(self):
+        update_audit_table_item_patcher = patch("checkpoint.update_audit_table_item")
+        self.mock_update_audit_table_item = update_audit_table_item_patcher.start()
+        self.addCleanup(update_audit_table_item_patcher.stop)
+
+    def test_checkpoint_saved_with_byte_offset_of_last_row_sent(self):
+        checkpointer = ProcessingCheckpointer("test_file_key", "test_message_id")
+        for row_number in range(1, 251):
+            checkpointer.record_row_read(row_number, row_number * 10)
+
+        checkpointer.record_rows_sent(120)
+
+        self.mock_update_audit_table_item.assert_called_once_with(
+            file_key="test_file_key",
+            message_id="test_message_id",
+            attrs_to_update={
+                AuditTableKeys.CHECKPOINT_ROW_COUNT: 120,
+                AuditTableKeys.CHECKPOINT_BYTE_OFFSET: 1200,
+            },
+        )
+
+    def test_checkpoint_saved_each_time_rows_are_sent(self):
+        checkpointer = ProcessingCheckpointer("test_file_key", "test_message_id", rows_already_sent=1000)
+        for row_number in range(1001, 1301):
+            checkpointer.record_row_read(row_number, row_number * 10)
+
+        for total_rows_sent in (1000, 1050, 1050, 1100, 1250):
+            checkpointer.record_rows_sent(total_rows_sent)
+
+        saved_row_counts = [
+            call.kwargs["attrs_to_update"][AuditTableKeys.CHECKPOINT_ROW_COUNT]
+            for call in self.mock_update_audit_table_item.call_args_list
+        ]
+        self.assertEqual(saved_row_counts, [1050, 1100, 1250])
+        self.assertEqual(checkpointer.row_byte_offsets[0], (1251, 12510))
+
+
+if __name__ == "__main__":
+    unittest.main()
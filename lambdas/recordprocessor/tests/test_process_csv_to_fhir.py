@@ -3,7 +3,7 @@
 import json
 import unittest
 from copy import deepcopy
-from unittest.mock import Mock, call, patch
+from unittest.mock import ANY, Mock, call, patch
 
 from moto import mock_aws
 
@@ -19,6 +19,7 @@ from utils_for_recordprocessor_tests.utils_for_recordprocessor_tests import (
 )
 from utils_for_recordprocessor_tests.values_for_recordprocessor_tests import (
     MockFileDetails,
+    MockFileRows,
     ValidMockFileContent,
 )
 
@@ -94,10 +95,15 @@ class TestProcessCsvToFhir(unittest.TestCase):
             file_content=ValidMockFileContent.with_new_and_update_and_delete,
         )
 
-        with patch("batch_processor.send_to_kinesis") as mock_send_to_kinesis:
+        with (
+            patch("batch_processor.send_to_kinesis") as mock_send_to_kinesis,
+            patch("batch_processor.KinesisRecordBatcher") as mock_kinesis_batcher,
+        ):
             process_csv_to_fhir(deepcopy(test_file.event_full_permissions_dict))
 
-        self.assertEqual(mock_send_to_kinesis.call_count, 4)
+        self.assertEqual(mock_kinesis_batcher.return_value.add.call_count, 3)
+        mock_kinesis_batcher.return_value.flush.assert_called_once()
+        self.assertEqual(mock_send_to_kinesis.call_count, 1)
 
         table_items = dynamodb_client.scan(TableName=AUDIT_TABLE_NAME).get("Items", [])
         self.assertIn(expected_table_entry, table_items)
@@ -118,10 +124,15 @@ class TestProcessCsvToFhir(unittest.TestCase):
             file_content=ValidMockFileContent.with_new_and_update_and_delete,
         )
 
-        with patch("batch_processor.send_to_kinesis") as mock_send_to_kinesis:
+        with (
+            patch("batch_processor.send_to_kinesis") as mock_send_to_kinesis,
+            patch("batch_processor.KinesisRecordBatcher") as mock_kinesis_batcher,
+        ):
             process_csv_to_fhir(deepcopy(test_file.event_create_permissions_only_dict))
 
-        self.assertEqual(mock_send_to_kinesis.call_count, 4)
+        self.assertEqual(mock_kinesis_batcher.return_value.add.call_count, 3)
+        mock_kinesis_batcher.return_value.flush.assert_called_once()
+        self.assertEqual(mock_send_to_kinesis.call_count, 1)
 
         table_items = dynamodb_client.scan(TableName=AUDIT_TABLE_NAME).get("Items", [])
         self.assertIn(expected_table_entry, table_items)
@@ -139,17 +150,18 @@ class TestProcessCsvToFhir(unittest.TestCase):
             file_content=ValidMockFileContent.with_update_and_delete,
         )
 
-        with patch("batch_processor.send_to_kinesis") as mock_send_to_kinesis:
+        with (
+            patch("batch_processor.send_to_kinesis") as mock_send_to_kinesis,
+            patch("batch_processor.KinesisRecordBatcher") as mock_kinesis_batcher,
+        ):
             process_csv_to_fhir(deepcopy(test_file.event_create_permissions_only_dict))
 
-        self.assertEqual(mock_send_to_kinesis.call_count, 3)
+        mock_kinesis_batcher.assert_called_once_with("EMIS", "RSV", on_flush=ANY)
+        self.assertEqual(mock_kinesis_batcher.return_value.add.call_count, 2)
+        self.assertEqual(mock_send_to_kinesis.call_count, 1)
         eof_message_call = mock_send_to_kinesis.call_args_list.pop(-1)
 
-        for (
-            _supplier,
-            message_body,
-            _vaccine,
-        ), _kwargs in mock_send_to_kinesis.call_args_list:
+        for (message_body,), _kwargs in mock_kinesis_batcher.return_value.add.call_args_list:
             self.assertIn("diagnostics", message_body)
             self.assertNotIn("fhir_json", message_body)
 
@@ -171,6 +183,90 @@ class TestProcessCsvToFhir(unittest.TestCase):
         table_items = dynamodb_client.scan(TableName=AUDIT_TABLE_NAME).get("Items", [])
         self.assertIn(expected_table_entry, table_items)
 
+    @patch("send_to_kinesis.KINESIS_PUT_RECORDS_MAX_RECORDS", 1)
+    @patch("send_to_kinesis.get_kinesis_client")
+    def test_process_csv_to_fhir_saves_checkpoints(self, mock_get_kinesis_client):
+        """Tests that process_csv_to_fhir saves a checkpoint on the audit table item as rows are sent to kinesis"""
+        mock_get_kinesis_client.return_value.put_records.return_value = {"FailedRecordCount": 0, "Records": []}
+        add_entry_to_table(test_file, FileStatus.PROCESSING)
+        self.upload_source_file(
+            file_key=test_file.file_key,
+            file_content=ValidMockFileContent.with_new_and_update_and_delete,
+        )
+
+        with patch("batch_processor.send_to_kinesis"):
+            process_csv_to_fhir(deepcopy(test_file.event_full_permissions_dict))
+
+        table_item = dynamodb_client.get_item(
+            TableName=AUDIT_TABLE_NAME, Key={"message_id": {"S": test_file.message_id}}
+        )["Item"]
+        expected_byte_offset = len(ValidMockFileContent.with_new_and_update_and_delete.encode())
+        self.assertEqual(table_item["checkpoint_row_count"], {"N": "3"})
+        self.assertEqual(table_item["checkpoint_byte_offset"], {"N": str(expected_byte_offset)})
+
+    def test_process_csv_to_fhir_resumes_from_checkpoint(self):
+        """
+        Tests that, when the audit table item has a checkpoint, process_csv_to_fhir skips file level validation and
+        resumes from the checkpointed row of the file in the processing folder
+        """
+        byte_offset = len(f"{MockFileRows.HEADERS}\n{MockFileRows.NEW}\n".encode())
+        dynamodb_client.put_item(
+            TableName=AUDIT_TABLE_NAME,
+            Item={
+                **test_file.audit_table_entry,
+                "status": {"S": FileStatus.PROCESSING},
+                "checkpoint_row_count": {"N": "1"},
+                "checkpoint_byte_offset": {"N": str(byte_offset)},
+            },
+        )
+        self.upload_source_file(
+            file_key=f"processing/{test_file.file_key}",
+            file_content=ValidMockFileContent.with_new_and_update_and_delete,
+        )
+
+        with (
+            patch("batch_processor.file_level_validation") as mock_file_level_validation,
+            patch("batch_processor.send_to_kinesis") as mock_send_to_kinesis,
+            patch("batch_processor.KinesisRecordBatcher") as mock_kinesis_batcher,
+        ):
+            row_count = process_csv_to_fhir(deepcopy(test_file.event_full_permissions_dict))
+
+        mock_file_level_validation.assert_not_called()
+        self.assertEqual(row_count, 3)
+        sent_messages = [call.args[0] for call in mock_kinesis_batcher.return_value.add.call_args_list]
+        self.assertEqual(
+            [(message["row_id"], message["operation_requested"]) for message in sent_messages],
+            [(f"{test_file.message_id}^2", "UPDATE"), (f"{test_file.message_id}^3", "DELETE")],
+        )
+        # The rows after the checkpoint may already have been sent before processing was interrupted
+        self.assertEqual([message["possibly_sent_up_to_row"] for message in sent_messages], [501, 501])
+        self.assertEqual(mock_send_to_kinesis.call_args.args[1]["row_id"], f"{test_file.message_id}^3")
+
+    @patch("batch_processor.get_processing_checkpoint_by_message_id")
+    def test_process_csv_to_fhir_processes_whole_file_if_checkpoint_cannot_be_read(self, mock_get_checkpoint):
+        """Tests that the file is processed from the start, rather than failed, if the checkpoint cannot be read"""
+        mock_get_checkpoint.side_effect = dynamodb_client.exceptions.ClientError(
+            {"Error": {"Code": "AccessDeniedException"}}, "GetItem"
+        )
+        add_entry_to_table(test_file, FileStatus.PROCESSING)
+        self.upload_source_file(
+            file_key=test_file.file_key,
+            file_content=ValidMockFileContent.with_new_and_update_and_delete,
+        )
+
+        with (
+            patch("batch_processor.send_to_kinesis"),
+            patch("batch_processor.KinesisRecordBatcher") as mock_kinesis_batcher,
+        ):
+            row_count = process_csv_to_fhir(deepcopy(test_file.event_full_permissions_dict))
+
+        self.assertEqual(row_count, 3)
+        sent_messages = [call.args[0] for call in mock_kinesis_batcher.return_value.add.call_args_list]
+        self.assertEqual(
+            [message["row_id"] for message in sent_messages], [f"{test_file.message_id}^{i}" for i in (1, 2, 3)]
+        )
+        self.assertNotIn("possibly_sent_up_to_row", sent_messages[0])
+
     def test_process_csv_to_fhir_invalid_headers(self):
         """Tests that process_csv_to_fhir does not send a message to kinesis when the csv has invalid headers"""
         self.upload_source_file(
@@ -178,10 +274,14 @@ class TestProcessCsvToFhir(unittest.TestCase):
             file_content=ValidMockFileContent.with_new_and_update.replace("NHS_NUMBER", "NHS_NUMBERS"),
         )
 
-        with patch("batch_processor.send_to_kinesis") as mock_send_to_kinesis:
+        with (
+            patch("batch_processor.send_to_kinesis") as mock_send_to_kinesis,
+            patch("batch_processor.KinesisRecordBatcher") as mock_kinesis_batcher,
+        ):
             process_csv_to_fhir(deepcopy(test_file.event_full_permissions_dict))
 
         self.assertEqual(mock_send_to_kinesis.call_count, 0)
+        mock_kinesis_batcher.return_value.add.assert_not_called()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 import os
 import unittest
 from io import BytesIO
-from unittest.mock import Mock, call, patch
+from unittest.mock import Mock, patch
 
 from batch_processor import process_csv_to_fhir
 from utils_for_recordprocessor_tests.utils_for_recordprocessor_tests import (
@@ -18,6 +18,7 @@ class TestProcessorEdgeCases(unittest.TestCase):
         self.mock_logger_warning = create_patch("logging.Logger.warning")
         self.mock_logger_error = create_patch("logging.Logger.error")
         self.mock_send_to_kinesis = create_patch("batch_processor.send_to_kinesis")
+        self.mock_kinesis_batcher = create_patch("batch_processor.KinesisRecordBatcher")
         self.mock_map_target_disease = create_patch("batch_processor.map_target_disease")
         self.mock_get_s3_client = create_patch("utils_for_recordprocessor.get_s3_client")
         self.mock_make_and_move = create_patch("file_level_validation.make_and_upload_ack_file")
@@ -80,17 +81,37 @@ class TestProcessorEdgeCases(unittest.TestCase):
 
         n_rows_processed = process_csv_to_fhir(message_body)
         self.assertEqual(n_rows_processed, n_rows)
-        self.assertEqual(self.mock_send_to_kinesis.call_count, n_rows + 1)
+        self.assertEqual(self.mock_kinesis_batcher.return_value.add.call_count, n_rows)
+        self.assertEqual(self.mock_send_to_kinesis.call_count, 1)
         # check logger.warning called for decode error
         self.mock_logger_warning.assert_called()
-        warning_call_args = self.mock_logger_warning.call_args[0][0]
-        self.assertTrue(warning_call_args.startswith("Encoding Error: 'utf-8' codec can't decode byte 0xe9"))
-        mock_s3.get_object.assert_has_calls(
-            [
-                call(Bucket=BucketNames.SOURCE, Key="test-filename"),
-                call(Bucket=BucketNames.SOURCE, Key="processing/test-filename"),
-            ]
-        )
+        warning_call_args = self.mock_logger_warning.call_args[0]
+        self.assertTrue(warning_call_args[0].startswith("Invalid Encoding detected in line"))
+        self.assertEqual(warning_call_args[1], n_rows + 1)
+        self.assertTrue(str(warning_call_args[2]).startswith("'utf-8' codec can't decode byte 0xe9"))
+        # The file is only downloaded once, even though the invalid byte is in the last row
+        mock_s3.get_object.assert_called_once_with(Bucket=BucketNames.SOURCE, Key="test-filename")
+
+    def test_process_file_with_byte_which_no_encoding_can_decode(self):
+        """Test that processing fails if a row can be decoded neither as utf-8 nor as cp1252"""
+        data = self.create_test_data_from_file("test-batch-data.csv")
+        data = self.expand_test_data(data, 10)
+        data = self.insert_cp1252_at_end(data, b"D\x81cembre", 2)
+        mock_s3 = Mock()
+        mock_s3.get_object.return_value = {"Body": BytesIO(b"".join(data))}
+        self.mock_get_s3_client.return_value = mock_s3
+
+        message_body = {
+            "vaccine_type": "vax-type-1",
+            "supplier": "test-supplier",
+            "filename": "test-filename",
+        }
+
+        with self.assertRaises(UnicodeDecodeError):
+            process_csv_to_fhir(message_body)
+
+        self.mock_send_to_kinesis.assert_not_called()
+        self.mock_update_audit_table_item_bp.assert_not_called()
 
     def test_process_large_file_utf8(self):
         """Test processing a large file with utf-8 encoding"""
@@ -112,7 +133,8 @@ class TestProcessorEdgeCases(unittest.TestCase):
 
         n_rows_processed = process_csv_to_fhir(message_body)
         self.assertEqual(n_rows_processed, n_rows)
-        self.assertEqual(self.mock_send_to_kinesis.call_count, n_rows + 1)
+        self.assertEqual(self.mock_kinesis_batcher.return_value.add.call_count, n_rows)
+        self.assertEqual(self.mock_send_to_kinesis.call_count, 1)
         self.mock_logger_warning.assert_not_called()
         self.mock_logger_error.assert_not_called()
 
@@ -139,10 +161,12 @@ class TestProcessorEdgeCases(unittest.TestCase):
 
         n_rows_processed = process_csv_to_fhir(message_body)
         self.assertEqual(n_rows_processed, n_rows)
-        self.assertEqual(self.mock_send_to_kinesis.call_count, n_rows + 1)
+        self.assertEqual(self.mock_kinesis_batcher.return_value.add.call_count, n_rows)
+        self.assertEqual(self.mock_send_to_kinesis.call_count, 1)
         self.mock_logger_warning.assert_called()
         warning_call_args = self.mock_logger_warning.call_args[0][0]
         self.assertTrue(warning_call_args.startswith("Invalid Encoding detected"))
+        mock_s3.get_object.assert_called_once()
 
     def test_process_small_file_utf8(self):
         """Test processing a small file with utf-8 encoding"""
@@ -165,6 +189,7 @@ class TestProcessorEdgeCases(unittest.TestCase):
 
         n_rows_processed = process_csv_to_fhir(message_body)
         self.assertEqual(n_rows_processed, n_rows)
-        self.assertEqual(self.mock_send_to_kinesis.call_count, n_rows + 1)
+        self.assertEqual(self.mock_kinesis_batcher.return_value.add.call_count, n_rows)
+        self.assertEqual(self.mock_send_to_kinesis.call_count, 1)
         self.mock_logger_warning.assert_not_called()
         self.mock_logger_error.assert_not_called()
@@ -494,7 +494,7 @@ class TestRecordProcessor(unittest.TestCase):
                 **test_file.audit_table_entry,
                 "status": {"S": FileStatus.FAILED},
                 "error_details": {
-                    "S": "An error occurred (ResourceNotFoundException) when calling the PutRecord operation"
+                    "S": "An error occurred (ResourceNotFoundException) when calling the PutRecords operation"
                     ": Stream imms-batch-internal-dev-processingdata-stream under account 123456789012"
                     " not found."
                 },
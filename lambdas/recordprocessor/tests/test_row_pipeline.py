@@ -0,0 +1,109 @@
+"""Tests for the row_pipeline module and process_rows"""
+
+import unittest
+from csv import DictReader
+from io import StringIO
+from unittest.mock import patch
+
+import simplejson as json
+
+from utils_for_recordprocessor_tests.mock_environment_variables import MOCK_ENVIRONMENT_DICT
+from utils_for_recordprocessor_tests.values_for_recordprocessor_tests import MockFileRows
+
+with patch("os.environ", MOCK_ENVIRONMENT_DICT):
+    from batch_processor import process_rows
+    from models.errors import KinesisBatchSendError
+    from row_pipeline import get_row_processing_workers, run_row_pipeline
+
+
+def encode_row_ids(rows: list[tuple[str, dict]]) -> list[bytes]:
+    """Picklable conversion function which encodes the row_id of each row"""
+    return [row_id.encode("utf-8") for row_id, _row in rows]
+
+
+class TestRowPipeline(unittest.TestCase):
+    """Tests for run_row_pipeline"""
+
+    def test_run_row_pipeline_preserves_row_order(self):
+        rows = [(f"file_id^{row_number}", {}) for row_number in range(1, 1001)]
+        sent_messages = []
+
+        run_row_pipeline(rows, encode_row_ids, sent_messages.append, workers=3)
+
+        self.assertEqual(sent_messages, [row_id.encode("utf-8") for row_id, _row in rows])
+
+    def test_get_row_processing_workers(self):
+        test_cases = [(None, 1), ("4", 4), ("0", 1), ("not_a_number", 1)]
+        for env_value, expected_workers in test_cases:
+            with self.subTest(env_value=env_value):
+                env = {"ROW_PROCESSING_WORKERS": env_value} if env_value is not None else {}
+                with patch.dict("os.environ", env, clear=True):
+                    self.assertEqual(get_row_processing_workers(), expected_workers)
+
+
+@patch.dict("os.environ", MOCK_ENVIRONMENT_DICT)
+class TestProcessRowsParallelMode(unittest.TestCase):
+    """Tests that process_rows sends the same messages in the same order whether run serially or in parallel"""
+
+    @staticmethod
+    def run_process_rows(
+        number_of_workers: str, total_rows_processed_count: int = 0, number_of_rows: int = 210
+    ) -> tuple[int, list[dict]]:
+        rows = ([MockFileRows.NEW, MockFileRows.UPDATE, MockFileRows.DELETE] * number_of_rows)[:number_of_rows]
+        csv_reader = DictReader(StringIO(MockFileRows.HEADERS + "\n" + "\n".join(rows)), delimiter="|")
+
+        with (
+            patch.dict("os.environ", {"ROW_PROCESSING_WORKERS": number_of_workers}),
+            patch("batch_processor.KinesisRecordBatcher") as mock_kinesis_batcher,
+        ):
+            row_count = process_rows(
+                "file_id",
+                "RSV",
+                "EMIS",
+                "test_file_key",
+                {"CREATE", "UPDATE"},
+                "20211120T12000000",
+                csv_reader,
+                [{"coding": [{"system": "http://snomed.info/sct", "code": "55735004"}]}],
+                total_rows_processed_count,
+            )
+
+        mock_batcher = mock_kinesis_batcher.return_value
+        messages = [call.args[0] for call in mock_batcher.add.call_args_list] + [
+            json.loads(call.args[0], use_decimal=True) for call in mock_batcher.add_encoded.call_args_list
+        ]
+        return row_count, messages
+
+    def test_process_rows_parallel_matches_serial(self):
+        serial_row_count, serial_messages = self.run_process_rows("1")
+        parallel_row_count, parallel_messages = self.run_process_rows("3")
+
+        self.assertEqual(serial_row_count, 210)
+        self.assertEqual(parallel_row_count, 210)
+        self.assertEqual(serial_messages, parallel_messages)
+        self.assertEqual([message["row_id"] for message in parallel_messages][:3], [f"file_id^{i}" for i in (1, 2, 3)])
+
+    def test_process_rows_parallel_numbers_rows_after_rows_already_processed(self):
+        row_count, messages = self.run_process_rows("2", total_rows_processed_count=200, number_of_rows=10)
+
+        self.assertEqual(row_count, 210)
+        self.assertEqual([message["row_id"] for message in messages], [f"file_id^{i}" for i in range(201, 211)])
+
+    def test_process_rows_does_not_hide_processing_error_with_kinesis_error(self):
+        """If a row cannot be processed, its error is raised rather than an error sending the rows read before it"""
+        csv_reader = DictReader(StringIO(MockFileRows.HEADERS + "\n" + MockFileRows.NEW), delimiter="|")
+
+        with (
+            patch("batch_processor.process_row", side_effect=ValueError("processing failed")),
+            patch("batch_processor.KinesisRecordBatcher") as mock_kinesis_batcher,
+        ):
+            mock_kinesis_batcher.return_value.flush.side_effect = KinesisBatchSendError("sending failed")
+
+            with self.assertRaisesRegex(ValueError, "processing failed"):
+                process_rows("file_id", "RSV", "EMIS", "test_file_key", {"CREATE"}, "20211120T12000000", csv_reader, [])
+
+        mock_kinesis_batcher.return_value.flush.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
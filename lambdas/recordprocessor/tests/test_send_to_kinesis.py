@@ -1,10 +1,12 @@
+import json
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from moto import mock_aws
 
 from tests.utils_for_recordprocessor_tests.mock_environment_variables import (
     MOCK_ENVIRONMENT_DICT,
+    Kinesis,
 )
 from tests.utils_for_recordprocessor_tests.utils_for_recordprocessor_tests import (
     GenericSetUp,
@@ -13,7 +15,8 @@ from tests.utils_for_recordprocessor_tests.utils_for_recordprocessor_tests impor
 )
 
 with patch("os.environ", MOCK_ENVIRONMENT_DICT):
-    from send_to_kinesis import send_to_kinesis
+    from models.errors import KinesisBatchSendError
+    from send_to_kinesis import KinesisRecordBatcher, send_to_kinesis
 
 kinesis_client = None
 
@@ -40,6 +43,171 @@ class TestSendToKinesis(unittest.TestCase):
         result = send_to_kinesis(supplier, message_body, vaccine_type)
         self.assertTrue(result)
 
+    @patch.dict("os.environ", MOCK_ENVIRONMENT_DICT)
+    def test_kinesis_record_batcher_sends_all_records_in_order(self):
+        batcher = KinesisRecordBatcher("test_supplier", "test_vaccine")
+
+        for row_number in range(1, 1201):
+            batcher.add({"row_id": f"file_id^{row_number}"})
+        batcher.flush()
+
+        self.assertEqual(batcher.batches_sent, 3)
+        self.assertEqual(batcher.records_sent, 1200)
+        self.assertEqual(batcher.throttled_records, 0)
+
+        shard_id = kinesis_client.describe_stream(StreamName=Kinesis.STREAM_NAME)["StreamDescription"]["Shards"][0][
+            "ShardId"
+        ]
+        shard_iterator = kinesis_client.get_shard_iterator(
+            StreamName=Kinesis.STREAM_NAME, ShardId=shard_id, ShardIteratorType="TRIM_HORIZON"
+        )["ShardIterator"]
+        records = kinesis_client.get_records(ShardIterator=shard_iterator, Limit=10000)["Records"]
+
+        self.assertEqual(
+            [json.loads(record["Data"])["row_id"] for record in records],
+            [f"file_id^{row_number}" for row_number in range(1, 1201)],
+        )
+        self.assertTrue(all(record["PartitionKey"] == "test_supplier_test_vaccine" for record in records))
+
+    @patch.dict("os.environ", MOCK_ENVIRONMENT_DICT)
+    @patch("send_to_kinesis.KINESIS_PUT_RECORDS_MAX_BYTES", 1000)
+    @patch("send_to_kinesis.get_kinesis_client")
+    def test_kinesis_record_batcher_respects_payload_size_limit(self, mock_get_kinesis_client):
+        mock_get_kinesis_client.return_value.put_records.return_value = {"FailedRecordCount": 0, "Records": []}
+        batcher = KinesisRecordBatcher("test_supplier", "test_vaccine")
+
+        for _ in range(5):
+            batcher.add({"data": "x" * 400})
+        batcher.flush()
+
+        put_records_calls = mock_get_kinesis_client.return_value.put_records.call_args_list
+        self.assertEqual([len(call.kwargs["Records"]) for call in put_records_calls], [2, 2, 1])
+
+    @patch.dict("os.environ", MOCK_ENVIRONMENT_DICT)
+    @patch("send_to_kinesis.time.sleep")
+    @patch("send_to_kinesis.get_kinesis_client")
+    def test_kinesis_record_batcher_retries_only_failed_records(self, mock_get_kinesis_client, mock_sleep):
+        mock_put_records = mock_get_kinesis_client.return_value.put_records
+        mock_put_records.side_effect = [
+            {
+                "FailedRecordCount": 1,
+                "Records": [
+                    {"SequenceNumber": "1", "ShardId": "shardId-000000000000"},
+                    {"ErrorCode": "ProvisionedThroughputExceededException", "ErrorMessage": "Rate exceeded"},
+                    {"SequenceNumber": "2", "ShardId": "shardId-000000000000"},
+                ],
+            },
+            {"FailedRecordCount": 0, "Records": [{"SequenceNumber": "3", "ShardId": "shardId-000000000000"}]},
+        ]
+        batcher = KinesisRecordBatcher("test_supplier", "test_vaccine")
+
+        for row_number in range(1, 4):
+            batcher.add({"row_id": row_number})
+        batcher.flush()
+
+        self.assertEqual(mock_put_records.call_count, 2)
+        retried_records = mock_put_records.call_args_list[1].kwargs["Records"]
+        self.assertEqual([json.loads(record["Data"]) for record in retried_records], [{"row_id": 2}])
+        mock_sleep.assert_called_once()
+        self.assertEqual(batcher.records_sent, 3)
+        self.assertEqual(batcher.throttled_records, 1)
+
+    @patch.dict("os.environ", MOCK_ENVIRONMENT_DICT)
+    @patch("send_to_kinesis.time.sleep", Mock())
+    @patch("send_to_kinesis.get_kinesis_client")
+    def test_kinesis_record_batcher_keeps_rows_for_an_immunization_in_order(self, mock_get_kinesis_client):
+        """
+        A row rejected part way through a batch is sent before any later row for the same immunization, as rows for
+        the same immunization are never sent in the same batch
+        """
+        stream = []
+
+        def put_records(Records, **_kwargs):
+            rows = [json.loads(record["Data"]) for record in Records]
+            # Reject the first attempt to send the CREATE, which is part way through the batch
+            results = [
+                {"ErrorCode": "ProvisionedThroughputExceededException"}
+                if row["row_id"] == 2 and row not in rejected_rows
+                else {"SequenceNumber": str(len(stream) + index)}
+                for index, row in enumerate(rows)
+            ]
+            for row, result in zip(rows, results, strict=True):
+                if result.get("ErrorCode"):
+                    rejected_rows.append(row)
+                else:
+                    stream.append(row)
+            return {"FailedRecordCount": sum("ErrorCode" in result for result in results), "Records": results}
+
+        rejected_rows = []
+        mock_get_kinesis_client.return_value.put_records.side_effect = put_records
+        rows = [
+            (1, "CREATE", "id-a"),
+            (2, "CREATE", "id-b"),
+            (3, "CREATE", "id-c"),
+            (4, "UPDATE", "id-b"),
+            (5, "DELETE", "id-b"),
+        ]
+        batcher = KinesisRecordBatcher("test_supplier", "test_vaccine")
+
+        for row_id, operation, identifier_value in rows:
+            batcher.add(
+                {
+                    "row_id": row_id,
+                    "operation_requested": operation,
+                    "fhir_json": {
+                        "identifier": [{"system": "https://supplierABC/identifiers", "value": identifier_value}]
+                    },
+                }
+            )
+        batcher.flush()
+
+        self.assertEqual([row["row_id"] for row in stream], [1, 3, 2, 4, 5])
+        self.assertEqual(
+            [row["operation_requested"] for row in stream if row["fhir_json"]["identifier"][0]["value"] == "id-b"],
+            ["CREATE", "UPDATE", "DELETE"],
+        )
+        self.assertEqual(batcher.records_sent, 5)
+        self.assertEqual(batcher.throttled_records, 1)
+
+    @patch.dict("os.environ", MOCK_ENVIRONMENT_DICT)
+    @patch("send_to_kinesis.time.sleep", Mock())
+    @patch("send_to_kinesis.get_kinesis_client")
+    def test_kinesis_record_batcher_only_counts_throughput_errors_as_throttled(self, mock_get_kinesis_client):
+        mock_get_kinesis_client.return_value.put_records.side_effect = [
+            {
+                "FailedRecordCount": 2,
+                "Records": [
+                    {"ErrorCode": "InternalFailure", "ErrorMessage": "Internal service failure"},
+                    {"ErrorCode": "ProvisionedThroughputExceededException", "ErrorMessage": "Rate exceeded"},
+                ],
+            },
+            {"FailedRecordCount": 0, "Records": [{"SequenceNumber": "1"}, {"SequenceNumber": "2"}]},
+        ]
+        batcher = KinesisRecordBatcher("test_supplier", "test_vaccine")
+
+        for row_number in range(1, 3):
+            batcher.add({"row_id": row_number})
+        batcher.flush()
+
+        self.assertEqual(mock_get_kinesis_client.return_value.put_records.call_count, 2)
+        self.assertEqual(batcher.throttled_records, 1)
+
+    @patch.dict("os.environ", MOCK_ENVIRONMENT_DICT)
+    @patch("send_to_kinesis.time.sleep", Mock())
+    @patch("send_to_kinesis.get_kinesis_client")
+    def test_kinesis_record_batcher_raises_when_retries_exhausted(self, mock_get_kinesis_client):
+        mock_get_kinesis_client.return_value.put_records.return_value = {
+            "FailedRecordCount": 1,
+            "Records": [{"ErrorCode": "InternalFailure", "ErrorMessage": "Internal service failure"}],
+        }
+        batcher = KinesisRecordBatcher("test_supplier", "test_vaccine")
+        batcher.add({"row_id": 1})
+
+        with self.assertRaises(KinesisBatchSendError):
+            batcher.flush()
+
+        self.assertEqual(mock_get_kinesis_client.return_value.put_records.call_count, 5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,7 +2,7 @@
 
 import csv
 import unittest
-from io import StringIO
+from io import BytesIO, StringIO
 from unittest.mock import patch
 
 from moto import mock_aws
@@ -23,6 +23,7 @@ from tests.utils_for_recordprocessor_tests.values_for_recordprocessor_tests impo
 
 with patch("os.environ", MOCK_ENVIRONMENT_DICT):
     from utils_for_recordprocessor import (
+        DecodedLines,
         create_diagnostics_dictionary,
         get_csv_content_dict_reader,
         get_environment,
@@ -59,6 +60,44 @@ class TestUtilsForRecordprocessor(unittest.TestCase):
         result = get_csv_content_dict_reader(test_file.file_key)
         self.assertEqual(list(result), list(expected_output))
 
+    def test_get_csv_content_dict_reader_with_cp1252_row(self):
+        """Tests that get_csv_content_dict_reader decodes rows which are not valid utf-8 using cp1252"""
+        file_content = "NAME|TOWN\nJosé|Zürich\n".encode() + "Décembre|Café\n".encode("cp1252")
+        self.upload_source_file(test_file.file_key, file_content)
+
+        result = get_csv_content_dict_reader(test_file.file_key)
+
+        self.assertEqual(list(result), [{"NAME": "José", "TOWN": "Zürich"}, {"NAME": "Décembre", "TOWN": "Café"}])
+
+    def test_decoded_lines(self):
+        """Tests that DecodedLines yields each line with its line ending, whatever the chunk boundaries"""
+        file_content = "A|B\r\né|ü\r\n".encode() + "é|x\n".encode("cp1252") + b"last|line"
+        expected_lines = ["A|B\r\n", "é|ü\r\n", "é|x\n", "last|line"]
+
+        for chunk_size in (1, 2, 3, 4, 5, 1024):
+            with self.subTest(chunk_size=chunk_size):
+                with patch("utils_for_recordprocessor.CSV_READ_CHUNK_SIZE", chunk_size):
+                    decoded_lines = DecodedLines(BytesIO(file_content))
+                    self.assertEqual(list(decoded_lines), expected_lines)
+                    self.assertEqual(decoded_lines.byte_offset, len(file_content))
+
+    def test_get_csv_content_dict_reader_from_byte_offset(self):
+        """Tests that get_csv_content_dict_reader can resume reading from the byte offset of a previously read row"""
+        self.upload_source_file(test_file.file_key, ValidMockFileContent.with_new_and_update_and_delete)
+        expected_rows = list(
+            csv.DictReader(StringIO(ValidMockFileContent.with_new_and_update_and_delete), delimiter="|")
+        )
+
+        first_reader = get_csv_content_dict_reader(test_file.file_key)
+        first_row = next(first_reader)
+        resumed_reader = get_csv_content_dict_reader(
+            test_file.file_key, byte_offset=first_reader.byte_offset, fieldnames=first_reader.fieldnames
+        )
+
+        self.assertEqual(first_row, expected_rows[0])
+        self.assertEqual(list(resumed_reader), expected_rows[1:])
+        self.assertEqual(resumed_reader.byte_offset, len(ValidMockFileContent.with_new_and_update_and_delete))
+
     def test_get_environment(self):
         """Tests that get_environment returns the correct environment"""
         # Each test case tuple has the structure (environment, expected_result)
@@ -3,6 +3,7 @@
 import json
 
 from common.clients import logger
+from common.models.constants import REDIS_CONFIG_VERSION_KEY
 from common.redis_client import get_redis_client
 from common.s3_reader import S3Reader
 from transform_map import transform_map
@@ -46,6 +47,10 @@ class RedisCacher:
                     redis_client.hdel(key, *fields_to_delete)
                     logger.info("Deleted mapping fields for %s: %s", key, fields_to_delete)
 
+            # Bump the config version so that lambdas discard their local caches of the Redis data
+            config_version = redis_client.incr(REDIS_CONFIG_VERSION_KEY)
+            logger.info("Redis config version is now %s", config_version)
+
             return {
                 "status": "success",
                 "message": f"File {file_key} uploaded to Redis cache.",
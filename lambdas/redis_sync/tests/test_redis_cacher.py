@@ -35,6 +35,7 @@ class TestRedisCacher(unittest.TestCase):
         self.mock_redis_client.hmset.assert_any_call("vacc_to_diseases", {"b": "c"})
         self.mock_redis_client.hmset.assert_any_call("diseases_to_vacc", {"c": "b"})
         self.mock_redis_client.hdel.assert_not_called()
+        self.mock_redis_client.incr.assert_called_once_with("config_version")
         self.assertEqual(
             result,
             {
@@ -104,3 +105,4 @@ class TestRedisCacher(unittest.TestCase):
         self.mock_logger_warning.assert_called_once()
         self.mock_redis_client.hmset.assert_not_called()
         self.mock_redis_client.hdel.assert_not_called()
+        self.mock_redis_client.incr.assert_not_called()
@@ -1,31 +1,65 @@
 import base64
 import json
+import os
+import threading
 import time
 import uuid
 from typing import Any
 
 import jwt
 import requests
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
 
 from common.api_clients.constants import (
     ACCESS_TOKEN_EXPIRY_SECONDS,
     ACCESS_TOKEN_MIN_ACCEPTABLE_LIFETIME_SECONDS,
+    ACCESS_TOKEN_REFRESH_RETRY_SECONDS,
     CLIENT_ASSERTION_TYPE_JWT_BEARER,
     CONTENT_TYPE_X_WWW_FORM_URLENCODED,
+    DEFAULT_ACCESS_TOKEN_REFRESH_AFTER_FRACTION,
     GRANT_TYPE_CLIENT_CREDENTIALS,
     JWT_EXPIRY_SECONDS,
 )
+from common.api_clients.http_session import get_http_session
 from common.clients import logger
 from common.models.errors import UnhandledResponseError
 
+ACCESS_TOKEN_REFRESH_AFTER_FRACTION = float(
+    os.getenv("ACCESS_TOKEN_REFRESH_AFTER_FRACTION", str(DEFAULT_ACCESS_TOKEN_REFRESH_AFTER_FRACTION))
+)
+
 
 class AppRestrictedAuth:
-    def __init__(self, secret_manager_client: Any, environment: str, secret_name: str | None = None):
+    """
+    Gets access tokens for the app restricted APIs, caching each token until shortly before it expires. Once
+    refresh_after_fraction of a token's lifetime has passed, the next call starts a refresh in a background thread and
+    returns the cached token, so that callers do not wait for the JWT to be signed and the token to be requested. The
+    refresh is started by a call rather than a timer, as the Lambda runtime is frozen between invocations. A value of 1
+    or more turns refreshing ahead off.
+    """
+
+    def __init__(
+        self,
+        secret_manager_client: Any,
+        environment: str,
+        secret_name: str | None = None,
+        refresh_after_fraction: float = ACCESS_TOKEN_REFRESH_AFTER_FRACTION,
+    ):
         self.secret_manager_client = secret_manager_client
 
         self.cached_access_token: str | None = None
         self.cached_access_token_expiry_time: int | None = None
+        self.cached_access_token_refresh_time: int | None = None
         self.cached_service_secrets: dict[str, Any] | None = None
+        self.cached_signing_key: Any = None
+        self.refresh_after_fraction = refresh_after_fraction
+        # Held while requesting a token, in the foreground or the background, so that only one is requested at a time
+        self._token_lock = threading.Lock()
+        self._refresh_thread: threading.Thread | None = None
+
+        self.refresh_count = 0
+        self.background_refresh_count = 0
+        self.last_refresh_timings: dict[str, Any] | None = None
 
         self.secret_name = f"imms/outbound/{environment}/jwt-secrets" if secret_name is None else secret_name
         self.token_url = (
@@ -45,6 +79,15 @@ class AppRestrictedAuth:
         self.cached_service_secrets = secret_object
         return secret_object
 
+    def get_signing_key(self) -> Any:
+        # Parsing the PEM takes far longer than signing with the parsed key, so it is only parsed once
+        if self.cached_signing_key is None:
+            self.cached_signing_key = load_pem_private_key(
+                self.get_service_secrets()["private_key"].encode(), password=None
+            )
+
+        return self.cached_signing_key
+
     def create_jwt(self, now: int) -> str:
         secret_object = self.get_service_secrets()
         return jwt.encode(
@@ -56,13 +99,13 @@ class AppRestrictedAuth:
                 "exp": now + JWT_EXPIRY_SECONDS,
                 "jti": str(uuid.uuid4()),
             },
-            secret_object["private_key"],
+            self.get_signing_key(),
             algorithm="RS512",
             headers={"kid": secret_object["kid"]},
         )
 
     def _request_access_token(self, jwt_assertion: str) -> requests.Response:
-        return requests.post(
+        return get_http_session().post(
             self.token_url,
             data={
                 "grant_type": GRANT_TYPE_CLIENT_CREDENTIALS,
@@ -73,18 +116,71 @@ class AppRestrictedAuth:
             timeout=10,
         )
 
-    def get_access_token(self) -> str:
-        now = int(time.time())
-
+    def _get_cached_access_token(self, now: int) -> str | None:
         if (
             self.cached_access_token
             and self.cached_access_token_expiry_time is not None
             and self.cached_access_token_expiry_time > now + ACCESS_TOKEN_MIN_ACCEPTABLE_LIFETIME_SECONDS
         ):
             return self.cached_access_token
+        return None
 
+    def _is_due_for_refresh(self, now: int) -> bool:
+        return self.cached_access_token_refresh_time is not None and now >= self.cached_access_token_refresh_time
+
+    def get_access_token(self) -> str:
+        now = int(time.time())
+        if cached_access_token := self._get_cached_access_token(now):
+            if self._is_due_for_refresh(now):
+                self._start_background_refresh()
+            return cached_access_token
+
+        with self._token_lock:
+            # Another thread may have fetched a token while this one waited for the lock
+            now = int(time.time())
+            if cached_access_token := self._get_cached_access_token(now):
+                return cached_access_token
+
+            return self._fetch_access_token(now, background=False)
+
+    def refresh_stats(self) -> dict[str, Any]:
+        """Returns the number of tokens requested, and the timings of the last request, for observability"""
+        return {
+            "refresh_count": self.refresh_count,
+            "background_refresh_count": self.background_refresh_count,
+            "last_refresh_timings": self.last_refresh_timings,
+        }
+
+    def _start_background_refresh(self) -> None:
+        """Starts refreshing the token in a background thread, unless a token is already being requested"""
+        if not self._token_lock.acquire(blocking=False):
+            return
+
+        try:
+            self._refresh_thread = threading.Thread(target=self._refresh_in_background, daemon=True)
+            self._refresh_thread.start()
+        except BaseException:
+            self._token_lock.release()
+            raise
+
+    def _refresh_in_background(self) -> None:
+        """Requests a new token, releasing the lock taken by _start_background_refresh once it is done"""
+        try:
+            now = int(time.time())
+            if self._is_due_for_refresh(now):
+                self._fetch_access_token(now, background=True)
+        except Exception:  # pylint: disable = broad-exception-caught
+            # The cached token is still valid, and a new one will be requested when it expires if this keeps failing
+            logger.warning("Background refresh of the access token failed", exc_info=True)
+            self.cached_access_token_refresh_time = int(time.time()) + ACCESS_TOKEN_REFRESH_RETRY_SECONDS
+        finally:
+            self._token_lock.release()
+
+    def _fetch_access_token(self, now: int, background: bool) -> str:
         logger.info("Requesting new access token")
+        start_time = time.perf_counter()
         jwt_assertion = self.create_jwt(now)
+        jwt_signed_time = time.perf_counter()
 
         try:
             token_response = self._request_access_token(jwt_assertion)
@@ -98,4 +194,20 @@ class AppRestrictedAuth:
         token = token_response.json().get("access_token")
         self.cached_access_token = token
         self.cached_access_token_expiry_time = now + ACCESS_TOKEN_EXPIRY_SECONDS
+        self.cached_access_token_refresh_time = (
+            now + int(ACCESS_TOKEN_EXPIRY_SECONDS * self.refresh_after_fraction)
+            if self.refresh_after_fraction < 1
+            else None
+        )
+
+        end_time = time.perf_counter()
+        self.refresh_count += 1
+        self.background_refresh_count += background
+        self.last_refresh_timings = {
+            "background": background,
+            "jwt_sign_ms": round((jwt_signed_time - start_time) * 1000, 1),
+            "token_request_ms": round((end_time - jwt_signed_time) * 1000, 1),
+            "total_ms": round((end_time - start_time) * 1000, 1),
+        }
+        logger.info("Access token refreshed: %s", self.last_refresh_timings)
         return token
@@ -12,6 +12,7 @@ class Constants:
     DEFAULT_API_CLIENTS_TIMEOUT = 5
     API_CLIENTS_MAX_RETRIES = 2
     API_CLIENTS_BACKOFF_SECONDS = 0.5
+    DEFAULT_API_CLIENTS_POOL_SIZE = 10
 
 
 # Fields from the incoming SQS message that forms part of the base schema and filtering attributes for MNS notifications
@@ -48,3 +49,7 @@ ACCESS_TOKEN_EXPIRY_SECONDS = 10 * 60
 # Throw away the cached token earlier than the exact expiry time so we have enough
 # time left to use it (and to account for network latency, clock skew etc.)
 ACCESS_TOKEN_MIN_ACCEPTABLE_LIFETIME_SECONDS = 30
+# Once this fraction of the token's lifetime has passed, it is refreshed in the background while it is still used
+DEFAULT_ACCESS_TOKEN_REFRESH_AFTER_FRACTION = 0.75
+# How long to wait before trying again if a background refresh fails
+ACCESS_TOKEN_REFRESH_RETRY_SECONDS = 30
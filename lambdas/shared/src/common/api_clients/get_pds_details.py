@@ -3,33 +3,45 @@ Operations related to PDS (Patient Demographic Service)
 """
 
 import os
+import threading
 
 from common.api_clients.authentication import AppRestrictedAuth
 from common.api_clients.errors import PdsSyncException
+from common.api_clients.pds_cache import pds_patient_details_cache
 from common.api_clients.pds_service import PdsService
 from common.clients import get_secrets_manager_client, logger
 
 PDS_ENV = os.getenv("PDS_ENV", "int")
 
 _pds_service: PdsService | None = None
+# Records may be processed concurrently, and each service has its own cached access token, so only one is created
+_pds_service_lock = threading.Lock()
 
 
 def get_pds_service() -> PdsService:
     global _pds_service
-    if _pds_service is None:
-        authenticator = AppRestrictedAuth(
-            secret_manager_client=get_secrets_manager_client(),
-            environment=PDS_ENV,
-        )
-        _pds_service = PdsService(authenticator, PDS_ENV)
+    with _pds_service_lock:
+        if _pds_service is None:
+            authenticator = AppRestrictedAuth(
+                secret_manager_client=get_secrets_manager_client(),
+                environment=PDS_ENV,
+            )
+            _pds_service = PdsService(authenticator, PDS_ENV)
 
     return _pds_service
 
 
 # Get Patient details from external service PDS using NHS number from MNS notification
-def pds_get_patient_details(nhs_number: str) -> dict:
+def pds_get_patient_details(nhs_number: str, use_cache: bool = True) -> dict:
+    """
+    Returns the patient details for the NHS number from PDS, using the PDS patient details cache. The cache, which may
+    hold details read before the notification being processed, is only used if use_cache is True. Concurrent lookups
+    of the same NHS number are coalesced either way.
+    """
     try:
-        patient = get_pds_service().get_patient_details(nhs_number)
+        patient = pds_patient_details_cache.get(
+            nhs_number, lambda number: get_pds_service().get_patient_details(number), use_cache=use_cache
+        )
         return patient
     except Exception as e:
         msg = "Error retrieving patient details from PDS"
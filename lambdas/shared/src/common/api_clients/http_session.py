@@ -0,0 +1,41 @@
+"""Pooled HTTP session shared by the API clients"""
+
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.api_clients.constants import Constants
+
+global_http_session = None
+
+
+def get_http_pool_size() -> int:
+    """
+    Returns the number of connections kept alive for each host, as set by the API_CLIENTS_POOL_SIZE environment
+    variable
+    """
+    try:
+        return max(int(os.getenv("API_CLIENTS_POOL_SIZE", str(Constants.DEFAULT_API_CLIENTS_POOL_SIZE))), 1)
+    except ValueError:
+        return Constants.DEFAULT_API_CLIENTS_POOL_SIZE
+
+
+def create_http_session() -> requests.Session:
+    """
+    Returns a Session which keeps its connections alive, so that requests to the same host after the first do not
+    need a new TCP connection and TLS handshake. Retries are made by request_with_retry_backoff, not the adapter.
+    """
+    pool_size = get_http_pool_size()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    global global_http_session
+    if global_http_session is None:
+        global_http_session = create_http_session()
+    return global_http_session
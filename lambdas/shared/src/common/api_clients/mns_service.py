@@ -3,11 +3,10 @@ import logging
 import os
 import uuid
 
-import requests
-
 from common.api_clients.authentication import AppRestrictedAuth
 from common.api_clients.constants import MnsNotificationPayload
 from common.api_clients.errors import raise_error_response
+from common.api_clients.http_session import get_http_session
 from common.api_clients.retry import request_with_retry_backoff
 
 SQS_ARN = os.getenv("SQS_ARN")
@@ -62,7 +61,7 @@ class MnsService:
 
     def subscribe_notification(self, event_type: str = "nhs-number-change-2", reason: str | None = None) -> dict | None:
         subscription_payload = self._build_subscription_payload(event_type, reason)
-        response = requests.request(
+        response = get_http_session().request(
             "POST",
             f"{MNS_BASE_URL}/subscriptions",
             headers=self._build_headers(),
@@ -78,7 +77,9 @@ class MnsService:
     def get_subscription(self) -> dict | None:
         """Retrieve existing subscription for this SQS ARN."""
         headers = self._build_headers()
-        response = request_with_retry_backoff("GET", f"{MNS_BASE_URL}/subscriptions", headers, timeout=10)
+        response = request_with_retry_backoff(
+            "GET", f"{MNS_BASE_URL}/subscriptions", headers, timeout=10, endpoint="MNS get subscriptions"
+        )
         logging.info(f"GET {MNS_BASE_URL}/subscriptions")
 
         if response.status_code == 200:
@@ -115,7 +116,9 @@ class MnsService:
     def delete_subscription(self, subscription_id: str) -> str:
         """Delete the subscription by ID."""
         url = f"{MNS_BASE_URL}/subscriptions/{subscription_id}"
-        response = request_with_retry_backoff("DELETE", url, headers=self._build_headers(), timeout=10)
+        response = request_with_retry_backoff(
+            "DELETE", url, headers=self._build_headers(), timeout=10, endpoint="MNS delete subscription"
+        )
         if response.status_code == 204:
             logging.info(f"Deleted subscription {subscription_id}")
             return "Subscription Successfully Deleted..."
@@ -144,6 +147,7 @@ class MnsService:
             headers=self._build_headers(content_type="application/cloudevents+json"),
             timeout=15,
             data=json.dumps(notification_payload),
+            endpoint="MNS publish notification",
         )
         if response.status_code == 200:
             return response.json()
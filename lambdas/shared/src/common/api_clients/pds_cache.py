@@ -0,0 +1,160 @@
+"""
+Cache of PDS patient details keyed by NHS number, shared by all invocations handled by a warm Lambda container.
+
+Entries are kept in process for PDS_CACHE_TTL_SECONDS (the cache is disabled if this is 0, which is the default), up
+to PDS_CACHE_MAX_ENTRIES, after which the least recently used entries are evicted. If PDS_CACHE_REDIS_TTL_SECONDS is
+set, details are also kept in Redis for that long, so that other containers can use them. Concurrent lookups of the
+same NHS number are coalesced into a single request to PDS whether or not the cache is enabled, or used by the caller.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+
+from common.clients import logger
+
+PDS_CACHE_REDIS_KEY_PREFIX = "pds:patient:"
+
+
+class PdsPatientDetailsCache:
+    """Time-limited LRU cache of PDS patient details, with an optional Redis tier and coalescing of lookups"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int, redis_ttl_seconds: int = 0):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict | None]] = OrderedDict()
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, nhs_number: str, fetch: Callable[[str], dict | None], use_cache: bool = True) -> dict | None:
+        """
+        Returns the cached patient details for the NHS number if they are still valid, or else fetches, caches and
+        returns them. If another thread is already fetching the details for the NHS number, waits for its result. If
+        use_cache is False, the details are always fetched, and neither read from nor written to either tier.
+        """
+        with self._lock:
+            entry = self._entries.get(nhs_number) if use_cache else None
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(nhs_number)
+                self.hits += 1
+                return entry[1]
+
+            if (in_flight := self._in_flight.get(nhs_number)) is not None:
+                self.coalesced += 1
+            else:
+                self._in_flight[nhs_number] = Future()
+
+        if in_flight is not None:
+            return in_flight.result()
+
+        try:
+            patient_details = self._fetch(nhs_number, fetch, use_cache)
+        except BaseException as error:
+            with self._lock:
+                self._in_flight.pop(nhs_number).set_exception(error)
+            raise
+
+        with self._lock:
+            if use_cache:
+                self._store(nhs_number, patient_details)
+            self._in_flight.pop(nhs_number).set_result(patient_details)
+
+        return patient_details
+
+    def clear(self) -> None:
+        """Discards all cached entries and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.redis_hits = 0
+            self.misses = 0
+            self.coalesced = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Returns the cache counters, for observability"""
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "hit_rate": round((self.hits + self.redis_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    def _fetch(self, nhs_number: str, fetch: Callable[[str], dict | None], use_cache: bool) -> dict | None:
+        """Returns the patient details from the Redis tier if they are there, or else from PDS"""
+        use_redis = use_cache and self.redis_ttl_seconds > 0
+        if use_redis and (cached_json := self._redis_get(nhs_number)) is not None:
+            with self._lock:
+                self.redis_hits += 1
+            return json.loads(cached_json)
+
+        with self._lock:
+            self.misses += 1
+        patient_details = fetch(nhs_number)
+
+        if use_redis:
+            self._redis_set(nhs_number, json.dumps(patient_details))
+        return patient_details
+
+    def _store(self, nhs_number: str, patient_details: dict | None) -> None:
+        if self.ttl_seconds <= 0:
+            return
+
+        self._entries[nhs_number] = (time.monotonic(), patient_details)
+        self._entries.move_to_end(nhs_number)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @staticmethod
+    def _redis_key(nhs_number: str) -> str:
+        # The NHS number is hashed so that it is not stored in Redis in the clear
+        return PDS_CACHE_REDIS_KEY_PREFIX + hashlib.sha256(nhs_number.encode()).hexdigest()
+
+    @staticmethod
+    def _get_redis_client():
+        # Imported here, as redis is only needed by the lambdas which enable the Redis tier
+        from common.redis_client import get_redis_client
+
+        return get_redis_client()
+
+    def _redis_get(self, nhs_number: str) -> str | None:
+        try:
+            return self._get_redis_client().get(self._redis_key(nhs_number))
+        except Exception as error:  # pylint: disable = broad-exception-caught
+            # The Redis tier is optional, so the details are fetched from PDS if it cannot be read
+            logger.warning("Unable to read PDS patient details from Redis: %s", error)
+            return None
+
+    def _redis_set(self, nhs_number: str, patient_details_json: str) -> None:
+        try:
+            self._get_redis_client().setex(self._redis_key(nhs_number), self.redis_ttl_seconds, patient_details_json)
+        except Exception as error:  # pylint: disable = broad-exception-caught
+            logger.warning("Unable to write PDS patient details to Redis: %s", error)
+
+
+pds_patient_details_cache = PdsPatientDetailsCache(
+    ttl_seconds=float(os.getenv("PDS_CACHE_TTL_SECONDS", "0")),
+    max_entries=int(os.getenv("PDS_CACHE_MAX_ENTRIES", "1000")),
+    redis_ttl_seconds=int(os.getenv("PDS_CACHE_REDIS_TTL_SECONDS", "0")),
+)
+
+
+def get_pds_cache_stats() -> dict:
+    """Returns the hit, miss and coalescing counts for the PDS patient details cache"""
+    return pds_patient_details_cache.stats()
@@ -26,7 +26,9 @@ class PdsService:
             "X-Request-ID": str(uuid.uuid4()),
             "X-Correlation-ID": str(uuid.uuid4()),
         }
-        response = request_with_retry_backoff("GET", f"{self.base_url}/{patient_id}", headers=request_headers)
+        response = request_with_retry_backoff(
+            "GET", f"{self.base_url}/{patient_id}", headers=request_headers, endpoint="PDS get patient"
+        )
 
         if response.status_code == 200:
             return response.json()
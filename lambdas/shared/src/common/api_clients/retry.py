@@ -1,8 +1,10 @@
 import time
+from urllib.parse import urlsplit
 
 import requests
 
 from common.api_clients.constants import Constants
+from common.api_clients.http_session import get_http_session
 from common.clients import logger
 
 
@@ -13,12 +15,15 @@ def request_with_retry_backoff(
     timeout: int = Constants.DEFAULT_API_CLIENTS_TIMEOUT,
     max_retries: int = Constants.API_CLIENTS_MAX_RETRIES,
     data: str | None = None,
+    endpoint: str | None = None,
 ) -> requests.Response:
     """
     Makes an external request with retry and exponential backoff for retryable status codes.
     Retries only for status codes in Constants.RETRYABLE_STATUS_CODES (e.g. 429/5xx),
     up to Constants.API_CLIENTS_MAX_RETRIES. Returns the final Response for the caller
     to handle (success or last failure after retries).
+    Requests are sent with the shared pooled session, so connections are reused, and the time
+    taken for the endpoint, including retries, is logged.
     Args:
         method (str): HTTP method (e.g. 'GET', 'POST', 'PUT', 'DELETE').
         url (str): The URL to send the request to.
@@ -26,8 +31,12 @@ def request_with_retry_backoff(
         timeout (int): Timeout for the request in seconds.
         max_retries (int): Maximum number of retries for retryable status codes.
         data (dict | None): Optional data to include in the request body.
+        endpoint (str | None): Name of the endpoint for the latency log. Defaults to the method and host,
+            so that identifiers in the path are not logged.
     """
     response = None
+    endpoint = endpoint or f"{method} {urlsplit(url).netloc}"
+    start_time = time.perf_counter()
 
     api_request_kwargs = {
         "method": method,
@@ -41,7 +50,7 @@ def request_with_retry_backoff(
             api_request_kwargs["data"] = data
 
         try:
-            response = requests.request(**api_request_kwargs)
+            response = get_http_session().request(**api_request_kwargs)
         except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
             if request_attempt < max_retries:
                 logger.warning(
@@ -53,6 +62,7 @@ def request_with_retry_backoff(
                 time.sleep(Constants.API_CLIENTS_BACKOFF_SECONDS * (2**request_attempt))
                 continue
             logger.error("Network error after %d attempts: %s", max_retries + 1, e)
+            _log_latency(endpoint, start_time, "network error", request_attempt + 1)
             raise
 
         if response.status_code not in Constants.RETRYABLE_STATUS_CODES:
@@ -65,4 +75,15 @@ def request_with_retry_backoff(
             )
             time.sleep(Constants.API_CLIENTS_BACKOFF_SECONDS * (2**request_attempt))
 
+    _log_latency(endpoint, start_time, response.status_code, request_attempt + 1)
     return response
+
+
+def _log_latency(endpoint: str, start_time: float, outcome: int | str, attempts: int) -> None:
+    logger.info(
+        "API request to %s: %s after %d attempt(s) in %.0fms",
+        endpoint,
+        outcome,
+        attempts,
+        (time.perf_counter() - start_time) * 1000,
+    )
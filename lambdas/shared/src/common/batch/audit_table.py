@@ -1,7 +1,12 @@
 from datetime import datetime
 
 from common.clients import get_dynamodb_client, logger
-from common.models.batch_constants import AUDIT_TABLE_NAME, AuditTableKeys, audit_table_key_data_types_map
+from common.models.batch_constants import (
+    AUDIT_TABLE_NAME,
+    AuditTableKeys,
+    FileStatus,
+    audit_table_key_data_types_map,
+)
 from common.models.errors import UnhandledAuditTableError
 
 ITEM_EXISTS_CONDITION_EXPRESSION = f"attribute_exists({AuditTableKeys.MESSAGE_ID})"
@@ -140,22 +145,39 @@ def get_record_count_and_failures_by_message_id(event_message_id: str) -> tuple[
     return int(record_count) if record_count else 0, int(failures_count) if failures_count else 0
 
 
-def increment_records_failed_count(message_id: str) -> None:
+def get_processing_checkpoint_by_message_id(event_message_id: str) -> tuple[int, int] | None:
     """
-    Increment a counter attribute safely, handling the case where it might not exist.
-    From https://docs.aws.amazon.com/code-library/latest/ug/dynamodb_example_dynamodb_Scenario_AtomicCounterOperations_section.html
+    Retrieves the number of rows processed and the byte offset at which processing of the file can resume.
+    Returns None if the file is not currently being processed or no checkpoint has been saved.
     """
-    increment_value = 1
-    initial_value = 0
+    audit_item = (
+        get_dynamodb_client()
+        .get_item(TableName=AUDIT_TABLE_NAME, Key={AuditTableKeys.MESSAGE_ID: {"S": event_message_id}})
+        .get("Item", {})
+    )
+
+    row_count = audit_item.get(AuditTableKeys.CHECKPOINT_ROW_COUNT, {}).get("N")
+    byte_offset = audit_item.get(AuditTableKeys.CHECKPOINT_BYTE_OFFSET, {}).get("N")
+    status = audit_item.get(AuditTableKeys.STATUS, {}).get("S")
+
+    if status != FileStatus.PROCESSING or not row_count or not byte_offset:
+        return None
+
+    return int(row_count), int(byte_offset)
 
+
+def increment_records_failed_count(message_id: str, increment: int = 1) -> None:
+    """
+    Atomically adds the given number of failures to the records_failed count, which is created if it does not yet exist.
+    From https://docs.aws.amazon.com/code-library/latest/ug/dynamodb_example_dynamodb_Scenario_AtomicCounterOperations_section.html
+    """
     try:
-        # Use SET with if_not_exists to safely increment the counter attribute
         get_dynamodb_client().update_item(
             TableName=AUDIT_TABLE_NAME,
             Key={AuditTableKeys.MESSAGE_ID: {"S": message_id}},
-            UpdateExpression="SET #attribute = if_not_exists(#attribute, :initial) + :increment",
+            UpdateExpression="ADD #attribute :increment",
             ExpressionAttributeNames={"#attribute": AuditTableKeys.RECORDS_FAILED},
-            ExpressionAttributeValues={":increment": {"N": str(increment_value)}, ":initial": {"N": str(initial_value)}},
+            ExpressionAttributeValues={":increment": {"N": str(increment)}},
             ConditionExpression=ITEM_EXISTS_CONDITION_EXPRESSION,
             ReturnValues="UPDATED_NEW",
         )
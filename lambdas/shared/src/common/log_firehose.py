@@ -1,10 +1,21 @@
 import json
+import time
 
 from common.clients import (
     get_firehose_client,
     logger,
 )
 
+# PutRecordBatch accepts at most 500 records, and 4 MiB in total, in each request
+FIREHOSE_PUT_RECORD_BATCH_MAX_RECORDS = 500
+FIREHOSE_PUT_RECORD_BATCH_MAX_BYTES = 4 * 1024 * 1024
+FIREHOSE_PUT_RECORD_BATCH_MAX_ATTEMPTS = 3
+FIREHOSE_PUT_RECORD_BATCH_BASE_BACKOFF_SECONDS = 0.1
+
+
+def _encode_log(log_data: dict) -> dict:
+    return {"Data": json.dumps({"event": log_data}).encode("utf-8")}
+
 
 # Not keen on including blocking calls in function code to forward log data to Splunk (via Firehose)
 # Consider simply logging and setting up CW subscription filters to forward to Firehose
@@ -12,8 +23,55 @@ from common.clients import (
 def send_log_to_firehose(stream_name: str, log_data: dict) -> None:
     """Sends the log_message to Firehose"""
     try:
-        record = {"Data": json.dumps({"event": log_data}).encode("utf-8")}
+        record = _encode_log(log_data)
         response = get_firehose_client().put_record(DeliveryStreamName=stream_name, Record=record)
         logger.info("Log sent to Firehose: %s", response)
     except Exception as error:  # pylint:disable = broad-exception-caught
         logger.exception("Error sending log to Firehose: %s", error)
+
+
+def send_logs_to_firehose(stream_name: str, logs_data: list[dict]) -> None:
+    """
+    Sends the log messages to Firehose with as few PutRecordBatch requests as the batch limits allow, resending any
+    records which Firehose rejects
+    """
+    batch = []
+    batch_bytes = 0
+    for log_data in logs_data:
+        record = _encode_log(log_data)
+        if batch and (
+            len(batch) >= FIREHOSE_PUT_RECORD_BATCH_MAX_RECORDS
+            or batch_bytes + len(record["Data"]) > FIREHOSE_PUT_RECORD_BATCH_MAX_BYTES
+        ):
+            _put_record_batch_with_retry(stream_name, batch)
+            batch = []
+            batch_bytes = 0
+
+        batch.append(record)
+        batch_bytes += len(record["Data"])
+
+    if batch:
+        _put_record_batch_with_retry(stream_name, batch)
+
+
+def _put_record_batch_with_retry(stream_name: str, records: list[dict]) -> None:
+    try:
+        for attempt in range(FIREHOSE_PUT_RECORD_BATCH_MAX_ATTEMPTS):
+            if attempt > 0:
+                time.sleep(FIREHOSE_PUT_RECORD_BATCH_BASE_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+            response = get_firehose_client().put_record_batch(DeliveryStreamName=stream_name, Records=records)
+            if not response.get("FailedPutCount"):
+                logger.info("%d logs sent to Firehose", len(records))
+                return
+
+            records = [
+                record
+                for record, result in zip(records, response["RequestResponses"], strict=True)
+                if result.get("ErrorCode")
+            ]
+            logger.warning("%d logs were rejected by Firehose on attempt %d", len(records), attempt + 1)
+
+        logger.error("%d logs could not be sent to Firehose", len(records))
+    except Exception as error:  # pylint:disable = broad-exception-caught
+        logger.exception("Error sending logs to Firehose: %s", error)
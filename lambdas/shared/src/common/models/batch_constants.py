@@ -36,6 +36,8 @@ class AuditTableKeys(StrEnum):
     RECORDS_SUCCEEDED = "records_succeeded"
     RECORDS_FAILED = "records_failed"
     ERROR_DETAILS = "error_details"
+    CHECKPOINT_ROW_COUNT = "checkpoint_row_count"
+    CHECKPOINT_BYTE_OFFSET = "checkpoint_byte_offset"
 
 
 class AuditTableKeyDataTypes(StrEnum):
@@ -56,6 +58,8 @@ audit_table_key_data_types_map = {
     AuditTableKeys.RECORDS_SUCCEEDED: AuditTableKeyDataTypes.NUMBER,
     AuditTableKeys.RECORDS_FAILED: AuditTableKeyDataTypes.NUMBER,
     AuditTableKeys.ERROR_DETAILS: AuditTableKeyDataTypes.STRING,
+    AuditTableKeys.CHECKPOINT_ROW_COUNT: AuditTableKeyDataTypes.NUMBER,
+    AuditTableKeys.CHECKPOINT_BYTE_OFFSET: AuditTableKeyDataTypes.NUMBER,
 }
 
 
@@ -88,3 +88,7 @@ class RedisHashKeys:
     VACCINE_TYPE_TO_DISEASES_HASH_KEY = "vacc_to_diseases"
     TARGET_DISEASE_LIST_KEY = "target_disease_list"
     TARGET_DISEASE_TO_VACCS_KEY = "target_disease_to_vaccs"
+
+
+# Counter incremented by redis_sync whenever config is uploaded, so that local caches of Redis data can be invalidated
+REDIS_CONFIG_VERSION_KEY = "config_version"
@@ -0,0 +1,31 @@
+"""Index of the resources contained in a FHIR Immunization Resource"""
+
+
+class ContainedResources:
+    """
+    The resources contained in a FHIR Immunization Resource, indexed by resourceType with a single traversal of
+    contained, so that each lookup does not have to scan contained again. As with get_contained_resource, the first
+    resource of each type is used. The index is not updated if contained is changed afterwards.
+    """
+
+    __slots__ = ("_resources_by_type",)
+
+    def __init__(self, imms: dict):
+        self._resources_by_type = {}
+        for resource in imms["contained"]:
+            self._resources_by_type.setdefault(resource.get("resourceType"), resource)
+
+    def get(self, resource_type: str) -> dict:
+        """Returns the first contained resource of the given type, raising IndexError if there is none"""
+        try:
+            return self._resources_by_type[resource_type]
+        except KeyError as error:
+            raise IndexError(f"There is no contained {resource_type} resource") from error
+
+    @property
+    def patient(self) -> dict:
+        return self.get("Patient")
+
+    @property
+    def practitioner(self) -> dict:
+        return self.get("Practitioner")
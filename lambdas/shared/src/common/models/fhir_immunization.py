@@ -1,10 +1,12 @@
 """Immunization FHIR R4B validator"""
 
 from fhir.resources.R4B.immunization import Immunization
+from redis import RedisError
 
+from common.clients import logger
 from common.models.fhir_immunization_post_validators import PostValidators
 from common.models.fhir_immunization_pre_validators import PreValidators
-from common.models.utils.validation_utils import get_vaccine_type
+from common.models.utils.validation_utils import get_vaccine_type, prefetch_vaccine_types
 
 
 class ImmunizationValidator:
@@ -23,9 +25,9 @@ class ImmunizationValidator:
             raise ValueError(error)
 
     @staticmethod
-    def run_fhir_validators(immunization: dict) -> None:
-        """Run the FHIR validator on the FHIR Immunization Resource JSON data"""
-        Immunization.parse_obj(immunization)
+    def run_fhir_validators(immunization: dict) -> Immunization:
+        """Run the FHIR validator on the FHIR Immunization Resource JSON data, returning the parsed model"""
+        return Immunization.parse_obj(immunization)
 
     @staticmethod
     def run_post_validators(immunization: dict, vaccine_type: str) -> None:
@@ -33,25 +35,54 @@ class ImmunizationValidator:
         if error := PostValidators(immunization, vaccine_type).validate():
             raise ValueError(error)
 
-    def validate(self, immunization_json_data: dict) -> Immunization:
+    def validate(
+        self,
+        immunization_json_data: dict,
+        prefetched_vaccine_types: dict[str, str | None] | None = None,
+    ) -> Immunization:
         """
         Generate the Immunization model. Note that run_pre_validators, run_fhir_validators, get_vaccine_type and
-        run_post_validators will each raise errors if validation is failed.
+        run_post_validators will each raise errors if validation is failed. The model is returned so that callers do
+        not need to parse the resource again. Vaccine types already read by prefetch_vaccine_types are not read again.
         """
         # Pre-FHIR validations
         self.run_pre_validators(immunization_json_data)
 
         # FHIR validations
-        self.run_fhir_validators(immunization_json_data)
+        immunization = self.run_fhir_validators(immunization_json_data)
 
         # Identify and validate vaccine type
-        vaccine_type = get_vaccine_type(immunization_json_data)
+        vaccine_type = get_vaccine_type(immunization_json_data, prefetched_vaccine_types)
 
         # Post-FHIR validations
         if self.add_post_validators:
             self.run_post_validators(immunization_json_data, vaccine_type)
 
+        return immunization
+
+    def validate_batch(self, immunizations: list[dict]) -> list[Immunization | Exception]:
+        """
+        Validate a batch of FHIR Immunization Resources, returning for each one, in the same order, either its
+        Immunization model or the error which validate would have raised for it. The vaccine types of the whole batch
+        are read from Redis together, rather than once per resource.
+        """
+        try:
+            prefetched_vaccine_types = prefetch_vaccine_types(immunizations)
+        except RedisError as error:
+            # Each resource reads its own vaccine type instead, so that any failure is reported against it
+            logger.warning("Unable to prefetch vaccine types for the batch: %s", error)
+            prefetched_vaccine_types = None
+
+        results = []
+        for immunization in immunizations:
+            try:
+                results.append(self.validate(immunization, prefetched_vaccine_types))
+            except Exception as error:  # pylint: disable = broad-exception-caught
+                results.append(error)
+
+        return results
+
     def run_postal_code_validator(self, values: dict) -> None:
         """Run pre validation on the FHIR Immunization Resource JSON data"""
-        if error := PreValidators.pre_validate_patient_address_postal_code(self, values):
+        if error := PreValidators(values).pre_validate_patient_address_postal_code(values):
             raise ValueError(error)
@@ -1,5 +1,6 @@
 "FHIR Immunization Post Validators"
 
+from common.models.contained_resources import ContainedResources
 from common.models.errors import MandatoryError
 from common.models.field_locations import FieldLocations
 from common.models.field_names import FieldNames
@@ -15,6 +16,7 @@ class PostValidators:
         self.imms = imms
         self.vaccine_type = vaccine_type
         self.errors = []
+        self.contained_resources = None
 
         # Note that the majority of fields require standard validation. Exception not included in the below list is
         # reason_code_coding_code, which has its own bespoke validation function.
@@ -94,7 +96,7 @@ class PostValidators:
         """Runs standard validation for the field"""
 
         field_location = obtain_field_location(field_name, field_locations)
-        field_value = obtain_field_value(self.imms, field_name)
+        field_value = obtain_field_value(self.imms, field_name, self.contained_resources)
         self.run_field_validation(mandation_functions, validation_set, field_name, field_location, field_value)
 
     # Note: this method is commented out as it is for a required element (validation should always pass),
@@ -136,9 +138,16 @@ class PostValidators:
             ValidationSets.vaccine_type_agnostic,
         )
 
+        # Index the contained resources once, rather than scanning contained for each field read from them. If
+        # contained can't be indexed then the contained resources are looked up directly
+        try:
+            self.contained_resources = ContainedResources(self.imms)
+        except (KeyError, TypeError, AttributeError):
+            self.contained_resources = None
+
         # Create an instance of FieldLocations and set dynamic fields
         field_locations = FieldLocations()
-        field_locations.set_dynamic_fields(self.imms)
+        field_locations.set_dynamic_fields(self.imms, self.contained_resources)
 
         # Validate all fields which have standard validation
         for field_name in self.fields_with_standard_validation:
@@ -1,6 +1,7 @@
 "FHIR Immunization Pre Validators"
 
 from common.models.constants import Constants, Urls
+from common.models.contained_resources import ContainedResources
 from common.models.errors import MandatoryError
 from common.models.utils.generic_utils import (
     check_for_unknown_elements,
@@ -26,6 +27,31 @@ class PreValidators:
     def __init__(self, immunization: dict):
         self.immunization = immunization
         self.errors = []
+        self._contained_resources = None
+
+    def _get_contained_resources(self, values: dict) -> ContainedResources | None:
+        """
+        Returns the index of the contained resources of the immunization being validated, which is built on first use
+        so that contained is traversed once rather than by every validator. Returns None for any other values, or if
+        contained can't be indexed, in which case the contained resources are looked up directly.
+        """
+        if values is not self.immunization:
+            return None
+
+        if self._contained_resources is None:
+            try:
+                self._contained_resources = ContainedResources(values)
+            except (KeyError, TypeError, AttributeError):
+                return None
+
+        return self._contained_resources
+
+    def _get_contained_resource(self, values: dict, resource_type: str) -> dict:
+        """Returns the first contained resource of the given type, raising IndexError if there is none"""
+        if (contained := self._get_contained_resources(values)) is not None:
+            return contained.get(resource_type)
+
+        return [x for x in values["contained"] if x.get("resourceType") == resource_type][0]
 
     def validate(self):
         """Run all pre-validation checks."""
@@ -201,7 +227,7 @@ class PreValidators:
             raise ValueError("patient.reference must be a single reference to a contained Patient resource")
 
         # Obtain the contained patient resource
-        contained_patient = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]
+        contained_patient = self._get_contained_resource(values, "Patient")
 
         # If the reference is not equal to the contained patient id then raise an error
         if ("#" + contained_patient["id"]) != patient_reference:
@@ -222,14 +248,16 @@ class PreValidators:
         ]
 
         # If there is no practitioner then check that there are no internal references within performer
-        if not (practitioner := [x for x in values["contained"] if x.get("resourceType") == "Practitioner"]):
+        try:
+            practitioner = self._get_contained_resource(values, "Practitioner")
+        except IndexError:
             if len(performer_internal_references) != 0:
                 raise ValueError(
                     "performer must not contain internal references when there is no contained Practitioner resource"
                 )
             return None
 
-        practitioner_id = str(practitioner[0]["id"])
+        practitioner_id = str(practitioner["id"])
 
         # Ensure that there are no internal references other than to the contained practitioner
         if any(x != "#" + practitioner_id for x in performer_internal_references):
@@ -254,7 +282,7 @@ class PreValidators:
         an extension field, it raises a validation error.
         """
         try:
-            patient = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]
+            patient = self._get_contained_resource(values, "Patient")
             identifier = patient["identifier"][0]
 
             if "extension" in identifier:
@@ -268,7 +296,7 @@ class PreValidators:
         """
         field_location = "contained[?(@.resourceType=='Patient')].identifier"
         try:
-            field_value = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]["identifier"]
+            field_value = self._get_contained_resource(values, "Patient")["identifier"]
             PreValidation.for_list(field_value, field_location, defined_length=1)
         except (KeyError, IndexError):
             pass
@@ -280,9 +308,7 @@ class PreValidators:
         """
         field_location = "contained[?(@.resourceType=='Patient')].identifier[0].system"
         try:
-            field_value = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]["identifier"][0][
-                "system"
-            ]
+            field_value = self._get_contained_resource(values, "Patient")["identifier"][0]["system"]
             PreValidation.for_string(field_value, field_location)
         except (KeyError, IndexError):
             pass
@@ -294,9 +320,7 @@ class PreValidators:
         """
         field_location = "contained[?(@.resourceType=='Patient')].identifier[0].system"
         try:
-            field_value = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]["identifier"][0][
-                "system"
-            ]
+            field_value = self._get_contained_resource(values, "Patient")["identifier"][0]["system"]
             if field_value != Urls.NHS_NUMBER:
                 raise ValueError(f"{field_location} must equal '{Urls.NHS_NUMBER}'")
         except (KeyError, IndexError):
@@ -309,7 +333,7 @@ class PreValidators:
         """
         field_location = f"contained[?(@.resourceType=='Patient')].identifier[?(@.system=='{Urls.NHS_NUMBER}')].value"
         try:
-            patient = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]
+            patient = self._get_contained_resource(values, "Patient")
             field_value = [x for x in patient["identifier"] if x.get("system") == Urls.NHS_NUMBER][0]["value"]
             PreValidation.for_string(field_value, field_location, defined_length=10, spaces_allowed=False)
             PreValidation.for_nhs_number(field_value, field_location)
@@ -322,7 +346,7 @@ class PreValidators:
         """
         field_location = "contained[?(@.resourceType=='Patient')].name"
         try:
-            field_value = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]["name"]
+            field_value = self._get_contained_resource(values, "Patient")["name"]
             PreValidation.for_list(field_value, field_location, elements_are_dicts=True)
         except (KeyError, IndexError):
             pass
@@ -333,10 +357,12 @@ class PreValidators:
         (legacy CSV field name:PERSON_FORENAME) exists, then it is an array containing a maximum of 5 items an no items
         may exceed the GIVEN_NAME_ELEMENT_MAX_LENGTH value
         """
-        field_location = patient_name_given_field_location(values)
+        field_location = patient_name_given_field_location(values, self._get_contained_resources(values))
 
         try:
-            field_value, _ = patient_and_practitioner_value_and_index(values, "given", "Patient")
+            field_value, _ = patient_and_practitioner_value_and_index(
+                values, "given", "Patient", self._get_contained_resources(values)
+            )
             PreValidation.for_list(
                 field_value,
                 field_location,
@@ -353,9 +379,11 @@ class PreValidators:
         PERSON_SURNAME) exists, index dynamically determined then it is a non-empty string no longer than the
         FAMILY_NAME_MAX_LENGTH value
         """
-        field_location = patient_name_family_field_location(values)
+        field_location = patient_name_family_field_location(values, self._get_contained_resources(values))
         try:
-            field_value, _ = patient_and_practitioner_value_and_index(values, "family", "Patient")
+            field_value, _ = patient_and_practitioner_value_and_index(
+                values, "family", "Patient", self._get_contained_resources(values)
+            )
             PreValidation.for_string(field_value, field_location, max_length=Constants.FAMILY_NAME_MAX_LENGTH)
         except (KeyError, IndexError, AttributeError):
             pass
@@ -367,7 +395,7 @@ class PreValidators:
         """
         field_location = "contained[?(@.resourceType=='Patient')].birthDate"
         try:
-            field_value = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]["birthDate"]
+            field_value = self._get_contained_resource(values, "Patient")["birthDate"]
             PreValidation.for_date(field_value, field_location)
         except (KeyError, IndexError):
             pass
@@ -379,7 +407,7 @@ class PreValidators:
         """
         field_location = "contained[?(@.resourceType=='Patient')].gender"
         try:
-            field_value = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]["gender"]
+            field_value = self._get_contained_resource(values, "Patient")["gender"]
             PreValidation.for_string(field_value, field_location, predefined_values=Constants.GENDERS)
         except (KeyError, IndexError):
             pass
@@ -390,7 +418,7 @@ class PreValidators:
         """
         field_location = "contained[?(@.resourceType=='Patient')].address"
         try:
-            field_value = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]["address"]
+            field_value = self._get_contained_resource(values, "Patient")["address"]
             PreValidation.for_list(field_value, field_location)
         except (KeyError, IndexError):
             pass
@@ -402,7 +430,7 @@ class PreValidators:
         """
         field_location = "contained[?(@.resourceType=='Patient')].address[0].postalCode"
         try:
-            patient = [x for x in values["contained"] if x.get("resourceType") == "Patient"][0]
+            patient = self._get_contained_resource(values, "Patient")
             postal_codes = []
             for address in patient["address"]:
                 if "postalCode" in address:
@@ -516,7 +544,7 @@ class PreValidators:
         """
         field_location = "contained[?(@.resourceType=='Practitioner')].name"
         try:
-            field_values = [x for x in values["contained"] if x.get("resourceType") == "Practitioner"][0]["name"]
+            field_values = self._get_contained_resource(values, "Practitioner")["name"]
             PreValidation.for_list(field_values, field_location, elements_are_dicts=True)
         except (KeyError, IndexError, AttributeError):
             pass
@@ -527,9 +555,11 @@ class PreValidators:
         determined (legacy CSV field name:PERSON_FORENAME) exists, then it is an array containing a single non-empty
         string
         """
-        field_location = practitioner_name_given_field_location(values)
+        field_location = practitioner_name_given_field_location(values, self._get_contained_resources(values))
         try:
-            field_value, _ = patient_and_practitioner_value_and_index(values, "given", "Practitioner")
+            field_value, _ = patient_and_practitioner_value_and_index(
+                values, "given", "Practitioner", self._get_contained_resources(values)
+            )
             PreValidation.for_list(field_value, field_location, elements_are_strings=True)
         except (KeyError, IndexError, AttributeError):
             pass
@@ -540,9 +570,11 @@ class PreValidators:
         index dynamically determined (legacy CSV field name:PERSON_SURNAME) exists,
         then it is a an array containing a single non-empty string
         """
-        field_location = practitioner_name_family_field_location(values)
+        field_location = practitioner_name_family_field_location(values, self._get_contained_resources(values))
         try:
-            field_name, _ = patient_and_practitioner_value_and_index(values, "family", "Practitioner")
+            field_name, _ = patient_and_practitioner_value_and_index(
+                values, "family", "Practitioner", self._get_contained_resources(values)
+            )
             PreValidation.for_string(field_name, field_location)
         except (KeyError, IndexError):
             pass
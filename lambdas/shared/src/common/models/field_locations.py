@@ -6,6 +6,7 @@ resource json data
 from dataclasses import dataclass, field
 
 from common.models.constants import Urls
+from common.models.contained_resources import ContainedResources
 from common.models.utils.generic_utils import (
     generate_field_location_for_extension,
     patient_name_family_field_location,
@@ -62,9 +63,9 @@ class FieldLocations:
     location_identifier_value = "location.identifier.value"
     location_identifier_system = "location.identifier.system"
 
-    def set_dynamic_fields(self, imms: dict):
-        """Sets the dynamic fields based on the imms dictionary."""
-        self.patient_name_given = patient_name_given_field_location(imms)
-        self.patient_name_family = patient_name_family_field_location(imms)
-        self.practitioner_name_given = practitioner_name_given_field_location(imms)
-        self.practitioner_name_family = practitioner_name_family_field_location(imms)
+    def set_dynamic_fields(self, imms: dict, contained: ContainedResources | None = None):
+        """Sets the dynamic fields based on the imms dictionary, using the index of its contained resources if given."""
+        self.patient_name_given = patient_name_given_field_location(imms, contained)
+        self.patient_name_family = patient_name_family_field_location(imms, contained)
+        self.practitioner_name_given = practitioner_name_given_field_location(imms, contained)
+        self.practitioner_name_family = practitioner_name_family_field_location(imms, contained)
@@ -1,6 +1,7 @@
 """Functions for obtaining a field value from the FHIR immunization resource json data"""
 
 from common.models.constants import Urls
+from common.models.contained_resources import ContainedResources
 from common.models.utils.generic_utils import (
     get_contained_patient,
     get_contained_practitioner,
@@ -13,6 +14,22 @@ from common.models.utils.generic_utils import (
 class ObtainFieldValue:
     """Functions for obtaining a field value from the FHIR immunization resource json data"""
 
+    # Fields which are read from a contained resource. Their functions also accept an index of the contained resources
+    CONTAINED_RESOURCE_FIELDS = frozenset(
+        {
+            "patient_identifier_value",
+            "patient_name_given",
+            "patient_name_family",
+            "patient_birth_date",
+            "patient_gender",
+            "patient_address_postal_code",
+            "practitioner_name_given",
+            "practitioner_name_family",
+            "practitioner_identifier_value",
+            "practitioner_identifier_system",
+        }
+    )
+
     @staticmethod
     def target_disease(imms: dict):
         return imms["protocolApplied"][0]["targetDisease"]
@@ -23,46 +40,46 @@ class ObtainFieldValue:
         return imms["occurrenceDateTime"]
 
     @staticmethod
-    def patient_identifier_value(imms: dict):
+    def patient_identifier_value(imms: dict, contained: ContainedResources | None = None):
         """Obtains patient_identifier_value value"""
-        contained_patient = get_contained_patient(imms)
+        contained_patient = get_contained_patient(imms, contained)
         contained_patient_identifier = [
             x for x in contained_patient.get("identifier") if x.get("system") == Urls.NHS_NUMBER
         ][0]
         return contained_patient_identifier["value"]
 
     @staticmethod
-    def patient_name_given(imms: dict):
+    def patient_name_given(imms: dict, contained: ContainedResources | None = None):
         """Obtains patient_name field location based on logic"""
         try:
-            given_name, _ = patient_and_practitioner_value_and_index(imms, "given", "Patient")
+            given_name, _ = patient_and_practitioner_value_and_index(imms, "given", "Patient", contained)
         except (KeyError, IndexError, AttributeError):
             given_name = None
         return given_name
 
     @staticmethod
-    def patient_name_family(imms: dict):
+    def patient_name_family(imms: dict, contained: ContainedResources | None = None):
         """Obtains patient_name_family value"""
         try:
-            family_name, _ = patient_and_practitioner_value_and_index(imms, "family", "Patient")
+            family_name, _ = patient_and_practitioner_value_and_index(imms, "family", "Patient", contained)
         except (KeyError, IndexError, AttributeError):
             family_name = None
         return family_name
 
     @staticmethod
-    def patient_birth_date(imms: dict):
+    def patient_birth_date(imms: dict, contained: ContainedResources | None = None):
         """Obtains patient_birth_date value"""
-        return get_contained_patient(imms)["birthDate"]
+        return get_contained_patient(imms, contained)["birthDate"]
 
     @staticmethod
-    def patient_gender(imms: dict):
+    def patient_gender(imms: dict, contained: ContainedResources | None = None):
         """Obtains patient_gender value"""
-        return get_contained_patient(imms)["gender"]
+        return get_contained_patient(imms, contained)["gender"]
 
     @staticmethod
-    def patient_address_postal_code(imms: dict):
+    def patient_address_postal_code(imms: dict, contained: ContainedResources | None = None):
         """Obtains patient_address_postal_code value"""
-        patient = get_contained_patient(imms)
+        patient = get_contained_patient(imms, contained)
         contained_patient_postal_code = [x for x in patient.get("address") if len(x.get("postalCode", "")) >= 1][0][
             "postalCode"
         ]
@@ -89,32 +106,32 @@ class ObtainFieldValue:
         return imms["identifier"][0]["system"]
 
     @staticmethod
-    def practitioner_name_given(imms: dict):
+    def practitioner_name_given(imms: dict, contained: ContainedResources | None = None):
         """Obtains practitioner_name_given value"""
         try:
-            given_name, _ = patient_and_practitioner_value_and_index(imms, "given", "Practitioner")
+            given_name, _ = patient_and_practitioner_value_and_index(imms, "given", "Practitioner", contained)
         except (KeyError, IndexError, AttributeError):
             given_name = None
         return given_name
 
     @staticmethod
-    def practitioner_name_family(imms: dict):
+    def practitioner_name_family(imms: dict, contained: ContainedResources | None = None):
         """Obtains practitioner_name_family value"""
         try:
-            family_name, _ = patient_and_practitioner_value_and_index(imms, "family", "Practitioner")
+            family_name, _ = patient_and_practitioner_value_and_index(imms, "family", "Practitioner", contained)
         except (KeyError, IndexError, AttributeError):
             family_name = None
         return family_name
 
     @staticmethod
-    def practitioner_identifier_value(imms: dict):
+    def practitioner_identifier_value(imms: dict, contained: ContainedResources | None = None):
         """Obtains practitioner_identifier_value value"""
-        return get_contained_practitioner(imms)["identifier"][0]["value"]
+        return get_contained_practitioner(imms, contained)["identifier"][0]["value"]
 
     @staticmethod
-    def practitioner_identifier_system(imms: dict):
+    def practitioner_identifier_system(imms: dict, contained: ContainedResources | None = None):
         """Obtains practitioner_identifier_system value"""
-        return get_contained_practitioner(imms)["identifier"][0]["system"]
+        return get_contained_practitioner(imms, contained)["identifier"][0]["system"]
 
     @staticmethod
     def recorded(imms: dict):
@@ -1,20 +1,27 @@
 """Utils for backend src code"""
 
+from common.models.contained_resources import ContainedResources
 from common.models.field_locations import FieldLocations
 from common.models.obtain_field_value import ObtainFieldValue
 
 FIELD_LOCATIONS = FieldLocations()
 
 
-def obtain_field_value(imms: dict, field_name: str) -> any:
-    """Finds and returns the field value from the imms json data. Returns none if field not found."""
+def obtain_field_value(imms: dict, field_name: str, contained: ContainedResources | None = None) -> any:
+    """
+    Finds and returns the field value from the imms json data. Returns none if field not found.
+    If an index of the contained resources is given then it is used for the fields read from a contained resource.
+    """
 
     # Obtain the function for extracting the field value from the json data
     function_for_obtaining_field_value = getattr(ObtainFieldValue, field_name)
 
     # Obtain the field value, or set it to none if it can't be found
     try:
-        field_value = function_for_obtaining_field_value(imms)
+        if contained is not None and field_name in ObtainFieldValue.CONTAINED_RESOURCE_FIELDS:
+            field_value = function_for_obtaining_field_value(imms, contained)
+        else:
+            field_value = function_for_obtaining_field_value(imms)
     except (KeyError, IndexError, TypeError):
         field_value = None
 
@@ -8,29 +8,40 @@ from typing import Literal
 from stdnum.verhoeff import validate
 
 from common.models.constants import Constants
+from common.models.contained_resources import ContainedResources
 
 
-def get_nhs_number(imms: dict):
+def get_nhs_number(imms: dict, contained: ContainedResources | None = None):
     try:
-        nhs_number = [x for x in imms["contained"] if x["resourceType"] == "Patient"][0]["identifier"][0]["value"]
+        patient = contained.patient if contained else [x for x in imms["contained"] if x["resourceType"] == "Patient"][0]
+        nhs_number = patient["identifier"][0]["value"]
     except (KeyError, IndexError):
         nhs_number = "TBC"
     return nhs_number
 
 
-def get_contained_resource(imms: dict, resource: Literal["Patient", "Practitioner", "QuestionnaireResponse"]):
-    """Extract and return the requested contained resource from the FHIR Immunization Resource JSON data"""
+def get_contained_resource(
+    imms: dict,
+    resource: Literal["Patient", "Practitioner", "QuestionnaireResponse"],
+    contained: ContainedResources | None = None,
+):
+    """
+    Extract and return the requested contained resource from the FHIR Immunization Resource JSON data, using the index
+    of its contained resources if one is given
+    """
+    if contained is not None:
+        return contained.get(resource)
     return [x for x in imms.get("contained") if x.get("resourceType") == resource][0]
 
 
-def get_contained_patient(imms: dict):
+def get_contained_patient(imms: dict, contained: ContainedResources | None = None):
     """Extract and return the contained patient from the FHIR Immunization Resource JSON data"""
-    return get_contained_resource(imms, "Patient")
+    return get_contained_resource(imms, "Patient", contained)
 
 
-def get_contained_practitioner(imms: dict):
+def get_contained_practitioner(imms: dict, contained: ContainedResources | None = None):
     """Extract and return the contained practitioner from the FHIR Immunization Resource JSON data"""
-    return get_contained_resource(imms, "Practitioner")
+    return get_contained_resource(imms, "Practitioner", contained)
 
 
 def get_generic_extension_value(
@@ -127,6 +138,22 @@ def get_occurrence_datetime(immunization: dict) -> datetime.datetime | None:
     return datetime.datetime.fromisoformat(occurrence_datetime_str)
 
 
+def make_patient_occurrence_sk(vaccine_type: str, occurrence: datetime.date | str | None, imms_id: str) -> str:
+    """
+    Returns the PatientOccurrenceSK for an immunization record, made up of the vaccine type, the date of the
+    occurrence and the immunization id. Within the PatientOccurrenceGSI this orders each patient's records for a
+    vaccine type by occurrence date, so that a search for a date range can be run as a key range query.
+    The occurrence may be given as a date, a datetime or an ISO 8601 string.
+    """
+    if isinstance(occurrence, str):
+        occurrence = datetime.datetime.fromisoformat(occurrence)
+    if isinstance(occurrence, datetime.datetime):
+        occurrence = occurrence.date()
+
+    occurrence_date = occurrence.isoformat() if occurrence else ""
+    return f"{vaccine_type}#{occurrence_date}#{imms_id}"
+
+
 def create_diagnostics():
     diagnostics = (
         "Validation errors: contained[?(@.resourceType=='Patient')].identifier"
@@ -252,10 +279,12 @@ def get_current_name_instance(names: list, occurrence_date: datetime) -> dict |
     return 0, names[0]
 
 
-def patient_and_practitioner_value_and_index(imms: dict, name_value: str, resource_type: str):
+def patient_and_practitioner_value_and_index(
+    imms: dict, name_value: str, resource_type: str, contained: ContainedResources | None = None
+):
     """Obtains patient_name_given, patient_name_family, practitioner_name_given or practitioner_name_family
     value and index, dependent on the resource_type and name_value"""
-    resource = get_contained_resource(imms, resource_type)
+    resource = get_contained_resource(imms, resource_type, contained)
     name = resource["name"]
 
     # Get occurrenceDateTime
@@ -270,33 +299,33 @@ def patient_and_practitioner_value_and_index(imms: dict, name_value: str, resour
     return name_field, index
 
 
-def obtain_name_field_location(imms, resource_type, name_value):
+def obtain_name_field_location(imms, resource_type, name_value, contained: ContainedResources | None = None):
     """Obtains the field location of the name value for the given resource type based on the relevant logic."""
     try:
-        _, index = patient_and_practitioner_value_and_index(imms, name_value, resource_type)
+        _, index = patient_and_practitioner_value_and_index(imms, name_value, resource_type, contained)
     except (KeyError, IndexError, AttributeError):
         index = 0
     return generate_field_location_for_name(index, name_value, resource_type)
 
 
-def patient_name_given_field_location(imms: dict):
+def patient_name_given_field_location(imms: dict, contained: ContainedResources | None = None):
     """Obtains patient_name field location based on logic"""
-    return obtain_name_field_location(imms, "Patient", "given")
+    return obtain_name_field_location(imms, "Patient", "given", contained)
 
 
-def patient_name_family_field_location(imms: dict):
+def patient_name_family_field_location(imms: dict, contained: ContainedResources | None = None):
     """Obtains patient_name_family field location based on logic"""
-    return obtain_name_field_location(imms, "Patient", "family")
+    return obtain_name_field_location(imms, "Patient", "family", contained)
 
 
-def practitioner_name_given_field_location(imms: dict):
+def practitioner_name_given_field_location(imms: dict, contained: ContainedResources | None = None):
     """Obtains practitioner_name_given field location based on logic"""
-    return obtain_name_field_location(imms, "Practitioner", "given")
+    return obtain_name_field_location(imms, "Practitioner", "given", contained)
 
 
-def practitioner_name_family_field_location(imms: dict):
+def practitioner_name_family_field_location(imms: dict, contained: ContainedResources | None = None):
     """Obtains practitioner_name_family field location based on logic"""
-    return obtain_name_field_location(imms, "Practitioner", "family")
+    return obtain_name_field_location(imms, "Practitioner", "family", contained)
 
 
 def get_occurrence_datetime_for_name(immunization: dict) -> datetime.datetime | None:
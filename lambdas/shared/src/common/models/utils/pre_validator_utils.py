@@ -143,12 +143,15 @@ class PreValidation:
             "+0100",
         }
 
-        # List of accepted strict formats
-        formats = [
-            "%Y-%m-%d",
-            "%Y-%m-%dT%H:%M:%S%z",
-            "%Y-%m-%dT%H:%M:%S.%f%z",
-        ]
+        # Only the accepted strict formats which could match are tried, as a failed strptime is expensive. A date
+        # cannot contain a "T", and only the format with milliseconds contains a ".". strptime matches the "T"
+        # separator case-insensitively, so a lowercase "t" is accepted too
+        if "T" not in field_value and "t" not in field_value:
+            formats = ("%Y-%m-%d",)
+        elif "." in field_value:
+            formats = ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S.%f%z")
+        else:
+            formats = ("%Y-%m-%dT%H:%M:%S%z",)
 
         for fmt in formats:
             try:
@@ -9,6 +9,7 @@ from common.models.errors import InconsistentIdentifierError, InconsistentResour
 from common.models.field_names import FieldNames
 from common.models.obtain_field_value import ObtainFieldValue
 from common.models.utils.base_utils import obtain_field_location
+from common.redis_cache import cached_hget, cached_hmget
 from common.redis_client import get_redis_client
 
 
@@ -45,15 +46,42 @@ def get_target_disease_codes(immunization: dict):
     return target_disease_codes
 
 
+def make_disease_codes_key(disease_codes: list) -> str:
+    """Returns the field of the diseases to vaccine type hash for the combination of disease codes"""
+    return ":".join(sorted(disease_codes))
+
+
+def prefetch_vaccine_types(immunizations: list[dict]) -> dict[str, str | None]:
+    """
+    Takes a list of FHIR immunization resources and returns the vaccine type for each distinct combination of target
+    disease codes among them (None if the combination is not valid), read from Redis with a single HMGET. Resources
+    whose target disease codes cannot be obtained are skipped, as validating them will raise the appropriate error.
+    """
+    keys = {}
+    for immunization in immunizations:
+        try:
+            keys[make_disease_codes_key(get_target_disease_codes(immunization))] = None
+        except Exception:  # pylint: disable = broad-exception-caught
+            continue
+
+    keys = list(keys)
+    vaccine_types = cached_hmget(get_redis_client(), RedisHashKeys.DISEASES_TO_VACCINE_TYPE_HASH_KEY, keys)
+    return dict(zip(keys, vaccine_types))
+
+
 def convert_disease_codes_to_vaccine_type(
     disease_codes_input: list,
+    prefetched_vaccine_types: dict[str, str | None] | None = None,
 ) -> str | None:
     """
     Takes a list of disease codes and returns the corresponding vaccine type if found,
-    otherwise raises a value error
+    otherwise raises a value error. Vaccine types already read by prefetch_vaccine_types are not read again.
     """
-    key = ":".join(sorted(disease_codes_input))
-    vaccine_type = get_redis_client().hget(RedisHashKeys.DISEASES_TO_VACCINE_TYPE_HASH_KEY, key)
+    key = make_disease_codes_key(disease_codes_input)
+    if prefetched_vaccine_types is not None and key in prefetched_vaccine_types:
+        vaccine_type = prefetched_vaccine_types[key]
+    else:
+        vaccine_type = cached_hget(get_redis_client(), RedisHashKeys.DISEASES_TO_VACCINE_TYPE_HASH_KEY, key)
 
     if not vaccine_type:
         raise ValueError(
@@ -63,7 +91,10 @@ def convert_disease_codes_to_vaccine_type(
     return vaccine_type
 
 
-def get_vaccine_type(immunization: dict | Any) -> str:
+def get_vaccine_type(
+    immunization: dict | Any,
+    prefetched_vaccine_types: dict[str, str | None] | None = None,
+) -> str:
     """
     Take a FHIR immunization resource (dict or Immunization model) and returns the vaccine type
     based on the combination of target diseases. If combination of disease types does not map
@@ -82,7 +113,7 @@ def get_vaccine_type(immunization: dict | Any) -> str:
         raise ValueError(f"{obtain_field_location(FieldNames.target_disease_codes)} is a mandatory field") from error
 
     # Convert list of target diseases to vaccine type
-    return convert_disease_codes_to_vaccine_type(target_diseases)
+    return convert_disease_codes_to_vaccine_type(target_diseases, prefetched_vaccine_types)
 
 
 def validate_identifiers_match(new_identifier: Identifier, existing_identifier: Identifier) -> None:
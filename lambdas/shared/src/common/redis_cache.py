@@ -0,0 +1,146 @@
+"""
+In-process cache of Redis reads (and of values derived from them), shared by all invocations handled by a warm Lambda
+container.
+
+Entries expire after REDIS_LOCAL_CACHE_TTL_SECONDS (the cache is disabled if this is 0, which is the default).
+The config version stamp, which redis_sync increments whenever it uploads new config, is read at most once every
+REDIS_LOCAL_CACHE_VERSION_CHECK_SECONDS, and all entries are discarded if it has changed.
+"""
+
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+from common.clients import logger
+from common.models.constants import REDIS_CONFIG_VERSION_KEY
+
+
+class RedisLocalCache:
+    """Time-limited cache of values read from Redis, invalidated when the Redis config version stamp changes"""
+
+    def __init__(self, ttl_seconds: float, version_check_interval_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.version_check_interval_seconds = version_check_interval_seconds
+        self._entries: dict[tuple, tuple[float, Any]] = {}
+        self._version = None
+        self._version_checked_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, redis_client, cache_key: tuple, fetch: Callable[[], Any]) -> Any:
+        """Returns the cached value for the key if it is still valid, or else fetches, caches and returns it"""
+        if self.ttl_seconds <= 0:
+            return fetch()
+
+        now = time.monotonic()
+        self._check_version(redis_client, now)
+
+        entry = self._entries.get(cache_key)
+        if entry is not None and now - entry[0] < self.ttl_seconds:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = fetch()
+        self._entries[cache_key] = (now, value)
+        return value
+
+    def get_many(self, redis_client, cache_keys: list[tuple], fetch_many: Callable[[list[tuple]], list]) -> list:
+        """
+        Returns the cached values for the keys, in the same order, fetching all of the keys which are not cached or
+        have expired with a single call to fetch_many, which returns their values in the order of the keys given
+        """
+        if self.ttl_seconds <= 0:
+            return list(fetch_many(cache_keys))
+
+        now = time.monotonic()
+        self._check_version(redis_client, now)
+
+        values = {}
+        keys_to_fetch = []
+        for cache_key in dict.fromkeys(cache_keys):
+            entry = self._entries.get(cache_key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self.hits += 1
+                values[cache_key] = entry[1]
+            else:
+                keys_to_fetch.append(cache_key)
+
+        if keys_to_fetch:
+            self.misses += len(keys_to_fetch)
+            for cache_key, value in zip(keys_to_fetch, fetch_many(keys_to_fetch)):
+                self._entries[cache_key] = (now, value)
+                values[cache_key] = value
+
+        return [values[cache_key] for cache_key in cache_keys]
+
+    def clear(self) -> None:
+        """Discards all cached entries and resets the counters"""
+        self._entries.clear()
+        self._version = None
+        self._version_checked_at = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        """Returns the cache counters, for observability"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+        }
+
+    def _check_version(self, redis_client, now: float) -> None:
+        """Discards all entries if the config version stamp in Redis has changed since it was last read"""
+        if self._version_checked_at is not None and now - self._version_checked_at < self.version_check_interval_seconds:
+            return
+
+        version = redis_client.get(REDIS_CONFIG_VERSION_KEY)
+        self._version_checked_at = now
+
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info("Redis config version changed from %s to %s - clearing local cache", self._version, version)
+            self._entries.clear()
+            self._version = version
+
+
+redis_local_cache = RedisLocalCache(
+    ttl_seconds=float(os.getenv("REDIS_LOCAL_CACHE_TTL_SECONDS", "0")),
+    version_check_interval_seconds=float(os.getenv("REDIS_LOCAL_CACHE_VERSION_CHECK_SECONDS", "5")),
+)
+
+
+def cached_hget(redis_client, key: str, field: str) -> str | None:
+    """Returns the value of the field in the Redis hash, using the local cache"""
+    return redis_local_cache.get(redis_client, ("hget", key, field), lambda: redis_client.hget(key, field))
+
+
+def cached_hmget(redis_client, key: str, fields: list[str]) -> list[str | None]:
+    """
+    Returns the values of the fields in the Redis hash, in the same order, using the local cache and reading all of the
+    fields which are not cached with a single HMGET. The fields share their cache entries with cached_hget.
+    """
+    if not fields:
+        return []
+
+    return redis_local_cache.get_many(
+        redis_client,
+        [("hget", key, field) for field in fields],
+        lambda cache_keys: redis_client.hmget(key, [cache_key[2] for cache_key in cache_keys]),
+    )
+
+
+def cached_hkeys(redis_client, key: str) -> list:
+    """Returns all fields in the Redis hash, using the local cache"""
+    return list(redis_local_cache.get(redis_client, ("hkeys", key), lambda: redis_client.hkeys(key)))
+
+
+def get_redis_cache_stats() -> dict:
+    """Returns the hit, miss and invalidation counts for the local Redis cache"""
+    return redis_local_cache.stats()
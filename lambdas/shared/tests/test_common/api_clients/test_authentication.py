@@ -1,21 +1,38 @@
 import base64
 import json
+import threading
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import ANY, MagicMock, patch
 
+import jwt
 import responses
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 from responses import matchers
 
 from common.api_clients.authentication import ACCESS_TOKEN_EXPIRY_SECONDS, AppRestrictedAuth
 from common.models.errors import UnhandledResponseError
 
 
+def _generate_private_key_pem() -> str:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode()
+
+
 class TestAuthenticator(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key = _generate_private_key_pem()
+
     def setUp(self):
         self.kid = "a_kid"
         self.api_key = "an_api_key"
-        self.private_key = "a_private_key"
         # The private key must be stored as base64 encoded in secret-manager
         b64_private_key = base64.b64encode(self.private_key.encode()).decode()
 
@@ -80,7 +97,24 @@ class TestAuthenticator(unittest.TestCase):
             # When
             self.authenticator.get_access_token()
             # Then
-            mock_jwt.assert_called_once_with(claims, self.private_key, algorithm="RS512", headers={"kid": self.kid})
+            mock_jwt.assert_called_once_with(claims, ANY, algorithm="RS512", headers={"kid": self.kid})
+            signing_key = mock_jwt.call_args.args[1]
+            self.assertEqual(
+                signing_key.private_numbers(),
+                serialization.load_pem_private_key(self.private_key.encode(), password=None).private_numbers(),
+            )
+
+    def test_signing_key_is_parsed_once(self):
+        """it should parse the private key once, and sign each JWT with the parsed key"""
+        with patch(
+            "common.api_clients.authentication.load_pem_private_key", wraps=serialization.load_pem_private_key
+        ) as mock_load_key:
+            first_jwt = self.authenticator.create_jwt(int(time.time()))
+            self.authenticator.create_jwt(int(time.time()))
+
+        mock_load_key.assert_called_once()
+        public_key = serialization.load_pem_private_key(self.private_key.encode(), password=None).public_key()
+        self.assertEqual(jwt.decode(first_jwt, public_key, algorithms=["RS512"], audience=self.url)["iss"], self.api_key)
 
     def test_env_mapping(self):
         """it should target int environment for none-prod environment, otherwise int"""
@@ -160,6 +194,25 @@ class TestAuthenticator(unittest.TestCase):
         self.assertEqual(self.authenticator.cached_access_token, new_token)
         self.assertEqual(self.authenticator.cached_access_token_expiry_time, new_now + ACCESS_TOKEN_EXPIRY_SECONDS)
 
+    def test_concurrent_callers_share_one_token_request(self):
+        """it should request a single token when several threads find there is no cached token"""
+        token_response = MagicMock(status_code=200)
+        token_response.json.return_value = {"access_token": "a-new-access-token"}
+
+        def slow_token_request(_jwt_assertion):
+            time.sleep(0.1)
+            return token_response
+
+        with (
+            patch("common.api_clients.authentication.jwt.encode", return_value="a-jwt"),
+            patch.object(self.authenticator, "_request_access_token", side_effect=slow_token_request) as mock_request,
+            ThreadPoolExecutor(max_workers=5) as executor,
+        ):
+            tokens = list(executor.map(lambda _: self.authenticator.get_access_token(), range(5)))
+
+        self.assertEqual(tokens, ["a-new-access-token"] * 5)
+        mock_request.assert_called_once()
+
     @responses.activate
     def test_raise_exception(self):
         """it should raise exception if auth response is not 200"""
@@ -170,3 +223,90 @@ class TestAuthenticator(unittest.TestCase):
             with self.assertRaises(UnhandledResponseError):
                 # When
                 self.authenticator.get_access_token()
+
+
+class TestAuthenticatorRefreshAhead(unittest.TestCase):
+    def setUp(self):
+        self.authenticator = AppRestrictedAuth(MagicMock(), "an-env", refresh_after_fraction=0.75)
+        self.now = int(time.time())
+        # A token which is still valid, but has passed 3/4 of its lifetime
+        self.authenticator.cached_access_token = "an-old-access-token"
+        self.authenticator.cached_access_token_expiry_time = self.now + 100
+        self.authenticator.cached_access_token_refresh_time = self.now - 1
+
+        self.token_response = MagicMock(status_code=200)
+        self.token_response.json.return_value = {"access_token": "a-new-access-token"}
+        patch.object(AppRestrictedAuth, "create_jwt", return_value="a-jwt").start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    def wait_for_background_refresh(self):
+        self.authenticator._refresh_thread.join(5)
+
+    def test_token_is_refreshed_in_the_background(self):
+        """it should return the cached token and request a new one in the background once it is due for refresh"""
+        with patch.object(self.authenticator, "_request_access_token", return_value=self.token_response) as mock_request:
+            token = self.authenticator.get_access_token()
+            self.wait_for_background_refresh()
+
+        self.assertEqual(token, "an-old-access-token")
+        mock_request.assert_called_once()
+        self.assertEqual(self.authenticator.get_access_token(), "a-new-access-token")
+        self.assertEqual(
+            self.authenticator.cached_access_token_refresh_time - self.authenticator.cached_access_token_expiry_time,
+            -int(ACCESS_TOKEN_EXPIRY_SECONDS * 0.25),
+        )
+        stats = self.authenticator.refresh_stats()
+        self.assertEqual((stats["refresh_count"], stats["background_refresh_count"]), (1, 1))
+        self.assertTrue(stats["last_refresh_timings"]["background"])
+        self.assertEqual(
+            set(stats["last_refresh_timings"]), {"background", "jwt_sign_ms", "token_request_ms", "total_ms"}
+        )
+
+    def test_only_one_background_refresh_runs_at_a_time(self):
+        """it should not start another refresh while one is in flight"""
+        release_request = threading.Event()
+
+        def slow_token_request(_jwt_assertion):
+            release_request.wait(5)
+            return self.token_response
+
+        with patch.object(self.authenticator, "_request_access_token", side_effect=slow_token_request) as mock_request:
+            tokens = [self.authenticator.get_access_token() for _ in range(5)]
+            release_request.set()
+            self.wait_for_background_refresh()
+
+        self.assertEqual(tokens, ["an-old-access-token"] * 5)
+        mock_request.assert_called_once()
+
+    @patch("common.api_clients.authentication.logger.warning")
+    def test_failed_background_refresh_keeps_the_cached_token(self, mock_logger_warning):
+        """it should keep using the cached token, and try again later, if the background refresh fails"""
+        failed_response = MagicMock(status_code=500, text="error")
+
+        with patch.object(self.authenticator, "_request_access_token", return_value=failed_response):
+            self.authenticator.get_access_token()
+            self.wait_for_background_refresh()
+
+        mock_logger_warning.assert_called_once()
+        self.assertEqual(self.authenticator.cached_access_token, "an-old-access-token")
+        self.assertGreater(self.authenticator.cached_access_token_refresh_time, self.now)
+
+        # The lock is released, so a token can still be requested once the cached one expires
+        self.authenticator.cached_access_token_expiry_time = self.now
+        with patch.object(self.authenticator, "_request_access_token", return_value=self.token_response):
+            self.assertEqual(self.authenticator.get_access_token(), "a-new-access-token")
+        self.assertFalse(self.authenticator.refresh_stats()["last_refresh_timings"]["background"])
+
+    def test_refresh_ahead_can_be_turned_off(self):
+        """it should not refresh tokens ahead of expiry if the refresh fraction is 1"""
+        authenticator = AppRestrictedAuth(MagicMock(), "an-env", refresh_after_fraction=1)
+
+        with patch.object(authenticator, "_request_access_token", return_value=self.token_response) as mock_request:
+            authenticator.get_access_token()
+            authenticator.get_access_token()
+
+        self.assertIsNone(authenticator.cached_access_token_refresh_time)
+        self.assertIsNone(authenticator._refresh_thread)
+        mock_request.assert_called_once()
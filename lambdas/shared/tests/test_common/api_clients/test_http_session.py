@@ -0,0 +1,68 @@
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from common.api_clients import http_session
+from common.api_clients.constants import Constants
+from common.api_clients.http_session import create_http_session, get_http_pool_size, get_http_session
+
+
+class _CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = set()
+
+    def do_GET(self):
+        _CountingHandler.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *_args):
+        pass
+
+
+class TestHttpSession(unittest.TestCase):
+    def setUp(self):
+        self.session_patcher = patch.object(http_session, "global_http_session", None)
+        self.session_patcher.start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    def test_get_http_session_returns_the_same_session(self):
+        """it should create the session once and reuse it"""
+        self.assertIs(get_http_session(), get_http_session())
+
+    def test_pool_size_is_read_from_the_environment(self):
+        """it should size the connection pool from API_CLIENTS_POOL_SIZE"""
+        with patch.dict(os.environ, {"API_CLIENTS_POOL_SIZE": "25"}):
+            adapter = create_http_session().get_adapter("https://example.com")
+
+        self.assertEqual(adapter._pool_connections, 25)
+        self.assertEqual(adapter._pool_maxsize, 25)
+
+    def test_pool_size_defaults_for_missing_or_invalid_values(self):
+        """it should use the default pool size if API_CLIENTS_POOL_SIZE is missing or not a number"""
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(get_http_pool_size(), Constants.DEFAULT_API_CLIENTS_POOL_SIZE)
+        with patch.dict(os.environ, {"API_CLIENTS_POOL_SIZE": "many"}):
+            self.assertEqual(get_http_pool_size(), Constants.DEFAULT_API_CLIENTS_POOL_SIZE)
+        with patch.dict(os.environ, {"API_CLIENTS_POOL_SIZE": "0"}):
+            self.assertEqual(get_http_pool_size(), 1)
+
+    def test_connections_are_kept_alive_between_requests(self):
+        """it should send consecutive requests to the same host over one connection"""
+        _CountingHandler.connections = set()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _CountingHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        for _ in range(3):
+            get_http_session().get(f"http://127.0.0.1:{server.server_port}/", timeout=5)
+
+        self.assertEqual(len(_CountingHandler.connections), 1)
@@ -0,0 +1,190 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+from redis import ConnectionError as RedisConnectionError
+
+from common.api_clients.pds_cache import PDS_CACHE_REDIS_KEY_PREFIX, PdsPatientDetailsCache
+
+NHS_NUMBER = "9912003888"
+PATIENT_DETAILS = {"identifier": [{"value": NHS_NUMBER}], "generalPractitioner": [{"identifier": {"value": "Y12345"}}]}
+
+
+class TestPdsPatientDetailsCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = PdsPatientDetailsCache(ttl_seconds=60, max_entries=2)
+        self.fetch = MagicMock(return_value=PATIENT_DETAILS)
+        self.time_patcher = patch("common.api_clients.pds_cache.time.monotonic", return_value=1000.0)
+        self.mock_monotonic = self.time_patcher.start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    def test_details_are_fetched_once_within_the_ttl(self):
+        """it should return cached details for the NHS number until they expire"""
+        self.assertEqual(self.cache.get(NHS_NUMBER, self.fetch), PATIENT_DETAILS)
+        self.mock_monotonic.return_value = 1059.0
+        self.assertEqual(self.cache.get(NHS_NUMBER, self.fetch), PATIENT_DETAILS)
+        self.fetch.assert_called_once_with(NHS_NUMBER)
+
+        self.mock_monotonic.return_value = 1061.0
+        self.cache.get(NHS_NUMBER, self.fetch)
+        self.assertEqual(self.fetch.call_count, 2)
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.333)
+
+    def test_patient_not_found_is_cached(self):
+        """it should cache that PDS has no patient for the NHS number"""
+        self.fetch.return_value = None
+
+        self.assertIsNone(self.cache.get(NHS_NUMBER, self.fetch))
+        self.assertIsNone(self.cache.get(NHS_NUMBER, self.fetch))
+
+        self.fetch.assert_called_once()
+
+    def test_least_recently_used_details_are_evicted(self):
+        """it should evict the least recently used NHS number when the cache is full"""
+        self.cache.get("1", self.fetch)
+        self.cache.get("2", self.fetch)
+        self.cache.get("1", self.fetch)
+        self.cache.get("3", self.fetch)
+
+        self.cache.get("1", self.fetch)
+        self.cache.get("2", self.fetch)
+
+        self.assertEqual([call.args[0] for call in self.fetch.call_args_list], ["1", "2", "3", "2"])
+        self.assertEqual(self.cache.stats()["evictions"], 2)
+
+    def test_details_are_not_cached_if_disabled(self):
+        """it should fetch the details every time if the TTL is 0"""
+        cache = PdsPatientDetailsCache(ttl_seconds=0, max_entries=2)
+
+        cache.get(NHS_NUMBER, self.fetch)
+        cache.get(NHS_NUMBER, self.fetch)
+
+        self.assertEqual(self.fetch.call_count, 2)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_cache_is_not_used_if_not_requested(self):
+        """it should fetch the details without reading or updating the cache if use_cache is False"""
+        self.cache.get(NHS_NUMBER, self.fetch)
+        self.fetch.return_value = {"identifier": [{"value": "9912003889"}]}
+
+        self.assertEqual(self.cache.get(NHS_NUMBER, self.fetch, use_cache=False), self.fetch.return_value)
+        self.assertEqual(self.cache.get(NHS_NUMBER, self.fetch), PATIENT_DETAILS)
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_errors_are_raised_and_not_cached(self):
+        """it should raise the error from fetching the details, and fetch them again next time"""
+        self.fetch.side_effect = [RuntimeError("PDS unavailable"), PATIENT_DETAILS]
+
+        with self.assertRaises(RuntimeError):
+            self.cache.get(NHS_NUMBER, self.fetch)
+
+        self.assertEqual(self.cache.get(NHS_NUMBER, self.fetch), PATIENT_DETAILS)
+
+
+class TestPdsPatientDetailsCacheCoalescing(unittest.TestCase):
+    def run_concurrent_lookups(self, cache: PdsPatientDetailsCache, fetch, use_cache: bool = True) -> list:
+        """Looks up the same NHS number from several threads, all of which start before the first fetch returns"""
+        fetch_started = threading.Event()
+        release_fetch = threading.Event()
+
+        def slow_fetch(nhs_number):
+            fetch_started.set()
+            release_fetch.wait(5)
+            return fetch(nhs_number)
+
+        def lookup(_):
+            try:
+                return cache.get(NHS_NUMBER, slow_fetch, use_cache=use_cache)
+            except RuntimeError as error:
+                return error
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            first = executor.submit(lookup, None)
+            fetch_started.wait(5)
+            others = [executor.submit(lookup, None) for _ in range(4)]
+            while cache.coalesced < 4:
+                time.sleep(0.01)
+            release_fetch.set()
+            return [first.result(), *(future.result() for future in others)]
+
+    def test_concurrent_lookups_of_the_same_nhs_number_are_coalesced(self):
+        """it should make one request for the NHS number, whose result is returned to all the lookups"""
+        fetch = MagicMock(return_value=PATIENT_DETAILS)
+
+        results = self.run_concurrent_lookups(PdsPatientDetailsCache(ttl_seconds=0, max_entries=10), fetch)
+
+        self.assertEqual(results, [PATIENT_DETAILS] * 5)
+        fetch.assert_called_once()
+
+    def test_concurrent_lookups_are_coalesced_if_the_cache_is_not_used(self):
+        """it should coalesce the lookups even if they do not use the cache"""
+        fetch = MagicMock(return_value=PATIENT_DETAILS)
+        cache = PdsPatientDetailsCache(ttl_seconds=60, max_entries=10)
+
+        results = self.run_concurrent_lookups(cache, fetch, use_cache=False)
+
+        self.assertEqual(results, [PATIENT_DETAILS] * 5)
+        fetch.assert_called_once()
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_concurrent_lookups_all_receive_the_error(self):
+        """it should raise the error from the single request in every coalesced lookup"""
+        fetch = MagicMock(side_effect=RuntimeError("PDS unavailable"))
+
+        results = self.run_concurrent_lookups(PdsPatientDetailsCache(ttl_seconds=60, max_entries=10), fetch)
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        fetch.assert_called_once()
+
+
+class TestPdsPatientDetailsCacheRedisTier(unittest.TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeStrictRedis(decode_responses=True)
+        patch("common.redis_client.get_redis_client", return_value=self.redis).start()
+        self.fetch = MagicMock(return_value=PATIENT_DETAILS)
+
+    def tearDown(self):
+        patch.stopall()
+
+    def make_cache(self) -> PdsPatientDetailsCache:
+        return PdsPatientDetailsCache(ttl_seconds=60, max_entries=10, redis_ttl_seconds=300)
+
+    def test_details_are_shared_through_redis(self):
+        """it should use the details another container has stored in Redis, keyed by the hashed NHS number"""
+        self.make_cache().get(NHS_NUMBER, self.fetch)
+        other_container_cache = self.make_cache()
+
+        self.assertEqual(other_container_cache.get(NHS_NUMBER, self.fetch), PATIENT_DETAILS)
+
+        self.fetch.assert_called_once()
+        self.assertEqual(other_container_cache.stats()["redis_hits"], 1)
+        (key,) = self.redis.keys()
+        self.assertTrue(key.startswith(PDS_CACHE_REDIS_KEY_PREFIX))
+        self.assertNotIn(NHS_NUMBER, key)
+        self.assertLessEqual(self.redis.ttl(key), 300)
+
+    def test_redis_is_not_used_if_not_requested(self):
+        """it should neither read nor write Redis if use_cache is False"""
+        self.make_cache().get(NHS_NUMBER, self.fetch)
+
+        self.make_cache().get(NHS_NUMBER, self.fetch, use_cache=False)
+
+        self.assertEqual(self.fetch.call_count, 2)
+
+    @patch("common.api_clients.pds_cache.logger.warning")
+    def test_details_are_fetched_from_pds_if_redis_fails(self, mock_logger_warning):
+        """it should fetch the details from PDS if Redis cannot be read or written"""
+        failing_redis = MagicMock()
+        failing_redis.get.side_effect = RedisConnectionError("Connection refused")
+        failing_redis.setex.side_effect = RedisConnectionError("Connection refused")
+
+        with patch("common.redis_client.get_redis_client", return_value=failing_redis):
+            self.assertEqual(self.make_cache().get(NHS_NUMBER, self.fetch), PATIENT_DETAILS)
+
+        self.fetch.assert_called_once()
+        self.assertEqual(mock_logger_warning.call_count, 2)
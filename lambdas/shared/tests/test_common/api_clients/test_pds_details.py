@@ -3,12 +3,14 @@ from unittest.mock import MagicMock, patch
 
 from common.api_clients.errors import PdsSyncException
 from common.api_clients.get_pds_details import get_pds_service, pds_get_patient_details
+from common.api_clients.pds_cache import pds_patient_details_cache
 
 
 class TestGetPdsPatientDetails(unittest.TestCase):
     def setUp(self):
         self.test_patient_id = "9912003888"
         get_pds_service.__globals__["_pds_service"] = None
+        pds_patient_details_cache.clear()
 
         self.logger_patcher = patch("common.api_clients.get_pds_details.logger")
         self.mock_logger = self.logger_patcher.start()
@@ -88,3 +90,20 @@ class TestGetPdsPatientDetails(unittest.TestCase):
         self.mock_auth_class.assert_called_once()
         self.mock_pds_service_class.assert_called_once()
         self.assertEqual(self.mock_pds_service_instance.get_patient_details.call_count, 2)
+
+    def test_patient_details_are_cached(self):
+        self.mock_pds_service_instance.get_patient_details.return_value = {"identifier": [{"value": "1111111111"}]}
+
+        with patch.object(pds_patient_details_cache, "ttl_seconds", 60):
+            pds_get_patient_details("1111111111")
+            result = pds_get_patient_details("1111111111")
+
+        self.assertEqual(result, {"identifier": [{"value": "1111111111"}]})
+        self.mock_pds_service_instance.get_patient_details.assert_called_once_with("1111111111")
+
+    def test_cache_is_only_used_if_requested(self):
+        with patch.object(pds_patient_details_cache, "get", return_value=None) as mock_cache_get:
+            pds_get_patient_details("1111111111")
+            pds_get_patient_details("1111111111", use_cache=False)
+
+        self.assertEqual([call.kwargs["use_cache"] for call in mock_cache_get.call_args_list], [True, False])
@@ -72,7 +72,7 @@ def _make_response(status_code: int, text: str = "err"):
 
 class TestRequestWithRetryBackoff(unittest.TestCase):
     @patch("time.sleep")
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_returns_immediately_for_non_retryable_status(self, mock_get, mock_sleep):
         # Arrange
         mock_get.return_value = _make_response(400)
@@ -87,7 +87,7 @@ class TestRequestWithRetryBackoff(unittest.TestCase):
         mock_sleep.assert_not_called()
 
     @patch("time.sleep")
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_retries_until_exhausted_for_retryable_status(self, mock_get, mock_sleep):
         # Arrange: always retryable => should attempt 1 + max_retries times
         mock_get.side_effect = [
@@ -105,7 +105,7 @@ class TestRequestWithRetryBackoff(unittest.TestCase):
         self.assertEqual(mock_sleep.call_count, 2)  # sleep between retries only
 
     @patch("time.sleep")
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_stops_retrying_when_non_retryable_received(self, mock_get, mock_sleep):
         # Arrange: retryable twice, then success => should stop
         mock_get.side_effect = [
@@ -123,7 +123,7 @@ class TestRequestWithRetryBackoff(unittest.TestCase):
         self.assertEqual(mock_sleep.call_count, 2)
 
     @patch("time.sleep")
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_backoff_values_are_exponential(self, mock_get, mock_sleep):
         # Arrange: always retryable
         mock_get.side_effect = [
@@ -140,6 +140,26 @@ class TestRequestWithRetryBackoff(unittest.TestCase):
             [call(Constants.API_CLIENTS_BACKOFF_SECONDS), call(Constants.API_CLIENTS_BACKOFF_SECONDS * 2)]
         )
 
+    @patch("time.sleep")
+    @patch("common.api_clients.retry.logger")
+    @patch("requests.Session.request")
+    def test_logs_latency_for_the_endpoint(self, mock_request, mock_logger, _mock_sleep):
+        mock_request.side_effect = [_make_response(503), _make_response(200)]
+
+        request_with_retry_backoff("GET", "https://example.com/Patient/9000000009", {}, endpoint="PDS get patient")
+
+        args = mock_logger.info.call_args.args
+        self.assertEqual(args[:4], ("API request to %s: %s after %d attempt(s) in %.0fms", "PDS get patient", 200, 2))
+
+    @patch("common.api_clients.retry.logger")
+    @patch("requests.Session.request")
+    def test_latency_log_does_not_include_the_path_by_default(self, mock_request, mock_logger):
+        mock_request.return_value = _make_response(200)
+
+        request_with_retry_backoff("GET", "https://example.com/Patient/9000000009", {})
+
+        self.assertEqual(mock_logger.info.call_args.args[1], "GET example.com")
+
 
 class TestRequestWithRetryBackoffNetworkErrors(unittest.TestCase):
     """
@@ -148,7 +168,7 @@ class TestRequestWithRetryBackoffNetworkErrors(unittest.TestCase):
     """
 
     @patch("time.sleep")
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_read_timeout_is_retried(self, mock_request, mock_sleep):
         """ReadTimeout on attempt 1 then success on attempt 2 — must not raise."""
         mock_request.side_effect = [
@@ -163,7 +183,7 @@ class TestRequestWithRetryBackoffNetworkErrors(unittest.TestCase):
         self.assertEqual(mock_sleep.call_count, 1)
 
     @patch("time.sleep")
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_connection_error_is_retried(self, mock_request, mock_sleep):
         """ConnectionError on attempt 1 then success on attempt 2 — must not raise."""
         mock_request.side_effect = [
@@ -177,7 +197,7 @@ class TestRequestWithRetryBackoffNetworkErrors(unittest.TestCase):
         self.assertEqual(mock_request.call_count, 2)
 
     @patch("time.sleep")
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_timeout_exhausted_raises_after_max_retries(self, mock_request, mock_sleep):
         """
         ReadTimeout on every attempt — must raise after max_retries+1 total attempts.
@@ -191,7 +211,7 @@ class TestRequestWithRetryBackoffNetworkErrors(unittest.TestCase):
         self.assertEqual(mock_request.call_count, Constants.API_CLIENTS_MAX_RETRIES + 1)
 
     @patch("time.sleep")
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_timeout_retry_backoff_is_exponential(self, mock_request, mock_sleep):
         """Sleep intervals between network-error retries must be identical to HTTP retryable backoff."""
         mock_request.side_effect = requests.exceptions.ReadTimeout("read timeout=5")
@@ -207,7 +227,7 @@ class TestRequestWithRetryBackoffNetworkErrors(unittest.TestCase):
         )
 
     @patch("time.sleep")
-    @patch("requests.request")
+    @patch("requests.Session.request")
     def test_timeout_then_retryable_status_then_success(self, mock_request, mock_sleep):
         """Network error on attempt 1, HTTP 503 on attempt 2, success on attempt 3 — full coverage."""
         mock_request.side_effect = [
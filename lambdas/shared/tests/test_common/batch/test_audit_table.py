@@ -28,6 +28,7 @@ with patch.dict("os.environ", MOCK_ENVIRONMENT_DICT):
         NOTHING_TO_UPDATE_ERROR_MESSAGE,
         create_audit_table_item,
         get_ingestion_start_time_by_message_id,
+        get_processing_checkpoint_by_message_id,
         get_record_count_and_failures_by_message_id,
         increment_records_failed_count,
         update_audit_table_item,
@@ -302,6 +303,47 @@ class TestAuditTable(TestCase):
         self.assertEqual(record_count, 0)
         self.assertEqual(failed_count, 0)
 
+    def test_get_processing_checkpoint_by_message_id_returns_the_checkpoint(self):
+        """Test that get_processing_checkpoint_by_message_id retrieves the checkpoint for a file being processed"""
+        ravs_rsv_test_file = FileDetails("RSV", "RAVS", "X26")
+        dynamodb_client.put_item(
+            TableName=AUDIT_TABLE_NAME,
+            Item={
+                **MockFileDetails.rsv_ravs.audit_table_entry,
+                "status": {"S": FileStatus.PROCESSING},
+                "checkpoint_row_count": {"N": "5000"},
+                "checkpoint_byte_offset": {"N": "1234567"},
+            },
+        )
+
+        self.assertEqual(get_processing_checkpoint_by_message_id(ravs_rsv_test_file.message_id), (5000, 1234567))
+
+    def test_get_processing_checkpoint_by_message_id_returns_none_if_no_checkpoint_can_be_used(self):
+        """
+        Test that get_processing_checkpoint_by_message_id returns None if no checkpoint has been saved, or the file is
+        no longer being processed
+        """
+        ravs_rsv_test_file = FileDetails("RSV", "RAVS", "X26")
+        checkpoint_attributes = {"checkpoint_row_count": {"N": "5000"}, "checkpoint_byte_offset": {"N": "1234567"}}
+        test_cases = [
+            ("No checkpoint saved", FileStatus.PROCESSING, {}),
+            ("File already preprocessed", FileStatus.PREPROCESSED, checkpoint_attributes),
+            ("File failed", FileStatus.FAILED, checkpoint_attributes),
+        ]
+
+        for description, status, additional_attributes in test_cases:
+            with self.subTest(description):
+                dynamodb_client.put_item(
+                    TableName=AUDIT_TABLE_NAME,
+                    Item={
+                        **MockFileDetails.rsv_ravs.audit_table_entry,
+                        "status": {"S": status},
+                        **additional_attributes,
+                    },
+                )
+
+                self.assertIsNone(get_processing_checkpoint_by_message_id(ravs_rsv_test_file.message_id))
+
     def test_get_ingestion_start_time_by_message_id_returns_the_ingestion_start_time(self):
         """Test that get_ingestion_start_time_by_message_id retrieves the integer value of the ingestion start time"""
         ravs_rsv_test_file = FileDetails("RSV", "RAVS", "X26")
@@ -361,6 +403,29 @@ class TestAuditTable(TestCase):
         table_items = dynamodb_client.scan(TableName=AUDIT_TABLE_NAME).get("Items", [])
         self.assertEqual(table_items[0]["records_failed"]["N"], "1")
 
+    def test_increment_records_failed_count_adds_given_increment_to_existing_count(self):
+        """Checks audit table adds the given increment to an existing records_failed count"""
+        ravs_rsv_test_file = FileDetails("RSV", "RAVS", "X26")
+        expected_table_entry = {
+            **MockFileDetails.rsv_ravs.audit_table_entry,
+            "status": {"S": FileStatus.PREPROCESSED},
+            "records_failed": {"N": "3"},
+        }
+
+        dynamodb_client.put_item(TableName=AUDIT_TABLE_NAME, Item=expected_table_entry)
+
+        increment_records_failed_count(ravs_rsv_test_file.message_id, 250)
+
+        table_items = dynamodb_client.scan(TableName=AUDIT_TABLE_NAME).get("Items", [])
+        self.assertEqual(table_items[0]["records_failed"]["N"], "253")
+
+    def test_increment_records_failed_count_raises_error_if_item_does_not_exist(self):
+        """Checks the records_failed count is not created for a file which is not in the audit table"""
+        with self.assertRaises(UnhandledAuditTableError):
+            increment_records_failed_count("non_existent_message_id", 5)
+
+        self.assertEqual(dynamodb_client.scan(TableName=AUDIT_TABLE_NAME).get("Items", []), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,52 @@
+"""Tests for the ContainedResources index"""
+
+import unittest
+from unittest.mock import patch
+
+from common.models.contained_resources import ContainedResources
+from common.models.fhir_immunization_post_validators import PostValidators
+from common.models.fhir_immunization_pre_validators import PreValidators
+from common.models.utils.generic_utils import get_contained_patient, get_contained_practitioner, get_nhs_number
+from test_common.testing_utils.generic_utils import load_json_data
+
+
+class TestContainedResources(unittest.TestCase):
+    def setUp(self):
+        self.json_data = load_json_data(filename="completed_covid_immunization_event.json")
+
+    def test_returns_the_first_contained_resource_of_each_type(self):
+        patient = {"resourceType": "Patient", "id": "Pat1"}
+        second_patient = {"resourceType": "Patient", "id": "Pat2"}
+        practitioner = {"resourceType": "Practitioner", "id": "Pract1"}
+
+        contained = ContainedResources({"contained": [patient, practitioner, second_patient]})
+
+        self.assertIs(contained.patient, patient)
+        self.assertIs(contained.practitioner, practitioner)
+        self.assertIs(contained.get("Patient"), patient)
+
+    def test_raises_index_error_when_there_is_no_resource_of_the_type(self):
+        contained = ContainedResources({"contained": [{"resourceType": "Patient", "id": "Pat1"}]})
+
+        with self.assertRaises(IndexError):
+            contained.practitioner
+
+    def test_contained_resource_helpers_give_the_same_results_with_the_index(self):
+        contained = ContainedResources(self.json_data)
+
+        self.assertIs(get_contained_patient(self.json_data, contained), get_contained_patient(self.json_data))
+        self.assertIs(get_contained_practitioner(self.json_data, contained), get_contained_practitioner(self.json_data))
+        self.assertEqual(get_nhs_number(self.json_data, contained), get_nhs_number(self.json_data))
+
+    def test_validators_traverse_contained_once(self):
+        for name, validator in (
+            ("pre", PreValidators(self.json_data)),
+            ("post", PostValidators(self.json_data, "COVID")),
+        ):
+            with self.subTest(validators=name):
+                with patch(
+                    f"common.models.fhir_immunization_{name}_validators.ContainedResources", wraps=ContainedResources
+                ) as mock_contained_resources:
+                    validator.validate()
+
+                mock_contained_resources.assert_called_once_with(self.json_data)
@@ -0,0 +1,87 @@
+"""Tests for validating a batch of immunizations with the ImmunizationValidator"""
+
+import unittest
+from copy import deepcopy
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+from fhir.resources.R4B.immunization import Immunization
+from redis import ConnectionError as RedisConnectionError
+
+from common.models.constants import RedisHashKeys
+from common.models.fhir_immunization import ImmunizationValidator
+from common.models.utils.validation_utils import get_target_disease_codes, make_disease_codes_key
+from test_common.testing_utils.generic_utils import load_json_data
+
+
+class TestImmunizationValidatorBatch(unittest.TestCase):
+    def setUp(self):
+        self.validator = ImmunizationValidator()
+        self.covid_json_data = load_json_data("completed_covid_immunization_event.json")
+        self.flu_json_data = load_json_data("completed_flu_immunization_event.json")
+
+        self.redis = fakeredis.FakeStrictRedis(decode_responses=True)
+        self.redis.hset(
+            RedisHashKeys.DISEASES_TO_VACCINE_TYPE_HASH_KEY,
+            mapping={
+                make_disease_codes_key(get_target_disease_codes(self.covid_json_data)): "COVID",
+                make_disease_codes_key(get_target_disease_codes(self.flu_json_data)): "FLU",
+            },
+        )
+        self.redis_spy = MagicMock(wraps=self.redis)
+        self.redis_getter_patcher = patch(
+            "common.models.utils.validation_utils.get_redis_client", return_value=self.redis_spy
+        )
+        self.redis_getter_patcher.start()
+
+    def tearDown(self):
+        patch.stopall()
+
+    def make_invalid_batch(self) -> list[dict]:
+        """Returns a batch including resources which fail pre validation, the vaccine type lookup and post validation"""
+        invalid_status = deepcopy(self.covid_json_data)
+        invalid_status["status"] = "not-completed"
+        invalid_disease = deepcopy(self.flu_json_data)
+        invalid_disease["protocolApplied"][0]["targetDisease"][0]["coding"][0]["code"] = "999999"
+        invalid_post = deepcopy(self.covid_json_data)
+        del invalid_post["primarySource"]
+        return [invalid_status, self.flu_json_data, invalid_disease, invalid_post, self.covid_json_data]
+
+    def test_validate_batch_reads_vaccine_types_with_a_single_hmget(self):
+        batch = [self.covid_json_data, self.flu_json_data, deepcopy(self.covid_json_data)]
+
+        results = self.validator.validate_batch(batch)
+
+        self.assertTrue(all(isinstance(result, Immunization) for result in results))
+        self.redis_spy.hmget.assert_called_once()
+        self.assertEqual(len(self.redis_spy.hmget.call_args.args[1]), 2)
+        self.redis_spy.hget.assert_not_called()
+
+    def test_validate_batch_returns_the_errors_raised_by_validate_in_order(self):
+        batch = self.make_invalid_batch()
+        expected_results = []
+        for immunization in deepcopy(batch):
+            try:
+                expected_results.append(type(self.validator.validate(immunization)))
+            except Exception as error:  # pylint: disable = broad-exception-caught
+                expected_results.append((type(error), str(error)))
+
+        results = self.validator.validate_batch(batch)
+
+        self.assertEqual(
+            [type(result) if isinstance(result, Immunization) else (type(result), str(result)) for result in results],
+            expected_results,
+        )
+        self.assertEqual(expected_results[1], Immunization)
+        self.assertEqual(expected_results[4], Immunization)
+        self.redis_spy.hmget.assert_called_once()
+
+    @patch("common.models.fhir_immunization.logger.warning")
+    def test_validate_batch_reads_vaccine_types_per_resource_if_prefetch_fails(self, mock_logger_warning):
+        self.redis_spy.hmget.side_effect = RedisConnectionError("Connection refused")
+
+        results = self.validator.validate_batch([self.covid_json_data, self.flu_json_data])
+
+        self.assertTrue(all(isinstance(result, Immunization) for result in results))
+        self.assertEqual(self.redis_spy.hget.call_count, 2)
+        mock_logger_warning.assert_called_once()
@@ -0,0 +1,29 @@
+"""Tests for the pre_validator_utils module"""
+
+import unittest
+
+from common.models.utils.pre_validator_utils import PreValidation
+
+
+class TestPreValidationForDateTime(unittest.TestCase):
+    """Tests for PreValidation.for_date_time"""
+
+    def test_for_date_time_accepts_a_lowercase_time_separator(self):
+        """it should accept a lowercase "t" between the date and time, as strptime matches it case-insensitively"""
+        valid_date_times = {
+            "2000-01-01t00:00:00+00:00": "2000-01-01T00:00:00+00:00",
+            "1933-12-31t11:11:11.1+01:00": "1933-12-31T11:11:11.100000+01:00",
+        }
+
+        for valid_date_time, expected_date_time in valid_date_times.items():
+            with self.subTest(valid_date_time=valid_date_time):
+                self.assertEqual(PreValidation.for_date_time(valid_date_time, "occurrenceDateTime"), expected_date_time)
+
+    def test_for_date_time_rejects_a_date_with_a_time_but_no_separator(self):
+        """it should reject a datetime with no separator between the date and time"""
+        with self.assertRaises(ValueError):
+            PreValidation.for_date_time("2000-01-0100:00:00+00:00", "occurrenceDateTime")
+
+
+if __name__ == "__main__":
+    unittest.main()
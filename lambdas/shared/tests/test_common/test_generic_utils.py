@@ -15,6 +15,7 @@ from common.models.utils.generic_utils import (
     get_nhs_number,
     get_occurrence_datetime,
     is_actor_referencing_contained_resource,
+    make_patient_occurrence_sk,
 )
 from common.models.utils.validation_utils import (
     convert_disease_codes_to_vaccine_type,
@@ -99,6 +100,19 @@ class TestGenericUtils(unittest.TestCase):
         result = get_occurrence_datetime(immunization)
         self.assertIsNone(result)
 
+    def test_make_patient_occurrence_sk(self):
+        """Test make_patient_occurrence_sk uses the date of the occurrence, however the occurrence is given"""
+        test_cases = [
+            ("2023-01-15T23:30:00+01:00", "COVID#2023-01-15#an-id"),
+            ("2023-01-15", "COVID#2023-01-15#an-id"),
+            (datetime.datetime(2023, 1, 15, 10, 30, tzinfo=datetime.UTC), "COVID#2023-01-15#an-id"),
+            (datetime.date(2023, 1, 15), "COVID#2023-01-15#an-id"),
+            (None, "COVID##an-id"),
+        ]
+        for occurrence, expected in test_cases:
+            with self.subTest(occurrence=occurrence):
+                self.assertEqual(make_patient_occurrence_sk("COVID", occurrence, "an-id"), expected)
+
     def test_create_diagnostics(self):
         """Test create_diagnostics returns expected error structure"""
         result = create_diagnostics()
@@ -4,6 +4,7 @@ import unittest
 from copy import deepcopy
 from unittest.mock import Mock, patch
 
+from fhir.resources.R4B.immunization import Immunization
 from jsonpath_ng.ext import parse
 from pydantic import ValidationError
 
@@ -88,7 +89,7 @@ class TestImmunizationModelPostValidationRules(unittest.TestCase):
         self.mock_redis.hget.return_value = "COVID"
         self.mock_redis_getter.return_value = self.mock_redis
         for json_data in list(self.completed_json_data.values()):
-            self.assertIsNone(self.validator.validate(json_data))
+            self.assertIsInstance(self.validator.validate(json_data), Immunization)
 
     def test_post_validate_and_set_vaccine_type(self):
         """
@@ -119,7 +120,7 @@ class TestImmunizationModelPostValidationRules(unittest.TestCase):
             "MMR",
             "RSV",
         ]:
-            self.assertIsNone(self.validator.validate(self.completed_json_data[vaccine_type]))
+            self.assertIsInstance(self.validator.validate(self.completed_json_data[vaccine_type]), Immunization)
 
         # Test that an invalid single disease code is rejected
         _test_invalid_values_rejected(
@@ -5,6 +5,7 @@ from copy import deepcopy
 from decimal import Decimal
 from unittest.mock import Mock, patch
 
+from fhir.resources.R4B.immunization import Immunization
 from jsonpath_ng.ext import parse
 
 from common.models.constants import Constants, Urls
@@ -82,7 +83,7 @@ class TestImmunizationModelPreValidationRules(unittest.TestCase):
 
         # Case: resourceType == 'Immunization' accepted
         valid_json_data = deepcopy(self.json_data)
-        self.assertIsNone(self.validator.validate(valid_json_data))
+        self.assertIsInstance(self.validator.validate(valid_json_data), Immunization)
 
         # Case: resourceType != 'Immunization' not accepted
         _test_invalid_values_rejected(
@@ -109,7 +110,7 @@ class TestImmunizationModelPreValidationRules(unittest.TestCase):
         # ACCEPT: Full resource with id
         valid_json_data = deepcopy(self.json_data)
         valid_json_data["id"] = "an-id"
-        self.assertIsNone(self.validator.validate(valid_json_data))
+        self.assertIsInstance(self.validator.validate(valid_json_data), Immunization)
 
         # REJECT: Immunization with subpotent and reportOrigin elements,
         # Patient with extension element, Practitioner with identifier element
@@ -1030,7 +1031,7 @@ class TestImmunizationModelPreValidationRules(unittest.TestCase):
         valid_json_data = load_json_data(filename="completed_mmr_immunization_event.json")
 
         # Case: valid targetDisease
-        self.assertIsNone(self.validator.validate(valid_json_data))
+        self.assertIsInstance(self.validator.validate(valid_json_data), Immunization)
 
         # CASE: targetDisease absent
         _test_invalid_values_rejected(
@@ -1,8 +1,8 @@
 import json
 import unittest
-from unittest.mock import patch
+from unittest.mock import call, patch
 
-from common.log_firehose import send_log_to_firehose
+from common.log_firehose import send_log_to_firehose, send_logs_to_firehose
 
 
 class TestLogFirehose(unittest.TestCase):
@@ -12,6 +12,8 @@ class TestLogFirehose(unittest.TestCase):
         self.mock_logger_exception = self.logger_exception_patcher.start()
         self.firehose_client_patcher = patch("common.clients.global_firehose_client")
         self.mock_firehose_client = self.firehose_client_patcher.start()
+        self.sleep_patcher = patch("common.log_firehose.time.sleep")
+        self.mock_sleep = self.sleep_patcher.start()
 
     def tearDown(self):
         patch.stopall()
@@ -67,3 +69,73 @@ class TestLogFirehose(unittest.TestCase):
 
         # Verify logger.exception was called with the correct message and error
         self.mock_logger_exception.assert_called_once_with("Error sending log to Firehose: %s", test_error)
+
+    def test_send_logs_to_firehose_sends_logs_in_one_batch(self):
+        """Test that send_logs_to_firehose sends all of the logs with a single PutRecordBatch request"""
+        logs_data = [{"function_name": "test_func", "result": str(index)} for index in range(3)]
+        self.mock_firehose_client.put_record_batch.return_value = {"FailedPutCount": 0}
+
+        send_logs_to_firehose(self.test_stream, logs_data)
+
+        self.mock_firehose_client.put_record_batch.assert_called_once_with(
+            DeliveryStreamName=self.test_stream,
+            Records=[{"Data": json.dumps({"event": log_data}).encode("utf-8")} for log_data in logs_data],
+        )
+        self.mock_firehose_client.put_record.assert_not_called()
+
+    def test_send_logs_to_firehose_splits_batches_at_record_limit(self):
+        """Test that no more than 500 logs are sent in each PutRecordBatch request"""
+        logs_data = [{"result": str(index)} for index in range(1001)]
+        self.mock_firehose_client.put_record_batch.return_value = {"FailedPutCount": 0}
+
+        send_logs_to_firehose(self.test_stream, logs_data)
+
+        batch_sizes = [len(c.kwargs["Records"]) for c in self.mock_firehose_client.put_record_batch.call_args_list]
+        self.assertEqual(batch_sizes, [500, 500, 1])
+
+    def test_send_logs_to_firehose_splits_batches_at_size_limit(self):
+        """Test that no more than 4 MiB of logs are sent in each PutRecordBatch request"""
+        logs_data = [{"result": "x" * 900_000} for _ in range(5)]
+        self.mock_firehose_client.put_record_batch.return_value = {"FailedPutCount": 0}
+
+        send_logs_to_firehose(self.test_stream, logs_data)
+
+        batch_sizes = [len(c.kwargs["Records"]) for c in self.mock_firehose_client.put_record_batch.call_args_list]
+        self.assertEqual(batch_sizes, [4, 1])
+
+    def test_send_logs_to_firehose_resends_rejected_logs(self):
+        """Test that only the logs rejected by Firehose are sent again"""
+        logs_data = [{"result": str(index)} for index in range(3)]
+        self.mock_firehose_client.put_record_batch.side_effect = [
+            {
+                "FailedPutCount": 1,
+                "RequestResponses": [{"RecordId": "1"}, {"ErrorCode": "ServiceUnavailableException"}, {"RecordId": "3"}],
+            },
+            {"FailedPutCount": 0},
+        ]
+
+        send_logs_to_firehose(self.test_stream, logs_data)
+
+        self.assertEqual(
+            self.mock_firehose_client.put_record_batch.call_args_list[1],
+            call(
+                DeliveryStreamName=self.test_stream,
+                Records=[{"Data": json.dumps({"event": logs_data[1]}).encode("utf-8")}],
+            ),
+        )
+        self.mock_sleep.assert_called_once()
+
+    def test_send_logs_to_firehose_exception(self):
+        """Test that an error sending the logs is logged rather than raised"""
+        test_error = Exception("Firehose connection failed")
+        self.mock_firehose_client.put_record_batch.side_effect = test_error
+
+        send_logs_to_firehose(self.test_stream, [{"result": "error"}])
+
+        self.mock_logger_exception.assert_called_once_with("Error sending logs to Firehose: %s", test_error)
+
+    def test_send_logs_to_firehose_no_logs(self):
+        """Test that no request is made when there are no logs to send"""
+        send_logs_to_firehose(self.test_stream, [])
+
+        self.mock_firehose_client.put_record_batch.assert_not_called()
@@ -0,0 +1,118 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import fakeredis
+
+from common.redis_cache import (
+    RedisLocalCache,
+    cached_hget,
+    cached_hkeys,
+    cached_hmget,
+    redis_local_cache,
+)
+
+
+class TestRedisLocalCache(unittest.TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeStrictRedis(decode_responses=True)
+        self.redis.hset("supplier_permissions", mapping={"EMIS": '["RSV.CRUDS"]', "TPP": '["FLU.R"]'})
+        self.redis_spy = MagicMock(wraps=self.redis)
+
+        self.monotonic_patcher = patch("common.redis_cache.time.monotonic", return_value=1000.0)
+        self.mock_monotonic = self.monotonic_patcher.start()
+
+        self.cache = RedisLocalCache(ttl_seconds=60, version_check_interval_seconds=5)
+
+    def tearDown(self):
+        patch.stopall()
+
+    def get_emis_permissions(self):
+        return self.cache.get(
+            self.redis_spy,
+            ("hget", "supplier_permissions", "EMIS"),
+            lambda: self.redis_spy.hget("supplier_permissions", "EMIS"),
+        )
+
+    def test_repeated_reads_are_served_from_cache(self):
+        for _ in range(3):
+            self.assertEqual(self.get_emis_permissions(), '["RSV.CRUDS"]')
+
+        self.redis_spy.hget.assert_called_once_with("supplier_permissions", "EMIS")
+        self.assertEqual(self.cache.stats(), {"hits": 2, "misses": 1, "invalidations": 0, "entries": 1})
+
+    def test_entry_is_read_again_after_ttl(self):
+        self.get_emis_permissions()
+        self.redis.hset("supplier_permissions", "EMIS", '["RSV.R"]')
+
+        self.mock_monotonic.return_value = 1059.0
+        self.assertEqual(self.get_emis_permissions(), '["RSV.CRUDS"]')
+
+        self.mock_monotonic.return_value = 1060.0
+        self.assertEqual(self.get_emis_permissions(), '["RSV.R"]')
+        self.assertEqual(self.redis_spy.hget.call_count, 2)
+
+    def test_cache_is_cleared_when_config_version_changes(self):
+        self.get_emis_permissions()
+        self.redis.hset("supplier_permissions", "EMIS", '["RSV.R"]')
+        self.redis.incr("config_version")
+
+        # The version is not checked again until the check interval has passed
+        self.mock_monotonic.return_value = 1004.0
+        self.assertEqual(self.get_emis_permissions(), '["RSV.CRUDS"]')
+
+        self.mock_monotonic.return_value = 1005.0
+        self.assertEqual(self.get_emis_permissions(), '["RSV.R"]')
+        self.assertEqual(self.cache.invalidations, 1)
+        self.assertEqual(self.redis_spy.get.call_count, 2)
+
+    def test_disabled_cache_always_reads_from_redis(self):
+        self.cache = RedisLocalCache(ttl_seconds=0, version_check_interval_seconds=5)
+
+        self.get_emis_permissions()
+        self.get_emis_permissions()
+
+        self.assertEqual(self.redis_spy.hget.call_count, 2)
+        self.redis_spy.get.assert_not_called()
+        self.assertEqual(self.cache.stats(), {"hits": 0, "misses": 0, "invalidations": 0, "entries": 0})
+
+
+class TestCachedRedisReads(unittest.TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeStrictRedis(decode_responses=True)
+        self.redis.hset("vacc_to_diseases", mapping={"RSV": "[]", "FLU": "[]"})
+        self.redis_spy = MagicMock(wraps=self.redis)
+
+        redis_local_cache.clear()
+        self.ttl_patcher = patch.object(redis_local_cache, "ttl_seconds", 60)
+        self.ttl_patcher.start()
+
+    def tearDown(self):
+        patch.stopall()
+        redis_local_cache.clear()
+
+    def test_cached_reads_return_copies_of_cached_values(self):
+        keys = cached_hkeys(self.redis_spy, "vacc_to_diseases")
+        keys.append("MUTATED")
+
+        self.assertCountEqual(cached_hkeys(self.redis_spy, "vacc_to_diseases"), ["RSV", "FLU"])
+        self.assertEqual(cached_hget(self.redis_spy, "vacc_to_diseases", "RSV"), "[]")
+        self.redis_spy.hkeys.assert_called_once()
+
+    def test_cached_hmget_reads_only_uncached_fields_with_a_single_hmget(self):
+        self.assertEqual(cached_hget(self.redis_spy, "vacc_to_diseases", "RSV"), "[]")
+
+        values = cached_hmget(self.redis_spy, "vacc_to_diseases", ["FLU", "RSV", "MISSING", "FLU"])
+
+        self.assertEqual(values, ["[]", "[]", None, "[]"])
+        self.redis_spy.hmget.assert_called_once_with("vacc_to_diseases", ["FLU", "MISSING"])
+        self.assertEqual(cached_hget(self.redis_spy, "vacc_to_diseases", "FLU"), "[]")
+        self.redis_spy.hget.assert_called_once()
+
+    def test_cached_hmget_reads_all_fields_when_cache_is_disabled(self):
+        with patch.object(redis_local_cache, "ttl_seconds", 0):
+            values = cached_hmget(self.redis_spy, "vacc_to_diseases", ["RSV", "FLU"])
+            cached_hmget(self.redis_spy, "vacc_to_diseases", ["RSV", "FLU"])
+
+        self.assertEqual(values, ["[]", "[]"])
+        self.assertEqual(self.redis_spy.hmget.call_count, 2)
+        self.assertEqual(cached_hmget(self.redis_spy, "vacc_to_diseases", []), [])
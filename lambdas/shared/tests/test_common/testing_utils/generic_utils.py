@@ -7,6 +7,7 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import Any, Literal
 
+from fhir.resources.R4B.immunization import Immunization
 from jsonpath_ng.ext import parse
 
 
@@ -52,7 +53,7 @@ def test_valid_values_accepted(
         # Update the value at the relevant field location to the valid value to be tested
         valid_json_data = parse(field_location).update(valid_json_data, valid_item)
         # Test that the valid data is accepted by the model
-        test_instance.assertIsNone(test_instance.validator.validate(valid_json_data))
+        test_instance.assertIsInstance(test_instance.validator.validate(valid_json_data), Immunization)
 
 
 def test_invalid_values_rejected(
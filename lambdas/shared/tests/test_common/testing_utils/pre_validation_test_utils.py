@@ -3,6 +3,7 @@
 import unittest
 from copy import deepcopy
 
+from fhir.resources.R4B.immunization import Immunization
 from jsonpath_ng.ext import parse
 
 from .generic_utils import (
@@ -531,7 +532,7 @@ class ValidatorModelTests:
         valid_json_data = parse("contained").update(valid_json_data, contained)
         valid_json_data = parse("performer").update(valid_json_data, performer)
 
-        test_instance.assertIsNone(test_instance.validator.validate(valid_json_data))
+        test_instance.assertIsInstance(test_instance.validator.validate(valid_json_data), Immunization)
 
     @staticmethod
     def test_invalid_performer_actor_reference_rejected(
@@ -571,7 +572,7 @@ class ValidatorModelTests:
         valid_json_data = parse("contained").update(valid_json_data, contained)
         valid_json_data = parse("patient").update(valid_json_data, patient)
 
-        test_instance.assertIsNone(test_instance.validator.validate(valid_json_data))
+        test_instance.assertIsInstance(test_instance.validator.validate(valid_json_data), Immunization)
 
     @staticmethod
     def test_invalid_patient_reference_rejected(